@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do arquivamento de movimentações antigas
+
+Cria um banco temporário com movimentações distribuídas por vários anos e
+compara, antes e depois de arquivar (database/archive.py):
+  - o tamanho do banco principal (após VACUUM)
+  - o relatório de movimentações do último mês (período recente)
+  - o relatório de um período antigo e o histórico completo do item (anexam
+    os arquivos anuais)
+
+Uso:
+    python benchmarks/bench_archive.py [movimentacoes] [anos]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def best_of(func, repeat=5):
+    """Menor tempo (ms) entre as execuções, sem o cache de consultas"""
+    from database.connection import db
+    
+    tempos = []
+    for _ in range(repeat):
+        db.query_cache.invalidate()
+        start = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - start) * 1000)
+    return min(tempos)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    
+    folder = tempfile.mkdtemp(prefix="brindez_archive_")
+    try:
+        import config.settings as settings
+        settings.DB_PATH = os.path.join(folder, "brindes.db")
+        
+        from database.connection import db
+        from database.archive import archive_manager
+        from utils.report_generator import report_generator
+        
+        conn = db.get_connection()
+        conn.execute(
+            "INSERT INTO brindes (descricao, codigo_interno, categoria_id, unidade_id, filial_id, quantidade, valor_unitario, estoque_minimo) "
+            "VALUES ('Caneta', 'BRD-1', 1, 1, 1, 100, 2.5, 10)"
+        )
+        brinde_id = conn.execute("SELECT MAX(id) FROM brindes").fetchone()[0]
+        usuario_id = conn.execute("SELECT MIN(id) FROM usuarios").fetchone()[0]
+        
+        random.seed(1)
+        agora = datetime.now()
+        conn.executemany(
+            """
+            INSERT INTO movimentacoes (brinde_id, tipo, quantidade, valor_unitario, usuario_id, justificativa, data_movimentacao)
+            VALUES (?, 'ENTRADA', ?, 2.5, ?, ?, ?)
+            """,
+            (
+                (
+                    brinde_id, random.randint(1, 50), usuario_id, f"Movimentação {i}",
+                    (agora - timedelta(days=random.uniform(0, 365 * years))).strftime("%Y-%m-%d %H:%M:%S")
+                )
+                for i in range(rows)
+            )
+        )
+        # Carga em massa: o log de alterações dessas inserções já teria saído
+        # pela retenção (CHANGE_LOG_RETENTION_DAYS)
+        conn.execute("DELETE FROM log_alteracoes")
+        conn.commit()
+        
+        recente = ((agora - timedelta(days=30)).strftime("%Y-%m-%d"), agora.strftime("%Y-%m-%d"))
+        antigo = (f"{agora.year - years + 1}-01-01", f"{agora.year - years + 1}-12-31")
+        
+        def measure():
+            conn.commit()
+            conn.execute("VACUUM")
+            return {
+                "banco": os.path.getsize(settings.DB_PATH) / (1024 * 1024),
+                "recente": best_of(lambda: report_generator.get_movimentacoes(*recente)),
+                "antigo": best_of(lambda: report_generator.get_movimentacoes(*antigo)),
+                "historico": best_of(lambda: report_generator.get_historico_item(brinde_id), repeat=3),
+            }
+        
+        anterior = measure()
+        
+        start = time.perf_counter()
+        while archive_manager.pending():
+            archive_manager.archive()
+        arquivamento = time.perf_counter() - start
+        
+        atual = measure()
+        
+        print(f"📦 {rows:,} movimentações em {years} anos (horizonte: {settings.ARCHIVE_HORIZON_DAYS} dias)\n")
+        print(f"{'':<32} {'Antes':>10} {'Depois':>10}")
+        print(f"{'Banco principal (MB)':<32} {anterior['banco']:>10.1f} {atual['banco']:>10.1f}")
+        print(f"{'Relatório do último mês (ms)':<32} {anterior['recente']:>10.1f} {atual['recente']:>10.1f}")
+        print(f"{'Relatório de ' + antigo[0][:4] + ' (ms)':<32} {anterior['antigo']:>10.1f} {atual['antigo']:>10.1f}")
+        print(f"{'Histórico completo do item (ms)':<32} {anterior['historico']:>10.1f} {atual['historico']:>10.1f}")
+        print(f"\nArquivamento: {arquivamento:.1f} s, anos arquivados: {archive_manager.years()}")
+        
+        db.close()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
+
+# Updated: 2026-10-19
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do armazenamento de backups
+
+Simula um dia de backups automáticos (um por hora) num banco com brindes
+sintéticos, com algumas movimentações entre um backup e outro e horas sem
+nenhuma alteração:
+  - anterior: cópia completa (.db) com shutil.copy2 a cada hora, mesmo sem alterações
+  - atual: backup pulado quando o banco não mudou; o primeiro é uma base
+    completa (blocos comprimidos) e os seguintes são diferenciais, só com as
+    páginas alteradas
+
+Mostra o total gravado em disco no dia, a média gravada por backup, o espaço
+ocupado para manter os 24 backups (o formato anterior mantinha só 2) e o
+tempo para restaurar o último backup (a base mais a cadeia de diferenciais).
+
+Uso:
+    python benchmarks/bench_backup_storage.py [brindes] [horas_com_alteracao]
+"""
+import glob
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.backup_manager import BackupManager
+
+
+def build_database(db_path, rows):
+    """Cria um banco com o schema da aplicação e brindes sintéticos"""
+    conn = sqlite3.connect(db_path)
+    with open(os.path.join(ROOT, "database", "schema.sql"), encoding="utf-8") as file:
+        conn.executescript(file.read())
+    conn.execute("INSERT INTO filiais (id, numero, nome, cidade) VALUES (1, '001', 'Matriz', 'São Paulo')")
+    conn.execute("INSERT INTO categorias (id, nome) VALUES (1, 'Geral')")
+    conn.execute("INSERT INTO unidades_medida (id, codigo, nome) VALUES (1, 'UN', 'Unidade')")
+    
+    random.seed(1)
+    conn.executemany(
+        """
+        INSERT INTO brindes (
+            descricao, codigo_interno, categoria_id, unidade_id, filial_id,
+            quantidade, valor_unitario, estoque_minimo, observacoes
+        ) VALUES (?, ?, 1, 1, 1, ?, ?, 10, ?)
+        """,
+        (
+            (f"Brinde {i}", f"BRD-{i:06d}", random.randint(0, 200), random.uniform(1, 50), f"Observação {i} " * 8)
+            for i in range(rows)
+        )
+    )
+    conn.commit()
+    return conn
+
+
+def change_some(conn, rows):
+    """Algumas alterações de estoque, como numa hora de uso"""
+    for _ in range(20):
+        conn.execute(
+            "UPDATE brindes SET quantidade = quantidade + 1 WHERE id = ?",
+            (random.randint(1, rows),)
+        )
+    conn.commit()
+
+
+def folder_size(path):
+    return sum(os.path.getsize(p) for p in glob.glob(os.path.join(path, "**", "*"), recursive=True) if os.path.isfile(p))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    changed_hours = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    
+    folder = tempfile.mkdtemp(prefix="brindez_backup_")
+    try:
+        db_path = os.path.join(folder, "brindes.db")
+        conn = build_database(db_path, rows)
+        size_mb = os.path.getsize(db_path) / (1024 * 1024)
+        print(f"💾 Banco: {rows:,} brindes, {size_mb:.1f} MB; 24 backups por hora, {changed_hours} horas com alterações\n")
+        
+        # Anterior: cópia completa a cada hora
+        full_dir = os.path.join(folder, "completo")
+        os.makedirs(full_dir)
+        started = time.perf_counter()
+        written_full = 0
+        for hour in range(24):
+            if hour < changed_hours:
+                change_some(conn, rows)
+            shutil.copy2(db_path, os.path.join(full_dir, f"{hour:02d}.db"))
+            written_full += os.path.getsize(db_path)
+        time_full = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        shutil.copy2(os.path.join(full_dir, "23.db"), os.path.join(folder, "restaurado.db"))
+        restore_full = time.perf_counter() - started
+        
+        # Atual: backup automático (pula se não mudou) com base e diferenciais
+        manager = BackupManager(db_path, os.path.join(folder, "blocos_dedup"))
+        manager.step_pause = 0
+        manager._cleanup_old_backups = lambda: None  # manter todos os backups do dia (criados no mesmo minuto)
+        started = time.perf_counter()
+        created = 0
+        for hour in range(24):
+            if hour < changed_hours:
+                change_some(conn, rows)
+            latest = manager.get_latest_backup()
+            if latest and latest["marker"] == manager._change_marker():
+                continue
+            manager.create_backup(f"hora{hour:02d}")
+            created += 1
+        time_dedup = time.perf_counter() - started
+        backups = manager.list_backups()
+        written_dedup = sum(backup["stored"] for backup in backups)
+        
+        started = time.perf_counter()
+        manager._materialize(backups[0]["path"], os.path.join(folder, "restaurado.db"))
+        restore_dedup = time.perf_counter() - started
+        
+        print(
+            f"{'':>10} {'Backups':>8} {'Gravado (MB)':>13} {'Por backup (MB)':>16} "
+            f"{'Em disco (MB)':>14} {'Tempo (s)':>10} {'Restaurar (s)':>14}"
+        )
+        print(
+            f"{'Anterior':>10} {24:>8} {written_full / 2**20:>13.1f} {written_full / 24 / 2**20:>16.2f} "
+            f"{folder_size(full_dir) / 2**20:>14.1f} {time_full:>10.2f} {restore_full:>14.2f}"
+        )
+        print(
+            f"{'Atual':>10} {created:>8} {written_dedup / 2**20:>13.1f} {written_dedup / created / 2**20:>16.2f} "
+            f"{folder_size(manager.backup_dir) / 2**20:>14.1f} {time_dedup:>10.2f} {restore_dedup:>14.2f}"
+        )
+        diffs = [backup["stored"] for backup in backups if backup["type"] == "diferencial"]
+        if diffs:
+            print(f"\nDiferenciais: {len(diffs)}, média de {sum(diffs) / len(diffs) / 1024:.0f} KB gravados por backup")
+        conn.close()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
+
+# Updated: 2026-10-19
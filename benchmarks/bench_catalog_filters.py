@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da primeira tela do catálogo de brindes com filtros
+
+Cria um banco temporário com um catálogo grande (várias filiais, categorias e
+fornecedores) e compara, para cada combinação de filtro e ordenação, o tempo
+até ter os cards da primeira página:
+  - antes: get_grouped_by_description de tudo, filtros e ordenação em Python
+    e get_by_description para cada grupo exibido (limite inferior: só os da
+    primeira página, a tela antiga buscava os de todos os grupos)
+  - depois: BrindeDAO.get_catalog_page + get_catalog_details, com o índice
+    idx_brindes_catalogo (removido para medir o antes)
+
+Uso:
+    python benchmarks/bench_catalog_filters.py [brindes] [descricoes]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def best_of(func, repeat=5):
+    """Menor tempo (ms) entre as execuções, sem o cache de consultas"""
+    from database.connection import db
+    
+    tempos = []
+    for _ in range(repeat):
+        db.query_cache.invalidate()
+        start = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - start) * 1000)
+    return min(tempos)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    descricoes = int(sys.argv[2]) if len(sys.argv) > 2 else 25_000
+    
+    folder = tempfile.mkdtemp(prefix="brindez_catalog_")
+    try:
+        import config.settings as settings
+        settings.DB_PATH = os.path.join(folder, "brindes.db")
+        
+        from config.settings import DEFAULT_ITEMS_PER_PAGE as pagina
+        from database.connection import db
+        from database.dao import BrindeDAO
+        
+        conn = db.get_connection()
+        for numero in range(conn.execute("SELECT COUNT(*) FROM filiais").fetchone()[0], 8):
+            conn.execute(
+                "INSERT INTO filiais (numero, nome, cidade) VALUES (?, ?, 'Benchmark')",
+                (f"B{numero}", f"Filial {numero}")
+            )
+        for i in range(conn.execute("SELECT COUNT(*) FROM categorias").fetchone()[0], 20):
+            conn.execute("INSERT INTO categorias (nome) VALUES (?)", (f"Categoria {i}",))
+        for i in range(50):
+            conn.execute("INSERT INTO fornecedores (nome) VALUES (?)", (f"Fornecedor {i}",))
+        
+        filiais = [row[0] for row in conn.execute("SELECT id FROM filiais")]
+        categorias = [row[0] for row in conn.execute("SELECT id FROM categorias")]
+        fornecedores = [row[0] for row in conn.execute("SELECT id FROM fornecedores")]
+        unidade_id = conn.execute("SELECT MIN(id) FROM unidades_medida").fetchone()[0]
+        
+        # Cada descrição tem categoria e fornecedor próprios e aparece em algumas filiais
+        random.seed(1)
+        itens = [
+            (f"Brinde {i:06d}", random.choice(categorias), random.choice(fornecedores))
+            for i in range(descricoes)
+        ]
+        start = time.perf_counter()
+        conn.executemany(
+            """
+            INSERT INTO brindes (descricao, categoria_id, unidade_id, filial_id, fornecedor_id, quantidade, valor_unitario)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (descricao, categoria, unidade_id, random.choice(filiais), fornecedor,
+                 random.choice((0, random.randint(1, 500))), round(random.uniform(0.5, 80), 2))
+                for descricao, categoria, fornecedor in (random.choice(itens) for _ in range(rows))
+            )
+        )
+        conn.execute("DELETE FROM log_alteracoes")
+        conn.commit()
+        conn.execute("ANALYZE")
+        carga = time.perf_counter() - start
+        
+        categoria = conn.execute("SELECT id, nome FROM categorias WHERE id = ?", (categorias[3],)).fetchone()
+        fornecedor = conn.execute("SELECT id, nome FROM fornecedores WHERE id = ?", (fornecedores[7],)).fetchone()
+        filial = conn.execute("SELECT id, numero FROM filiais WHERE id = ?", (filiais[2],)).fetchone()
+        
+        cenarios = [
+            ("Sem filtros", {}),
+            ("Categoria", {"categoria": categoria}),
+            ("Filial", {"filial": filial}),
+            ("Fornecedor + filial", {"fornecedor": fornecedor, "filial": filial}),
+            ("Maior quantidade", {"ordem_qtd": "desc"}),
+            ("Categoria, menor valor", {"categoria": categoria, "ordem_valor": "asc"}),
+        ]
+        
+        def antes(filtros):
+            grupos = BrindeDAO.get_grouped_by_description()
+            if "categoria" in filtros:
+                grupos = [g for g in grupos if g["categoria"] == filtros["categoria"]["nome"]]
+            if "fornecedor" in filtros:
+                grupos = [g for g in grupos if g["fornecedor"] == filtros["fornecedor"]["nome"]]
+            if filtros.get("ordem_valor"):
+                grupos = sorted(grupos, key=lambda g: g["valor_medio"], reverse=filtros["ordem_valor"] == "desc")
+            if filtros.get("ordem_qtd"):
+                grupos = sorted(grupos, key=lambda g: g["quantidade_total"], reverse=filtros["ordem_qtd"] == "desc")
+            
+            cards = []
+            for grupo in grupos:
+                detalhes = BrindeDAO.get_by_description(grupo["descricao"])
+                if "filial" in filtros:
+                    detalhes = [d for d in detalhes if d["filial_numero"] == filtros["filial"]["numero"]]
+                if detalhes:
+                    cards.append(detalhes)
+                if len(cards) == pagina:
+                    break
+            return cards
+        
+        def depois(filtros):
+            criterios = {
+                "categoria_id": filtros["categoria"]["id"] if "categoria" in filtros else None,
+                "filial_id": filtros["filial"]["id"] if "filial" in filtros else None,
+                "fornecedor_id": filtros["fornecedor"]["id"] if "fornecedor" in filtros else None,
+                "ordem_qtd": filtros.get("ordem_qtd"),
+                "ordem_valor": filtros.get("ordem_valor"),
+            }
+            grupos, _ = BrindeDAO.get_catalog_page(criterios, limit=pagina)
+            return BrindeDAO.get_catalog_details([g["descricao"] for g in grupos], criterios)
+        
+        grupos = conn.execute(
+            "SELECT COUNT(*) FROM (SELECT DISTINCT descricao FROM brindes WHERE quantidade > 0)"
+        ).fetchone()[0]
+        print(f"🗂️  {rows:,} brindes, {grupos:,} descrições em estoque, {len(filiais)} filiais "
+              f"(carga: {carga:.1f} s)\n")
+        tempos = {nome: best_of(lambda: depois(filtros)) for nome, filtros in cenarios}
+        
+        # Antes: sem o índice do catálogo (get_by_description percorria a tabela)
+        conn.executescript("DROP INDEX idx_brindes_catalogo; ANALYZE;")
+        
+        print(f"Primeira tela ({pagina} cards)")
+        print(f"  {'':<26} {'Antes':>10} {'Depois':>10}")
+        for nome, filtros in cenarios:
+            print(f"  {nome + ' (ms)':<26} {best_of(lambda: antes(filtros), 3):>10.1f} {tempos[nome]:>10.1f}")
+        
+        db.close()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
+
+# Updated: 2026-10-19
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark dos totais diários de movimentações
+
+Cria um banco temporário com movimentações de vários anos, várias filiais e
+brindes e compara a tendência mensal de um ano (todas as filiais):
+  - agrupando as movimentações pela view vw_movimentacoes_completas
+  - lendo movimentacoes_diarias (MovimentacaoDiariaDAO.get_serie)
+
+Uso:
+    python benchmarks/bench_daily_rollup.py [movimentacoes] [anos] [brindes]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def best_of(func, repeat=5):
+    """Menor tempo (ms) entre as execuções, sem o cache de consultas"""
+    from database.connection import db
+    
+    tempos = []
+    for _ in range(repeat):
+        db.query_cache.invalidate()
+        start = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - start) * 1000)
+    return min(tempos)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    brindes = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    
+    folder = tempfile.mkdtemp(prefix="brindez_rollup_")
+    try:
+        import config.settings as settings
+        settings.DB_PATH = os.path.join(folder, "brindes.db")
+        
+        from database.connection import db
+        from database.dao import MovimentacaoDiariaDAO
+        
+        conn = db.get_connection()
+        for numero in range(conn.execute("SELECT COUNT(*) FROM filiais").fetchone()[0], 4):
+            conn.execute(
+                "INSERT INTO filiais (numero, nome, cidade) VALUES (?, ?, 'Benchmark')",
+                (f"B{numero}", f"Filial {numero}")
+            )
+        filiais = [row[0] for row in conn.execute("SELECT id FROM filiais")]
+        conn.executemany(
+            "INSERT INTO brindes (descricao, categoria_id, unidade_id, filial_id, quantidade, valor_unitario) "
+            "VALUES (?, 1, 1, ?, 0, 2.5)",
+            ((f"Brinde {i}", filiais[i % len(filiais)]) for i in range(brindes))
+        )
+        ids = [row[0] for row in conn.execute("SELECT id FROM brindes")]
+        usuario_id = conn.execute("SELECT MIN(id) FROM usuarios").fetchone()[0]
+        
+        random.seed(1)
+        agora = datetime.now()
+        start = time.perf_counter()
+        conn.executemany(
+            """
+            INSERT INTO movimentacoes (brinde_id, tipo, quantidade, valor_unitario, usuario_id, justificativa, data_movimentacao)
+            VALUES (?, ?, ?, ?, ?, 'Carga', ?)
+            """,
+            (
+                (
+                    random.choice(ids),
+                    tipo,
+                    random.randint(1, 50),
+                    2.5 if tipo == "ENTRADA" else None,
+                    usuario_id,
+                    (agora - timedelta(days=random.uniform(0, 365 * years))).strftime("%Y-%m-%d %H:%M:%S"),
+                )
+                for tipo in (random.choice(("ENTRADA", "SAIDA")) for _ in range(rows))
+            )
+        )
+        conn.execute("DELETE FROM log_alteracoes")
+        conn.commit()
+        carga = time.perf_counter() - start
+        
+        inicio = (agora - timedelta(days=365)).strftime("%Y-%m-%d")
+        fim = agora.strftime("%Y-%m-%d")
+        
+        def pela_view():
+            return db.execute_query(
+                """
+                SELECT strftime('%Y-%m-01', data_movimentacao) as periodo, tipo,
+                       COUNT(*) as movimentacoes, SUM(quantidade) as quantidade,
+                       SUM(quantidade * COALESCE(valor_unitario, 0)) as valor_total
+                FROM vw_movimentacoes_completas
+                WHERE data_movimentacao >= ? AND data_movimentacao < date(?, '+1 day')
+                GROUP BY periodo, tipo
+                ORDER BY periodo, tipo
+                """,
+                (inicio, fim)
+            )
+        
+        def pelos_totais():
+            return MovimentacaoDiariaDAO.get_serie(inicio, fim, "mes")
+        
+        assert [tuple(row) for row in pela_view()] == [tuple(row) for row in pelos_totais()]
+        
+        linhas = conn.execute(
+            "SELECT COUNT(*) FROM movimentacoes_diarias WHERE dia BETWEEN ? AND ?", (inicio, fim)
+        ).fetchone()[0]
+        
+        print(f"📈 {rows:,} movimentações em {years} anos, {brindes} brindes, {len(filiais)} filiais\n")
+        print(f"Tendência mensal de um ano ({linhas:,} linhas diárias no período)")
+        print(f"  {'Agrupando a view (ms)':<30} {best_of(pela_view):>8.1f}")
+        print(f"  {'Totais diários (ms)':<30} {best_of(pelos_totais):>8.1f}")
+        print(f"  {'Totais diários, semanal (ms)':<30} {best_of(lambda: MovimentacaoDiariaDAO.get_serie(inicio, fim, 'semana')):>8.1f}")
+        print(f"\nCarga com os triggers: {carga:.1f} s")
+        
+        db.close()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
+
+# Updated: 2026-10-19
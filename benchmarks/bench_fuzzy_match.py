@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da busca aproximada de descrições (utils/fuzzy_match.py)
+
+Monta um catálogo sintético, indexa as descrições e verifica uma importação
+com descrições novas e variações com erros de digitação, como faz
+DataImporter.import_brindes (cada linha consultada e depois adicionada).
+
+Uso:
+    python benchmarks/bench_fuzzy_match.py [catalogo] [linhas_importadas]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fuzzy_match import TrigramIndex
+
+
+PRODUTOS = [
+    "caneta", "caderno", "camiseta", "boné", "chaveiro", "garrafa", "copo", "mochila",
+    "agenda", "pendrive", "squeeze", "caneca", "ecobag", "guarda-chuva", "lanterna", "adesivo",
+    "bloco", "calendário", "mousepad", "toalha", "avental", "necessaire", "estojo", "régua",
+    "lápis", "marca-texto", "porta-cartão", "carregador", "fone", "caixa de som"
+]
+MATERIAIS = ["plástico", "metal", "algodão", "bambu", "vidro", "couro", "poliéster", "madeira", "alumínio", "silicone"]
+CORES = ["azul", "vermelho", "verde", "preto", "branco", "amarelo", "rosa", "laranja", "cinza", "roxo", "prata"]
+CAPACIDADES = ["100ml", "250ml", "300ml", "350ml", "400ml", "500ml", "600ml", "750ml", "1l"]
+CONSOANTES = list("bcdfglmnprstvxz") + ["br", "cr", "tr", "pl", "ch", "lh", "nh", "gr", "fl", "qu"]
+VOGAIS = list("aeiou") + ["ão", "ei", "ou"]
+
+
+def palavra(rng):
+    """Nome inventado (linha, modelo ou marca)"""
+    return "".join(rng.choice(CONSOANTES) + rng.choice(VOGAIS) for _ in range(rng.randint(2, 4)))
+
+
+def gerador_de_descricoes(seed):
+    """Gera descrições no estilo do catálogo: produto, material, linha, cor, capacidade, código"""
+    rng = random.Random(seed)
+    linhas = [palavra(rng) for _ in range(2000)]
+    
+    def descricao():
+        partes = [rng.choice(PRODUTOS), rng.choice(MATERIAIS), rng.choice(linhas)]
+        if rng.random() < 0.6:
+            partes.append(rng.choice(CORES))
+        if rng.random() < 0.5:
+            partes.append(rng.choice(CAPACIDADES))
+        if rng.random() < 0.5:
+            partes.append(f"{palavra(rng)[:4].upper()}{rng.randint(1, 999)}")
+        return " ".join(partes)
+    
+    return descricao
+
+
+def typo(texto, rng):
+    """Simula um erro de digitação: troca, remoção ou repetição de uma letra"""
+    pos = rng.randrange(1, len(texto) - 1)
+    operacao = rng.choice(("troca", "remove", "repete", "maiusculas"))
+    if operacao == "troca":
+        return texto[:pos] + texto[pos + 1] + texto[pos] + texto[pos + 2:]
+    if operacao == "remove":
+        return texto[:pos] + texto[pos + 1:]
+    if operacao == "repete":
+        return texto[:pos] + texto[pos] + texto[pos:]
+    return texto.upper()
+
+
+def main():
+    catalogo = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    importadas = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    rng = random.Random(1)
+    
+    print(f"🔤 Busca aproximada: catálogo de {catalogo:,}, importação de {importadas:,} linhas\n")
+    
+    descricao = gerador_de_descricoes(1)
+    existentes = [descricao() for _ in range(catalogo)]
+    
+    start = time.perf_counter()
+    index = TrigramIndex(existentes)
+    print(f"Indexação do catálogo: {time.perf_counter() - start:.2f} s")
+    
+    # Metade das linhas são itens novos, metade variações de itens existentes
+    linhas = []
+    for i in range(importadas):
+        if i % 2:
+            linhas.append((typo(rng.choice(existentes), rng), True))
+        else:
+            linhas.append((descricao(), False))
+    
+    start = time.perf_counter()
+    avisos = acertos = 0
+    for texto, variacao in linhas:
+        similares = index.search(texto, limit=1, min_score=0.7)
+        if similares:
+            avisos += 1
+            acertos += variacao
+        index.add(texto)
+    elapsed = time.perf_counter() - start
+    
+    print(f"Verificação da importação: {elapsed:.2f} s ({elapsed / importadas * 1e6:.0f} µs/linha)")
+    print(f"Possíveis duplicatas: {avisos:,} (variações detectadas: {acertos:,} de {importadas // 2:,})")
+
+
+if __name__ == "__main__":
+    main()
+
+# Updated: 2026-10-19
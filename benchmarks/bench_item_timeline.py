@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da linha do tempo de um item e das consultas por período
+
+Cria um banco temporário com muitas movimentações e compara a definição
+anterior (view com ORDER BY interno, índice só de brinde_id, filtro com
+DATE()) com a atual (view sem ordenação, índice (brinde_id, data) e ORDER BY
+explícito no DAO):
+  - MovimentacaoDAO.get_by_brinde (últimas 50 de um item)
+  - MovimentacaoDAO.get_by_period (um mês)
+  - MovimentacaoDAO.get_all (últimas 100)
+
+Uso:
+    python benchmarks/bench_item_timeline.py [movimentacoes] [brindes]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Definição anterior, recriada para a comparação
+VIEW_ANTERIOR = """
+    CREATE VIEW vw_movimentacoes_completas AS
+    SELECT m.id, m.brinde_id, m.tipo, m.quantidade, m.valor_unitario, m.justificativa,
+           m.data_movimentacao, b.descricao as brinde, u.nome as usuario, b.filial_id, f.nome as filial
+    FROM movimentacoes m
+    INNER JOIN brindes b ON m.brinde_id = b.id
+    INNER JOIN usuarios u ON m.usuario_id = u.id
+    INNER JOIN filiais f ON b.filial_id = f.id
+    ORDER BY m.data_movimentacao DESC
+"""
+
+
+def best_of(func, repeat=5):
+    """Menor tempo (ms) entre as execuções, sem o cache de consultas"""
+    from database.connection import db
+    
+    tempos = []
+    for _ in range(repeat):
+        db.query_cache.invalidate()
+        start = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - start) * 1000)
+    return min(tempos)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    brindes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    
+    folder = tempfile.mkdtemp(prefix="brindez_timeline_")
+    try:
+        import config.settings as settings
+        settings.DB_PATH = os.path.join(folder, "brindes.db")
+        
+        from database.connection import db
+        from database.dao import MovimentacaoDAO
+        
+        conn = db.get_connection()
+        filial_id = conn.execute("SELECT MIN(id) FROM filiais").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO brindes (descricao, categoria_id, unidade_id, filial_id, quantidade, valor_unitario) "
+            "VALUES (?, 1, 1, ?, 0, 2.5)",
+            ((f"Brinde {i}", filial_id) for i in range(brindes))
+        )
+        ids = [row[0] for row in conn.execute("SELECT id FROM brindes")]
+        usuario_id = conn.execute("SELECT MIN(id) FROM usuarios").fetchone()[0]
+        
+        random.seed(1)
+        agora = datetime.now()
+        conn.executemany(
+            """
+            INSERT INTO movimentacoes (brinde_id, tipo, quantidade, valor_unitario, usuario_id, justificativa, data_movimentacao)
+            VALUES (?, 'ENTRADA', ?, 2.5, ?, 'Carga', ?)
+            """,
+            (
+                (
+                    random.choice(ids), random.randint(1, 50), usuario_id,
+                    (agora - timedelta(days=random.uniform(0, 730))).strftime("%Y-%m-%d %H:%M:%S"),
+                )
+                for _ in range(rows)
+            )
+        )
+        conn.execute("DELETE FROM log_alteracoes")
+        conn.commit()
+        conn.execute("ANALYZE")
+        
+        brinde_id = ids[len(ids) // 2]
+        mes = ((agora - timedelta(days=60)).strftime("%Y-%m-%d"), (agora - timedelta(days=30)).strftime("%Y-%m-%d"))
+        
+        def anterior():
+            return {
+                "item": best_of(lambda: db.execute_query(
+                    "SELECT * FROM vw_movimentacoes_completas WHERE brinde_id = ? LIMIT ?", (brinde_id, 50)
+                )),
+                "periodo": best_of(lambda: db.execute_query(
+                    "SELECT * FROM vw_movimentacoes_completas "
+                    "WHERE DATE(data_movimentacao) BETWEEN DATE(?) AND DATE(?)", mes
+                )),
+                "ultimas": best_of(lambda: db.execute_query(
+                    "SELECT * FROM vw_movimentacoes_completas LIMIT ?", (100,)
+                )),
+            }
+        
+        def atual():
+            return {
+                "item": best_of(lambda: MovimentacaoDAO.get_by_brinde(brinde_id, limit=50)),
+                "periodo": best_of(lambda: MovimentacaoDAO.get_by_period(*mes)),
+                "ultimas": best_of(lambda: MovimentacaoDAO.get_all(limit=100)),
+            }
+        
+        depois = atual()
+        
+        conn.executescript(f"""
+            DROP VIEW vw_movimentacoes_completas;
+            {VIEW_ANTERIOR};
+            DROP INDEX idx_movimentacoes_brinde_data;
+            CREATE INDEX idx_movimentacoes_brinde ON movimentacoes(brinde_id);
+            ANALYZE;
+        """)
+        antes = anterior()
+        
+        print(f"🕒 {rows:,} movimentações, {brindes} brindes\n")
+        print(f"{'':<34} {'Antes':>10} {'Depois':>10}")
+        print(f"{'Últimas 50 de um item (ms)':<34} {antes['item']:>10.1f} {depois['item']:>10.1f}")
+        print(f"{'Movimentações de um mês (ms)':<34} {antes['periodo']:>10.1f} {depois['periodo']:>10.1f}")
+        print(f"{'Últimas 100 movimentações (ms)':<34} {antes['ultimas']:>10.1f} {depois['ultimas']:>10.1f}")
+        
+        db.close()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
+
+# Updated: 2026-10-19
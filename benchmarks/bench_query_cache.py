@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do cache de resultados de consultas (database/query_cache.py)
+
+Popula um banco temporário e repete as consultas do dashboard e dos
+relatórios, como acontece ao navegar entre as telas, medindo:
+  - primeira execução (cache vazio)
+  - repetições sem escrita (servidas do cache)
+  - repetição após uma entrada de estoque (invalidação por versão de tabela)
+
+Uso:
+    python benchmarks/bench_query_cache.py [quantidade_de_brindes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Apontar a aplicação para um banco temporário antes de abrir a conexão
+import config.settings as settings
+settings.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="brindez_bench_"), "brindes.db")
+
+from database.connection import db
+from database.dao import BrindeDAO, MovimentacaoDAO
+from utils.report_generator import report_generator
+
+
+def populate(rows):
+    """Insere brindes e movimentações sintéticos"""
+    random.seed(1)
+    conn = db.get_connection()
+    conn.executemany(
+        """
+        INSERT INTO brindes (
+            descricao, codigo_interno, categoria_id, unidade_id, filial_id,
+            quantidade, valor_unitario, estoque_minimo
+        ) VALUES (?, ?, ?, 1, 1, ?, ?, 10)
+        """,
+        (
+            (f"Brinde {i}", f"BRD-{i:06d}", random.randint(1, 5), random.randint(0, 200), random.uniform(1, 50))
+            for i in range(rows)
+        )
+    )
+    conn.executemany(
+        """
+        INSERT INTO movimentacoes (brinde_id, tipo, quantidade, valor_unitario, usuario_id, justificativa)
+        VALUES (?, 'ENTRADA', ?, 1, 1, 'carga')
+        """,
+        ((random.randint(1, rows), random.randint(1, 20)) for _ in range(rows * 2))
+    )
+    conn.commit()
+
+
+SCREENS = [
+    ("Dashboard: estatísticas", lambda: BrindeDAO.get_stats(None)),
+    ("Dashboard: por categoria", lambda: BrindeDAO.get_by_category_stats(None)),
+    ("Estoque baixo", lambda: BrindeDAO.get_low_stock(None)),
+    ("Relatório: estoque atual", lambda: report_generator.get_estoque_atual()),
+    ("Últimas movimentações", lambda: MovimentacaoDAO.get_all(limit=100)),
+]
+
+
+def timed(funcao, repeticoes=1):
+    start = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - start) / repeticoes * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    
+    print(f"🗄️  Benchmark do cache de consultas: {rows:,} brindes, {rows * 2:,} movimentações\n")
+    populate(rows)
+    brinde_id = BrindeDAO.get_all()[0]["id"]
+    
+    print(f"{'Consulta':<28} {'Vazio (ms)':>11} {'Cache (ms)':>11} {'Pós-escrita (ms)':>17}")
+    for nome, funcao in SCREENS:
+        frio = timed(funcao)
+        quente = timed(funcao, repeticoes=20)
+        BrindeDAO.add_stock(brinde_id, 1, 1.0)
+        pos_escrita = timed(funcao)
+        print(f"{nome:<28} {frio:>11.2f} {quente:>11.3f} {pos_escrita:>17.2f}")
+    
+    print()
+    for chave, valor in db.query_cache.stats().items():
+        print(f"  {chave}: {valor:.2f}" if isinstance(valor, float) else f"  {chave}: {valor}")
+    
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
+
+# Updated: 2026-10-19
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de memória das linhas retornadas pelo banco
+
+Compara, com tracemalloc, um relatório de 100 mil linhas carregado como:
+  - dict(row) sobre sqlite3.Row (formato antigo dos DAOs)
+  - sqlite3.Row puro
+  - Record (database/records.py, formato atual)
+
+Uso:
+    python benchmarks/bench_row_memory.py [quantidade_de_linhas]
+"""
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.records import record_factory
+
+
+# Mesmas colunas do relatório de estoque atual (vw_estoque_atual)
+REPORT_QUERY = """
+    SELECT id, descricao, quantidade, valor_unitario, valor_total,
+           estoque_minimo, status_estoque, categoria, unidade_medida,
+           filial, fornecedor, codigo_interno
+    FROM estoque
+"""
+
+
+def create_database(rows):
+    """Cria banco em memória com a quantidade de linhas informada"""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE estoque (
+            id INTEGER PRIMARY KEY,
+            descricao TEXT, quantidade INTEGER, valor_unitario REAL,
+            valor_total REAL, estoque_minimo INTEGER, status_estoque TEXT,
+            categoria TEXT, unidade_medida TEXT, filial TEXT,
+            fornecedor TEXT, codigo_interno TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO estoque VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (i, f"Brinde {i}", i % 500, 9.9, (i % 500) * 9.9, 10,
+             "BAIXO" if i % 500 <= 10 else "OK", f"Categoria {i % 20}",
+             "UN", f"Filial {i % 5}", f"Fornecedor {i % 50}", f"BRD{i:06d}")
+            for i in range(1, rows + 1)
+        )
+    )
+    conn.commit()
+    return conn
+
+
+def measure(conn, row_factory, convert):
+    """Executa o relatório e retorna (memória retida, pico, tempo)"""
+    conn.row_factory = row_factory
+    
+    tracemalloc.start()
+    start = time.perf_counter()
+    
+    rows = conn.execute(REPORT_QUERY).fetchall()
+    if convert:
+        rows = [convert(row) for row in rows]
+    
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    # Acesso equivalente ao das views, para garantir que os formatos funcionam
+    assert rows[0]["descricao"] == "Brinde 1"
+    
+    del rows
+    return current, peak, elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    
+    print(f"📊 Benchmark de memória: relatório com {rows:,} linhas\n")
+    conn = create_database(rows)
+    
+    scenarios = [
+        ("dict(sqlite3.Row)", sqlite3.Row, dict),
+        ("sqlite3.Row", sqlite3.Row, None),
+        ("Record", record_factory, None),
+    ]
+    
+    results = {}
+    for name, row_factory, convert in scenarios:
+        results[name] = measure(conn, row_factory, convert)
+    
+    baseline = results["dict(sqlite3.Row)"][0]
+    
+    print(f"{'Formato':<20} {'Retido (MB)':>12} {'Pico (MB)':>10} {'Tempo (s)':>10} {'vs dict':>8}")
+    for name, (current, peak, elapsed) in results.items():
+        print(
+            f"{name:<20} {current / 1024 / 1024:>12.1f} {peak / 1024 / 1024:>10.1f} "
+            f"{elapsed:>10.3f} {current / baseline:>7.0%}"
+        )
+    
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
+
+# Updated: 2026-10-19
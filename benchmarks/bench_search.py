@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da busca textual de brindes (FTS5)
+
+Cria um banco temporário com o schema da aplicação, popula o catálogo e
+mede BrindeDAO.search para termos curtos, longos e com várias palavras.
+
+Uso:
+    python benchmarks/bench_search.py [quantidade_de_brindes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Apontar a aplicação para um banco temporário antes de abrir a conexão
+import config.settings as settings
+settings.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="brindez_bench_"), "brindes.db")
+
+from database.connection import db
+from database.dao import BrindeDAO
+
+
+PRODUTOS = [
+    "caneta", "caderno", "camiseta", "bone", "chaveiro", "garrafa", "copo", "mochila",
+    "agenda", "pendrive", "squeeze", "caneca", "ecobag", "guarda-chuva", "lanterna", "adesivo"
+]
+CORES = ["azul", "vermelho", "verde", "preto", "branco", "amarelo", "rosa", "laranja", "cinza", "roxo"]
+OBSERVACOES = [None, "lote promocional", "personalizado com logo"]
+
+TERMOS = [
+    "ca", "can", "caneta az", "caneta azul", "pers", "personalizado",
+    "modelo 12345", "BRD-0001", "caneta azul modelo 4", "inexistente"
+]
+
+
+def populate(rows):
+    """Insere brindes sintéticos (os triggers mantêm o índice de busca)"""
+    random.seed(1)
+    conn = db.get_connection()
+    conn.executemany(
+        """
+        INSERT INTO brindes (
+            descricao, codigo_interno, observacoes, categoria_id,
+            unidade_id, filial_id, quantidade, valor_unitario
+        ) VALUES (?, ?, ?, 1, 1, 1, 5, 1)
+        """,
+        (
+            (
+                f"{random.choice(PRODUTOS)} {random.choice(CORES)} modelo {i}",
+                f"BRD-{i:06d}",
+                random.choice(OBSERVACOES)
+            )
+            for i in range(rows)
+        )
+    )
+    conn.commit()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    repeticoes = 20
+    
+    print(f"🔎 Benchmark da busca: {rows:,} brindes\n")
+    
+    start = time.perf_counter()
+    populate(rows)
+    print(f"Carga: {time.perf_counter() - start:.1f} s\n")
+    
+    print(f"{'Termo':<24} {'Resultados':>10} {'Média (ms)':>11}")
+    for termo in TERMOS:
+        BrindeDAO.search(termo)  # aquecer cache de páginas
+        
+        start = time.perf_counter()
+        for _ in range(repeticoes):
+            resultados = BrindeDAO.search(termo)
+        media = (time.perf_counter() - start) / repeticoes * 1000
+        
+        print(f"{termo!r:<24} {len(resultados):>10} {media:>11.2f}")
+    
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
+
+# Updated: 2026-10-19
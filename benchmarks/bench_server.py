@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de carga do servidor de estoque (server.py)
+
+Popula o catálogo num banco temporário, sobe o servidor nele e simula clientes
+simultâneos (cada um com seu pool de conexões, como um aplicativo em modo
+cliente) fazendo a mistura de operações das telas: listagem, busca, detalhe,
+estatísticas do dashboard, relatório de estoque baixo e entradas de estoque.
+
+Uso:
+    python benchmarks/bench_server.py [brindes] [segundos_por_rodada]
+"""
+import os
+import random
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from database.backend import RemoteBackend
+
+
+CLIENTES = [1, 10, 50, 100]
+
+# (peso, nome, chamada)
+OPERACOES = [
+    (30, "busca", lambda c, rng, n: c.call("BrindeDAO", "search", [f"brinde {rng.randint(1, n)}"], {"limit": 20})),
+    (25, "detalhe", lambda c, rng, n: c.call("BrindeDAO", "get_by_id", [rng.randint(1, n)])),
+    (15, "dashboard", lambda c, rng, n: c.call("BrindeDAO", "get_stats", [rng.choice([None, 1])])),
+    (10, "estoque baixo", lambda c, rng, n: c.call("report_generator", "get_estoque_baixo", [1])),
+    (10, "movimentações", lambda c, rng, n: c.call("MovimentacaoDAO", "get_page", [1], {"limit": 50})),
+    (10, "entrada", lambda c, rng, n: c.call("BrindeDAO", "add_stock", [rng.randint(1, n), 1])),
+]
+
+
+def start_server(db_path, token_file):
+    """Inicia o servidor numa porta livre; retorna (processo, porta)"""
+    process = subprocess.Popen(
+        [
+            sys.executable, os.path.join(ROOT, "server.py"), "--host", "127.0.0.1", "--port", "0",
+            "--db", db_path, "--token-file", token_file,
+        ],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    for line in process.stdout:
+        if line.startswith("PORT"):
+            # Continuar lendo o log do servidor (com o pipe cheio, ele travaria)
+            threading.Thread(target=process.stdout.read, daemon=True).start()
+            return process, int(line.split()[1])
+    raise RuntimeError("Servidor não iniciou")
+
+
+def populate(db_path, rows):
+    """Cria o banco e insere brindes sintéticos antes de subir o servidor"""
+    import config.settings as settings
+    settings.DB_BACKEND = "embedded"
+    settings.DB_PATH = db_path
+    from database.connection import db
+    
+    random.seed(1)
+    conn = db.get_connection()
+    conn.executemany(
+        """
+        INSERT INTO brindes (
+            descricao, codigo_interno, categoria_id, unidade_id, filial_id,
+            quantidade, valor_unitario, estoque_minimo
+        ) VALUES (?, ?, ?, 1, 1, ?, ?, 10)
+        """,
+        [
+            (f"Brinde {i}", f"BRD-{i:06d}", random.randint(1, 5), random.randint(0, 200), random.uniform(1, 50))
+            for i in range(1, rows + 1)
+        ]
+    )
+    conn.commit()
+    db.close()
+
+
+def run_round(port, token, clientes, segundos, rows):
+    """Roda os clientes simultâneos por alguns segundos; retorna as latências (ms)"""
+    pesos = [peso for peso, _, _ in OPERACOES]
+    latencias = []
+    erros = []
+    lock = threading.Lock()
+    inicio = threading.Barrier(clientes + 1)
+    fim = [0.0]
+    
+    def cliente(seed):
+        rng = random.Random(seed)
+        conexao = RemoteBackend("127.0.0.1", port, pool_size=1, token=token)
+        minhas = []
+        inicio.wait()
+        while time.perf_counter() < fim[0]:
+            _, _, chamada = rng.choices(OPERACOES, pesos)[0]
+            start = time.perf_counter()
+            try:
+                chamada(conexao, rng, rows)
+            except Exception as e:
+                erros.append(e)
+            minhas.append((time.perf_counter() - start) * 1000)
+        conexao.close()
+        with lock:
+            latencias.extend(minhas)
+    
+    threads = [threading.Thread(target=cliente, args=(i,)) for i in range(clientes)]
+    for thread in threads:
+        thread.start()
+    fim[0] = time.perf_counter() + segundos
+    inicio.wait()
+    for thread in threads:
+        thread.join()
+    return latencias, erros
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    segundos = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    
+    folder = tempfile.mkdtemp(prefix="brindez_server_")
+    db_path = os.path.join(folder, "brindes.db")
+    token_file = os.path.join(folder, "token")
+    token = secrets.token_hex(16)
+    with open(token_file, "w", encoding="utf-8") as f:
+        f.write(token)
+    
+    populate(db_path, rows)
+    process, port = start_server(db_path, token_file)
+    try:
+        admin = RemoteBackend("127.0.0.1", port, token=token)
+        
+        print(f"🖧  Servidor de estoque em 127.0.0.1:{port}, {rows:,} brindes, {segundos:.0f} s por rodada\n")
+        print(f"{'Clientes':>8} {'Chamadas/s':>11} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'Erros':>6}")
+        for clientes in CLIENTES:
+            latencias, erros = run_round(port, token, clientes, segundos, rows)
+            percentis = statistics.quantiles(latencias, n=100)
+            print(
+                f"{clientes:>8} {len(latencias) / segundos:>11,.0f} {percentis[49]:>9.2f} "
+                f"{percentis[94]:>9.2f} {percentis[98]:>9.2f} {len(erros):>6}"
+            )
+        
+        saude = admin.health()
+        cache = saude["query_cache"]
+        print(f"\nRequisições atendidas: {saude['requests']:,} (erros: {saude['errors']})")
+        print(f"Cache de consultas no servidor: {cache['hit_rate']:.0%} de acertos")
+        admin.close()
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
+
+# Updated: 2026-10-19
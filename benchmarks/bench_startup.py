@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da abertura do sistema com backup automático pendente
+
+Cada medição é um processo novo que abre o banco e carrega os dados do
+dashboard (o que a primeira tela precisa), com o último backup vencido
+(mais de 1 hora), para bancos de tamanhos diferentes:
+  - anterior: backup_manager.auto_backup_if_needed() antes de abrir o banco,
+    como _initialize_database fazia
+  - atual: o backup só é agendado depois da primeira tela, em segundo plano
+    (a coluna "Backup" mostra quando ele terminou, já com o sistema em uso)
+
+Uso:
+    python benchmarks/bench_startup.py [brindes_1 brindes_2 ...]
+"""
+import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+# Executado em cada processo (cwd = pasta do banco temporário)
+LAUNCH = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+
+import config.settings as settings
+settings.DB_PATH = {db_path!r}
+from utils.backup_manager import backup_manager
+
+if {modo!r} == "anterior":
+    backup_manager.auto_backup_if_needed()
+
+from database.connection import db
+from database.dao import BrindeDAO
+BrindeDAO.get_stats(None)
+BrindeDAO.get_by_category_stats(None)
+BrindeDAO.get_low_stock(None)
+primeira_tela = time.perf_counter() - start
+
+backup = None
+if {modo!r} == "atual":
+    backup_manager.schedule_auto_backup().result()
+    backup = time.perf_counter() - start
+
+sys.stdout.write("\nRESULTADO " + json.dumps({{"primeira_tela": primeira_tela, "backup": backup}}) + "\n")
+"""
+
+
+def build_database(folder, rows):
+    """Cria o banco (schema da aplicação) e insere brindes sintéticos"""
+    db_path = os.path.join(folder, "data", "brindes.db")
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    
+    # Primeira abertura cria o schema e os dados iniciais
+    launch(folder, db_path, "atual")
+    
+    random.seed(1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        """
+        INSERT INTO brindes (
+            descricao, codigo_interno, categoria_id, unidade_id, filial_id,
+            quantidade, valor_unitario, estoque_minimo, observacoes
+        ) VALUES (?, ?, ?, 1, 1, ?, ?, 10, ?)
+        """,
+        (
+            (
+                f"Brinde {i}", f"BRD-{i:06d}", random.randint(1, 5), random.randint(0, 200),
+                random.uniform(1, 50), f"Observação do brinde {i} " * 8
+            )
+            for i in range(rows)
+        )
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def launch(folder, db_path, modo):
+    """Abre o sistema num processo novo, com o último backup vencido"""
+    shutil.rmtree(os.path.join(folder, "data", "backups"), ignore_errors=True)
+    
+    code = LAUNCH.format(root=ROOT, db_path=db_path, modo=modo)
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=folder, capture_output=True, text=True, check=True
+    )
+    # O log do aplicativo também vai para a saída padrão
+    resultado = re.search(r"RESULTADO (\{.*?\})", result.stdout).group(1)
+    return json.loads(resultado)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 300_000]
+    
+    print("🚀 Abertura do sistema com backup automático vencido (processo novo a cada medição)\n")
+    print(f"{'Brindes':>9} {'Banco (MB)':>11} {'Anterior (s)':>13} {'Atual (s)':>10} {'Backup (s)':>11}")
+    
+    for rows in sizes:
+        folder = tempfile.mkdtemp(prefix="brindez_startup_")
+        try:
+            db_path = build_database(folder, rows)
+            size_mb = os.path.getsize(db_path) / (1024 * 1024)
+            
+            anterior = min(launch(folder, db_path, "anterior")["primeira_tela"] for _ in range(3))
+            atuais = [launch(folder, db_path, "atual") for _ in range(3)]
+            atual = min(medida["primeira_tela"] for medida in atuais)
+            backup = min(medida["backup"] for medida in atuais)
+            
+            print(f"{rows:>9,} {size_mb:>11.1f} {anterior:>13.2f} {atual:>10.2f} {backup:>11.2f}")
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+    
+    print("\nBackup: instante em que o backup em segundo plano terminou (a primeira tela já estava pronta)")
+
+
+if __name__ == "__main__":
+    main()
+
+# Updated: 2026-10-19
@@ -66,7 +66,14 @@ COLORS = {
 
 # Configurações de Estoque
 DEFAULT_MIN_STOCK_ALERT = 10
-DEFAULT_ITEMS_PER_PAGE = 20
+DEFAULT_ITEMS_PER_PAGE = 20             # Grupos por página no catálogo de brindes
+
+# Cache de Consultas (ver database/query_cache.py e db.query_cache.stats())
+QUERY_CACHE_MAX_ENTRIES = 256       # Consultas guardadas
+QUERY_CACHE_MAX_ROWS = 100_000      # Linhas guardadas somando todas as consultas
+
+# Alterações feitas por outras instâncias no mesmo banco (ver utils/change_watcher.py)
+CHANGE_WATCH_INTERVAL_MS = 2000     # Intervalo de verificação de PRAGMA data_version
 
 # Perfis de Usuário
 USER_PROFILES = {
@@ -101,4 +108,101 @@ def get_db_path():
 # Caminho padrão do banco (pode ser sobrescrito pelo usuário)
 DB_PATH = get_db_path()
 
+# Backups (ver utils/backup_manager.py)
+BACKUP_PAGES_PER_STEP = 1024        # Páginas copiadas por etapa da API de backup do SQLite
+BACKUP_STEP_PAUSE = 0.01            # Pausa entre etapas (segundos), para não disputar o disco com o aplicativo
+BACKUP_MAX_RESTARTS = 3             # Recomeços (gravações durante a cópia) antes de copiar numa etapa só
+AUTO_BACKUP_DELAY_MS = 2000         # Espera após a primeira tela antes do backup automático
+BACKUP_BLOCK_SIZE = 64 * 1024       # Blocos do armazenamento deduplicado (múltiplo do tamanho de página)
+BACKUP_COMPRESS_LEVEL = 6           # Compressão zlib dos blocos (1 = mais rápido, 9 = menor)
+BACKUP_DIFF_MAX_CHAIN = 24          # Backups diferenciais seguidos antes de uma nova base completa
+BACKUP_KEEP_LAST = 3                # Retenção: os N backups mais recentes, mesmo na mesma hora
+BACKUP_KEEP_HOURLY = 24             # ... e o último backup de cada uma das últimas N horas
+BACKUP_KEEP_DAILY = 7               # ... de cada um dos últimos N dias
+BACKUP_KEEP_WEEKLY = 4              # ... de cada uma das últimas N semanas
+BACKUP_KEEP_MONTHLY = 12            # ... de cada um dos últimos N meses
+
+# Servidor de Estoque (ver server.py e database/backend.py)
+SERVER_DEFAULT_PORT = 8765
+SERVER_POOL_SIZE = 4                # Conexões mantidas abertas por cliente
+
+def get_server_address():
+    """Obtém host e porta do servidor de estoque, ou (None, porta) para abrir o banco diretamente"""
+    try:
+        from config.user_settings import user_settings
+        address = user_settings.get_server_address()
+    except:
+        address = None
+    if not address:
+        return None, SERVER_DEFAULT_PORT
+    host, _, port = address.rpartition(":") if ":" in address else (address, "", "")
+    return host, int(port or SERVER_DEFAULT_PORT)
+
+SERVER_HOST, SERVER_PORT = get_server_address()
+
+def get_server_token():
+    """Obtém o token compartilhado entre o servidor e os clientes (server_token)"""
+    try:
+        from config.user_settings import user_settings
+        return user_settings.get_server_token()
+    except:
+        return None
+
+SERVER_TOKEN = get_server_token()
+
+def get_server_listen_host():
+    """Endereço de escuta do servidor; só a própria máquina, salvo configuração explícita"""
+    try:
+        from config.user_settings import user_settings
+        return user_settings.get_server_listen_host() or "127.0.0.1"
+    except:
+        return "127.0.0.1"
+
+SERVER_LISTEN_HOST = get_server_listen_host()
+
+# "embedded": o aplicativo abre o arquivo SQLite; "server": cliente do servidor de estoque
+DB_BACKEND = "server" if SERVER_HOST else "embedded"
+
+# Réplica Local da Filial (ver database/replica.py)
+def get_replica_mode():
+    """Indica se o aplicativo trabalha numa cópia local sincronizada com o banco principal"""
+    try:
+        from config.user_settings import user_settings
+        return bool(user_settings.get_replica_mode())
+    except:
+        return False
+
+REPLICA_MODE = get_replica_mode()
+REPLICA_PATH = "data/replica.db"
+REPLICA_SYNC_INTERVAL = 30          # Segundos entre sincronizações com o banco principal
+REPLICA_BATCH_SIZE = 200            # Operações da fila enviadas por transação
+
+# Log de alterações (ver database/change_log.py)
+CHANGE_LOG_RETENTION_DAYS = 90      # Consumidores mais atrasados que isso refazem a cópia completa
+
+# Manutenção do banco em períodos ociosos (ver utils/maintenance.py)
+MAINTENANCE_CHECK_INTERVAL_MS = 30000   # Intervalo entre verificações no loop do Tk
+MAINTENANCE_IDLE_SECONDS = 60           # Sem teclado/mouse por esse tempo = ocioso
+MAINTENANCE_OPTIMIZE_HOURS = 6          # Intervalo entre execuções de PRAGMA optimize
+MAINTENANCE_ANALYZE_DAYS = 7            # Intervalo entre execuções de ANALYZE
+MAINTENANCE_ANALYSIS_LIMIT = 1000       # Linhas amostradas por índice no ANALYZE (PRAGMA analysis_limit)
+MAINTENANCE_VACUUM_PAGES = 2048         # Máximo de páginas devolvidas ao disco por execução
+MAINTENANCE_VACUUM_MIN_FREE_PAGES = 256 # Páginas livres abaixo disso não valem uma execução
+MAINTENANCE_HISTORY_DAYS = 90           # Execuções registradas mantidas
+
+# Arquivamento de movimentações e transferências antigas (ver database/archive.py)
+ARCHIVE_DIR_NAME = "arquivo"            # Pasta dos arquivos anuais, ao lado do banco principal
+ARCHIVE_HORIZON_DAYS = 730              # Linhas mais antigas que isso saem do banco principal
+ARCHIVE_BATCH_SIZE = 2000               # Linhas movidas por transação
+ARCHIVE_MAX_ROWS_PER_RUN = 20000        # Linhas movidas por execução da manutenção
+ARCHIVE_MAX_ATTACHED = 8                # Arquivos anuais mantidos anexados à conexão
+
+# Fechamentos de estoque (ver database/stock_closings.py)
+STOCK_CLOSING_KEEP_DAYS = 62            # Fechamentos diários mantidos (o primeiro de cada mês fica sempre)
+
+# Conciliação do estoque com o razão (ver database/reconciliation.py)
+RECONCILE_BATCH_SIZE = 2000             # Linhas do razão por transação
+RECONCILE_MAX_ROWS_PER_RUN = 20000      # Linhas processadas por execução da manutenção
+RECONCILE_GRACE_MINUTES = 10            # Divergências mais novas que isso não são relatadas
+
 # Updated: 2025-10-15 11:24:00
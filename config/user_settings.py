@@ -54,6 +54,30 @@ class UserSettingsManager:
         """Define caminho do banco de dados"""
         return self.set('db_path', path)
     
+    def get_server_address(self):
+        """Obtém endereço do servidor de estoque (host:porta), se configurado"""
+        return self.get('server_address', None)
+    
+    def set_server_address(self, address):
+        """Define endereço do servidor de estoque (vazio volta a abrir o banco diretamente)"""
+        return self.set('server_address', address or None)
+    
+    def get_server_token(self):
+        """Obtém o token compartilhado com o servidor de estoque"""
+        return self.get('server_token', None)
+    
+    def get_server_listen_host(self):
+        """Obtém o endereço em que o servidor de estoque atende (server.py)"""
+        return self.get('server_listen_host', None)
+    
+    def get_replica_mode(self):
+        """Obtém se o modo réplica local está ativo"""
+        return self.get('replica_mode', False)
+    
+    def set_replica_mode(self, enabled):
+        """Ativa/desativa o modo réplica local"""
+        return self.set('replica_mode', bool(enabled))
+    
     def get_min_stock_alert(self):
         """Obtém quantidade mínima para alerta de estoque"""
         return self.get('min_stock_alert', 10)
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivamento de Movimentações e Transferências Antigas
+movimentacoes e transferencias só crescem, e a maior parte das linhas é de
+anos que quase ninguém consulta. O arquivamento move as linhas mais antigas
+que ARCHIVE_HORIZON_DAYS para um arquivo SQLite por ano
+(<pasta do banco>/arquivo/arquivo_<ano>.db), deixando o banco principal
+pequeno: consultas do dia a dia, backups e VACUUM trabalham só com o período
+recente.
+
+Os relatórios históricos (ver utils/report_generator.py) pedem a rounds()
+as tabelas do período consultado: os arquivos dos anos envolvidos são
+anexados à conexão (ATTACH) e as linhas arquivadas entram na consulta por
+UNION ALL, sem que a tela perceba a diferença. Períodos com mais anos do que
+ARCHIVE_MAX_ATTACHED são consultados em rodadas, do mais recente para o mais
+antigo, trocando os arquivos anexados entre uma rodada e outra.
+
+Cada lote é copiado para o arquivo do ano e excluído do banco principal na
+mesma transação (INSERT OR REPLACE: repetir um lote interrompido, ou
+arquivar de novo linhas trazidas de volta por um backup restaurado, não
+duplica nada). As exclusões passam pelos triggers normais, então o cache de
+consultas, as outras instâncias e as réplicas enxergam a saída das linhas;
+só os totais diários (movimentacoes_diarias) continuam contando as linhas
+arquivadas (arquivamento_lote marca a transação do lote).
+
+Os backups (ver utils/backup_manager.py) guardam os arquivos anuais alterados
+junto com o banco principal, e a restauração devolve os dois juntos.
+"""
+import json
+import os
+import re
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from config.settings import (
+    DB_PATH, ARCHIVE_DIR_NAME, ARCHIVE_HORIZON_DAYS, ARCHIVE_BATCH_SIZE,
+    ARCHIVE_MAX_ROWS_PER_RUN, ARCHIVE_MAX_ATTACHED,
+)
+from database.connection import db, resolve_db_path
+from utils.logger import info, debug
+
+
+# Tabela -> (coluna de data, colunas copiadas, DDL no arquivo anual)
+ARCHIVED_TABLES = {
+    "movimentacoes": (
+        "data_movimentacao",
+        "id, brinde_id, tipo, quantidade, valor_unitario, usuario_id, justificativa, data_movimentacao",
+        """
+        CREATE TABLE IF NOT EXISTS {schema}.movimentacoes (
+            id INTEGER PRIMARY KEY,
+            brinde_id INTEGER NOT NULL,
+            tipo VARCHAR(10) NOT NULL,
+            quantidade INTEGER NOT NULL,
+            valor_unitario DECIMAL(10, 2),
+            usuario_id INTEGER NOT NULL,
+            justificativa TEXT,
+            data_movimentacao TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS {schema}.idx_movimentacoes_brinde_data ON movimentacoes(brinde_id, data_movimentacao);
+        DROP INDEX IF EXISTS {schema}.idx_movimentacoes_brinde;
+        CREATE INDEX IF NOT EXISTS {schema}.idx_movimentacoes_data ON movimentacoes(data_movimentacao);
+        """,
+    ),
+    "transferencias": (
+        "data_transferencia",
+        "id, brinde_id, filial_origem_id, filial_destino_id, quantidade, usuario_id, justificativa, data_transferencia",
+        """
+        CREATE TABLE IF NOT EXISTS {schema}.transferencias (
+            id INTEGER PRIMARY KEY,
+            brinde_id INTEGER NOT NULL,
+            filial_origem_id INTEGER NOT NULL,
+            filial_destino_id INTEGER NOT NULL,
+            quantidade INTEGER NOT NULL,
+            usuario_id INTEGER NOT NULL,
+            justificativa TEXT NOT NULL,
+            data_transferencia TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS {schema}.idx_transferencias_brinde_data ON transferencias(brinde_id, data_transferencia);
+        DROP INDEX IF EXISTS {schema}.idx_transferencias_brinde;
+        CREATE INDEX IF NOT EXISTS {schema}.idx_transferencias_data ON transferencias(data_transferencia);
+        """,
+    ),
+}
+
+_FILE_RE = re.compile(r"arquivo_(\d{4})\.db")
+
+
+class ArchiveManager:
+    """Move linhas antigas para arquivos anuais e os anexa às consultas históricas"""
+    
+    def __init__(self):
+        # Arquivos anexados à conexão, do menos para o mais recentemente usado
+        self._attached = OrderedDict()
+        self._connection = None
+        self._years = None
+        self._dir_mtime = None
+    
+    def archive_dir(self):
+        """Pasta dos arquivos anuais (ao lado do banco principal, mesmo no modo réplica)"""
+        return os.path.join(os.path.dirname(resolve_db_path(DB_PATH)), ARCHIVE_DIR_NAME)
+    
+    def archive_path(self, ano):
+        """Caminho do arquivo de um ano"""
+        return os.path.join(self.archive_dir(), f"arquivo_{int(ano)}.db")
+    
+    @staticmethod
+    def cutoff():
+        """Data (AAAA-MM-DD) a partir da qual as linhas ficam no banco principal"""
+        return (datetime.now() - timedelta(days=ARCHIVE_HORIZON_DAYS)).strftime("%Y-%m-%d")
+    
+    def years(self):
+        """Anos com arquivo, em ordem crescente"""
+        try:
+            mtime = os.stat(self.archive_dir()).st_mtime_ns
+        except OSError:
+            return []
+        
+        # Um stat por consulta; a pasta só é listada quando um arquivo novo aparece
+        if mtime != self._dir_mtime:
+            anos = []
+            for name in os.listdir(self.archive_dir()):
+                match = _FILE_RE.fullmatch(name)
+                if match:
+                    anos.append(int(match.group(1)))
+            self._years = sorted(anos)
+            self._dir_mtime = mtime
+        return self._years
+    
+    def rounds(self, tabela, data_inicio=None, data_fim=None):
+        """
+        Tabelas a consultar para o período, em rodadas de no máximo
+        ARCHIVE_MAX_ATTACHED arquivos anuais, da mais recente para a mais antiga
+        
+        Cada rodada é uma lista de fontes (tabela, desde, ate): a tabela do
+        banco principal e os arquivos anuais da rodada, já anexados à conexão.
+        Com mais de uma rodada, a tabela do banco principal vem em todas, com
+        a faixa de datas da rodada (desde inclusivo, ate exclusivo; None = sem
+        limite, ver window()), para as linhas antigas que chegaram depois do
+        arquivamento entrarem só na rodada do seu ano. As rodadas cobrem
+        períodos disjuntos e decrescentes: os resultados de cada uma, na
+        ordem, formam o resultado completo. Os arquivos de uma rodada são
+        anexados quando o gerador chega nela (fora de transações).
+        
+        Args:
+            tabela: "movimentacoes" ou "transferencias"
+            data_inicio, data_fim: Período (AAAA-MM-DD); None = sem limite
+        
+        Yields:
+            list: Fontes da rodada, ex. [("movimentacoes", None, None),
+            ("arquivo_2022.movimentacoes", None, None)]
+        """
+        anos = [
+            ano for ano in self.years()
+            if (not data_inicio or ano >= int(str(data_inicio)[:4]))
+            and (not data_fim or ano <= int(str(data_fim)[:4]))
+        ]
+        grupos = [anos[max(0, fim - ARCHIVE_MAX_ATTACHED):fim] for fim in range(len(anos), 0, -ARCHIVE_MAX_ATTACHED)]
+        if len(grupos) <= 1:
+            yield [(tabela, None, None)] + [(f"{alias}.{tabela}", None, None) for alias in self._attach(anos)]
+            return
+        
+        debug(f"Período com {len(anos)} anos arquivados: consultando em {len(grupos)} rodadas")
+        for i, grupo in enumerate(grupos):
+            desde = None if i == len(grupos) - 1 else f"{grupo[0]:04d}-01-01"
+            ate = None if i == 0 else f"{grupos[i - 1][0]:04d}-01-01"
+            yield [(tabela, desde, ate)] + [(f"{alias}.{tabela}", None, None) for alias in self._attach(grupo)]
+    
+    @staticmethod
+    def window(coluna, desde, ate):
+        """Condição (" AND ...") e parâmetros da faixa de datas de uma fonte de rounds()"""
+        condicao = ""
+        params = []
+        if desde:
+            condicao += f" AND {coluna} >= ?"
+            params.append(desde)
+        if ate:
+            condicao += f" AND {coluna} < ?"
+            params.append(ate)
+        return condicao, params
+    
+    def _attach(self, anos):
+        """Anexa os arquivos dos anos informados; retorna os aliases"""
+        conn = db.get_connection()
+        if conn is not self._connection:
+            # Conexão reaberta: nada anexado nela ainda
+            self._attached.clear()
+            self._connection = conn
+        
+        aliases = []
+        for ano in anos:
+            alias = f"arquivo_{ano}"
+            if alias not in self._attached:
+                self._make_room(conn, keep={f"arquivo_{a}" for a in anos})
+                conn.execute(f"ATTACH DATABASE ? AS {alias}", (self.archive_path(ano),))
+                debug(f"Arquivo anexado: {alias}")
+            self._attached[alias] = True
+            self._attached.move_to_end(alias)
+            aliases.append(alias)
+        return aliases
+    
+    def _make_room(self, conn, keep):
+        """Desanexa os arquivos usados há mais tempo para respeitar ARCHIVE_MAX_ATTACHED"""
+        for alias in list(self._attached):
+            if len(self._attached) < ARCHIVE_MAX_ATTACHED:
+                break
+            if alias in keep:
+                continue
+            try:
+                conn.execute(f"DETACH DATABASE {alias}")
+                del self._attached[alias]
+            except Exception as e:
+                # Ainda lido por uma consulta em andamento (iter_query)
+                debug(f"Arquivo {alias} mantido anexado: {e}")
+    
+    def detach_all(self):
+        """Desanexa todos os arquivos (antes de a restauração de um backup substituí-los)"""
+        conn = db.get_connection()
+        if conn is not self._connection:
+            self._attached.clear()
+            return
+        for alias in list(self._attached):
+            conn.execute(f"DETACH DATABASE {alias}")
+            del self._attached[alias]
+    
+    def pending(self):
+        """Indica se há linhas mais antigas que o horizonte no banco principal"""
+        conn = db.get_connection()
+        cutoff = self.cutoff()
+        for tabela, (coluna, _, _) in ARCHIVED_TABLES.items():
+            if conn.execute(f"SELECT 1 FROM {tabela} WHERE {coluna} < ? LIMIT 1", (cutoff,)).fetchone():
+                return True
+        return False
+    
+    def archive(self, max_rows=ARCHIVE_MAX_ROWS_PER_RUN, batch_size=ARCHIVE_BATCH_SIZE):
+        """
+        Move para os arquivos anuais as linhas mais antigas que o horizonte
+        
+        Args:
+            max_rows: Limite de linhas movidas nesta chamada (o restante fica
+                para a próxima)
+            batch_size: Linhas por transação
+        
+        Returns:
+            dict: Linhas movidas por tabela
+        """
+        conn = db.get_connection()
+        conn.commit()
+        cutoff = self.cutoff()
+        os.makedirs(self.archive_dir(), exist_ok=True)
+        
+        moved = {tabela: 0 for tabela in ARCHIVED_TABLES}
+        total = 0
+        for tabela, (coluna, colunas, _) in ARCHIVED_TABLES.items():
+            while total < max_rows:
+                rows = conn.execute(
+                    f"""
+                    SELECT id, substr({coluna}, 1, 4) FROM {tabela}
+                    WHERE {coluna} < ? AND {coluna} GLOB '[0-9][0-9][0-9][0-9]-*'
+                    ORDER BY {coluna}
+                    LIMIT ?
+                    """,
+                    (cutoff, min(batch_size, max_rows - total))
+                ).fetchall()
+                if not rows:
+                    break
+                
+                por_ano = {}
+                for row in rows:
+                    por_ano.setdefault(int(row[1]), []).append(row[0])
+                
+                # No máximo ARCHIVE_MAX_ATTACHED anos por lote; os demais ficam
+                # para o próximo (as linhas vêm em ordem de data)
+                for ano in sorted(por_ano)[ARCHIVE_MAX_ATTACHED:]:
+                    del por_ano[ano]
+                moved_ids = sum(len(ids) for ids in por_ano.values())
+                
+                # ATTACH e DDL fora da transação (o arquivo anual sempre tem
+                # as duas tabelas, que os relatórios consultam juntas)
+                aliases = self._attach(sorted(por_ano))
+                for alias in aliases:
+                    for _, _, ddl in ARCHIVED_TABLES.values():
+                        conn.executescript(ddl.format(schema=alias))
+                
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    # Sinaliza aos triggers que as exclusões são arquivamento
+                    conn.execute("INSERT INTO arquivamento_lote (id) VALUES (1)")
+                    for alias, ids in zip(aliases, (por_ano[ano] for ano in sorted(por_ano))):
+                        ids = json.dumps(ids)
+                        conn.execute(
+                            f"""
+                            INSERT OR REPLACE INTO {alias}.{tabela} ({colunas})
+                            SELECT {colunas} FROM main.{tabela}
+                            WHERE id IN (SELECT value FROM json_each(?))
+                            """,
+                            (ids,)
+                        )
+                        conn.execute(
+                            f"DELETE FROM main.{tabela} WHERE id IN (SELECT value FROM json_each(?))",
+                            (ids,)
+                        )
+                    conn.execute("DELETE FROM arquivamento_lote")
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                
+                moved[tabela] += moved_ids
+                total += moved_ids
+        
+        if total:
+            info(f"Arquivamento anterior a {cutoff}: {moved}")
+        return moved
+
+
+# Instância global
+archive_manager = ArchiveManager()
+
+# Updated: 2026-10-19
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+Backend de Acesso a Dados
+O aplicativo roda em dois modos:
+  - embutido: os DAOs abrem o arquivo SQLite diretamente (padrão)
+  - cliente: um servidor de estoque (server.py) é o único dono do banco e os
+    DAOs, report_generator e db viram proxies que chamam o servidor por
+    HTTP/JSON, reaproveitando conexões de um pool
+"""
+import base64
+import http.client
+import json
+import queue
+import threading
+from datetime import date, datetime
+from config import settings
+from database.records import Record, record_class
+
+
+# Métodos de db que os clientes podem chamar (o resto é interno do servidor).
+# SQL livre e restauração de backup não: os clientes só usam os DAOs e relatórios.
+DB_METHODS = {"table_versions", "create_backup", "list_backups"}
+
+# Cabeçalho com o token compartilhado entre servidor e clientes (server_token)
+TOKEN_HEADER = "X-Brindez-Token"
+
+
+def is_client():
+    """Indica se o aplicativo usa o servidor de estoque em vez do arquivo SQLite"""
+    return settings.DB_BACKEND == "server"
+
+
+# ------------------------------------------------------------------
+# Serialização: registros, datas e dicionários com chaves não textuais
+# ------------------------------------------------------------------
+
+def encode(value):
+    """Converte o valor para tipos JSON, preservando Records, datas e chaves numéricas"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Record):
+        return {"$rec": [list(value._fields), list(value)]}
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"$bytes": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {key: encode(item) for key, item in value.items()}
+        return {"$dict": [[encode(key), encode(item)] for key, item in value.items()]}
+    
+    # Listas, tuplas e geradores (os iter_* viram lista no servidor)
+    items = list(value)
+    if items and isinstance(items[0], Record):
+        fields = items[0]._fields
+        if all(isinstance(item, Record) and item._fields == fields for item in items):
+            # Nomes das colunas uma vez só, não a cada linha
+            return {"$rows": [list(fields), [list(item) for item in items]]}
+    return [encode(item) for item in items]
+
+
+def decode(value):
+    """Inverso de encode()"""
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    
+    if len(value) == 1:
+        tag, content = next(iter(value.items()))
+        if tag == "$rows":
+            cls = record_class(content[0])
+            return [cls(decode(row)) for row in content[1]]
+        if tag == "$rec":
+            return record_class(content[0])(decode(content[1]))
+        if tag == "$dt":
+            return datetime.fromisoformat(content)
+        if tag == "$date":
+            return date.fromisoformat(content)
+        if tag == "$bytes":
+            return base64.b64decode(content)
+        if tag == "$dict":
+            return {decode(key): decode(item) for key, item in content}
+    return {key: decode(item) for key, item in value.items()}
+
+
+class RemoteError(Exception):
+    """Erro ocorrido no servidor (mensagem original preservada)"""
+    
+    def __init__(self, message, error_type=None):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+# ------------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------------
+
+class EmbeddedBackend:
+    """Executa as chamadas no próprio processo (usado pelo servidor)"""
+    
+    def __init__(self):
+        self._services = None
+    
+    def services(self):
+        """Objetos expostos: DAOs, report_generator e db"""
+        if self._services is None:
+            from database import dao
+            from database.connection import db
+            from utils.report_generator import report_generator
+            
+            services = {name: getattr(dao, name) for name in dao.__all__}
+            services["report_generator"] = report_generator
+            services["db"] = db
+            self._services = services
+        return self._services
+    
+    def resolve(self, service, method):
+        """Retorna o método chamado, recusando serviços/métodos não expostos"""
+        target = self.services().get(service)
+        if target is None:
+            raise RemoteError(f"Serviço desconhecido: {service}", "LookupError")
+        if method.startswith("_") or (service == "db" and method not in DB_METHODS):
+            raise RemoteError(f"Método não permitido: {service}.{method}", "PermissionError")
+        
+        funcao = getattr(target, method, None)
+        if not callable(funcao):
+            raise RemoteError(f"Método desconhecido: {service}.{method}", "LookupError")
+        return funcao
+    
+    def call(self, service, method, args=(), kwargs=None):
+        return self.resolve(service, method)(*args, **(kwargs or {}))
+
+
+class RemoteBackend:
+    """
+    Cliente HTTP/JSON do servidor de estoque
+    
+    Mantém até pool_size conexões keep-alive; cada chamada pega uma conexão
+    livre (ou abre outra) e a devolve ao terminar, então várias threads podem
+    chamar ao mesmo tempo sem reabrir conexões TCP.
+    
+    Args:
+        host: Endereço do servidor
+        port: Porta do servidor
+        pool_size: Conexões mantidas abertas
+        timeout: Tempo máximo de cada chamada (segundos)
+        token: Token compartilhado com o servidor (server_token)
+    """
+    
+    def __init__(self, host, port, pool_size=4, timeout=30, token=None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.token = token
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._write_listeners = []
+        self._lock = threading.Lock()
+    
+    def on_write(self, callback):
+        """
+        Registra um callback chamado com {tabela: versão} após cada chamada que
+        alterou o banco (o monitor de alterações não repete eventos já emitidos)
+        """
+        with self._lock:
+            self._write_listeners.append(callback)
+    
+    def _acquire(self):
+        """Retorna (conexão, reaproveitada do pool)"""
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+    
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+    
+    def _request(self, method, path, body=None):
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        if self.token:
+            headers[TOKEN_HEADER] = self.token
+        
+        while True:
+            conn, reused = self._acquire()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+            except (ConnectionError, http.client.HTTPException):
+                # Conexão guardada que o servidor já fechou: a requisição não chegou
+                # a ser atendida, então pode ser repetida numa conexão nova. Timeouts
+                # não são repetidos (uma escrita poderia ser aplicada duas vezes).
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, json.loads(payload)
+    
+    def call(self, service, method, args=(), kwargs=None):
+        body = json.dumps({
+            "service": service,
+            "method": method,
+            "args": encode(list(args)),
+            "kwargs": encode(kwargs or {}),
+        }).encode("utf-8")
+        
+        status, payload = self._request("POST", "/call", body)
+        if status != 200:
+            raise RemoteError(payload.get("error", f"HTTP {status}"), payload.get("type"))
+        
+        versoes = payload.get("versoes")
+        if versoes:
+            for callback in list(self._write_listeners):
+                callback(versoes)
+        return decode(payload["result"])
+    
+    def health(self):
+        """Estado do servidor (para diagnóstico e para o teste de carga)"""
+        return self._request("GET", "/health")[1]
+    
+    def close(self):
+        """Fecha as conexões do pool"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class RemoteService:
+    """
+    Proxy de um DAO, do report_generator ou de db no modo cliente
+    
+    BrindeDAO.get_all(...) vira uma chamada ao servidor com os mesmos
+    argumentos; o resultado volta como Records, como no modo embutido.
+    """
+    
+    def __init__(self, name, backend=None):
+        self._name = name
+        self._backend = backend
+    
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+        
+        def remote_call(*args, **kwargs):
+            return (self._backend or get_backend()).call(self._name, method, args, kwargs)
+        
+        remote_call.__name__ = method
+        return remote_call
+    
+    def __repr__(self):
+        return f"<RemoteService {self._name}>"
+
+
+_backend = None
+
+
+def get_backend():
+    """Backend configurado (criado na primeira chamada)"""
+    global _backend
+    if _backend is None:
+        if is_client():
+            _backend = RemoteBackend(
+                settings.SERVER_HOST, settings.SERVER_PORT, settings.SERVER_POOL_SIZE, token=settings.SERVER_TOKEN
+            )
+        else:
+            _backend = EmbeddedBackend()
+    return _backend
+
+# Updated: 2026-10-19
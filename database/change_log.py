@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Log de Alterações
+Cada inserção, alteração ou exclusão nas tabelas replicáveis gera uma linha em
+log_alteracoes (triggers em schema.sql) com um seq crescente e a linha completa
+em JSON. Quem consome o log (réplicas de filial, backups, extrações para BI)
+guarda o último seq recebido e pede apenas o que veio depois, sem varrer as
+tabelas inteiras.
+
+Aplicar as alterações em outro banco é idempotente: cada alteração traz a
+imagem completa da linha (reaplicar grava o mesmo resultado) e o destino
+registra o último seq aplicado de cada origem (log_origens) na mesma
+transação, então alterações já aplicadas são ignoradas.
+"""
+import json
+from utils.logger import info, debug
+
+
+# Tabelas com log, na ordem em que uma cópia completa deve ser feita (cadastros antes)
+LOGGED_TABLES = (
+    "filiais", "usuarios", "categorias", "unidades_medida", "fornecedores",
+    "brindes", "movimentacoes", "transferencias", "brindes_excluidos",
+)
+
+
+class ChangeLogGap(Exception):
+    """As alterações após o seq pedido já foram removidas do log (é preciso uma cópia completa)"""
+
+
+class ChangeLog:
+    """Leitura e aplicação do log de alterações (recebe a conexão sqlite3 de cada banco)"""
+    
+    @staticmethod
+    def last_seq(conn):
+        """Último seq gerado no banco (0 se nenhum)"""
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'log_alteracoes'").fetchone()
+        return row[0] if row else 0
+    
+    @staticmethod
+    def changes_since(conn, seq, limit=1000, tabelas=None):
+        """
+        Alterações com seq maior que o informado, em ordem
+        
+        Args:
+            conn: Conexão do banco de origem
+            seq: Último seq já recebido (0 para começar do início)
+            limit: Máximo de alterações retornadas (chamar de novo com o último seq)
+            tabelas: Restringe às tabelas informadas
+        
+        Returns:
+            list: Registros (seq, tabela, registro_id, operacao, dados, data_alteracao)
+        
+        Raises:
+            ChangeLogGap: parte das alterações pedidas já foi removida do log
+        """
+        primeiro = conn.execute("SELECT MIN(seq) FROM log_alteracoes").fetchone()[0]
+        if primeiro is None:
+            primeiro = ChangeLog.last_seq(conn) + 1
+        if seq + 1 < primeiro:
+            raise ChangeLogGap(f"Log de alterações disponível a partir do seq {primeiro} (pedido após {seq})")
+        
+        query = "SELECT * FROM log_alteracoes WHERE seq > ?"
+        params = [seq]
+        if tabelas:
+            query += f" AND tabela IN ({', '.join('?' for _ in tabelas)})"
+            params.extend(tabelas)
+        query += " ORDER BY seq LIMIT ?"
+        params.append(limit)
+        
+        return conn.execute(query, params).fetchall()
+    
+    @staticmethod
+    def applied_seq(conn, origem):
+        """Último seq da origem aplicado no banco (None se nunca sincronizado)"""
+        row = conn.execute("SELECT ultimo_seq FROM log_origens WHERE origem = ?", (origem,)).fetchone()
+        return row[0] if row else None
+    
+    @staticmethod
+    def set_applied_seq(conn, origem, seq):
+        """Registra o ponto de sincronização (ex. após uma cópia completa)"""
+        conn.execute(
+            """
+            INSERT INTO log_origens (origem, ultimo_seq) VALUES (?, ?)
+            ON CONFLICT(origem) DO UPDATE SET
+                ultimo_seq = excluded.ultimo_seq,
+                atualizado_em = CURRENT_TIMESTAMP
+            """,
+            (origem, seq)
+        )
+    
+    @staticmethod
+    def reset(conn, origem):
+        """Esquece o ponto de sincronização (a próxima sincronização faz uma cópia completa)"""
+        conn.execute("DELETE FROM log_origens WHERE origem = ?", (origem,))
+    
+    @staticmethod
+    def restart(conn, seq):
+        """
+        Recomeça o log depois que o banco voltou a um estado anterior (backup restaurado)
+        
+        O log é esvaziado e o próximo seq fica acima do último seq gerado antes
+        da restauração, com uma lacuna: quem já tinha recebido alterações
+        desfeitas pela restauração recebe ChangeLogGap e refaz a cópia completa.
+        
+        Args:
+            conn: Conexão do banco restaurado
+            seq: Último seq do banco antes da restauração
+        """
+        proximo = max(seq, ChangeLog.last_seq(conn)) + 1
+        conn.execute("DELETE FROM log_alteracoes")
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = 'log_alteracoes'")
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('log_alteracoes', ?)", (proximo,))
+    
+    @staticmethod
+    def apply(conn, changes, origem, accept=None):
+        """
+        Aplica alterações de outro banco, uma única vez cada
+        
+        Args:
+            conn: Conexão do banco de destino
+            changes: Alterações retornadas por changes_since (em ordem)
+            origem: Identificação do banco de origem
+            accept: Função (conn, alteração, dados) -> bool para aplicar só parte
+                (as recusadas também contam como recebidas)
+        
+        Returns:
+            int: Alterações aplicadas
+        """
+        if not changes:
+            return 0
+        
+        ultimo = ChangeLog.applied_seq(conn, origem) or 0
+        aplicadas = 0
+        
+        conn.execute("SAVEPOINT aplicar_log")
+        try:
+            for change in changes:
+                if change["seq"] <= ultimo:
+                    continue
+                
+                dados = json.loads(change["dados"]) if change["dados"] else None
+                if accept is None or accept(conn, change, dados):
+                    ChangeLog._apply_change(conn, change["tabela"], change["registro_id"], change["operacao"], dados)
+                    aplicadas += 1
+                ultimo = change["seq"]
+            
+            ChangeLog.set_applied_seq(conn, origem, ultimo)
+            conn.execute("RELEASE aplicar_log")
+        except Exception:
+            conn.execute("ROLLBACK TO aplicar_log")
+            conn.execute("RELEASE aplicar_log")
+            raise
+        
+        return aplicadas
+    
+    @staticmethod
+    def _apply_change(conn, tabela, registro_id, operacao, dados):
+        if tabela not in LOGGED_TABLES:
+            raise ValueError(f"Tabela sem log de alterações: {tabela}")
+        
+        if operacao == "DELETE":
+            conn.execute(f"DELETE FROM {tabela} WHERE id = ?", (registro_id,))
+            return
+        
+        # INSERT e UPDATE trazem a linha completa: inserir ou sobrescrever
+        campos = list(dados)
+        conn.execute(
+            f"""
+            INSERT INTO {tabela} ({', '.join(campos)}) VALUES ({', '.join('?' for _ in campos)})
+            ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in campos if c != 'id')}
+            """,
+            [dados[campo] for campo in campos]
+        )
+    
+    @staticmethod
+    def sync(source, target, origem, batch_size=1000, accept=None, tabelas=None):
+        """
+        Aplica no destino tudo o que mudou na origem desde a última sincronização
+        
+        Args:
+            source: Conexão do banco de origem
+            target: Conexão do banco de destino
+            origem: Identificação da origem (ponto de sincronização guardado no destino)
+        
+        Returns:
+            int: Alterações aplicadas
+        
+        Raises:
+            ChangeLogGap: o destino ficou para trás do que o log ainda guarda
+        """
+        seq = ChangeLog.applied_seq(target, origem) or 0
+        total = 0
+        while True:
+            changes = ChangeLog.changes_since(source, seq, batch_size, tabelas)
+            if not changes:
+                break
+            total += ChangeLog.apply(target, changes, origem, accept)
+            seq = changes[-1]["seq"]
+        
+        if total:
+            debug(f"Log de alterações de {origem}: {total} alterações aplicadas até o seq {seq}")
+        return total
+    
+    @staticmethod
+    def prune(conn, days):
+        """
+        Remove do log as alterações mais antigas que o período informado
+        
+        Consumidores que ficarem para trás recebem ChangeLogGap e refazem a cópia.
+        
+        Returns:
+            int: Alterações removidas
+        """
+        # seq cresce com o tempo: basta achar a primeira alteração recente
+        removidas = conn.execute(
+            """
+            DELETE FROM log_alteracoes WHERE seq < COALESCE(
+                (SELECT seq FROM log_alteracoes WHERE data_alteracao >= datetime('now', ?) ORDER BY seq LIMIT 1),
+                (SELECT MAX(seq) + 1 FROM log_alteracoes)
+            )
+            """,
+            (f"-{int(days)} days",)
+        ).rowcount
+        if removidas:
+            info(f"Log de alterações: {removidas} alterações com mais de {days} dias removidas")
+        return removidas
+
+# Updated: 2026-10-19
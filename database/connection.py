@@ -5,8 +5,94 @@ Gerenciador de Conexão com Banco de Dados
 import sqlite3
 import os
 from pathlib import Path
-from config.settings import DB_PATH
+from config.settings import (
+    DB_PATH, QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_MAX_ROWS, REPLICA_MODE, REPLICA_PATH,
+    CHANGE_LOG_RETENTION_DAYS,
+)
 from utils.logger import info, error, warning, debug
+from database.records import record_factory
+from database.query_cache import QueryCache
+from database.change_log import ChangeLog
+from database.backend import is_client, RemoteService
+from utils.event_manager import event_manager, EVENTS
+
+
+# Tabelas derivadas mantidas por triggers: (tabela, tabela de origem, SQL de reconstrução)
+# A reconstrução roda apenas quando a tabela derivada está vazia e a origem não,
+# ou seja, na primeira abertura de um banco criado antes da tabela existir.
+DERIVED_TABLES = [
+    (
+        "estoque_resumo",
+        "brindes",
+        """
+            DELETE FROM estoque_resumo;
+            INSERT INTO estoque_resumo (
+                filial_id, categoria_id, total_produtos, total_itens,
+                valor_total, itens_estoque_baixo
+            )
+            SELECT
+                filial_id,
+                categoria_id,
+                COUNT(*),
+                SUM(quantidade),
+                SUM(quantidade * valor_unitario),
+                SUM(CASE WHEN quantidade <= estoque_minimo THEN 1 ELSE 0 END)
+            FROM brindes
+            GROUP BY filial_id, categoria_id;
+        """
+    ),
+    (
+        "brindes_fts",
+        "brindes",
+        """
+            DELETE FROM brindes_fts;
+            INSERT INTO brindes_fts (rowid, descricao, codigo_interno, observacoes, fornecedor, filial_id)
+            SELECT b.id, b.descricao, b.codigo_interno, b.observacoes, fo.nome, b.filial_id
+            FROM brindes b
+            LEFT JOIN fornecedores fo ON b.fornecedor_id = fo.id;
+        """
+    ),
+    (
+        "movimentacoes_diarias",
+        "movimentacoes",
+        """
+            DELETE FROM movimentacoes_diarias;
+            INSERT INTO movimentacoes_diarias (
+                dia, filial_id, brinde_id, tipo, movimentacoes, quantidade, valor_total
+            )
+            SELECT
+                date(m.data_movimentacao),
+                b.filial_id,
+                m.brinde_id,
+                m.tipo,
+                COUNT(*),
+                SUM(m.quantidade),
+                SUM(m.quantidade * COALESCE(m.valor_unitario, 0))
+            FROM movimentacoes m
+            INNER JOIN brindes b ON m.brinde_id = b.id
+            WHERE date(m.data_movimentacao) IS NOT NULL
+            GROUP BY 1, 2, 3, 4;
+        """
+    ),
+]
+
+# Views que já tiveram ORDER BY na definição: bancos criados antes da mudança
+# ainda guardam a versão ordenada, removida uma única vez antes do schema
+# (que recria a view com CREATE VIEW IF NOT EXISTS)
+REDEFINED_VIEWS = ("vw_movimentacoes_completas", "vw_transferencias_completas")
+
+
+def is_replica():
+    """Indica se o aplicativo trabalha na réplica local da filial"""
+    return REPLICA_MODE and not is_client()
+
+
+def resolve_db_path(path):
+    """Caminho absoluto do banco (caminhos relativos partem da raiz do projeto)"""
+    if os.path.isabs(path):
+        return path
+    project_root = Path(__file__).parent.parent
+    return os.path.join(project_root, path)
 
 
 class DatabaseConnection:
@@ -14,6 +100,7 @@ class DatabaseConnection:
     
     _instance = None
     _connection = None
+    query_cache = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -29,23 +116,11 @@ class DatabaseConnection:
         try:
             info("Inicializando banco de dados...")
             
-            # Obter caminho absoluto do banco
-            if os.path.isabs(DB_PATH):
-                db_path = DB_PATH
-            else:
-                # Caminho relativo à raiz do projeto
-                project_root = Path(__file__).parent.parent
-                db_path = os.path.join(project_root, DB_PATH)
-            
-            # Criar backup automático se o banco já existir
-            if os.path.exists(db_path):
-                try:
-                    from utils.backup_manager import backup_manager
-                    backup_path = backup_manager.auto_backup_if_needed()
-                    if backup_path:
-                        info(f"Backup automático criado: {os.path.basename(backup_path)}")
-                except Exception as e:
-                    warning(f"Erro no backup automático: {e}")
+            # Modo réplica: o aplicativo usa a cópia local da filial (ver database/replica.py)
+            replica = is_replica()
+            path = REPLICA_PATH if replica else DB_PATH
+            
+            db_path = resolve_db_path(path)
             
             debug(f"Caminho do banco: {db_path}")
             
@@ -57,18 +132,42 @@ class DatabaseConnection:
             
             # Conectar ao banco
             self._connection = sqlite3.connect(db_path, check_same_thread=False)
-            self._connection.row_factory = sqlite3.Row
+            # Linhas como tuplas compactas com acesso por chave (ver database/records.py)
+            self._connection.row_factory = record_factory
             info("Conexão estabelecida com sucesso")
             
             # Habilitar foreign keys
             self._connection.execute("PRAGMA foreign_keys = ON")
             debug("Foreign keys habilitadas")
             
+            # Bancos novos já nascem com auto_vacuum incremental (os existentes
+            # são convertidos pelo administrador, ver utils/maintenance.py)
+            self._connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            
             # Executar schema
             self._execute_schema()
             
-            # Executar dados iniciais
-            self._execute_initial_data()
+            if replica:
+                # Cadastros vêm do banco principal, não de initial_data.sql
+                from database.replica import replica_sync
+                replica_sync.prepare(self._connection)
+                replica_sync.bootstrap()
+            else:
+                # Executar dados iniciais
+                self._execute_initial_data()
+                
+                # Alterações antigas já foram recebidas por quem consome o log
+                ChangeLog.prune(self._connection, CHANGE_LOG_RETENTION_DAYS)
+                self._connection.commit()
+            
+            # Cache de resultados (descartado ao reabrir, ex. após restaurar backup)
+            if self.query_cache is None:
+                self.query_cache = QueryCache(
+                    self.get_connection, QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_MAX_ROWS
+                )
+            else:
+                self.query_cache.invalidate(schema=True)
+            self._changes_seen = self._change_marker()
             
             info(f"Banco de dados inicializado: {db_path}")
         except Exception as e:
@@ -86,8 +185,10 @@ class DatabaseConnection:
             
             cursor = self._connection.cursor()
             
+            self._drop_outdated_views(cursor)
+            
             # Executar comandos individualmente para manter foreign keys
-            commands = [cmd.strip() for cmd in schema_sql.split(';') if cmd.strip()]
+            commands = self._split_statements(schema_sql)
             
             for command in commands:
                 if command:
@@ -100,9 +201,60 @@ class DatabaseConnection:
             self._connection.commit()
             
             info("Schema do banco de dados criado/atualizado")
+            
+            # Popular tabelas derivadas criadas após os dados existentes
+            self._rebuild_derived_tables()
         else:
             warning("Arquivo schema.sql não encontrado")
     
+    @staticmethod
+    def _drop_outdated_views(cursor):
+        """Remove as views de REDEFINED_VIEWS ainda com a definição antiga (com ORDER BY)"""
+        placeholders = ", ".join("?" for _ in REDEFINED_VIEWS)
+        cursor.execute(
+            f"""
+            SELECT name FROM sqlite_master
+            WHERE type = 'view' AND name IN ({placeholders}) AND sql LIKE '%ORDER BY%'
+            """,
+            REDEFINED_VIEWS
+        )
+        for (name,) in cursor.fetchall():
+            info(f"Recriando view sem ORDER BY: {name}")
+            cursor.execute(f"DROP VIEW {name}")
+    
+    @staticmethod
+    def _split_statements(sql):
+        """Divide um script SQL em comandos completos (suporta triggers com BEGIN...END)"""
+        commands = []
+        buffer = ""
+        
+        for line in sql.splitlines(keepends=True):
+            buffer += line
+            if sqlite3.complete_statement(buffer):
+                commands.append(buffer.strip())
+                buffer = ""
+        
+        # Sobra apenas comentários/espaços após o último comando
+        return commands
+    
+    def _rebuild_derived_tables(self):
+        """Reconstrói tabelas mantidas por triggers que ainda estão vazias"""
+        cursor = self._connection.cursor()
+        
+        for table, source_table, rebuild_sql in DERIVED_TABLES:
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")
+            if cursor.fetchone()[0]:
+                continue
+            
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {source_table})")
+            if not cursor.fetchone()[0]:
+                continue
+            
+            info(f"Reconstruindo tabela derivada: {table}")
+            cursor.executescript(rebuild_sql)
+        
+        self._connection.commit()
+    
     def _execute_initial_data(self):
         """Executa dados iniciais se necessário"""
         try:
@@ -172,28 +324,119 @@ class DatabaseConnection:
             error(f"Erro ao listar backups: {e}")
             return []
     
-    def restore_backup(self, backup_path):
-        """Restaura backup específico"""
+    def restore_backup(self, backup_path, prepared=None):
+        """
+        Restaura backup específico
+        
+        O backup é gravado na conexão aberta com a API de backup do SQLite, sem
+        reabrir o banco (outras instâncias veem a troca como uma gravação comum).
+        Depois os caches são descartados e DATA_RESET é emitido para as telas
+        recarregarem.
+        
+        Args:
+            backup_path: Backup escolhido
+            prepared: Cópias já preparadas em segundo plano (backup_manager.prepare_restore)
+        """
         try:
             from utils.backup_manager import backup_manager
-            success = backup_manager.restore_backup(backup_path)
+            objetos = self._schema_objects()
+            seq = ChangeLog.last_seq(self._connection)
+            self._connection.commit()
+            
+            success = backup_manager.restore_backup(backup_path, target=self._connection, prepared=prepared)
             if success:
-                # Reconectar ao banco restaurado
-                self._connection.close()
-                self._connection = None
-                self._initialize_database()
+                self._after_restore(objetos, seq)
             return success
         except Exception as e:
             error(f"Erro ao restaurar backup: {e}")
             return False
     
+    def _schema_objects(self):
+        rows = self._connection.execute("SELECT type, name FROM sqlite_master").fetchall()
+        return {(row["type"], row["name"]) for row in rows}
+    
+    def _after_restore(self, objetos, seq):
+        """Ajusta o banco restaurado e descarta o que foi lido do banco anterior"""
+        # Backup anterior a alguma tabela/índice/trigger atual: completar o schema
+        if not objetos <= self._schema_objects():
+            info("Backup restaurado de uma versão anterior do schema: atualizando")
+            self._execute_schema()
+        
+        if not is_replica():
+            # Consumidores do log (réplicas) refazem a cópia a partir do banco restaurado
+            ChangeLog.restart(self._connection, seq)
+        
+        # Todas as tabelas mudaram para quem acompanha tabela_versoes
+        # (outras instâncias e clientes do servidor de estoque)
+        self._connection.execute("UPDATE tabela_versoes SET versao = versao + 1")
+        self._connection.commit()
+        
+        self.query_cache.invalidate(schema=True)
+        self._changes_seen = self._change_marker()
+        
+        from database.dao import BrindeDAO
+        BrindeDAO._descricao_index = None
+        
+        event_manager.emit(EVENTS['DATA_RESET'], {"origem": "restauracao"})
+    
     def get_connection(self):
         """Retorna a conexão ativa"""
         return self._connection
     
+    def data_version(self):
+        """
+        Valor de PRAGMA data_version: muda quando outra conexão (outra instância
+        do sistema abrindo o mesmo arquivo) grava no banco
+        """
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+    
+    def table_versions(self):
+        """Contadores de alteração por tabela (tabela_versoes), lidos sem passar pelo cache"""
+        rows = self._connection.execute("SELECT tabela, versao FROM tabela_versoes").fetchall()
+        return {row["tabela"]: row["versao"] for row in rows}
+    
+    def changes_since(self, seq, limit=1000, tabelas=None):
+        """Alterações do log com seq maior que o informado (ver database/change_log.py)"""
+        return ChangeLog.changes_since(self._connection, seq, limit, tabelas)
+    
+    def last_change_seq(self):
+        """Último seq do log de alterações"""
+        return ChangeLog.last_seq(self._connection)
+    
+    def _change_marker(self):
+        return self._connection.total_changes, self.data_version()
+    
+    def _sync_query_cache(self):
+        """
+        Descarta o cache se o banco foi alterado por fora de execute_update/execute_many,
+        pela própria conexão ou por outra instância
+        """
+        marker = self._change_marker()
+        if marker != self._changes_seen:
+            self.query_cache.invalidate()
+            self._changes_seen = marker
+    
+    def _record_write(self, query):
+        """Incrementa a versão das tabelas alteradas pelo comando"""
+        self.query_cache.table_changed(query)
+        # data_version continua o anterior: uma escrita de outra instância no
+        # meio do comando ainda invalida o cache na próxima consulta
+        self._changes_seen = (self._connection.total_changes, self._changes_seen[1])
+    
     def execute_query(self, query, params=None):
-        """Executa uma query SELECT e retorna os resultados"""
+        """
+        Executa uma query SELECT e retorna os resultados
+        
+        Resultados ficam no cache (database/query_cache.py) até alguma escrita
+        alterar uma das tabelas lidas pela query.
+        """
         try:
+            self._sync_query_cache()
+            hit, token = self.query_cache.get(query, params)
+            if hit:
+                debug(f"Query servida do cache: {query[:100]}...")
+                return token
+            
             debug(f"Executando query: {query[:100]}...")
             cursor = self._connection.cursor()
             if params:
@@ -202,6 +445,7 @@ class DatabaseConnection:
                 cursor.execute(query)
             results = cursor.fetchall()
             debug(f"Query retornou {len(results)} resultados")
+            self.query_cache.put(token, results)
             return results
         except Exception as e:
             error(f"Erro ao executar query: {e}")
@@ -209,16 +453,47 @@ class DatabaseConnection:
             error(f"Params: {params}")
             raise
     
+    def iter_query(self, query, params=None, batch_size=500):
+        """
+        Executa uma query SELECT e entrega as linhas sob demanda
+        
+        Busca em lotes com fetchmany, então o consumidor recebe as primeiras
+        linhas sem esperar o resultado completo e a memória não cresce com
+        o tamanho do resultado.
+        """
+        debug(f"Executando query (streaming): {query[:100]}...")
+        cursor = self._connection.cursor()
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        except Exception as e:
+            error(f"Erro ao executar query: {e}")
+            error(f"Query: {query}")
+            error(f"Params: {params}")
+            raise
+        finally:
+            cursor.close()
+    
     def execute_update(self, query, params=None):
         """Executa uma query INSERT/UPDATE/DELETE"""
         try:
             debug(f"Executando update: {query[:100]}...")
+            self._sync_query_cache()
             cursor = self._connection.cursor()
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
             self._connection.commit()
+            self._record_write(query)
             lastrowid = cursor.lastrowid
             info(f"Update executado com sucesso (ID: {lastrowid})")
             return lastrowid
@@ -231,9 +506,11 @@ class DatabaseConnection:
     
     def execute_many(self, query, params_list):
         """Executa múltiplas queries"""
+        self._sync_query_cache()
         cursor = self._connection.cursor()
         cursor.executemany(query, params_list)
         self._connection.commit()
+        self._record_write(query)
         return cursor.rowcount
     
     def close(self):
@@ -244,7 +521,10 @@ class DatabaseConnection:
             info("Conexão com banco de dados fechada")
 
 
-# Instância global
-db = DatabaseConnection()
+# Instância global (no modo cliente, as chamadas vão para o servidor de estoque)
+if is_client():
+    db = RemoteService("db")
+else:
+    db = DatabaseConnection()
 
 # Updated: 2025-10-14 14:28:20
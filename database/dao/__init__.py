@@ -11,6 +11,8 @@ from .fornecedor_dao import FornecedorDAO
 from .movimentacao_dao import MovimentacaoDAO
 from .transferencia_dao import TransferenciaDAO
 from .brinde_excluido_dao import BrindeExcluidoDAO
+from .historico_dao import HistoricoDAO
+from .movimentacao_diaria_dao import MovimentacaoDiariaDAO
 
 __all__ = [
     'BrindeDAO',
@@ -21,7 +23,15 @@ __all__ = [
     'FornecedorDAO',
     'MovimentacaoDAO',
     'TransferenciaDAO',
-    'BrindeExcluidoDAO'
+    'BrindeExcluidoDAO',
+    'HistoricoDAO',
+    'MovimentacaoDiariaDAO'
 ]
 
+# Modo cliente: os DAOs viram proxies do servidor de estoque (ver database/backend.py)
+from database.backend import is_client, RemoteService
+if is_client():
+    for _name in __all__:
+        globals()[_name] = RemoteService(_name)
+
 # Updated: 2025-10-14 14:28:20
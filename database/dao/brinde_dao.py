@@ -2,12 +2,26 @@
 """
 DAO para Brindes
 """
+import json
+import re
+import unicodedata
 from database.connection import db
+from utils.fuzzy_match import TrigramIndex, normalize
+
+
+# Sentidos aceitos nas ordenações do catálogo
+CATALOG_DIRECTIONS = {"asc": "ASC", "desc": "DESC"}
+
+# Chave dos grupos do catálogo, na ordem de idx_brindes_catalogo
+CATALOG_GROUP_ORDER = ("descricao", "codigo_interno", "categoria_id", "unidade_id", "fornecedor_id")
 
 
 class BrindeDAO:
     """Data Access Object para Brindes"""
     
+    # Índice de trigramas das descrições (montado na primeira busca aproximada)
+    _descricao_index = None
+    
     @staticmethod
     def create(data):
         """Cria um novo brinde"""
@@ -30,7 +44,12 @@ class BrindeDAO:
             data.get('observacoes'),
             data.get('estoque_minimo', 10)
         )
-        return db.execute_update(query, params)
+        brinde_id = db.execute_update(query, params)
+        
+        if BrindeDAO._descricao_index is not None:
+            BrindeDAO._descricao_index.add(data.get('descricao'))
+        
+        return brinde_id
     
     @staticmethod
     def get_all(filial_id=None):
@@ -45,14 +64,28 @@ class BrindeDAO:
         query += " ORDER BY descricao"
         
         rows = db.execute_query(query, params)
-        return [dict(row) for row in rows]
+        return rows
+    
+    @staticmethod
+    def iter_all(filial_id=None, batch_size=500):
+        """Retorna todos os brindes sob demanda, em lotes (exportações)"""
+        query = "SELECT * FROM vw_estoque_atual"
+        params = None
+        
+        if filial_id:
+            query += " WHERE filial_id = ?"
+            params = (filial_id,)
+        
+        query += " ORDER BY descricao"
+        
+        return db.iter_query(query, params, batch_size)
     
     @staticmethod
     def get_by_id(brinde_id):
         """Retorna brinde por ID"""
         query = "SELECT * FROM brindes WHERE id = ?"
         rows = db.execute_query(query, (brinde_id,))
-        return dict(rows[0]) if rows else None
+        return rows[0] if rows else None
     
     @staticmethod
     def get_by_category(categoria_id, filial_id=None):
@@ -65,7 +98,7 @@ class BrindeDAO:
             params.append(filial_id)
         
         rows = db.execute_query(query, tuple(params))
-        return [dict(row) for row in rows]
+        return rows
     
     @staticmethod
     def update(brinde_id, data):
@@ -89,6 +122,7 @@ class BrindeDAO:
             brinde_id
         )
         db.execute_update(query, params)
+        BrindeDAO._descricao_index = None
         return True
     
     @staticmethod
@@ -96,6 +130,7 @@ class BrindeDAO:
         """Exclui um brinde"""
         query = "DELETE FROM brindes WHERE id = ?"
         db.execute_update(query, (brinde_id,))
+        BrindeDAO._descricao_index = None
         return True
     
     @staticmethod
@@ -144,16 +179,18 @@ class BrindeDAO:
         # Remover da filial origem
         BrindeDAO.remove_stock(brinde_id, quantidade)
         
-        # Verificar se já existe na filial destino
+        # Verificar se já existe na filial destino (mesma descrição, ignorando
+        # maiúsculas, acentos e espaços, para não dividir o estoque em duas linhas)
         query = """
-            SELECT id FROM brindes 
-            WHERE descricao = ? AND categoria_id = ? AND filial_id = ?
+            SELECT id, descricao FROM brindes 
+            WHERE categoria_id = ? AND filial_id = ?
         """
-        rows = db.execute_query(query, (
-            brinde['descricao'],
-            brinde['categoria_id'],
-            filial_destino_id
-        ))
+        rows = db.execute_query(query, (brinde['categoria_id'], filial_destino_id))
+        descricao = normalize(brinde['descricao'])
+        rows = sorted(
+            (row for row in rows if normalize(row['descricao']) == descricao),
+            key=lambda row: row['descricao'] != brinde['descricao']
+        )
         
         if rows:
             # Adicionar ao existente
@@ -187,18 +224,18 @@ class BrindeDAO:
             params = (filial_id,)
         
         rows = db.execute_query(query, params)
-        return [dict(row) for row in rows]
+        return rows
     
     @staticmethod
     def get_stats(filial_id=None):
-        """Retorna estatísticas de estoque"""
+        """Retorna estatísticas de estoque (lidas do resumo materializado)"""
         query = """
             SELECT 
-                COUNT(*) as total_produtos,
-                SUM(quantidade) as total_itens,
+                COALESCE(SUM(total_produtos), 0) as total_produtos,
+                SUM(total_itens) as total_itens,
                 SUM(valor_total) as valor_total,
-                SUM(estoque_baixo) as itens_estoque_baixo
-            FROM vw_estoque_atual
+                SUM(itens_estoque_baixo) as itens_estoque_baixo
+            FROM estoque_resumo
         """
         params = None
         
@@ -207,28 +244,29 @@ class BrindeDAO:
             params = (filial_id,)
         
         rows = db.execute_query(query, params)
-        return dict(rows[0]) if rows else {}
+        return rows[0] if rows else {}
     
     @staticmethod
     def get_by_category_stats(filial_id=None):
-        """Retorna estatísticas por categoria"""
+        """Retorna estatísticas por categoria (lidas do resumo materializado)"""
         query = """
             SELECT 
-                categoria,
-                COUNT(*) as total_produtos,
-                SUM(quantidade) as total_itens,
-                SUM(valor_total) as valor_total
-            FROM vw_estoque_atual
+                c.nome as categoria,
+                SUM(r.total_produtos) as total_produtos,
+                SUM(r.total_itens) as total_itens,
+                SUM(r.valor_total) as valor_total
+            FROM estoque_resumo r
+            INNER JOIN categorias c ON r.categoria_id = c.id
         """
         
         if filial_id:
-            query += " WHERE filial_id = ?"
+            query += " WHERE r.filial_id = ?"
         
-        query += " GROUP BY categoria ORDER BY categoria"
+        query += " GROUP BY c.nome ORDER BY c.nome"
         
         params = (filial_id,) if filial_id else None
         rows = db.execute_query(query, params)
-        return [dict(row) for row in rows]
+        return rows
     
     @staticmethod
     def get_grouped_by_description(filial_id=None):
@@ -262,7 +300,7 @@ class BrindeDAO:
         """
         
         rows = db.execute_query(query, tuple(params) if params else None)
-        return [dict(row) for row in rows]
+        return rows
     
     @staticmethod
     def get_by_description(descricao, filial_id=None):
@@ -292,7 +330,324 @@ class BrindeDAO:
         query += " ORDER BY f.numero"
         
         rows = db.execute_query(query, tuple(params))
-        return [dict(row) for row in rows]
+        return rows
+    
+    @staticmethod
+    def _catalog_filters(filtros):
+        """
+        WHERE do catálogo agrupado a partir dos filtros da tela
+        
+        Args:
+            filtros: dict com filial_id, categoria_id, fornecedor_id (ids;
+                vazio = todos) e descricoes (lista; None = sem restrição)
+        
+        Returns:
+            tuple: (condição, parâmetros)
+        """
+        # quantidade > 0 é a condição do índice parcial idx_brindes_catalogo
+        condicoes = ["b.quantidade > 0"]
+        params = []
+        
+        for coluna in ("filial_id", "categoria_id", "fornecedor_id"):
+            if filtros.get(coluna):
+                condicoes.append(f"b.{coluna} = ?")
+                params.append(filtros[coluna])
+        
+        if filtros.get("descricoes") is not None:
+            condicoes.append("b.descricao IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(list(filtros["descricoes"])))
+        
+        return " AND ".join(condicoes), params
+    
+    @staticmethod
+    def _catalog_order(filtros, quantidade, valor):
+        """
+        ORDER BY do catálogo: quantidade e depois valor, se pedidos ("asc" ou
+        "desc"), e por fim a ordem de idx_brindes_catalogo
+        """
+        ordem = []
+        for chave, coluna in (("ordem_qtd", quantidade), ("ordem_valor", valor)):
+            sentido = filtros.get(chave)
+            if sentido:
+                if sentido not in CATALOG_DIRECTIONS:
+                    raise ValueError(f"Ordenação inválida: {sentido}")
+                ordem.append(f"{coluna} {CATALOG_DIRECTIONS[sentido]}")
+        return ordem
+    
+    @staticmethod
+    def _catalog_after(chaves, cursor):
+        """
+        Condição dos grupos depois do cursor na ordem das chaves, como o
+        SQLite ordena (NULL antes de qualquer valor em ASC, depois em DESC)
+        
+        Args:
+            chaves: lista de (expressão, "ASC" ou "DESC")
+            cursor: Valores das chaves no último grupo exibido
+        
+        Returns:
+            tuple: (condição, parâmetros)
+        """
+        alternativas = []
+        params = []
+        iguais = []
+        iguais_params = []
+        for (expressao, sentido), valor in zip(chaves, cursor):
+            if valor is None:
+                depois = f"{expressao} IS NOT NULL" if sentido == "ASC" else None
+                depois_params = []
+            elif sentido == "ASC":
+                depois, depois_params = f"{expressao} > ?", [valor]
+            else:
+                depois, depois_params = f"({expressao} < ? OR {expressao} IS NULL)", [valor]
+            if depois:
+                alternativas.append(" AND ".join(iguais + [depois]))
+                params += iguais_params + depois_params
+            iguais.append(f"{expressao} IS ?")
+            iguais_params.append(valor)
+        
+        if not alternativas:
+            return "0", []
+        return "(" + " OR ".join(alternativas) + ")", params
+    
+    @staticmethod
+    def get_catalog_page(filtros=None, limit=20, cursor=None):
+        """
+        Página do catálogo agrupado por descrição (apenas com quantidade > 0)
+        
+        Filtros e ordenação vão para o WHERE e o ORDER BY. A página é escolhida
+        calculando só o que a ordenação usa; os totais, a média e os nomes são
+        calculados depois, apenas para os grupos da página. O cursor é a chave
+        de ordenação do último grupo exibido: sem ordenação por valor ou
+        quantidade, a chave do grupo (CATALOG_GROUP_ORDER), e a consulta
+        começa no índice idx_brindes_catalogo logo depois dela e para ao
+        completar a página; com ordenação, os valores ordenados seguidos da
+        chave do grupo.
+        
+        Args:
+            filtros: Ver _catalog_filters, mais ordem_qtd e ordem_valor
+            limit: Grupos por página
+            cursor: Cursor retornado pela página anterior (None na primeira)
+        
+        Returns:
+            tuple: (grupos, cursor da próxima página ou None)
+        """
+        filtros = filtros or {}
+        condicao, params = BrindeDAO._catalog_filters(filtros)
+        ordem = BrindeDAO._catalog_order(filtros, "quantidade_total", "valor_medio")
+        
+        agregados = {"quantidade_total": "SUM(b.quantidade)", "valor_medio": "AVG(b.valor_unitario)"}
+        ordenados = [item.split() for item in ordem]
+        chaves = "".join(f", {agregados[coluna]} as {coluna}" for coluna, _ in ordenados)
+        grupo = ", ".join(f"b.{coluna}" for coluna in CATALOG_GROUP_ORDER)
+        
+        # Depois do cursor: no WHERE quando a ordem é só a chave do grupo
+        # (descricao >= ? posiciona a busca no índice), senão no HAVING
+        where = condicao
+        having = ""
+        pagina_params = list(params)
+        if cursor:
+            depois, depois_params = BrindeDAO._catalog_after(
+                [(agregados[coluna], sentido) for coluna, sentido in ordenados]
+                + [(f"b.{coluna}", "ASC") for coluna in CATALOG_GROUP_ORDER],
+                cursor
+            )
+            if ordenados:
+                having = f"HAVING {depois}"
+            else:
+                where += f" AND b.descricao >= ? AND {depois}"
+                pagina_params.append(cursor[0])
+            pagina_params += depois_params
+        
+        # Valores ordenados vêm da página (o cursor compara com os mesmos valores)
+        quantidade = "p.quantidade_total" if "quantidade_total" in dict(ordenados) else agregados["quantidade_total"]
+        valor = "p.valor_medio" if "valor_medio" in dict(ordenados) else agregados["valor_medio"]
+        
+        query = f"""
+            WITH pagina AS (
+                SELECT {grupo}{chaves}
+                FROM brindes b
+                WHERE {where}
+                GROUP BY {grupo}
+                {having}
+                ORDER BY {", ".join(ordem + list(CATALOG_GROUP_ORDER))}
+                LIMIT ?
+            )
+            SELECT p.descricao, p.codigo_interno, p.categoria_id, p.unidade_id, p.fornecedor_id,
+                   c.nome as categoria, u.codigo as unidade, fo.nome as fornecedor,
+                   COUNT(DISTINCT b.filial_id) as num_filiais,
+                   {quantidade} as quantidade_total,
+                   {valor} as valor_medio,
+                   SUM(b.quantidade * b.valor_unitario) as valor_total
+            FROM pagina p
+            INNER JOIN brindes b ON b.descricao = p.descricao
+                AND b.codigo_interno IS p.codigo_interno
+                AND b.categoria_id IS p.categoria_id
+                AND b.unidade_id IS p.unidade_id
+                AND b.fornecedor_id IS p.fornecedor_id
+            LEFT JOIN categorias c ON p.categoria_id = c.id
+            LEFT JOIN unidades_medida u ON p.unidade_id = u.id
+            LEFT JOIN fornecedores fo ON p.fornecedor_id = fo.id
+            WHERE {condicao}
+            GROUP BY {", ".join(f"p.{coluna}" for coluna in CATALOG_GROUP_ORDER)}
+            ORDER BY {", ".join(ordem + [f"p.{coluna}" for coluna in CATALOG_GROUP_ORDER])}
+        """
+        # Um grupo a mais indica se existe a próxima página
+        params = pagina_params + [limit + 1] + params
+        
+        rows = db.execute_query(query, tuple(params))
+        if len(rows) > limit:
+            rows = rows[:limit]
+            ultimo = rows[-1]
+            return rows, tuple(ultimo[coluna] for coluna, _ in ordenados) + tuple(
+                ultimo[coluna] for coluna in CATALOG_GROUP_ORDER
+            )
+        return rows, None
+    
+    @staticmethod
+    def get_catalog_details(descricoes, filtros=None):
+        """
+        Registros por filial dos grupos de uma página, com os mesmos filtros
+        (uma consulta para a página inteira)
+        
+        Returns:
+            list: Mesmas colunas de get_by_description, por descrição e, dentro
+            dela, pela ordenação pedida e número da filial
+        """
+        filtros = dict(filtros or {}, descricoes=descricoes)
+        condicao, params = BrindeDAO._catalog_filters(filtros)
+        ordem = BrindeDAO._catalog_order(filtros, "b.quantidade", "b.valor_unitario")
+        
+        query = f"""
+            SELECT
+                b.*,
+                c.nome as categoria,
+                u.codigo as unidade,
+                f.numero as filial_numero,
+                f.nome as filial,
+                fo.nome as fornecedor,
+                (b.quantidade * b.valor_unitario) as valor_total
+            FROM brindes b
+            LEFT JOIN categorias c ON b.categoria_id = c.id
+            LEFT JOIN unidades_medida u ON b.unidade_id = u.id
+            LEFT JOIN filiais f ON b.filial_id = f.id
+            LEFT JOIN fornecedores fo ON b.fornecedor_id = fo.id
+            WHERE {condicao}
+            ORDER BY {", ".join(["b.descricao"] + ordem + ["f.numero"])}
+        """
+        
+        rows = db.execute_query(query, tuple(params))
+        return rows
+    
+    @staticmethod
+    def _search_words(texto):
+        """Palavras do texto como o tokenizer do FTS5 as vê (minúsculas e sem acentos)"""
+        texto = unicodedata.normalize("NFKD", (texto or "").lower())
+        texto = "".join(c for c in texto if not unicodedata.combining(c))
+        return re.findall(r"\w+", texto)
+    
+    @staticmethod
+    def search(termo, filial_id=None, limit=50):
+        """
+        Busca brindes por descrição, código interno, observações ou fornecedor
+        
+        Todas as palavras precisam aparecer; a última e as de até 4 letras valem
+        como prefixo: "can az" encontra "Caneta Azul". Entre
+        os itens mais recentes que atendem à busca, os encontrados pela
+        descrição ou código interno vêm antes dos encontrados só pelo
+        fornecedor ou observações.
+        
+        A consulta ao índice para no LIMIT, então o tempo não cresce com o
+        total de itens que contêm a palavra (o bm25 do FTS5 não serve aqui:
+        ele percorre todas as ocorrências de cada termo para calcular o peso).
+        
+        Args:
+            termo: Texto digitado pelo usuário
+            filial_id: Restringe a uma filial (opcional)
+            limit: Quantidade máxima de resultados
+            
+        Returns:
+            list: Linhas de vw_estoque_atual em ordem de relevância
+        """
+        palavras = BrindeDAO._search_words(termo)
+        if not palavras:
+            return []
+        
+        # A última palavra (ainda sendo digitada) e as abreviações de até 4 letras
+        # valem como prefixo; essas usam o índice de prefixos (prefix = '1 2 3 4').
+        # Palavras longas já completas usam busca exata, que não precisa carregar
+        # a lista de documentos de todos os termos que começam com elas.
+        prefixos = [len(palavra) <= 4 for palavra in palavras]
+        prefixos[-1] = True
+        match = " ".join(
+            f'"{palavra}"*' if prefixo else f'"{palavra}"'
+            for palavra, prefixo in zip(palavras, prefixos)
+        )
+        if filial_id:
+            match = f'filial_id : "{int(filial_id)}" AND ({match})'
+        
+        # Candidatos: os mais recentes que atendem à busca
+        query = """
+            SELECT rowid AS id FROM brindes_fts
+            WHERE brindes_fts MATCH ?
+            ORDER BY rowid DESC
+            LIMIT ?
+        """
+        ids = [row["id"] for row in db.execute_query(query, (match, limit * 4))]
+        if not ids:
+            return []
+        
+        def encontrado_na_descricao(row):
+            texto = BrindeDAO._search_words(f"{row['descricao']} {row['codigo_interno'] or ''}")
+            return all(
+                any(t.startswith(palavra) for t in texto) if prefixo else palavra in texto
+                for palavra, prefixo in zip(palavras, prefixos)
+            )
+        
+        # sorted é estável: dentro de cada grupo continuam os mais recentes primeiro
+        placeholders = ", ".join("?" for _ in ids)
+        candidatos = db.execute_query(
+            f"SELECT id, descricao, codigo_interno FROM brindes WHERE id IN ({placeholders}) ORDER BY id DESC",
+            tuple(ids)
+        )
+        candidatos = sorted(candidatos, key=lambda row: not encontrado_na_descricao(row))
+        ids = [row["id"] for row in candidatos[:limit]]
+        
+        placeholders = ", ".join("?" for _ in ids)
+        rows = db.execute_query(
+            f"SELECT * FROM vw_estoque_atual WHERE id IN ({placeholders})",
+            tuple(ids)
+        )
+        
+        # Manter a ordem de relevância definida acima
+        posicao = {brinde_id: i for i, brinde_id in enumerate(ids)}
+        return sorted(rows, key=lambda row: posicao[row["id"]])
+    
+    @staticmethod
+    def build_descricao_index():
+        """Monta um índice de trigramas com as descrições cadastradas"""
+        rows = db.execute_query("SELECT DISTINCT descricao FROM brindes")
+        return TrigramIndex(row['descricao'] for row in rows)
+    
+    @staticmethod
+    def find_similar(descricao, limit=5, min_score=0.5):
+        """
+        Busca descrições cadastradas parecidas (tolerante a erros de digitação)
+        
+        Args:
+            descricao: Descrição digitada
+            limit: Quantidade máxima de resultados
+            min_score: Similaridade mínima (0 a 1)
+            
+        Returns:
+            list: dicts com descricao e similaridade, da mais parecida para a menos
+        """
+        if BrindeDAO._descricao_index is None:
+            BrindeDAO._descricao_index = BrindeDAO.build_descricao_index()
+        
+        return [
+            {"descricao": texto, "similaridade": score}
+            for texto, score in BrindeDAO._descricao_index.search(descricao, limit, min_score)
+        ]
     
     @staticmethod
     def create_multi_filial(data, distribuicao):
@@ -60,12 +60,53 @@ class BrindeExcluidoDAO:
                 LIMIT ? OFFSET ?
             """
             rows = db.execute_query(query, (limit, offset))
-            return [dict(row) for row in rows]
+            return rows
             
         except Exception as e:
             logger.error(f"Erro ao buscar brindes excluídos: {e}")
             return []
     
+    @staticmethod
+    def iter_all(batch_size=500):
+        """Retorna todos os brindes excluídos sob demanda, em lotes (exportações)"""
+        query = "SELECT * FROM brindes_excluidos ORDER BY data_exclusao DESC"
+        return db.iter_query(query, None, batch_size)
+    
+    @staticmethod
+    def get_page(cursor=None, limit=50):
+        """
+        Retorna uma página de brindes excluídos (paginação por cursor)
+        
+        Ao contrário de get_all, não usa OFFSET: o cursor é o par
+        (data_exclusao, id) da última linha da página anterior, então o custo
+        de cada página não cresce com a profundidade.
+        
+        Returns:
+            tuple: (lista de brindes excluídos, cursor da próxima página ou None)
+        """
+        try:
+            query = "SELECT * FROM brindes_excluidos"
+            params = []
+            
+            if cursor:
+                query += " WHERE (data_exclusao, id) < (?, ?)"
+                params.extend(cursor)
+            
+            # Buscar uma linha a mais para saber se existe próxima página
+            query += " ORDER BY data_exclusao DESC, id DESC LIMIT ?"
+            params.append(limit + 1)
+            
+            rows = db.execute_query(query, tuple(params))
+            
+            if len(rows) > limit:
+                rows = rows[:limit]
+                return rows, (rows[-1]["data_exclusao"], rows[-1]["id"])
+            return rows, None
+            
+        except Exception as e:
+            logger.error(f"Erro ao buscar página de brindes excluídos: {e}")
+            return [], None
+    
     @staticmethod
     def get_by_period(data_inicio, data_fim):
         """Retorna brindes excluídos por período"""
@@ -76,7 +117,7 @@ class BrindeExcluidoDAO:
                 ORDER BY data_exclusao DESC
             """
             rows = db.execute_query(query, (data_inicio, data_fim))
-            return [dict(row) for row in rows]
+            return rows
             
         except Exception as e:
             logger.error(f"Erro ao buscar brindes excluídos por período: {e}")
@@ -92,7 +133,7 @@ class BrindeExcluidoDAO:
                 ORDER BY data_exclusao DESC
             """
             rows = db.execute_query(query, (usuario_id,))
-            return [dict(row) for row in rows]
+            return rows
             
         except Exception as e:
             logger.error(f"Erro ao buscar brindes excluídos por usuário: {e}")
@@ -24,14 +24,14 @@ class CategoriaDAO:
         query += " ORDER BY nome"
         
         rows = db.execute_query(query)
-        return [dict(row) for row in rows]
+        return rows
     
     @staticmethod
     def get_by_id(categoria_id):
         """Retorna categoria por ID"""
         query = "SELECT * FROM categorias WHERE id = ?"
         rows = db.execute_query(query, (categoria_id,))
-        return dict(rows[0]) if rows else None
+        return rows[0] if rows else None
     
     @staticmethod
     def update(categoria_id, data):
@@ -59,6 +59,12 @@ class CategoriaDAO:
         db.execute_update(query, (categoria_id,))
         return True
     
+    @staticmethod
+    def delete_permanent(categoria_id):
+        """Exclui uma categoria definitivamente"""
+        db.execute_update("DELETE FROM categorias WHERE id = ?", (categoria_id,))
+        return True
+    
     @staticmethod
     def activate(categoria_id):
         """Ativa uma categoria"""
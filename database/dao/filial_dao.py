@@ -38,14 +38,14 @@ class FilialDAO:
         query += " ORDER BY numero"
         
         rows = db.execute_query(query)
-        return [dict(row) for row in rows]
+        return rows
     
     @staticmethod
     def get_by_id(filial_id):
         """Retorna filial por ID"""
         query = "SELECT * FROM filiais WHERE id = ?"
         rows = db.execute_query(query, (filial_id,))
-        return dict(rows[0]) if rows else None
+        return rows[0] if rows else None
     
     @staticmethod
     def update(filial_id, data):
@@ -85,12 +85,36 @@ class FilialDAO:
         db.execute_update(query, (filial_id,))
         return True
     
+    @staticmethod
+    def delete_permanent(filial_id):
+        """Exclui uma filial definitivamente (ver can_delete)"""
+        db.execute_update("DELETE FROM filiais WHERE id = ?", (filial_id,))
+        return True
+    
+    @staticmethod
+    def get_default():
+        """Filial padrão para usuários não cadastrados: id 1 ou a primeira cadastrada"""
+        query = "SELECT id, nome FROM filiais ORDER BY id != 1, id LIMIT 1"
+        rows = db.execute_query(query)
+        return rows[0] if rows else None
+    
+    @staticmethod
+    def count_dependencies(filial_id):
+        """Usuários ativos e brindes da filial (impedem desativá-la)"""
+        query = """
+            SELECT
+                (SELECT COUNT(*) FROM usuarios WHERE filial_id = ? AND ativo = 1) as usuarios,
+                (SELECT COUNT(*) FROM brindes WHERE filial_id = ?) as brindes
+        """
+        row = db.execute_query(query, (filial_id, filial_id))[0]
+        return row['usuarios'], row['brindes']
+    
     @staticmethod
     def get_matriz():
         """Retorna a filial matriz"""
         query = "SELECT * FROM filiais WHERE is_matriz = 1 LIMIT 1"
         rows = db.execute_query(query)
-        return dict(rows[0]) if rows else None
+        return rows[0] if rows else None
     
     @staticmethod
     def set_matriz(filial_id):
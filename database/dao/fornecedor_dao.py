@@ -41,14 +41,14 @@ class FornecedorDAO:
         query += " ORDER BY nome"
         
         rows = db.execute_query(query)
-        return [dict(row) for row in rows]
+        return rows
     
     @staticmethod
     def get_by_id(fornecedor_id):
         """Retorna fornecedor por ID"""
         query = "SELECT * FROM fornecedores WHERE id = ?"
         rows = db.execute_query(query, (fornecedor_id,))
-        return dict(rows[0]) if rows else None
+        return rows[0] if rows else None
     
     @staticmethod
     def update(fornecedor_id, data):
@@ -83,6 +83,21 @@ class FornecedorDAO:
         db.execute_update(query, (fornecedor_id,))
         return True
     
+    @staticmethod
+    def delete_permanent(fornecedor_id):
+        """
+        Exclui um fornecedor definitivamente, removendo a referência dos brindes
+        
+        Returns:
+            int: Brindes que deixaram de ter fornecedor
+        """
+        query = "SELECT COUNT(*) as count FROM brindes WHERE fornecedor_id = ?"
+        brindes = db.execute_query(query, (fornecedor_id,))[0]['count']
+        if brindes:
+            db.execute_update("UPDATE brindes SET fornecedor_id = NULL WHERE fornecedor_id = ?", (fornecedor_id,))
+        db.execute_update("DELETE FROM fornecedores WHERE id = ?", (fornecedor_id,))
+        return brindes
+    
     @staticmethod
     def activate(fornecedor_id):
         """Ativa um fornecedor"""
@@ -100,6 +115,6 @@ class FornecedorDAO:
         """
         termo_busca = f"%{termo}%"
         rows = db.execute_query(query, (termo_busca, termo_busca))
-        return [dict(row) for row in rows]
+        return rows
 
 # Updated: 2025-10-14 14:28:20
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+DAO para o Histórico de Alterações (Auditoria)
+
+O histórico é gravado pelos triggers trg_*_historico_* (schema.sql) na mesma
+transação da alteração; aqui só há leitura. dados_anteriores e dados_novos
+são objetos JSON com apenas as colunas alteradas ({coluna: valor}).
+"""
+from database.connection import db
+from utils.logger import logger
+
+
+class HistoricoDAO:
+    """Data Access Object para o histórico de alterações"""
+    
+    @staticmethod
+    def get_timeline(tabela, registro_id, limit=50, cursor=None):
+        """
+        Linha do tempo de um registro, da alteração mais recente para a mais antiga
+        
+        Usa o índice (tabela, registro_id), que já guarda as linhas na ordem
+        de id: cada página lê só as entradas que devolve. O cursor é o id da
+        última entrada da página anterior.
+        
+        Returns:
+            tuple: (lista de entradas, cursor da próxima página ou None)
+        """
+        try:
+            query = """
+                SELECT h.id, h.acao, h.usuario_id, u.nome as usuario,
+                       h.dados_anteriores, h.dados_novos, h.data_acao
+                FROM historico h
+                LEFT JOIN usuarios u ON h.usuario_id = u.id
+                WHERE h.tabela = ? AND h.registro_id = ?
+            """
+            params = [tabela, registro_id]
+            
+            if cursor:
+                query += " AND h.id < ?"
+                params.append(cursor)
+            
+            # Buscar uma linha a mais para saber se existe próxima página
+            query += " ORDER BY h.id DESC LIMIT ?"
+            params.append(limit + 1)
+            
+            rows = db.execute_query(query, tuple(params))
+            
+            if len(rows) > limit:
+                rows = rows[:limit]
+                return rows, rows[-1]["id"]
+            return rows, None
+        
+        except Exception as e:
+            logger.error(f"Erro ao buscar histórico de {tabela} {registro_id}: {e}")
+            return [], None
+    
+    @staticmethod
+    def get_recent(limit=50, cursor=None):
+        """
+        Alterações mais recentes de todas as tabelas (paginação por cursor)
+        
+        Returns:
+            tuple: (lista de entradas, cursor da próxima página ou None)
+        """
+        try:
+            query = """
+                SELECT h.id, h.tabela, h.registro_id, h.acao, h.usuario_id, u.nome as usuario,
+                       h.dados_anteriores, h.dados_novos, h.data_acao
+                FROM historico h
+                LEFT JOIN usuarios u ON h.usuario_id = u.id
+            """
+            params = []
+            
+            if cursor:
+                query += " WHERE h.id < ?"
+                params.append(cursor)
+            
+            query += " ORDER BY h.id DESC LIMIT ?"
+            params.append(limit + 1)
+            
+            rows = db.execute_query(query, tuple(params))
+            
+            if len(rows) > limit:
+                rows = rows[:limit]
+                return rows, rows[-1]["id"]
+            return rows, None
+        
+        except Exception as e:
+            logger.error(f"Erro ao buscar alterações recentes: {e}")
+            return [], None
+
+
+# Updated: 2026-10-19
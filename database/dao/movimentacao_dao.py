@@ -3,6 +3,7 @@
 DAO para Movimentações
 """
 from database.connection import db
+from database.archive import archive_manager
 
 
 class MovimentacaoDAO:
@@ -40,10 +41,116 @@ class MovimentacaoDAO:
             query += " WHERE filial_id = ?"
             params = (filial_id,)
         
-        query += f" LIMIT {limit}"
+        query += " ORDER BY data_movimentacao DESC, id DESC LIMIT ?"
+        params = (params or ()) + (limit,)
         
         rows = db.execute_query(query, params)
-        return [dict(row) for row in rows]
+        return rows
+    
+    @staticmethod
+    def iter_all(filial_id=None, batch_size=500):
+        """Retorna todas as movimentações sob demanda, em lotes (exportações)"""
+        query = "SELECT * FROM vw_movimentacoes_completas"
+        params = None
+        
+        if filial_id:
+            query += " WHERE filial_id = ?"
+            params = (filial_id,)
+        
+        query += " ORDER BY data_movimentacao DESC, id DESC"
+        
+        return db.iter_query(query, params, batch_size)
+    
+    @staticmethod
+    def get_page(filial_id=None, data_inicio=None, data_fim=None, cursor=None, limit=50):
+        """
+        Retorna uma página de movimentações (paginação por cursor)
+        
+        As linhas vêm ordenadas da mais recente para a mais antiga. O cursor é
+        o par (data_movimentacao, id) da última linha da página anterior, então
+        cada página é uma busca no índice de data, sem OFFSET. Os anos
+        arquivados do período entram por UNION ALL, com o cursor aplicado em
+        cada parte; com mais anos que ARCHIVE_MAX_ATTACHED, a página é
+        completada com as rodadas seguintes (ver ArchiveManager.rounds).
+        
+        Args:
+            filial_id: Filtra pela filial do brinde
+            data_inicio: Data inicial (YYYY-MM-DD), inclusive
+            data_fim: Data final (YYYY-MM-DD), inclusive
+            cursor: Cursor retornado pela página anterior (None na primeira)
+            limit: Tamanho da página
+        
+        Returns:
+            tuple: (lista de movimentações, cursor da próxima página ou None)
+        """
+        rows = []
+        for rodada in archive_manager.rounds("movimentacoes", data_inicio, data_fim):
+            inicio_rodada = rodada[0][1]
+            if cursor and inicio_rodada and str(cursor[0]) < inicio_rodada:
+                # Rodada inteira acima do cursor (já exibida)
+                continue
+            
+            partes = []
+            for tabela, desde, ate in rodada:
+                # CROSS JOIN fixa movimentacoes como laço externo, percorrendo o índice de data
+                query = f"""
+                    SELECT 
+                        m.id,
+                        m.brinde_id,
+                        m.data_movimentacao,
+                        m.tipo,
+                        b.descricao as brinde,
+                        m.quantidade,
+                        m.valor_unitario,
+                        m.quantidade * m.valor_unitario as valor_total,
+                        u.nome as usuario,
+                        b.filial_id,
+                        f.nome as filial,
+                        m.justificativa
+                    FROM {tabela} m
+                    CROSS JOIN brindes b ON m.brinde_id = b.id
+                    INNER JOIN usuarios u ON m.usuario_id = u.id
+                    INNER JOIN filiais f ON b.filial_id = f.id
+                    WHERE 1=1
+                """
+                params = []
+                
+                if cursor:
+                    query += " AND (m.data_movimentacao, m.id) < (?, ?)"
+                    params.extend(cursor)
+                
+                if data_inicio:
+                    query += " AND m.data_movimentacao >= ?"
+                    params.append(data_inicio)
+                
+                if data_fim:
+                    query += " AND m.data_movimentacao < DATE(?, '+1 day')"
+                    params.append(data_fim)
+                
+                if filial_id:
+                    query += " AND b.filial_id = ?"
+                    params.append(filial_id)
+                
+                faixa, faixa_params = archive_manager.window("m.data_movimentacao", desde, ate)
+                query += faixa
+                params.extend(faixa_params)
+                
+                # LIMIT em cada parte: cada tabela para no índice de data
+                query += " ORDER BY m.data_movimentacao DESC, m.id DESC LIMIT ?"
+                params.append(limit + 1 - len(rows))
+                partes.append((f"SELECT * FROM ({query})", params))
+            
+            # Buscar uma linha a mais para saber se existe próxima página
+            query = " UNION ALL ".join(parte for parte, _ in partes)
+            query += " ORDER BY data_movimentacao DESC, id DESC LIMIT ?"
+            params = [param for _, parametros in partes for param in parametros]
+            params.append(limit + 1 - len(rows))
+            
+            rows += db.execute_query(query, tuple(params))
+            if len(rows) > limit:
+                rows = rows[:limit]
+                return rows, (rows[-1]['data_movimentacao'], rows[-1]['id'])
+        return rows, None
     
     @staticmethod
     def get_by_brinde(brinde_id, limit=50):
@@ -51,17 +158,18 @@ class MovimentacaoDAO:
         query = """
             SELECT * FROM vw_movimentacoes_completas
             WHERE brinde_id = ?
+            ORDER BY data_movimentacao DESC, id DESC
             LIMIT ?
         """
         rows = db.execute_query(query, (brinde_id, limit))
-        return [dict(row) for row in rows]
+        return rows
     
     @staticmethod
     def get_by_period(data_inicio, data_fim, filial_id=None):
         """Retorna movimentações por período"""
         query = """
             SELECT * FROM vw_movimentacoes_completas
-            WHERE DATE(data_movimentacao) BETWEEN DATE(?) AND DATE(?)
+            WHERE data_movimentacao >= DATE(?) AND data_movimentacao < DATE(?, '+1 day')
         """
         params = [data_inicio, data_fim]
         
@@ -69,7 +177,9 @@ class MovimentacaoDAO:
             query += " AND filial_id = ?"
             params.append(filial_id)
         
+        query += " ORDER BY data_movimentacao DESC, id DESC"
+        
         rows = db.execute_query(query, tuple(params))
-        return [dict(row) for row in rows]
+        return rows
 
 # Updated: 2025-10-14 14:28:20
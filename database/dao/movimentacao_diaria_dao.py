@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+DAO para os Totais Diários de Movimentações
+
+movimentacoes_diarias é mantida pelos triggers trg_movimentacoes_diarias_*
+(schema.sql): uma linha por dia, filial, brinde e tipo. Relatórios de
+tendência e volume leem essa tabela em vez de agrupar movimentacoes, então o
+custo depende do número de dias do período, não do número de movimentações.
+As movimentações já arquivadas (database/archive.py) continuam nos totais.
+"""
+from database.connection import db
+from utils.logger import logger
+
+
+# Início do período de cada granularidade (semanas começam na segunda-feira)
+GRANULARIDADES = {
+    "dia": "s.dia",
+    "semana": "date(s.dia, '-6 days', 'weekday 1')",
+    "mes": "strftime('%Y-%m-01', s.dia)",
+}
+
+
+class MovimentacaoDiariaDAO:
+    """Data Access Object para os totais diários de movimentações"""
+    
+    @staticmethod
+    def _filtros(data_inicio, data_fim, filial_id=None, brinde_id=None, tipo=None):
+        """Condições e parâmetros comuns (período inclusivo, AAAA-MM-DD)"""
+        condicoes = ["d.dia BETWEEN ? AND ?"]
+        params = [str(data_inicio)[:10], str(data_fim)[:10]]
+        
+        if filial_id:
+            condicoes.append("d.filial_id = ?")
+            params.append(filial_id)
+        if brinde_id:
+            condicoes.append("d.brinde_id = ?")
+            params.append(brinde_id)
+        if tipo:
+            condicoes.append("d.tipo = ?")
+            params.append(tipo)
+        
+        return " AND ".join(condicoes), params
+    
+    @staticmethod
+    def get_serie(data_inicio, data_fim, granularidade="dia", filial_id=None, brinde_id=None, tipo=None,
+                  por_filial=False):
+        """
+        Série de movimentações por período
+        
+        Args:
+            data_inicio, data_fim: Período (inclusivo)
+            granularidade: "dia", "semana" ou "mes"
+            filial_id, brinde_id, tipo: Filtros opcionais
+            por_filial: Uma série por filial (colunas filial_id e filial)
+        
+        Returns:
+            list: periodo (primeiro dia), tipo, movimentacoes, quantidade e
+            valor_total, em ordem de período
+        """
+        if granularidade not in GRANULARIDADES:
+            raise ValueError(f"Granularidade inválida: {granularidade}")
+        
+        try:
+            condicao, params = MovimentacaoDiariaDAO._filtros(data_inicio, data_fim, filial_id, brinde_id, tipo)
+            periodo = GRANULARIDADES[granularidade]
+            
+            # Primeiro por dia, na ordem do índice (dia, tipo, filial_id, ...),
+            # sem tabela temporária; o período é calculado só sobre os totais do dia
+            colunas = "d.dia, d.tipo, d.filial_id" if por_filial else "d.dia, d.tipo"
+            diario = f"""
+                SELECT {colunas},
+                       SUM(d.movimentacoes) as movimentacoes,
+                       SUM(d.quantidade) as quantidade,
+                       SUM(d.valor_total) as valor_total
+                FROM movimentacoes_diarias d
+                WHERE {condicao}
+                GROUP BY {colunas}
+            """
+            
+            if por_filial:
+                query = f"""
+                    SELECT {periodo} as periodo, s.filial_id, f.nome as filial, s.tipo,
+                           SUM(s.movimentacoes) as movimentacoes,
+                           SUM(s.quantidade) as quantidade,
+                           SUM(s.valor_total) as valor_total
+                    FROM ({diario}) s
+                    LEFT JOIN filiais f ON s.filial_id = f.id
+                    GROUP BY periodo, s.filial_id, s.tipo
+                    ORDER BY periodo, f.nome, s.tipo
+                """
+            else:
+                query = f"""
+                    SELECT {periodo} as periodo, s.tipo,
+                           SUM(s.movimentacoes) as movimentacoes,
+                           SUM(s.quantidade) as quantidade,
+                           SUM(s.valor_total) as valor_total
+                    FROM ({diario}) s
+                    GROUP BY periodo, s.tipo
+                    ORDER BY periodo, s.tipo
+                """
+            
+            return db.execute_query(query, tuple(params))
+        
+        except Exception as e:
+            logger.error(f"Erro ao buscar série de movimentações: {e}")
+            return []
+    
+    @staticmethod
+    def get_ranking_brindes(data_inicio, data_fim, tipo="SAIDA", filial_id=None, limit=10):
+        """
+        Brindes com maior quantidade movimentada no período
+        
+        Returns:
+            list: brinde_id, descricao, filial, movimentacoes, quantidade e
+            valor_total, da maior quantidade para a menor
+        """
+        try:
+            condicao, params = MovimentacaoDiariaDAO._filtros(data_inicio, data_fim, filial_id, tipo=tipo)
+            query = f"""
+                SELECT r.brinde_id, b.descricao, f.nome as filial,
+                       r.movimentacoes, r.quantidade, r.valor_total
+                FROM (
+                    SELECT d.brinde_id,
+                           SUM(d.movimentacoes) as movimentacoes,
+                           SUM(d.quantidade) as quantidade,
+                           SUM(d.valor_total) as valor_total
+                    FROM movimentacoes_diarias d
+                    WHERE {condicao}
+                    GROUP BY d.brinde_id
+                    ORDER BY quantidade DESC
+                    LIMIT ?
+                ) r
+                LEFT JOIN brindes b ON r.brinde_id = b.id
+                LEFT JOIN filiais f ON b.filial_id = f.id
+                ORDER BY r.quantidade DESC
+            """
+            params.append(limit)
+            
+            return db.execute_query(query, tuple(params))
+        
+        except Exception as e:
+            logger.error(f"Erro ao buscar ranking de brindes: {e}")
+            return []
+
+
+# Updated: 2026-10-19
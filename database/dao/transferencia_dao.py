@@ -3,6 +3,7 @@
 DAO para Transferências
 """
 from database.connection import db
+from database.archive import archive_manager
 
 
 class TransferenciaDAO:
@@ -33,10 +34,104 @@ class TransferenciaDAO:
             query += " WHERE filial_origem_id = ? OR filial_destino_id = ?"
             params = (filial_id, filial_id)
         
-        query += f" LIMIT {limit}"
+        query += " ORDER BY data_transferencia DESC, id DESC LIMIT ?"
+        params = (params or ()) + (limit,)
         
         rows = db.execute_query(query, params)
-        return [dict(row) for row in rows]
+        return rows
+    
+    @staticmethod
+    def iter_all(filial_id=None, batch_size=500):
+        """Retorna todas as transferências sob demanda, em lotes (exportações)"""
+        query = "SELECT * FROM vw_transferencias_completas"
+        params = None
+        
+        if filial_id:
+            query += " WHERE filial_origem_id = ? OR filial_destino_id = ?"
+            params = (filial_id, filial_id)
+        
+        query += " ORDER BY data_transferencia DESC, id DESC"
+        
+        return db.iter_query(query, params, batch_size)
+    
+    @staticmethod
+    def get_page(filial_id=None, data_inicio=None, data_fim=None, cursor=None, limit=50):
+        """
+        Retorna uma página de transferências (paginação por cursor)
+        
+        O cursor é o par (data_transferencia, id) da última linha da página
+        anterior; as linhas vêm da mais recente para a mais antiga. Os anos
+        arquivados do período entram como em MovimentacaoDAO.get_page.
+        
+        Returns:
+            tuple: (lista de transferências, cursor da próxima página ou None)
+        """
+        rows = []
+        for rodada in archive_manager.rounds("transferencias", data_inicio, data_fim):
+            inicio_rodada = rodada[0][1]
+            if cursor and inicio_rodada and str(cursor[0]) < inicio_rodada:
+                # Rodada inteira acima do cursor (já exibida)
+                continue
+            
+            partes = []
+            for tabela, desde, ate in rodada:
+                query = f"""
+                    SELECT 
+                        t.id,
+                        t.brinde_id,
+                        t.data_transferencia,
+                        b.descricao as brinde,
+                        t.quantidade,
+                        t.filial_origem_id,
+                        fo.nome as filial_origem,
+                        t.filial_destino_id,
+                        fd.nome as filial_destino,
+                        u.nome as usuario,
+                        t.justificativa
+                    FROM {tabela} t
+                    CROSS JOIN brindes b ON t.brinde_id = b.id
+                    INNER JOIN filiais fo ON t.filial_origem_id = fo.id
+                    INNER JOIN filiais fd ON t.filial_destino_id = fd.id
+                    INNER JOIN usuarios u ON t.usuario_id = u.id
+                    WHERE 1=1
+                """
+                params = []
+                
+                if cursor:
+                    query += " AND (t.data_transferencia, t.id) < (?, ?)"
+                    params.extend(cursor)
+                
+                if data_inicio:
+                    query += " AND t.data_transferencia >= ?"
+                    params.append(data_inicio)
+                
+                if data_fim:
+                    query += " AND t.data_transferencia < DATE(?, '+1 day')"
+                    params.append(data_fim)
+                
+                if filial_id:
+                    query += " AND (t.filial_origem_id = ? OR t.filial_destino_id = ?)"
+                    params.extend([filial_id, filial_id])
+                
+                faixa, faixa_params = archive_manager.window("t.data_transferencia", desde, ate)
+                query += faixa
+                params.extend(faixa_params)
+                
+                query += " ORDER BY t.data_transferencia DESC, t.id DESC LIMIT ?"
+                params.append(limit + 1 - len(rows))
+                partes.append((f"SELECT * FROM ({query})", params))
+            
+            # Buscar uma linha a mais para saber se existe próxima página
+            query = " UNION ALL ".join(parte for parte, _ in partes)
+            query += " ORDER BY data_transferencia DESC, id DESC LIMIT ?"
+            params = [param for _, parametros in partes for param in parametros]
+            params.append(limit + 1 - len(rows))
+            
+            rows += db.execute_query(query, tuple(params))
+            if len(rows) > limit:
+                rows = rows[:limit]
+                return rows, (rows[-1]['data_transferencia'], rows[-1]['id'])
+        return rows, None
     
     @staticmethod
     def get_by_brinde(brinde_id, limit=50):
@@ -44,17 +139,18 @@ class TransferenciaDAO:
         query = """
             SELECT * FROM vw_transferencias_completas
             WHERE brinde_id = ?
+            ORDER BY data_transferencia DESC, id DESC
             LIMIT ?
         """
         rows = db.execute_query(query, (brinde_id, limit))
-        return [dict(row) for row in rows]
+        return rows
     
     @staticmethod
     def get_by_period(data_inicio, data_fim, filial_id=None):
         """Retorna transferências por período"""
         query = """
             SELECT * FROM vw_transferencias_completas
-            WHERE DATE(data_transferencia) BETWEEN DATE(?) AND DATE(?)
+            WHERE data_transferencia >= DATE(?) AND data_transferencia < DATE(?, '+1 day')
         """
         params = [data_inicio, data_fim]
         
@@ -62,7 +158,9 @@ class TransferenciaDAO:
             query += " AND (filial_origem_id = ? OR filial_destino_id = ?)"
             params.extend([filial_id, filial_id])
         
+        query += " ORDER BY data_transferencia DESC, id DESC"
+        
         rows = db.execute_query(query, tuple(params))
-        return [dict(row) for row in rows]
+        return rows
 
 # Updated: 2025-10-14 14:28:20
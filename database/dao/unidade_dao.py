@@ -24,14 +24,14 @@ class UnidadeDAO:
         query += " ORDER BY codigo"
         
         rows = db.execute_query(query)
-        return [dict(row) for row in rows]
+        return rows
     
     @staticmethod
     def get_by_id(unidade_id):
         """Retorna unidade por ID"""
         query = "SELECT * FROM unidades_medida WHERE id = ?"
         rows = db.execute_query(query, (unidade_id,))
-        return dict(rows[0]) if rows else None
+        return rows[0] if rows else None
     
     @staticmethod
     def update(unidade_id, data):
@@ -59,6 +59,19 @@ class UnidadeDAO:
         db.execute_update(query, (unidade_id,))
         return True
     
+    @staticmethod
+    def count_brindes(unidade_id):
+        """Quantidade de brindes que usam a unidade"""
+        query = "SELECT COUNT(*) as count FROM brindes WHERE unidade_id = ?"
+        result = db.execute_query(query, (unidade_id,))
+        return result[0]['count']
+    
+    @staticmethod
+    def delete_permanent(unidade_id):
+        """Exclui uma unidade definitivamente"""
+        db.execute_update("DELETE FROM unidades_medida WHERE id = ?", (unidade_id,))
+        return True
+    
     @staticmethod
     def activate(unidade_id):
         """Ativa uma unidade"""
@@ -37,7 +37,7 @@ class UsuarioDAO:
         query += " ORDER BY u.nome"
         
         rows = db.execute_query(query)
-        return [dict(row) for row in rows]
+        return rows
     
     @staticmethod
     def get_by_id(usuario_id):
@@ -49,7 +49,7 @@ class UsuarioDAO:
             WHERE u.id = ?
         """
         rows = db.execute_query(query, (usuario_id,))
-        return dict(rows[0]) if rows else None
+        return rows[0] if rows else None
     
     @staticmethod
     def get_by_username(username):
@@ -61,7 +61,7 @@ class UsuarioDAO:
             WHERE u.username = ? AND u.ativo = 1
         """
         rows = db.execute_query(query, (username,))
-        return dict(rows[0]) if rows else None
+        return rows[0] if rows else None
     
     @staticmethod
     def update(usuario_id, data):
@@ -89,6 +89,24 @@ class UsuarioDAO:
         db.execute_update(query, (usuario_id,))
         return True
     
+    @staticmethod
+    def count_references(usuario_id):
+        """Movimentações, transferências e histórico registrados pelo usuário"""
+        query = """
+            SELECT
+                (SELECT COUNT(*) FROM movimentacoes WHERE usuario_id = ?) as movimentacoes,
+                (SELECT COUNT(*) FROM transferencias WHERE usuario_id = ?) as transferencias,
+                (SELECT COUNT(*) FROM historico WHERE usuario_id = ?) as historico
+        """
+        row = db.execute_query(query, (usuario_id, usuario_id, usuario_id))[0]
+        return row['movimentacoes'], row['transferencias'], row['historico']
+    
+    @staticmethod
+    def delete_permanent(usuario_id):
+        """Exclui um usuário definitivamente"""
+        db.execute_update("DELETE FROM usuarios WHERE id = ?", (usuario_id,))
+        return True
+    
     @staticmethod
     def activate(usuario_id):
         """Ativa um usuário"""
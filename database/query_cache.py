@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de Resultados de Consultas
+Guarda o resultado de SELECTs por (SQL, parâmetros) com as tabelas lidas por
+cada consulta. Cada tabela tem um contador de versão incrementado pelas
+escritas; um resultado só é reaproveitado se nenhuma das suas tabelas mudou.
+"""
+import re
+import threading
+from collections import OrderedDict
+from utils.logger import debug
+
+
+# Alvos de escrita em comandos e corpos de triggers
+_WRITE_RE = re.compile(
+    r"\b(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+(?!SET\b)[\"`\[]?(\w+)",
+    re.IGNORECASE
+)
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_]\w*")
+
+# Consultas cujo resultado depende de algo além das tabelas
+_VOLATILE_RE = re.compile(
+    r"\b(?:now|random|randomblob|current_date|current_time|current_timestamp|changes|"
+    r"total_changes|last_insert_rowid|sqlite_\w+)\b|\bpragma\b",
+    re.IGNORECASE
+)
+
+
+class QueryCache:
+    """
+    Cache LRU de resultados, invalidado por versão de tabela
+    
+    A memória é limitada pelo número de consultas e pelo total de linhas
+    guardadas; resultados maiores que um quarto do limite não entram.
+    
+    Args:
+        connection_getter: Função que retorna a conexão ativa (para ler o schema)
+        max_entries: Máximo de consultas guardadas
+        max_rows: Máximo de linhas somando todas as consultas
+    """
+    
+    def __init__(self, connection_getter, max_entries=256, max_rows=100_000):
+        self._connection_getter = connection_getter
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()   # (sql, params) -> (tabelas, versões, linhas)
+        self._versions = {}             # tabela -> versão
+        self._epoch = 0                 # incrementado ao descartar tudo
+        self._rows = 0
+        
+        self._tables_by_sql = {}        # sql -> tabelas lidas (None = não cacheável)
+        self._writes_by_sql = {}        # sql -> tabelas escritas (None = desconhecido)
+        self._objects = None            # tabelas e views do schema -> tabelas base
+        self._volatile = set()          # views com now(), random() etc. (nunca guardadas)
+        self._triggers = None           # tabela -> tabelas escritas pelos triggers
+        
+        self.reset_stats()
+    
+    def _load_schema(self):
+        """Mapeia views para tabelas base e tabelas para as escritas dos seus triggers"""
+        rows = self._connection_getter().execute(
+            "SELECT type, name, tbl_name, sql FROM sqlite_master WHERE type IN ('table', 'view', 'trigger')"
+        ).fetchall()
+        
+        nomes = {row[1].lower() for row in rows if row[0] in ("table", "view")}
+        views = {row[1].lower(): row[3] or "" for row in rows if row[0] == "view"}
+        
+        def base_tables(nome, visitados):
+            if nome not in views:
+                return {nome}
+            tabelas = set()
+            for token in set(_IDENTIFIER_RE.findall(views[nome].lower())) & nomes:
+                if token != nome and token not in visitados:
+                    tabelas |= base_tables(token, visitados | {nome})
+            return tabelas
+        
+        self._objects = {nome: frozenset(base_tables(nome, frozenset())) for nome in nomes}
+        self._volatile = {nome for nome, sql in views.items() if _VOLATILE_RE.search(sql)}
+        
+        triggers = {}
+        for tipo, _, tabela, sql in rows:
+            if tipo == "trigger" and sql:
+                alvos = {alvo.lower() for alvo in _WRITE_RE.findall(sql.split("BEGIN", 1)[-1])}
+                triggers.setdefault(tabela.lower(), set()).update(alvos)
+        self._triggers = triggers
+    
+    def _tables_read(self, sql):
+        """Tabelas base lidas pela consulta, ou None se o resultado não pode ser guardado"""
+        if sql in self._tables_by_sql:
+            return self._tables_by_sql[sql]
+        
+        if self._objects is None:
+            self._load_schema()
+        
+        tabelas = None
+        if sql.lstrip()[:6].upper().startswith(("SELECT", "WITH")) and not _VOLATILE_RE.search(sql):
+            tokens = set(_IDENTIFIER_RE.findall(sql.lower()))
+            if not tokens & self._volatile:
+                tabelas = frozenset().union(*(self._objects[t] for t in tokens if t in self._objects)) or None
+        
+        self._tables_by_sql[sql] = tabelas
+        return tabelas
+    
+    def _tables_written(self, sql):
+        """Tabelas alteradas pelo comando, incluindo as escritas por triggers (None = desconhecido)"""
+        if sql in self._writes_by_sql:
+            return self._writes_by_sql[sql]
+        
+        if self._triggers is None:
+            self._load_schema()
+        
+        match = _WRITE_RE.match(sql.lstrip())
+        tabelas = None
+        if match:
+            tabelas = set()
+            pendentes = [match.group(1).lower()]
+            while pendentes:
+                tabela = pendentes.pop()
+                if tabela not in tabelas:
+                    tabelas.add(tabela)
+                    pendentes.extend(self._triggers.get(tabela, ()))
+            tabelas = frozenset(tabelas)
+        
+        self._writes_by_sql[sql] = tabelas
+        return tabelas
+    
+    def _current_versions(self, tabelas):
+        return (self._epoch,) + tuple(self._versions.get(t, 0) for t in tabelas)
+    
+    def get(self, sql, params):
+        """
+        Retorna o resultado guardado para a consulta
+        
+        Returns:
+            tuple: (True, linhas) se houver resultado válido, (False, chave) caso
+            contrário; a chave é passada a put() depois de executar a consulta
+        """
+        with self._lock:
+            tabelas = self._tables_read(sql)
+            if tabelas is None:
+                self.uncacheable += 1
+                return False, None
+            
+            if isinstance(params, dict):
+                params = sorted(params.items())
+            key = (sql, tuple(params) if params else ())
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_tables, versions, rows = entry
+                if versions == self._current_versions(entry_tables):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, list(rows)
+                
+                self._discard(key)
+                self.invalidations += 1
+            
+            self.misses += 1
+            return False, (key, tabelas, self._current_versions(tabelas))
+    
+    def put(self, token, rows):
+        """Guarda o resultado de uma consulta que não estava no cache"""
+        if token is None:
+            return
+        
+        key, tabelas, versions = token
+        if len(rows) > self.max_rows // 4:
+            return
+        
+        with self._lock:
+            # Uma escrita durante a consulta deixaria o resultado desatualizado
+            if versions != self._current_versions(tabelas):
+                return
+            
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (tabelas, versions, tuple(rows))
+            self._rows += len(rows)
+            
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def _discard(self, key):
+        _, _, rows = self._entries.pop(key)
+        self._rows -= len(rows)
+    
+    def table_changed(self, sql):
+        """Registra uma escrita: incrementa a versão das tabelas afetadas pelo comando"""
+        with self._lock:
+            tabelas = self._tables_written(sql)
+            if tabelas is None:
+                self.invalidate()
+                return
+            
+            for tabela in tabelas:
+                self._versions[tabela] = self._versions.get(tabela, 0) + 1
+    
+    def invalidate(self, schema=False):
+        """
+        Descarta todos os resultados guardados
+        
+        Args:
+            schema: Também relê o schema (após criar/alterar tabelas, views ou triggers)
+        """
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+            self._epoch += 1
+            if schema:
+                self._objects = self._triggers = None
+                self._tables_by_sql.clear()
+                self._writes_by_sql.clear()
+            debug("Cache de consultas invalidado")
+    
+    def reset_stats(self):
+        """Zera as estatísticas"""
+        self.hits = self.misses = self.evictions = self.invalidations = self.uncacheable = 0
+    
+    def stats(self):
+        """
+        Estatísticas para ajustar o tamanho do cache
+        
+        Returns:
+            dict: acertos, faltas, taxa de acerto, descartes por LRU e por
+            versão, consultas não cacheáveis, consultas e linhas guardadas
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "uncacheable": self.uncacheable,
+                "entries": len(self._entries),
+                "rows": self._rows,
+                "max_entries": self.max_entries,
+                "max_rows": self.max_rows,
+            }
+
+# Updated: 2026-10-19
@@ -0,0 +1,461 @@
+# -*- coding: utf-8 -*-
+"""
+Conciliação do Estoque com o Razão
+brindes.quantidade é alterada direto por add_stock/remove_stock, e a tela
+grava a movimentação correspondente em outra chamada. As duas coisas podem
+divergir: um commit que falhou no meio, um brinde cadastrado com quantidade
+inicial sem movimentação de entrada (create_multi_filial), importações, etc.
+
+O razão de cada brinde é a soma das movimentações (ENTRADA soma, SAIDA
+subtrai) e das transferências (saem da origem e entram no brinde da filial
+destino com a mesma categoria e descrição normalizada, a regra de
+BrindeDAO.transfer). conciliacao_saldos guarda esse saldo já somado, e
+conciliacao_estado o último id processado de cada fonte: cada execução lê
+só as linhas novas, pela chave primária, em lotes de RECONCILE_BATCH_SIZE
+por transação. Linhas já arquivadas (database/archive.py) entram na
+primeira passada pelos arquivos anuais.
+
+Alterações em brindes chegam pelo histórico (triggers de auditoria): um
+brinde criado, alterado ou excluído é marcado para verificação. Quando o
+processamento alcança o fim das três fontes, os brindes marcados (na
+primeira passada, todos) são comparados com brindes.quantidade;
+divergente_desde registra desde quando a diferença existe. A tela grava
+estoque e movimentação em commits separados, então divergences() só
+relata diferenças mais antigas que RECONCILE_GRACE_MINUTES.
+
+Excluir um brinde apaga em cascata as movimentações e transferências dele
+no banco principal; o saldo de brindes que não existem mais é descartado.
+As transferências apagadas assim antes de processadas ficam em
+conciliacao_transferencias_excluidas (trigger no schema) e são lidas com as
+demais: o destino recebe o crédito, identificado pelo registro do brinde de
+origem em brindes_excluidos. O destino é o brinde que existia na data da
+transferência; se ele também já foi excluído, o crédito é descartado.
+"""
+import json
+from config.settings import RECONCILE_BATCH_SIZE, RECONCILE_MAX_ROWS_PER_RUN, RECONCILE_GRACE_MINUTES
+from database.connection import db
+from database.archive import archive_manager
+from utils.fuzzy_match import normalize
+from utils.logger import info, debug
+
+
+# Fontes do razão, na ordem em que são processadas
+SOURCES = ("movimentacoes", "transferencias", "historico")
+
+# Colunas lidas de cada tabela do razão (id primeiro: ordem dos lotes)
+LEDGER_COLUMNS = {
+    "movimentacoes": "id, brinde_id, CASE WHEN tipo = 'ENTRADA' THEN quantidade ELSE -quantidade END",
+    "transferencias": "id, brinde_id, filial_destino_id, quantidade, data_transferencia",
+}
+
+
+class LedgerReconciler:
+    """Saldo incremental do razão por brinde e comparação com o estoque"""
+    
+    @staticmethod
+    def _checkpoints(conn):
+        """{fonte: último id processado}"""
+        return {row[0]: row[1] for row in conn.execute("SELECT fonte, ultimo_id FROM conciliacao_estado")}
+    
+    @staticmethod
+    def _sequences(conn):
+        """{fonte: maior id já atribuído} (sqlite_sequence: AUTOINCREMENT)"""
+        placeholders = ", ".join("?" for _ in SOURCES)
+        sequences = {fonte: 0 for fonte in SOURCES}
+        for name, seq in conn.execute(
+            f"SELECT name, seq FROM sqlite_sequence WHERE name IN ({placeholders})", SOURCES
+        ):
+            sequences[name] = seq
+        return sequences
+    
+    def _caught_up(self, conn):
+        """Indica se todas as fontes já foram processadas até o fim"""
+        checkpoints = self._checkpoints(conn)
+        sequences = self._sequences(conn)
+        return all(checkpoints.get(fonte, -1) >= sequences[fonte] for fonte in SOURCES)
+    
+    def pending(self):
+        """Indica se há linhas novas no razão ou brindes a verificar"""
+        conn = db.get_connection()
+        if not self._caught_up(conn):
+            return True
+        return conn.execute("SELECT EXISTS (SELECT 1 FROM conciliacao_saldos WHERE verificar)").fetchone()[0] == 1
+    
+    def run(self, max_rows=RECONCILE_MAX_ROWS_PER_RUN, batch_size=RECONCILE_BATCH_SIZE):
+        """
+        Processa as linhas novas do razão e, se alcançar o fim, compara os
+        brindes marcados com o estoque
+        
+        Args:
+            max_rows: Limite de linhas do razão processadas nesta chamada (o
+                restante fica para a próxima)
+            batch_size: Linhas por transação
+        
+        Returns:
+            dict: linhas processadas, brindes verificados e divergências abertas
+        """
+        conn = db.get_connection()
+        conn.commit()
+        
+        if not self._checkpoints(conn):
+            self._initialize(conn)
+        
+        processadas = 0
+        while processadas < max_rows:
+            linhas = self._process_batch(conn, min(batch_size, max_rows - processadas))
+            if not linhas:
+                break
+            processadas += linhas
+        
+        verificados = 0
+        while processadas + verificados < max_rows:
+            lote = self._verify_batch(conn, batch_size)
+            if not lote:
+                break
+            verificados += lote
+        
+        divergentes = conn.execute(
+            "SELECT COUNT(*) FROM conciliacao_saldos WHERE divergente_desde IS NOT NULL"
+        ).fetchone()[0]
+        if processadas or verificados:
+            info(f"Conciliação: {processadas} linhas do razão, {verificados} brindes verificados, {divergentes} divergentes")
+        return {"linhas": processadas, "verificados": verificados, "divergentes": divergentes}
+    
+    def _initialize(self, conn):
+        """
+        Primeira execução: razão desde o início, todos os brindes a verificar;
+        o histórico anterior não é necessário
+        """
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            historico = self._sequences(conn)["historico"]
+            conn.executemany(
+                "INSERT OR IGNORE INTO conciliacao_estado (fonte, ultimo_id) VALUES (?, ?)",
+                [("movimentacoes", 0), ("transferencias", 0), ("historico", historico)]
+            )
+            conn.execute("INSERT OR IGNORE INTO conciliacao_saldos (brinde_id) SELECT id FROM brindes")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        debug("Conciliação iniciada: razão completo a processar")
+    
+    def _process_batch(self, conn, limit):
+        """
+        Soma ao saldo um lote de linhas novas das fontes e avança os
+        checkpoints na mesma transação
+        
+        Returns:
+            int: Linhas lidas (0 = todas as fontes processadas)
+        """
+        # ATTACH dos arquivos anuais fora da transação. Com mais anos
+        # arquivados que ARCHIVE_MAX_ATTACHED, as rodadas além da primeira
+        # (ver ArchiveManager.rounds) são lidas antes e juntadas às linhas
+        # da primeira, lidas na transação
+        inicio = self._checkpoints(conn)
+        antigas = {
+            fonte: self._read_older(conn, fonte, colunas, inicio[fonte], limit)
+            for fonte, colunas in LEDGER_COLUMNS.items()
+        }
+        tabelas = {
+            fonte: [tabela for tabela, _, _ in next(archive_manager.rounds(fonte))]
+            for fonte in LEDGER_COLUMNS
+        }
+        tabelas["transferencias"].append("conciliacao_transferencias_excluidas")
+        
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            checkpoints = self._checkpoints(conn)
+            if any(checkpoints[fonte] != inicio[fonte] for fonte in LEDGER_COLUMNS):
+                # Outra instância processou um lote no meio: lê de novo
+                conn.rollback()
+                return self._process_batch(conn, limit)
+            sequences = self._sequences(conn)
+            novos = {}
+            saldo = {}
+            marcados = set()
+            excluidos = []
+            lidas = 0
+            
+            movimentacoes = self._read(
+                conn, tabelas["movimentacoes"], LEDGER_COLUMNS["movimentacoes"],
+                checkpoints["movimentacoes"], limit, antigas["movimentacoes"]
+            )
+            for _, brinde_id, delta in movimentacoes:
+                saldo[brinde_id] = saldo.get(brinde_id, 0) + delta
+            novos["movimentacoes"] = self._advance(movimentacoes, limit, checkpoints, sequences, "movimentacoes")
+            lidas += len(movimentacoes)
+            
+            restante = limit - lidas
+            transferencias = self._read(
+                conn, tabelas["transferencias"], LEDGER_COLUMNS["transferencias"],
+                checkpoints["transferencias"], restante, antigas["transferencias"]
+            ) if restante > 0 else []
+            destinos = self._transfer_targets(conn, transferencias)
+            for transferencia_id, origem, _, quantidade, _ in transferencias:
+                saldo[origem] = saldo.get(origem, 0) - quantidade
+                destino = destinos.get(transferencia_id)
+                if destino is not None:
+                    saldo[destino] = saldo.get(destino, 0) + quantidade
+            sem_destino = len(transferencias) - len(destinos)
+            if sem_destino:
+                debug(f"Conciliação: {sem_destino} transferências sem brinde de destino identificado")
+            if restante > 0:
+                novos["transferencias"] = self._advance(transferencias, restante, checkpoints, sequences, "transferencias")
+            lidas += len(transferencias)
+            
+            restante = limit - lidas
+            historico = conn.execute(
+                "SELECT id, tabela, registro_id, acao FROM historico WHERE id > ? ORDER BY id LIMIT ?",
+                (checkpoints["historico"], restante)
+            ).fetchall() if restante > 0 else []
+            for _, tabela, registro_id, acao in historico:
+                if tabela != "brindes":
+                    continue
+                if acao == "DELETE":
+                    excluidos.append(registro_id)
+                else:
+                    marcados.add(registro_id)
+            if restante > 0:
+                novos["historico"] = self._advance(historico, restante, checkpoints, sequences, "historico")
+            lidas += len(historico)
+            
+            conn.executemany(
+                """
+                INSERT INTO conciliacao_saldos (brinde_id, saldo_razao) VALUES (?, ?)
+                ON CONFLICT(brinde_id) DO UPDATE SET
+                    saldo_razao = saldo_razao + excluded.saldo_razao,
+                    verificar = 1
+                """,
+                [(brinde_id, delta) for brinde_id, delta in saldo.items()]
+                + [(brinde_id, 0) for brinde_id in marcados - saldo.keys()]
+            )
+            if excluidos:
+                conn.execute(
+                    "DELETE FROM conciliacao_saldos WHERE brinde_id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(excluidos),)
+                )
+            conn.executemany(
+                "UPDATE conciliacao_estado SET ultimo_id = ?, atualizado_em = CURRENT_TIMESTAMP WHERE fonte = ?",
+                [(ultimo_id, fonte) for fonte, ultimo_id in novos.items() if ultimo_id != checkpoints[fonte]]
+            )
+            if novos.get("transferencias", 0) > checkpoints["transferencias"]:
+                conn.execute(
+                    "DELETE FROM conciliacao_transferencias_excluidas WHERE id <= ?",
+                    (novos["transferencias"],)
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        return lidas
+    
+    @staticmethod
+    def _read(conn, tabelas, colunas, ultimo_id, limit, antigas=()):
+        """
+        Próximas linhas (id > checkpoint) da tabela principal e dos arquivos
+        anuais, em ordem de id, junto com as já lidas das rodadas antigas
+        """
+        query = " UNION ALL ".join(f"SELECT {colunas} FROM {tabela} WHERE id > ?" for tabela in tabelas)
+        rows = conn.execute(
+            f"{query} ORDER BY 1 LIMIT ?", [ultimo_id] * len(tabelas) + [limit]
+        ).fetchall()
+        if antigas:
+            rows = sorted(rows + antigas, key=lambda row: row[0])[:limit]
+        return rows
+    
+    @staticmethod
+    def _read_older(conn, fonte, colunas, ultimo_id, limit):
+        """Próximas linhas dos arquivos anuais das rodadas além da primeira (fora da transação)"""
+        rows = []
+        for rodada, fontes in enumerate(archive_manager.rounds(fonte)):
+            if rodada:
+                # A tabela do banco principal é lida inteira na primeira rodada
+                rows += LedgerReconciler._read(conn, [tabela for tabela, _, _ in fontes[1:]], colunas, ultimo_id, limit)
+        return rows
+    
+    @staticmethod
+    def _advance(rows, limit, checkpoints, sequences, fonte):
+        """
+        Novo checkpoint da fonte: o último id lido ou, se o lote não encheu,
+        o fim da sequência (ids abaixo dele que faltam foram excluídos)
+        """
+        if len(rows) < limit:
+            return max(checkpoints[fonte], sequences[fonte])
+        return rows[-1][0]
+    
+    @staticmethod
+    def _transfer_targets(conn, transferencias):
+        """
+        {id da transferência: brinde que recebeu}, pela regra de
+        BrindeDAO.transfer: mesma categoria e descrição normalizada na filial
+        destino, preferindo a descrição idêntica
+        
+        Só concorrem os brindes que existiam na data da transferência,
+        inclusive os excluídos depois (brindes_excluidos): se quem recebeu já
+        foi excluído, o crédito não vai para outro brinde criado depois com a
+        mesma descrição.
+        """
+        if not transferencias:
+            return {}
+        
+        origens = json.dumps(sorted({row[1] for row in transferencias}))
+        dados = {
+            row[0]: (row[1], row[2]) for row in conn.execute(
+                """
+                SELECT e.brinde_id_original, e.descricao, c.id
+                FROM brindes_excluidos e
+                LEFT JOIN categorias c ON c.nome = e.categoria_nome
+                WHERE e.brinde_id_original IN (SELECT value FROM json_each(?))
+                """,
+                (origens,)
+            )
+        }
+        dados.update(
+            (row[0], (row[1], row[2])) for row in conn.execute(
+                "SELECT id, descricao, categoria_id FROM brindes WHERE id IN (SELECT value FROM json_each(?))",
+                (origens,)
+            )
+        )
+        
+        candidatos = {}
+        destinos = {}
+        for transferencia_id, origem, filial_destino, _, data in transferencias:
+            if origem not in dados:
+                continue
+            descricao, categoria_id = dados[origem]
+            chave = (categoria_id, filial_destino)
+            if chave not in candidatos:
+                candidatos[chave] = conn.execute(
+                    """
+                    SELECT id, descricao, created_at, NULL FROM brindes
+                    WHERE categoria_id = ? AND filial_id = ?
+                    UNION ALL
+                    SELECT e.brinde_id_original, e.descricao, e.data_criacao, e.data_exclusao
+                    FROM brindes_excluidos e
+                    INNER JOIN categorias c ON c.nome = e.categoria_nome
+                    INNER JOIN filiais f ON f.nome = e.filial_nome
+                    WHERE c.id = ? AND f.id = ?
+                    ORDER BY 1
+                    """,
+                    chave + chave
+                ).fetchall()
+            normalizada = normalize(descricao)
+            rows = sorted(
+                (
+                    row for row in candidatos[chave]
+                    if normalize(row[1]) == normalizada
+                    and (data is None or row[2] is None or str(row[2]) <= str(data))
+                    and (data is None or row[3] is None or str(row[3]) >= str(data))
+                ),
+                key=lambda row: row[1] != descricao
+            )
+            if rows and rows[0][3] is None:
+                destinos[transferencia_id] = rows[0][0]
+        return destinos
+    
+    def _verify_batch(self, conn, limit):
+        """
+        Compara um lote de brindes marcados com brindes.quantidade (só com
+        todas as fontes processadas, senão a diferença seria só atraso)
+        
+        Returns:
+            int: Brindes verificados
+        """
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if not self._caught_up(conn):
+                conn.rollback()
+                return 0
+            
+            ids = json.dumps([
+                row[0] for row in conn.execute(
+                    "SELECT brinde_id FROM conciliacao_saldos WHERE verificar LIMIT ?", (limit,)
+                )
+            ])
+            conn.execute(
+                """
+                DELETE FROM conciliacao_saldos
+                WHERE brinde_id IN (SELECT value FROM json_each(?))
+                  AND brinde_id NOT IN (SELECT id FROM brindes)
+                """,
+                (ids,)
+            )
+            verificados = conn.execute(
+                """
+                UPDATE conciliacao_saldos SET
+                    verificar = 0,
+                    divergente_desde = CASE
+                        WHEN saldo_razao = (SELECT quantidade FROM brindes WHERE id = brinde_id) THEN NULL
+                        ELSE COALESCE(divergente_desde, CURRENT_TIMESTAMP)
+                    END
+                WHERE brinde_id IN (SELECT value FROM json_each(?))
+                """,
+                (ids,)
+            ).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        return verificados
+    
+    def status(self):
+        """
+        Situação da conciliação
+        
+        Returns:
+            dict: linhas ainda não processadas por fonte, brindes a verificar
+            e divergências abertas
+        """
+        conn = db.get_connection()
+        checkpoints = self._checkpoints(conn)
+        sequences = self._sequences(conn)
+        a_verificar, divergentes = conn.execute(
+            """
+            SELECT
+                (SELECT COUNT(*) FROM conciliacao_saldos WHERE verificar),
+                (SELECT COUNT(*) FROM conciliacao_saldos WHERE divergente_desde IS NOT NULL)
+            """
+        ).fetchone()
+        return {
+            "atraso": {fonte: max(sequences[fonte] - checkpoints.get(fonte, 0), 0) for fonte in SOURCES},
+            "a_verificar": a_verificar,
+            "divergentes": divergentes,
+        }
+    
+    @staticmethod
+    def divergences(filial_id=None, grace_minutes=RECONCILE_GRACE_MINUTES):
+        """
+        Brindes cuja quantidade difere do saldo do razão há mais de
+        grace_minutes
+        
+        Returns:
+            list: brinde, filial, quantidade, saldo_razao, diferenca e
+            divergente_desde, por filial e descrição
+        """
+        query = """
+            SELECT s.brinde_id, b.descricao, c.nome as categoria, b.filial_id, f.nome as filial,
+                   b.quantidade, s.saldo_razao, b.quantidade - s.saldo_razao as diferenca,
+                   s.divergente_desde
+            FROM conciliacao_saldos s
+            JOIN brindes b ON b.id = s.brinde_id
+            LEFT JOIN categorias c ON b.categoria_id = c.id
+            LEFT JOIN filiais f ON b.filial_id = f.id
+            WHERE s.divergente_desde <= datetime('now', ?)
+        """
+        params = [f"-{int(grace_minutes)} minutes"]
+        
+        if filial_id:
+            query += " AND b.filial_id = ?"
+            params.append(filial_id)
+        
+        query += " ORDER BY f.nome, b.descricao"
+        return db.execute_query(query, tuple(params))
+
+
+# Instância global
+ledger_reconciler = LedgerReconciler()
+
+# Updated: 2026-10-19
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Registros Compactos para Linhas do Banco de Dados
+Substitui dict(row) por tuplas com acesso por chave e por atributo
+"""
+import keyword
+from operator import itemgetter
+
+
+class Record(tuple):
+    """
+    Linha de resultado baseada em tupla
+    
+    Cada consulta gera (uma única vez) uma subclasse com os nomes das colunas,
+    então cada linha ocupa apenas o espaço da tupla com os valores.
+    Compatível com o uso anterior de dicionários: row['campo'], row.get('campo'),
+    'campo' in row, keys(), items() e dict(row).
+    """
+    
+    __slots__ = ()
+    
+    _fields = ()
+    _index = {}
+    
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return tuple.__getitem__(self, self._index[key])
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+    
+    def __contains__(self, key):
+        return key in self._index
+    
+    def get(self, key, default=None):
+        """Retorna o valor da coluna ou default se ela não existir"""
+        index = self._index.get(key)
+        if index is None:
+            return default
+        return tuple.__getitem__(self, index)
+    
+    def keys(self):
+        """Nomes das colunas"""
+        return list(self._index)
+    
+    def values(self):
+        """Valores das colunas"""
+        return [tuple.__getitem__(self, i) for i in self._index.values()]
+    
+    def items(self):
+        """Pares (coluna, valor)"""
+        return [(key, tuple.__getitem__(self, i)) for key, i in self._index.items()]
+    
+    def _asdict(self):
+        """Converte para dicionário (quando for necessário alterar a linha)"""
+        return dict(self.items())
+    
+    def __repr__(self):
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.items())
+        return f"Record({fields})"
+
+
+# Nomes que não podem virar atributo sem esconder métodos da classe
+_RESERVED = set(dir(Record))
+
+# Classes já criadas, por tupla de nomes de colunas
+_record_classes = {}
+
+
+def record_class(fields):
+    """Retorna (criando se necessário) a classe de registro para as colunas"""
+    fields = tuple(fields)
+    cls = _record_classes.get(fields)
+    if cls is not None:
+        return cls
+    
+    # Colunas repetidas mantêm o último valor, como dict(row) fazia
+    index = {name: i for i, name in enumerate(fields)}
+    
+    namespace = {"__slots__": (), "_fields": fields, "_index": index}
+    for name, i in index.items():
+        if name.isidentifier() and not keyword.iskeyword(name) and name not in _RESERVED:
+            namespace[name] = property(itemgetter(i))
+    
+    cls = type("Record", (Record,), namespace)
+    _record_classes[fields] = cls
+    return cls
+
+
+def record_factory(cursor, row):
+    """row_factory do sqlite3 que cria registros compactos"""
+    global _last_class
+    description = cursor.description
+    
+    # Todas as linhas de uma consulta compartilham o mesmo description
+    last_description, cls = _last_class
+    if last_description is not description:
+        cls = record_class(column[0] for column in description)
+        _last_class = (description, cls)
+    return cls(row)
+
+
+# Último (description, classe) usado, evita recalcular a chave a cada linha
+_last_class = (None, None)
+
+# Updated: 2026-10-19
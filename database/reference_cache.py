@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de Dados de Referência
+Categorias, unidades, fornecedores e filiais mudam raramente e são lidos a
+cada formulário ou filtro aberto. Ficam em memória, com índices por id e por
+nome, até o evento *_CHANGED correspondente (ou DATA_RESET).
+"""
+from database.dao import CategoriaDAO, UnidadeDAO, FornecedorDAO, FilialDAO
+from utils.event_manager import event_manager, EVENTS
+from utils.logger import debug
+
+
+# tabela -> (carga de todos os registros, campos indexados por nome, evento que invalida)
+REFERENCE_TABLES = {
+    "categorias": (CategoriaDAO.get_all, ("nome",), "CATEGORIA_CHANGED"),
+    "unidades": (UnidadeDAO.get_all, ("codigo", "nome"), "UNIDADE_CHANGED"),
+    "fornecedores": (FornecedorDAO.get_all, ("nome", "cnpj"), "FORNECEDOR_CHANGED"),
+    "filiais": (FilialDAO.get_all, ("numero", "nome"), "FILIAL_CHANGED"),
+}
+
+
+class _Snapshot:
+    """Registros de uma tabela carregados de uma vez, com os índices"""
+    
+    __slots__ = ("todos", "ativos", "por_id", "por_campo")
+    
+    def __init__(self, rows, campos):
+        self.todos = list(rows)
+        self.ativos = [row for row in self.todos if row["ativo"]]
+        self.por_id = {row["id"]: row for row in self.todos}
+        
+        # Nomes comparados sem diferenciar maiúsculas e espaços nas pontas; a
+        # chave guarda todos os registros que caem nela (ver get_all_by_name)
+        self.por_campo = {campo: {} for campo in campos}
+        for row in self.todos:
+            for campo, indice in self.por_campo.items():
+                valor = row[campo]
+                if valor is not None:
+                    indice.setdefault(str(valor).strip().lower(), []).append(row)
+
+
+class ReferenceCache:
+    """Cache em memória das tabelas de referência, invalidado por eventos"""
+    
+    def __init__(self):
+        self._snapshots = {}
+        
+        for tabela, (_, _, evento) in REFERENCE_TABLES.items():
+            event_manager.subscribe(
+                EVENTS[evento], lambda data, tabela=tabela: self.invalidate(tabela), first=True
+            )
+        event_manager.subscribe(EVENTS['DATA_RESET'], lambda data: self.invalidate(), first=True)
+    
+    def _snapshot(self, tabela):
+        snapshot = self._snapshots.get(tabela)
+        if snapshot is None:
+            carregar, campos, _ = REFERENCE_TABLES[tabela]
+            snapshot = self._snapshots[tabela] = _Snapshot(carregar(ativo_apenas=False), campos)
+            debug(f"Cache de referência carregado: {tabela} ({len(snapshot.todos)} registros)")
+        return snapshot
+    
+    def get_all(self, tabela, ativo_apenas=True):
+        """
+        Retorna os registros da tabela, na mesma ordem do DAO
+        
+        Args:
+            tabela: categorias, unidades, fornecedores ou filiais
+            ativo_apenas: Apenas registros ativos
+        
+        Returns:
+            list: Cópia da lista (pode ser filtrada/ordenada por quem chama)
+        """
+        snapshot = self._snapshot(tabela)
+        return list(snapshot.ativos if ativo_apenas else snapshot.todos)
+    
+    def get_by_id(self, tabela, registro_id):
+        """Retorna o registro pelo id (ativo ou não), ou None"""
+        return self._snapshot(tabela).por_id.get(registro_id)
+    
+    def get_by_name(self, tabela, nome, campo=None):
+        """
+        Retorna o registro pelo nome, sem diferenciar maiúsculas, ou None
+        
+        Se mais de um registro cai no mesmo nome (ex. "Caixa" e "CAIXA"),
+        prefere o de nome idêntico ao procurado.
+        
+        Args:
+            tabela: categorias, unidades, fornecedores ou filiais
+            nome: Valor procurado
+            campo: Campo indexado (padrão: o primeiro da tabela, ex. codigo em unidades)
+        """
+        campo = campo or REFERENCE_TABLES[tabela][1][0]
+        registros = self.get_all_by_name(tabela, nome, campo)
+        for row in registros:
+            if str(row[campo]) == str(nome):
+                return row
+        return registros[0] if registros else None
+    
+    def get_all_by_name(self, tabela, nome, campo=None):
+        """
+        Retorna todos os registros com o nome, sem diferenciar maiúsculas
+        (validações de duplicidade comparam cada um com o critério do cadastro)
+        """
+        snapshot = self._snapshot(tabela)
+        campo = campo or REFERENCE_TABLES[tabela][1][0]
+        return list(snapshot.por_campo[campo].get(str(nome or "").strip().lower(), ()))
+    
+    def invalidate(self, tabela=None):
+        """Descarta o cache de uma tabela (ou de todas)"""
+        if tabela is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(tabela, None)
+        debug(f"Cache de referência invalidado: {tabela or 'todas'}")
+
+
+# Instância global
+reference_cache = ReferenceCache()
+
+# Updated: 2026-10-19
@@ -0,0 +1,674 @@
+# -*- coding: utf-8 -*-
+"""
+Réplica Local da Filial
+No modo réplica o aplicativo lê e grava num SQLite local (data/replica.db)
+com os dados da filial do usuário, então abre mesmo sem acesso ao banco
+principal e as leituras não passam pela rede.
+
+As escritas na réplica são capturadas por triggers (replica_schema.sql) na
+fila replica_outbox. Uma thread de sincronização, quando o banco principal
+está acessível:
+  1. reenvia a fila em lotes, cada operação com detecção de conflito (ex.
+     saída maior que o estoque atual no banco principal); cada operação é
+     aplicada uma única vez (tabela replica_recebidos no banco principal)
+  2. recebe apenas o que mudou: as alterações do log do banco principal
+     (database/change_log.py) após o último seq recebido, filtradas para os
+     cadastros e os dados da filial
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from config import settings
+from database.records import record_factory
+from database.change_log import ChangeLog, ChangeLogGap
+from utils.fuzzy_match import normalize
+from utils.logger import info, warning, error, debug
+
+
+# Ids de registros criados na réplica começam aqui (não colidem com os recebidos)
+LOCAL_ID_OFFSET = 10 ** 12
+
+# Tabelas com registros criados localmente
+LOCAL_TABLES = ("brindes", "movimentacoes", "transferencias", "brindes_excluidos")
+
+# Origem do log de alterações aplicado na réplica (log_origens)
+MASTER_ORIGIN = "principal"
+
+# Cadastros recebidos por completo (só mudam no banco principal)
+REFERENCE_TABLES = ("filiais", "usuarios", "categorias", "unidades_medida", "fornecedores")
+
+BRINDE_CATALOG_FIELDS = (
+    "descricao", "valor_unitario", "categoria_id", "unidade_id",
+    "fornecedor_id", "codigo_interno", "observacoes", "estoque_minimo",
+)
+
+
+def resolve_path(path):
+    """Caminho absoluto (caminhos relativos partem da raiz do projeto)"""
+    if os.path.isabs(path):
+        return path
+    return os.path.join(Path(__file__).parent.parent, path)
+
+
+class ReplicaConflict(Exception):
+    """Operação da fila que não pode ser aplicada no banco principal"""
+
+
+class ReplicaUnavailable(Exception):
+    """Banco principal inacessível"""
+
+
+class ReplicaSync:
+    """Sincronização entre a réplica local e o banco principal"""
+    
+    def __init__(self):
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self.filial_id = None
+        self.online = None
+        self.last_error = None
+        self.last_result = None
+    
+    @property
+    def replica_path(self):
+        return resolve_path(settings.REPLICA_PATH)
+    
+    @property
+    def master_path(self):
+        return resolve_path(settings.DB_PATH)
+    
+    # ------------------------------------------------------------------
+    # Preparação da réplica (chamado por DatabaseConnection)
+    # ------------------------------------------------------------------
+    
+    def prepare(self, conn):
+        """Cria as tabelas e triggers da réplica e reserva a faixa de ids locais"""
+        from database.connection import DatabaseConnection
+        
+        schema_path = Path(__file__).parent / "replica_schema.sql"
+        with open(schema_path, "r", encoding="utf-8") as f:
+            for command in DatabaseConnection._split_statements(f.read()):
+                conn.execute(command)
+        
+        conn.execute(
+            "UPDATE replica_estado SET replica_uid = ? WHERE id = 1 AND replica_uid IS NULL",
+            (str(uuid.uuid4()),)
+        )
+        for tabela in LOCAL_TABLES:
+            updated = conn.execute(
+                "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (LOCAL_ID_OFFSET, tabela)
+            ).rowcount
+            if not updated:
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (tabela, LOCAL_ID_OFFSET))
+        conn.commit()
+    
+    def bootstrap(self):
+        """
+        Garante os cadastros na réplica antes do login
+        
+        Na primeira abertura a réplica está vazia e o banco principal precisa
+        estar acessível; depois disso o aplicativo abre mesmo sem ele.
+        """
+        replica = self._connect_replica()
+        try:
+            if replica.execute("SELECT EXISTS (SELECT 1 FROM filiais)").fetchone()[0]:
+                return
+            
+            info("Réplica vazia: recebendo cadastros do banco principal...")
+            try:
+                master = self._connect_master()
+            except ReplicaUnavailable as e:
+                raise ReplicaUnavailable(
+                    f"Réplica local vazia e banco principal inacessível ({self.master_path}): {e}"
+                ) from None
+            try:
+                self._pull(master, replica, filial_id=None)
+            finally:
+                master.close()
+        finally:
+            replica.close()
+    
+    # ------------------------------------------------------------------
+    # Conexões
+    # ------------------------------------------------------------------
+    
+    def _connect_replica(self):
+        conn = sqlite3.connect(self.replica_path, timeout=30, isolation_level=None)
+        conn.row_factory = record_factory
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+    
+    def _connect_master(self):
+        """Abre o banco principal (falha se o caminho não estiver acessível)"""
+        path = self.master_path
+        if not os.path.exists(path):
+            raise ReplicaUnavailable(f"Banco principal não encontrado: {path}")
+        try:
+            conn = sqlite3.connect(f"{Path(path).as_uri()}?mode=rw", uri=True, timeout=10, isolation_level=None)
+            conn.row_factory = record_factory
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("SELECT 1 FROM log_alteracoes LIMIT 1")
+        except sqlite3.Error as e:
+            raise ReplicaUnavailable(str(e)) from None
+        return conn
+    
+    # ------------------------------------------------------------------
+    # Ciclo de sincronização
+    # ------------------------------------------------------------------
+    
+    def start(self, filial_id):
+        """
+        Inicia a sincronização periódica em segundo plano
+        
+        Args:
+            filial_id: Filial cujos dados ficam na réplica (a do usuário logado)
+        """
+        self._set_filial(filial_id)
+        if self._thread and self._thread.is_alive():
+            self.sync_soon()
+            return
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-sync", daemon=True)
+        self._thread.start()
+        info(f"Sincronização da réplica iniciada (filial {filial_id})")
+    
+    def _set_filial(self, filial_id):
+        """Define a filial da réplica (a captura de brindes depende dela mesmo antes da primeira sincronização)"""
+        self.filial_id = filial_id
+        replica = self._connect_replica()
+        try:
+            anterior = replica.execute("SELECT filial_id FROM replica_estado WHERE id = 1").fetchone()[0]
+            if anterior == filial_id:
+                return
+            
+            # Outra filial: os dados da anterior são descartados na próxima sincronização
+            replica.execute("BEGIN IMMEDIATE")
+            replica.execute("UPDATE replica_estado SET filial_id = ? WHERE id = 1", (filial_id,))
+            ChangeLog.reset(replica, MASTER_ORIGIN)
+            replica.execute("COMMIT")
+        finally:
+            replica.close()
+    
+    def stop(self):
+        """Interrompe a sincronização periódica"""
+        self._stop.set()
+        self._wake.set()
+    
+    def sync_soon(self):
+        """Antecipa a próxima sincronização (ex. após uma movimentação)"""
+        self._wake.set()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                error(f"Erro na sincronização da réplica: {e}")
+            self._wake.wait(settings.REPLICA_SYNC_INTERVAL)
+            self._wake.clear()
+    
+    def sync(self):
+        """
+        Envia a fila e recebe as alterações do banco principal
+        
+        Returns:
+            dict: enviados, conflitos, recebidos e online
+        """
+        with self._lock:
+            result = {"enviados": 0, "conflitos": 0, "recebidos": 0, "online": False}
+            try:
+                master = self._connect_master()
+            except ReplicaUnavailable as e:
+                if self.online is not False:
+                    warning(f"Banco principal inacessível, trabalhando na réplica local: {e}")
+                self.online = False
+                self.last_error = str(e)
+                self.last_result = result
+                return result
+            
+            if self.online is False:
+                info("Banco principal acessível novamente, sincronizando a réplica")
+            self.online = True
+            self.last_error = None
+            result["online"] = True
+            
+            replica = self._connect_replica()
+            try:
+                enviados, conflitos, brindes = self._push(master, replica)
+                result["enviados"] = enviados
+                result["conflitos"] = conflitos
+                result["recebidos"] = self._pull(master, replica, self.filial_id, brindes)
+            except sqlite3.Error as e:
+                # Rede caiu no meio: o que não foi confirmado é refeito na próxima vez
+                self.online = False
+                self.last_error = str(e)
+                warning(f"Sincronização da réplica interrompida: {e}")
+            finally:
+                master.close()
+                replica.close()
+            
+            if result["enviados"] or result["recebidos"]:
+                debug(f"Réplica sincronizada: {result}")
+            self.last_result = result
+            return result
+    
+    # ------------------------------------------------------------------
+    # Envio da fila
+    # ------------------------------------------------------------------
+    
+    def _push(self, master, replica):
+        """
+        Aplica a fila no banco principal, em lotes
+        
+        Returns:
+            tuple: (aplicadas, conflitos, ids no banco principal dos brindes afetados)
+        """
+        replica_uid = replica.execute("SELECT replica_uid FROM replica_estado WHERE id = 1").fetchone()[0]
+        ids = {
+            (row["tabela"], row["local_id"]): row["master_id"]
+            for row in replica.execute("SELECT tabela, local_id, master_id FROM replica_ids")
+        }
+        aplicadas = conflitos = 0
+        brindes = set()
+        
+        while True:
+            entries = replica.execute(
+                "SELECT * FROM replica_outbox WHERE status = 'PENDENTE' ORDER BY id LIMIT ?",
+                (settings.REPLICA_BATCH_SIZE,)
+            ).fetchall()
+            if not entries:
+                break
+            
+            status = []
+            novos_ids = []
+            master.execute("BEGIN IMMEDIATE")
+            try:
+                for entry in entries:
+                    recebido = master.execute(
+                        "SELECT registro_id FROM replica_recebidos WHERE replica_uid = ? AND outbox_id = ?",
+                        (replica_uid, entry["id"])
+                    ).fetchone()
+                    if recebido is not None:
+                        # Já recebida numa sincronização interrompida antes de registrar o envio
+                        # (sem registro no banco principal = foi recusada por conflito)
+                        master_id = recebido[0]
+                        mensagem = None if master_id is not None else "conflito registrado em sincronização anterior"
+                        brinde_id = None
+                    else:
+                        master.execute("SAVEPOINT operacao")
+                        try:
+                            master_id, brinde_id = self._apply(master, entry, ids)
+                            mensagem = None
+                            brindes.add(brinde_id)
+                        except ReplicaConflict as e:
+                            master.execute("ROLLBACK TO operacao")
+                            master_id, mensagem = None, str(e)
+                            brinde_id = ids.get(("brindes", json.loads(entry["dados"]).get("brinde_id")))
+                        master.execute("RELEASE operacao")
+                        master.execute(
+                            "INSERT INTO replica_recebidos (replica_uid, outbox_id, registro_id) VALUES (?, ?, ?)",
+                            (replica_uid, entry["id"], master_id)
+                        )
+                    
+                    if mensagem is None:
+                        aplicadas += 1
+                        status.append(("APLICADO", None, entry["id"]))
+                        if entry["operacao"] == "INSERT" and master_id is not None:
+                            ids[(entry["tabela"], entry["registro_id"])] = master_id
+                            novos_ids.append((entry["tabela"], entry["registro_id"], master_id))
+                    else:
+                        conflitos += 1
+                        status.append(("CONFLITO", mensagem, entry["id"]))
+                        warning(f"Conflito na réplica ({entry['tabela']} {entry['operacao']} #{entry['registro_id']}): {mensagem}")
+                        if entry["tabela"] == "brindes":
+                            brindes.add(ids.get(("brindes", entry["registro_id"]), entry["registro_id"]))
+                master.execute("COMMIT")
+            except Exception:
+                master.execute("ROLLBACK")
+                raise
+            
+            replica.execute("BEGIN IMMEDIATE")
+            replica.executemany(
+                "UPDATE replica_outbox SET status = ?, mensagem = ?, aplicado_em = CURRENT_TIMESTAMP WHERE id = ?",
+                status
+            )
+            replica.executemany(
+                "INSERT OR REPLACE INTO replica_ids (tabela, local_id, master_id) VALUES (?, ?, ?)", novos_ids
+            )
+            replica.execute("COMMIT")
+        
+        brindes.discard(None)
+        return aplicadas, conflitos, {b for b in brindes if b < LOCAL_ID_OFFSET}
+    
+    @staticmethod
+    def _master_id(ids, tabela, local_id):
+        """Id no banco principal de um registro (criado localmente ou recebido)"""
+        if local_id is None or local_id < LOCAL_ID_OFFSET:
+            return local_id
+        master_id = ids.get((tabela, local_id))
+        if master_id is None:
+            raise ReplicaConflict(f"registro local {tabela} #{local_id} não foi enviado")
+        return master_id
+    
+    def _apply(self, master, entry, ids):
+        """
+        Aplica uma operação da fila no banco principal
+        
+        Returns:
+            tuple: (id do registro no banco principal, id do brinde afetado)
+        """
+        dados = json.loads(entry["dados"])
+        tabela, operacao = entry["tabela"], entry["operacao"]
+        
+        if tabela == "movimentacoes":
+            return self._apply_movimentacao(master, dados, ids)
+        if tabela == "transferencias":
+            return self._apply_transferencia(master, dados, ids)
+        if tabela == "brindes_excluidos":
+            dados["brinde_id_original"] = ids.get(("brindes", dados["brinde_id_original"]), dados["brinde_id_original"])
+            return self._insert(master, "brindes_excluidos", dados), None
+        
+        # brindes
+        if operacao == "INSERT":
+            brinde_id = self._insert(master, "brindes", dados)
+            return brinde_id, brinde_id
+        
+        brinde_id = self._master_id(ids, "brindes", entry["registro_id"])
+        atual = master.execute(
+            f"SELECT {', '.join(BRINDE_CATALOG_FIELDS)} FROM brindes WHERE id = ?", (brinde_id,)
+        ).fetchone()
+        
+        if operacao == "DELETE":
+            if atual is not None:
+                master.execute("DELETE FROM brindes WHERE id = ?", (brinde_id,))
+            return brinde_id, None
+        
+        if atual is None:
+            raise ReplicaConflict("brinde excluído no banco principal")
+        
+        novo, anterior = dados["novo"], dados["anterior"]
+        alterados = [campo for campo in BRINDE_CATALOG_FIELDS if novo[campo] != anterior[campo]]
+        
+        # Conflito: o mesmo campo foi alterado para outro valor no banco principal
+        divergentes = [
+            campo for campo in alterados
+            if atual[campo] != anterior[campo] and atual[campo] != novo[campo]
+        ]
+        if divergentes:
+            raise ReplicaConflict(f"alterado também no banco principal: {', '.join(divergentes)}")
+        
+        if alterados:
+            master.execute(
+                f"UPDATE brindes SET {', '.join(f'{campo} = ?' for campo in alterados)}, "
+                f"updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                [novo[campo] for campo in alterados] + [brinde_id]
+            )
+        return brinde_id, brinde_id
+    
+    @staticmethod
+    def _insert(master, tabela, dados):
+        campos = list(dados)
+        cursor = master.execute(
+            f"INSERT INTO {tabela} ({', '.join(campos)}) VALUES ({', '.join('?' for _ in campos)})",
+            [dados[campo] for campo in campos]
+        )
+        return cursor.lastrowid
+    
+    def _quantidade(self, master, brinde_id):
+        row = master.execute("SELECT quantidade FROM brindes WHERE id = ?", (brinde_id,)).fetchone()
+        if row is None:
+            raise ReplicaConflict("brinde excluído no banco principal")
+        return row[0]
+    
+    def _apply_movimentacao(self, master, dados, ids):
+        """Entrada/saída: ajusta o estoque do banco principal e registra a movimentação"""
+        brinde_id = dados["brinde_id"] = self._master_id(ids, "brindes", dados["brinde_id"])
+        quantidade = dados["quantidade"]
+        atual = self._quantidade(master, brinde_id)
+        
+        if dados["tipo"] == "SAIDA":
+            if atual < quantidade:
+                raise ReplicaConflict(f"estoque insuficiente no banco principal ({atual} < {quantidade})")
+            master.execute(
+                "UPDATE brindes SET quantidade = quantidade - ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (quantidade, brinde_id)
+            )
+        else:
+            master.execute(
+                """
+                UPDATE brindes SET
+                    quantidade = quantidade + ?,
+                    valor_unitario = COALESCE(?, valor_unitario),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                (quantidade, dados["valor_unitario"], brinde_id)
+            )
+        return self._insert(master, "movimentacoes", dados), brinde_id
+    
+    def _apply_transferencia(self, master, dados, ids):
+        """Transferência: mesma regra de BrindeDAO.transfer, aplicada no banco principal"""
+        brinde_id = dados["brinde_id"] = self._master_id(ids, "brindes", dados["brinde_id"])
+        quantidade = dados["quantidade"]
+        atual = self._quantidade(master, brinde_id)
+        if atual < quantidade:
+            raise ReplicaConflict(f"estoque insuficiente no banco principal ({atual} < {quantidade})")
+        
+        brinde = master.execute("SELECT * FROM brindes WHERE id = ?", (brinde_id,)).fetchone()
+        master.execute(
+            "UPDATE brindes SET quantidade = quantidade - ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (quantidade, brinde_id)
+        )
+        
+        descricao = normalize(brinde["descricao"])
+        destinos = sorted(
+            (
+                row for row in master.execute(
+                    "SELECT id, descricao FROM brindes WHERE categoria_id = ? AND filial_id = ?",
+                    (brinde["categoria_id"], dados["filial_destino_id"])
+                )
+                if normalize(row["descricao"]) == descricao
+            ),
+            key=lambda row: row["descricao"] != brinde["descricao"]
+        )
+        if destinos:
+            master.execute(
+                """
+                UPDATE brindes SET
+                    quantidade = quantidade + ?, valor_unitario = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                (quantidade, brinde["valor_unitario"], destinos[0]["id"])
+            )
+        else:
+            copia = {campo: brinde[campo] for campo in BRINDE_CATALOG_FIELDS}
+            copia.update(quantidade=quantidade, filial_id=dados["filial_destino_id"])
+            self._insert(master, "brindes", copia)
+        
+        return self._insert(master, "transferencias", dados), brinde_id
+    
+    # ------------------------------------------------------------------
+    # Recebimento das alterações
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _upsert(replica, tabela, rows):
+        if not rows:
+            return 0
+        campos = rows[0].keys()
+        replica.executemany(
+            f"""
+            INSERT INTO {tabela} ({', '.join(campos)}) VALUES ({', '.join('?' for _ in campos)})
+            ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in campos if c != 'id')}
+            """,
+            rows
+        )
+        return len(rows)
+    
+    def _pull(self, master, replica, filial_id, brindes_afetados=()):
+        """
+        Recebe do banco principal o que mudou desde a última sincronização
+        
+        Returns:
+            int: Registros recebidos
+        """
+        # Leitura consistente do banco principal (log e tabelas do mesmo instante)
+        master.execute("BEGIN")
+        replica.execute("BEGIN IMMEDIATE")
+        try:
+            # Desliga a captura da fila durante a gravação do que foi recebido
+            replica.execute("UPDATE replica_estado SET sincronizando = 1 WHERE id = 1")
+            
+            # Registros criados localmente já enviados voltam com o id do banco principal
+            for tabela in LOCAL_TABLES:
+                replica.execute(
+                    f"""
+                    DELETE FROM {tabela} WHERE id >= ? AND id IN (
+                        SELECT registro_id FROM replica_outbox
+                        WHERE tabela = ? AND operacao = 'INSERT' AND status != 'PENDENTE'
+                    )
+                    """,
+                    (LOCAL_ID_OFFSET, tabela)
+                )
+            
+            try:
+                if ChangeLog.applied_seq(replica, MASTER_ORIGIN) is None:
+                    raise ChangeLogGap("primeira sincronização")
+                recebidos = ChangeLog.sync(
+                    master, replica, MASTER_ORIGIN, settings.REPLICA_BATCH_SIZE,
+                    accept=lambda conn, change, dados: self._accept(conn, change, dados, filial_id)
+                )
+            except ChangeLogGap:
+                # Primeira sincronização, outra filial ou réplica parada há mais tempo que o log guarda
+                recebidos = self._pull_full(master, replica, filial_id)
+            
+            # Operações recusadas não geram alteração no banco principal: corrige o estoque local
+            if brindes_afetados and filial_id is not None:
+                rows = master.execute(
+                    f"SELECT * FROM brindes WHERE id IN ({', '.join('?' for _ in brindes_afetados)}) AND filial_id = ?",
+                    list(brindes_afetados) + [filial_id]
+                ).fetchall()
+                recebidos += self._upsert(replica, "brindes", rows)
+            
+            # Brindes de outras filiais (destino de transferências feitas na réplica)
+            if filial_id is not None:
+                replica.execute("DELETE FROM brindes WHERE filial_id != ?", (filial_id,))
+            
+            # O log da própria réplica não tem consumidores
+            replica.execute("DELETE FROM log_alteracoes")
+            
+            replica.execute(
+                "UPDATE replica_estado SET sincronizando = 0, ultima_sincronizacao = CURRENT_TIMESTAMP WHERE id = 1"
+            )
+            replica.execute("COMMIT")
+        except Exception:
+            replica.execute("ROLLBACK")
+            raise
+        finally:
+            master.execute("COMMIT")
+        
+        return recebidos
+    
+    @staticmethod
+    def _accept(conn, change, dados, filial_id):
+        """Alterações do banco principal que interessam à réplica da filial"""
+        tabela = change["tabela"]
+        if change["operacao"] == "DELETE" or tabela in REFERENCE_TABLES or tabela == "brindes_excluidos":
+            return True
+        if tabela == "brindes":
+            return dados["filial_id"] == filial_id
+        # Movimentações e transferências dos brindes presentes na réplica
+        return conn.execute("SELECT 1 FROM brindes WHERE id = ?", (dados["brinde_id"],)).fetchone() is not None
+    
+    def _pull_full(self, master, replica, filial_id):
+        """Cópia completa dos cadastros e dos dados da filial; continua pelo log a partir daqui"""
+        info("Réplica: cópia completa do banco principal")
+        seq = ChangeLog.last_seq(master)
+        recebidos = 0
+        
+        for tabela in REFERENCE_TABLES:
+            rows = master.execute(f"SELECT * FROM {tabela}").fetchall()
+            recebidos += self._upsert(replica, tabela, rows)
+            self._delete_missing(replica, tabela, [row["id"] for row in rows])
+        
+        if filial_id is not None:
+            brindes = master.execute("SELECT * FROM brindes WHERE filial_id = ?", (filial_id,)).fetchall()
+            recebidos += self._upsert(replica, "brindes", brindes)
+            self._delete_missing(replica, "brindes", [row["id"] for row in brindes], "filial_id = ?", [filial_id])
+            
+            for tabela in ("movimentacoes", "transferencias"):
+                rows = master.execute(
+                    f"""
+                    SELECT t.* FROM {tabela} t JOIN brindes b ON b.id = t.brinde_id
+                    WHERE b.filial_id = ?
+                    """,
+                    (filial_id,)
+                ).fetchall()
+                recebidos += self._upsert(replica, tabela, rows)
+        
+        ChangeLog.set_applied_seq(replica, MASTER_ORIGIN, seq)
+        return recebidos
+    
+    @staticmethod
+    def _delete_missing(replica, tabela, ids, where="1 = 1", params=()):
+        """Remove da réplica os registros (recebidos do banco principal) que não existem mais lá"""
+        replica.execute("CREATE TEMP TABLE IF NOT EXISTS replica_ids_master (id INTEGER PRIMARY KEY)")
+        replica.execute("DELETE FROM replica_ids_master")
+        replica.executemany("INSERT INTO replica_ids_master (id) VALUES (?)", [(i,) for i in ids])
+        replica.execute(
+            f"""
+            DELETE FROM {tabela}
+            WHERE {where} AND id < ? AND id NOT IN (SELECT id FROM replica_ids_master)
+            """,
+            list(params) + [LOCAL_ID_OFFSET]
+        )
+    
+    # ------------------------------------------------------------------
+    # Consulta de estado
+    # ------------------------------------------------------------------
+    
+    def status(self):
+        """
+        Estado da réplica
+        
+        Returns:
+            dict: online, pendentes, conflitos, ultima_sincronizacao e erro
+        """
+        replica = self._connect_replica()
+        try:
+            contagem = {
+                row["status"]: row["total"]
+                for row in replica.execute("SELECT status, COUNT(*) AS total FROM replica_outbox GROUP BY status")
+            }
+            ultima = replica.execute("SELECT ultima_sincronizacao FROM replica_estado WHERE id = 1").fetchone()[0]
+        finally:
+            replica.close()
+        return {
+            "online": self.online,
+            "pendentes": contagem.get("PENDENTE", 0),
+            "conflitos": contagem.get("CONFLITO", 0),
+            "ultima_sincronizacao": ultima,
+            "erro": self.last_error,
+        }
+    
+    def conflicts(self, limit=100):
+        """Operações da fila recusadas pelo banco principal, da mais recente para a mais antiga"""
+        replica = self._connect_replica()
+        try:
+            return replica.execute(
+                "SELECT * FROM replica_outbox WHERE status = 'CONFLITO' ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        finally:
+            replica.close()
+
+
+# Instância global
+replica_sync = ReplicaSync()
+
+# Updated: 2026-10-19
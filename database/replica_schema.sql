@@ -0,0 +1,279 @@
+-- Réplica Local da Filial (ver database/replica.py)
+-- Executado apenas no banco local, depois de schema.sql, quando o modo réplica
+-- está ativo. As escritas feitas pelo aplicativo na réplica são capturadas
+-- por triggers na fila replica_outbox e reenviadas ao banco principal; os
+-- dados recebidos do log de alterações do banco principal (o ponto de
+-- sincronização fica em log_origens) são gravados com sincronizando = 1, o
+-- que desliga a captura.
+
+-- Estado da réplica (linha única)
+CREATE TABLE IF NOT EXISTS replica_estado (
+    id INTEGER PRIMARY KEY CHECK(id = 1),
+    replica_uid VARCHAR(36),
+    filial_id INTEGER,
+    sincronizando INTEGER NOT NULL DEFAULT 0,
+    ultima_sincronizacao TIMESTAMP
+);
+
+INSERT OR IGNORE INTO replica_estado (id) VALUES (1);
+
+-- Fila de operações feitas na réplica, reenviadas em ordem ao banco principal
+CREATE TABLE IF NOT EXISTS replica_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tabela VARCHAR(50) NOT NULL,
+    operacao VARCHAR(10) NOT NULL CHECK(operacao IN ('INSERT', 'UPDATE', 'DELETE')),
+    registro_id INTEGER NOT NULL,
+    dados TEXT NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'PENDENTE' CHECK(status IN ('PENDENTE', 'APLICADO', 'CONFLITO')),
+    mensagem TEXT,
+    criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    aplicado_em TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_replica_outbox_status ON replica_outbox(status, id);
+
+-- Ids de registros criados na réplica -> ids recebidos no banco principal
+CREATE TABLE IF NOT EXISTS replica_ids (
+    tabela VARCHAR(50) NOT NULL,
+    local_id INTEGER NOT NULL,
+    master_id INTEGER NOT NULL,
+    PRIMARY KEY (tabela, local_id)
+);
+
+-- Captura de movimentações, transferências e alterações de brindes da filial
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_movimentacoes_insert
+AFTER INSERT ON movimentacoes
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    INSERT INTO replica_outbox (tabela, operacao, registro_id, dados)
+    VALUES ('movimentacoes', 'INSERT', NEW.id, json_object(
+        'brinde_id', NEW.brinde_id,
+        'tipo', NEW.tipo,
+        'quantidade', NEW.quantidade,
+        'valor_unitario', NEW.valor_unitario,
+        'usuario_id', NEW.usuario_id,
+        'justificativa', NEW.justificativa,
+        'data_movimentacao', NEW.data_movimentacao
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_transferencias_insert
+AFTER INSERT ON transferencias
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    INSERT INTO replica_outbox (tabela, operacao, registro_id, dados)
+    VALUES ('transferencias', 'INSERT', NEW.id, json_object(
+        'brinde_id', NEW.brinde_id,
+        'filial_origem_id', NEW.filial_origem_id,
+        'filial_destino_id', NEW.filial_destino_id,
+        'quantidade', NEW.quantidade,
+        'usuario_id', NEW.usuario_id,
+        'justificativa', NEW.justificativa,
+        'data_transferencia', NEW.data_transferencia
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_brindes_insert
+AFTER INSERT ON brindes
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+    AND NEW.filial_id = (SELECT filial_id FROM replica_estado WHERE id = 1)
+BEGIN
+    INSERT INTO replica_outbox (tabela, operacao, registro_id, dados)
+    VALUES ('brindes', 'INSERT', NEW.id, json_object(
+        'descricao', NEW.descricao,
+        'quantidade', NEW.quantidade,
+        'valor_unitario', NEW.valor_unitario,
+        'categoria_id', NEW.categoria_id,
+        'unidade_id', NEW.unidade_id,
+        'filial_id', NEW.filial_id,
+        'fornecedor_id', NEW.fornecedor_id,
+        'codigo_interno', NEW.codigo_interno,
+        'observacoes', NEW.observacoes,
+        'estoque_minimo', NEW.estoque_minimo,
+        'created_at', NEW.created_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_brindes_update
+AFTER UPDATE OF descricao, valor_unitario, categoria_id, unidade_id, fornecedor_id, codigo_interno, observacoes, estoque_minimo ON brindes
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+    AND NEW.filial_id = (SELECT filial_id FROM replica_estado WHERE id = 1)
+    AND (
+        NEW.descricao IS NOT OLD.descricao
+        OR NEW.valor_unitario IS NOT OLD.valor_unitario
+        OR NEW.categoria_id IS NOT OLD.categoria_id
+        OR NEW.unidade_id IS NOT OLD.unidade_id
+        OR NEW.fornecedor_id IS NOT OLD.fornecedor_id
+        OR NEW.codigo_interno IS NOT OLD.codigo_interno
+        OR NEW.observacoes IS NOT OLD.observacoes
+        OR NEW.estoque_minimo IS NOT OLD.estoque_minimo
+    )
+BEGIN
+    INSERT INTO replica_outbox (tabela, operacao, registro_id, dados)
+    VALUES ('brindes', 'UPDATE', NEW.id, json_object(
+        'novo', json_object(
+            'descricao', NEW.descricao,
+            'valor_unitario', NEW.valor_unitario,
+            'categoria_id', NEW.categoria_id,
+            'unidade_id', NEW.unidade_id,
+            'fornecedor_id', NEW.fornecedor_id,
+            'codigo_interno', NEW.codigo_interno,
+            'observacoes', NEW.observacoes,
+            'estoque_minimo', NEW.estoque_minimo
+        ),
+        'anterior', json_object(
+            'descricao', OLD.descricao,
+            'valor_unitario', OLD.valor_unitario,
+            'categoria_id', OLD.categoria_id,
+            'unidade_id', OLD.unidade_id,
+            'fornecedor_id', OLD.fornecedor_id,
+            'codigo_interno', OLD.codigo_interno,
+            'observacoes', OLD.observacoes,
+            'estoque_minimo', OLD.estoque_minimo
+        )
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_brindes_delete
+AFTER DELETE ON brindes
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+    AND OLD.filial_id = (SELECT filial_id FROM replica_estado WHERE id = 1)
+BEGIN
+    INSERT INTO replica_outbox (tabela, operacao, registro_id, dados)
+    VALUES ('brindes', 'DELETE', OLD.id, json_object('descricao', OLD.descricao));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_brindes_excluidos_insert
+AFTER INSERT ON brindes_excluidos
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    INSERT INTO replica_outbox (tabela, operacao, registro_id, dados)
+    VALUES ('brindes_excluidos', 'INSERT', NEW.id, json_object(
+        'brinde_id_original', NEW.brinde_id_original,
+        'descricao', NEW.descricao,
+        'categoria_nome', NEW.categoria_nome,
+        'unidade_codigo', NEW.unidade_codigo,
+        'filial_nome', NEW.filial_nome,
+        'fornecedor_nome', NEW.fornecedor_nome,
+        'quantidade', NEW.quantidade,
+        'valor_unitario', NEW.valor_unitario,
+        'codigo_interno', NEW.codigo_interno,
+        'observacoes', NEW.observacoes,
+        'estoque_minimo', NEW.estoque_minimo,
+        'data_criacao', NEW.data_criacao,
+        'data_exclusao', NEW.data_exclusao,
+        'usuario_exclusao_id', NEW.usuario_exclusao_id,
+        'usuario_exclusao_nome', NEW.usuario_exclusao_nome,
+        'motivo_exclusao', NEW.motivo_exclusao
+    ));
+END;
+
+-- Cadastros de referência só mudam no banco principal (chegam pela sincronização)
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_categorias_insert
+BEFORE INSERT ON categorias
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_categorias_update
+BEFORE UPDATE ON categorias
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_categorias_delete
+BEFORE DELETE ON categorias
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_unidades_medida_insert
+BEFORE INSERT ON unidades_medida
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_unidades_medida_update
+BEFORE UPDATE ON unidades_medida
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_unidades_medida_delete
+BEFORE DELETE ON unidades_medida
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_fornecedores_insert
+BEFORE INSERT ON fornecedores
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_fornecedores_update
+BEFORE UPDATE ON fornecedores
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_fornecedores_delete
+BEFORE DELETE ON fornecedores
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_filiais_insert
+BEFORE INSERT ON filiais
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_filiais_update
+BEFORE UPDATE ON filiais
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_filiais_delete
+BEFORE DELETE ON filiais
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_usuarios_insert
+BEFORE INSERT ON usuarios
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_usuarios_update
+BEFORE UPDATE ON usuarios
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_replica_usuarios_delete
+BEFORE DELETE ON usuarios
+WHEN (SELECT sincronizando FROM replica_estado WHERE id = 1) = 0
+BEGIN
+    SELECT RAISE(ABORT, 'Cadastros só podem ser alterados conectado ao banco principal (modo réplica)');
+END;
+
+-- Updated: 2026-10-19
@@ -156,16 +156,53 @@ CREATE TABLE IF NOT EXISTS brindes_excluidos (
     FOREIGN KEY (usuario_exclusao_id) REFERENCES usuarios(id)
 );
 
+-- Tabela de Resumo de Estoque (agregado materializado por filial e categoria)
+-- Mantida pelos triggers trg_brindes_resumo_*; lida pelo dashboard
+CREATE TABLE IF NOT EXISTS estoque_resumo (
+    filial_id INTEGER NOT NULL,
+    categoria_id INTEGER NOT NULL,
+    total_produtos INTEGER NOT NULL DEFAULT 0,
+    total_itens INTEGER NOT NULL DEFAULT 0,
+    valor_total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    itens_estoque_baixo INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (filial_id, categoria_id)
+);
+
+-- Índice de Busca Textual (FTS5) do catálogo de brindes
+-- rowid = brindes.id; mantido pelos triggers trg_brindes_fts_*
+-- filial_id é indexado como termo para o filtro por filial ser resolvido no próprio índice
+CREATE VIRTUAL TABLE IF NOT EXISTS brindes_fts USING fts5(
+    descricao,
+    codigo_interno,
+    observacoes,
+    fornecedor,
+    filial_id,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '1 2 3 4'
+);
+
 -- Índices para melhor performance
 CREATE INDEX IF NOT EXISTS idx_brindes_categoria ON brindes(categoria_id);
 CREATE INDEX IF NOT EXISTS idx_brindes_filial ON brindes(filial_id);
 CREATE INDEX IF NOT EXISTS idx_brindes_fornecedor ON brindes(fornecedor_id);
-CREATE INDEX IF NOT EXISTS idx_movimentacoes_brinde ON movimentacoes(brinde_id);
+-- Catálogo agrupado por descrição (BrindeDAO.get_catalog_page): na ordem dos grupos
+-- e cobrindo as colunas somadas, só com os itens em estoque
+CREATE INDEX IF NOT EXISTS idx_brindes_catalogo ON brindes(
+    descricao, codigo_interno, categoria_id, unidade_id, fornecedor_id, filial_id, quantidade, valor_unitario
+) WHERE quantidade > 0;
 CREATE INDEX IF NOT EXISTS idx_movimentacoes_data ON movimentacoes(data_movimentacao);
-CREATE INDEX IF NOT EXISTS idx_transferencias_brinde ON transferencias(brinde_id);
 CREATE INDEX IF NOT EXISTS idx_transferencias_data ON transferencias(data_transferencia);
+
+-- Linha do tempo de um brinde: busca por brinde já na ordem de data (e id,
+-- que o índice guarda como rowid), sem ordenar; percorrido de trás para frente
+-- para as mais recentes primeiro. Substituem os índices só de brinde_id
+CREATE INDEX IF NOT EXISTS idx_movimentacoes_brinde_data ON movimentacoes(brinde_id, data_movimentacao);
+CREATE INDEX IF NOT EXISTS idx_transferencias_brinde_data ON transferencias(brinde_id, data_transferencia);
+DROP INDEX IF EXISTS idx_movimentacoes_brinde;
+DROP INDEX IF EXISTS idx_transferencias_brinde;
 CREATE INDEX IF NOT EXISTS idx_usuarios_username ON usuarios(username);
 CREATE INDEX IF NOT EXISTS idx_historico_tabela_registro ON historico(tabela, registro_id);
+CREATE INDEX IF NOT EXISTS idx_brindes_excluidos_data ON brindes_excluidos(data_exclusao);
 
 -- Views úteis
 
@@ -197,7 +234,10 @@ INNER JOIN unidades_medida u ON b.unidade_id = u.id
 INNER JOIN filiais f ON b.filial_id = f.id
 LEFT JOIN fornecedores fo ON b.fornecedor_id = fo.id;
 
--- View de Movimentações Completas
+-- Views de Movimentações e Transferências Completas
+-- Sem ORDER BY: cada consulta ordena o que precisa (ORDER BY dentro da view
+-- obrigava a ordenar todas as linhas antes do filtro e do LIMIT de fora).
+-- Bancos com a definição antiga: ver REDEFINED_VIEWS em database/connection.py
 CREATE VIEW IF NOT EXISTS vw_movimentacoes_completas AS
 SELECT 
     m.id,
@@ -214,10 +254,8 @@ SELECT
 FROM movimentacoes m
 INNER JOIN brindes b ON m.brinde_id = b.id
 INNER JOIN usuarios u ON m.usuario_id = u.id
-INNER JOIN filiais f ON b.filial_id = f.id
-ORDER BY m.data_movimentacao DESC;
+INNER JOIN filiais f ON b.filial_id = f.id;
 
--- View de Transferências Completas
 CREATE VIEW IF NOT EXISTS vw_transferencias_completas AS
 SELECT 
     t.id,
@@ -235,7 +273,1277 @@ FROM transferencias t
 INNER JOIN brindes b ON t.brinde_id = b.id
 INNER JOIN filiais fo ON t.filial_origem_id = fo.id
 INNER JOIN filiais fd ON t.filial_destino_id = fd.id
-INNER JOIN usuarios u ON t.usuario_id = u.id
-ORDER BY t.data_transferencia DESC;
+INNER JOIN usuarios u ON t.usuario_id = u.id;
+
+-- Triggers de manutenção do resumo de estoque
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_resumo_insert
+AFTER INSERT ON brindes
+BEGIN
+    INSERT INTO estoque_resumo (
+        filial_id, categoria_id, total_produtos, total_itens, valor_total, itens_estoque_baixo
+    ) VALUES (
+        NEW.filial_id, NEW.categoria_id, 1, NEW.quantidade,
+        NEW.quantidade * NEW.valor_unitario,
+        CASE WHEN NEW.quantidade <= NEW.estoque_minimo THEN 1 ELSE 0 END
+    )
+    ON CONFLICT(filial_id, categoria_id) DO UPDATE SET
+        total_produtos = total_produtos + 1,
+        total_itens = total_itens + excluded.total_itens,
+        valor_total = valor_total + excluded.valor_total,
+        itens_estoque_baixo = itens_estoque_baixo + excluded.itens_estoque_baixo;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_resumo_update
+AFTER UPDATE OF quantidade, valor_unitario, categoria_id, filial_id, estoque_minimo ON brindes
+BEGIN
+    UPDATE estoque_resumo SET
+        total_produtos = total_produtos - 1,
+        total_itens = total_itens - OLD.quantidade,
+        valor_total = valor_total - OLD.quantidade * OLD.valor_unitario,
+        itens_estoque_baixo = itens_estoque_baixo - CASE WHEN OLD.quantidade <= OLD.estoque_minimo THEN 1 ELSE 0 END
+    WHERE filial_id = OLD.filial_id AND categoria_id = OLD.categoria_id;
+
+    INSERT INTO estoque_resumo (
+        filial_id, categoria_id, total_produtos, total_itens, valor_total, itens_estoque_baixo
+    ) VALUES (
+        NEW.filial_id, NEW.categoria_id, 1, NEW.quantidade,
+        NEW.quantidade * NEW.valor_unitario,
+        CASE WHEN NEW.quantidade <= NEW.estoque_minimo THEN 1 ELSE 0 END
+    )
+    ON CONFLICT(filial_id, categoria_id) DO UPDATE SET
+        total_produtos = total_produtos + 1,
+        total_itens = total_itens + excluded.total_itens,
+        valor_total = valor_total + excluded.valor_total,
+        itens_estoque_baixo = itens_estoque_baixo + excluded.itens_estoque_baixo;
+
+    DELETE FROM estoque_resumo
+    WHERE filial_id = OLD.filial_id AND categoria_id = OLD.categoria_id AND total_produtos <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_resumo_delete
+AFTER DELETE ON brindes
+BEGIN
+    UPDATE estoque_resumo SET
+        total_produtos = total_produtos - 1,
+        total_itens = total_itens - OLD.quantidade,
+        valor_total = valor_total - OLD.quantidade * OLD.valor_unitario,
+        itens_estoque_baixo = itens_estoque_baixo - CASE WHEN OLD.quantidade <= OLD.estoque_minimo THEN 1 ELSE 0 END
+    WHERE filial_id = OLD.filial_id AND categoria_id = OLD.categoria_id;
+
+    DELETE FROM estoque_resumo
+    WHERE filial_id = OLD.filial_id AND categoria_id = OLD.categoria_id AND total_produtos <= 0;
+END;
+
+-- Triggers de manutenção do índice de busca textual
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_fts_insert
+AFTER INSERT ON brindes
+BEGIN
+    INSERT INTO brindes_fts (rowid, descricao, codigo_interno, observacoes, fornecedor, filial_id)
+    VALUES (
+        NEW.id, NEW.descricao, NEW.codigo_interno, NEW.observacoes,
+        (SELECT nome FROM fornecedores WHERE id = NEW.fornecedor_id),
+        NEW.filial_id
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_fts_update
+AFTER UPDATE OF descricao, codigo_interno, observacoes, fornecedor_id, filial_id ON brindes
+BEGIN
+    UPDATE brindes_fts SET
+        descricao = NEW.descricao,
+        codigo_interno = NEW.codigo_interno,
+        observacoes = NEW.observacoes,
+        fornecedor = (SELECT nome FROM fornecedores WHERE id = NEW.fornecedor_id),
+        filial_id = NEW.filial_id
+    WHERE rowid = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_fts_delete
+AFTER DELETE ON brindes
+BEGIN
+    DELETE FROM brindes_fts WHERE rowid = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fornecedores_fts_update
+AFTER UPDATE OF nome ON fornecedores
+BEGIN
+    UPDATE brindes_fts SET fornecedor = NEW.nome
+    WHERE rowid IN (SELECT id FROM brindes WHERE fornecedor_id = NEW.id);
+END;
+
+-- Operações de réplicas locais já aplicadas neste banco (ver database/replica.py)
+-- Garante que uma operação da fila seja aplicada uma única vez, mesmo que a
+-- réplica perca a conexão antes de registrar o envio.
+CREATE TABLE IF NOT EXISTS replica_recebidos (
+    replica_uid VARCHAR(36) NOT NULL,
+    outbox_id INTEGER NOT NULL,
+    registro_id INTEGER,
+    aplicado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (replica_uid, outbox_id)
+);
+
+-- Contadores de alteração por tabela (ver utils/change_watcher.py)
+-- Outras instâncias que abrem o mesmo banco comparam os contadores para
+-- saber quais tabelas mudaram depois que PRAGMA data_version indicar escrita.
+
+CREATE TABLE IF NOT EXISTS tabela_versoes (
+    tabela VARCHAR(50) PRIMARY KEY,
+    versao INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO tabela_versoes (tabela) VALUES
+    ('brindes'),
+    ('movimentacoes'),
+    ('transferencias'),
+    ('brindes_excluidos'),
+    ('categorias'),
+    ('unidades_medida'),
+    ('fornecedores'),
+    ('filiais'),
+    ('usuarios');
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_versao_insert
+AFTER INSERT ON brindes
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'brindes';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_versao_update
+AFTER UPDATE ON brindes
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'brindes';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_versao_delete
+AFTER DELETE ON brindes
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'brindes';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_versao_insert
+AFTER INSERT ON movimentacoes
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'movimentacoes';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_versao_update
+AFTER UPDATE ON movimentacoes
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'movimentacoes';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_versao_delete
+AFTER DELETE ON movimentacoes
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'movimentacoes';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transferencias_versao_insert
+AFTER INSERT ON transferencias
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'transferencias';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transferencias_versao_update
+AFTER UPDATE ON transferencias
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'transferencias';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transferencias_versao_delete
+AFTER DELETE ON transferencias
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'transferencias';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_excluidos_versao_insert
+AFTER INSERT ON brindes_excluidos
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'brindes_excluidos';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_excluidos_versao_update
+AFTER UPDATE ON brindes_excluidos
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'brindes_excluidos';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_excluidos_versao_delete
+AFTER DELETE ON brindes_excluidos
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'brindes_excluidos';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categorias_versao_insert
+AFTER INSERT ON categorias
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'categorias';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categorias_versao_update
+AFTER UPDATE ON categorias
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'categorias';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categorias_versao_delete
+AFTER DELETE ON categorias
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'categorias';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_unidades_medida_versao_insert
+AFTER INSERT ON unidades_medida
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'unidades_medida';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_unidades_medida_versao_update
+AFTER UPDATE ON unidades_medida
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'unidades_medida';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_unidades_medida_versao_delete
+AFTER DELETE ON unidades_medida
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'unidades_medida';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fornecedores_versao_insert
+AFTER INSERT ON fornecedores
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'fornecedores';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fornecedores_versao_update
+AFTER UPDATE ON fornecedores
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'fornecedores';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fornecedores_versao_delete
+AFTER DELETE ON fornecedores
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'fornecedores';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_filiais_versao_insert
+AFTER INSERT ON filiais
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'filiais';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_filiais_versao_update
+AFTER UPDATE ON filiais
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'filiais';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_filiais_versao_delete
+AFTER DELETE ON filiais
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'filiais';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_usuarios_versao_insert
+AFTER INSERT ON usuarios
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'usuarios';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_usuarios_versao_update
+AFTER UPDATE ON usuarios
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'usuarios';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_usuarios_versao_delete
+AFTER DELETE ON usuarios
+BEGIN
+    UPDATE tabela_versoes SET versao = versao + 1 WHERE tabela = 'usuarios';
+END;
+
+-- Log de alterações (ver database/change_log.py)
+-- Registro sequencial e somente de inserção de cada linha inserida, alterada ou
+-- excluída nas tabelas replicáveis, com a linha completa em JSON. Réplicas,
+-- backups e extrações pedem as alterações após o último seq que já receberam.
+
+CREATE TABLE IF NOT EXISTS log_alteracoes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    tabela VARCHAR(50) NOT NULL,
+    registro_id INTEGER NOT NULL,
+    operacao VARCHAR(10) NOT NULL CHECK(operacao IN ('INSERT', 'UPDATE', 'DELETE')),
+    dados TEXT,
+    data_alteracao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Último seq aplicado neste banco, por banco de origem
+CREATE TABLE IF NOT EXISTS log_origens (
+    origem VARCHAR(200) PRIMARY KEY,
+    ultimo_seq INTEGER NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_filiais_log_insert
+AFTER INSERT ON filiais
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('filiais', NEW.id, 'INSERT', json_object(
+        'id', NEW.id,
+        'numero', NEW.numero,
+        'nome', NEW.nome,
+        'cidade', NEW.cidade,
+        'estado', NEW.estado,
+        'endereco', NEW.endereco,
+        'telefone', NEW.telefone,
+        'email', NEW.email,
+        'responsavel', NEW.responsavel,
+        'ativo', NEW.ativo,
+        'created_at', NEW.created_at,
+        'updated_at', NEW.updated_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_filiais_log_update
+AFTER UPDATE ON filiais
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('filiais', NEW.id, 'UPDATE', json_object(
+        'id', NEW.id,
+        'numero', NEW.numero,
+        'nome', NEW.nome,
+        'cidade', NEW.cidade,
+        'estado', NEW.estado,
+        'endereco', NEW.endereco,
+        'telefone', NEW.telefone,
+        'email', NEW.email,
+        'responsavel', NEW.responsavel,
+        'ativo', NEW.ativo,
+        'created_at', NEW.created_at,
+        'updated_at', NEW.updated_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_filiais_log_delete
+AFTER DELETE ON filiais
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao) VALUES ('filiais', OLD.id, 'DELETE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_usuarios_log_insert
+AFTER INSERT ON usuarios
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('usuarios', NEW.id, 'INSERT', json_object(
+        'id', NEW.id,
+        'nome', NEW.nome,
+        'username', NEW.username,
+        'email', NEW.email,
+        'perfil', NEW.perfil,
+        'filial_id', NEW.filial_id,
+        'ativo', NEW.ativo,
+        'created_at', NEW.created_at,
+        'updated_at', NEW.updated_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_usuarios_log_update
+AFTER UPDATE ON usuarios
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('usuarios', NEW.id, 'UPDATE', json_object(
+        'id', NEW.id,
+        'nome', NEW.nome,
+        'username', NEW.username,
+        'email', NEW.email,
+        'perfil', NEW.perfil,
+        'filial_id', NEW.filial_id,
+        'ativo', NEW.ativo,
+        'created_at', NEW.created_at,
+        'updated_at', NEW.updated_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_usuarios_log_delete
+AFTER DELETE ON usuarios
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao) VALUES ('usuarios', OLD.id, 'DELETE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categorias_log_insert
+AFTER INSERT ON categorias
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('categorias', NEW.id, 'INSERT', json_object(
+        'id', NEW.id,
+        'nome', NEW.nome,
+        'descricao', NEW.descricao,
+        'ativo', NEW.ativo,
+        'created_at', NEW.created_at,
+        'updated_at', NEW.updated_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categorias_log_update
+AFTER UPDATE ON categorias
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('categorias', NEW.id, 'UPDATE', json_object(
+        'id', NEW.id,
+        'nome', NEW.nome,
+        'descricao', NEW.descricao,
+        'ativo', NEW.ativo,
+        'created_at', NEW.created_at,
+        'updated_at', NEW.updated_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categorias_log_delete
+AFTER DELETE ON categorias
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao) VALUES ('categorias', OLD.id, 'DELETE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_unidades_medida_log_insert
+AFTER INSERT ON unidades_medida
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('unidades_medida', NEW.id, 'INSERT', json_object(
+        'id', NEW.id,
+        'codigo', NEW.codigo,
+        'nome', NEW.nome,
+        'descricao', NEW.descricao,
+        'ativo', NEW.ativo,
+        'created_at', NEW.created_at,
+        'updated_at', NEW.updated_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_unidades_medida_log_update
+AFTER UPDATE ON unidades_medida
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('unidades_medida', NEW.id, 'UPDATE', json_object(
+        'id', NEW.id,
+        'codigo', NEW.codigo,
+        'nome', NEW.nome,
+        'descricao', NEW.descricao,
+        'ativo', NEW.ativo,
+        'created_at', NEW.created_at,
+        'updated_at', NEW.updated_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_unidades_medida_log_delete
+AFTER DELETE ON unidades_medida
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao) VALUES ('unidades_medida', OLD.id, 'DELETE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fornecedores_log_insert
+AFTER INSERT ON fornecedores
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('fornecedores', NEW.id, 'INSERT', json_object(
+        'id', NEW.id,
+        'nome', NEW.nome,
+        'cnpj', NEW.cnpj,
+        'contato', NEW.contato,
+        'telefone', NEW.telefone,
+        'email', NEW.email,
+        'endereco', NEW.endereco,
+        'cidade', NEW.cidade,
+        'estado', NEW.estado,
+        'cep', NEW.cep,
+        'observacoes', NEW.observacoes,
+        'ativo', NEW.ativo,
+        'created_at', NEW.created_at,
+        'updated_at', NEW.updated_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fornecedores_log_update
+AFTER UPDATE ON fornecedores
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('fornecedores', NEW.id, 'UPDATE', json_object(
+        'id', NEW.id,
+        'nome', NEW.nome,
+        'cnpj', NEW.cnpj,
+        'contato', NEW.contato,
+        'telefone', NEW.telefone,
+        'email', NEW.email,
+        'endereco', NEW.endereco,
+        'cidade', NEW.cidade,
+        'estado', NEW.estado,
+        'cep', NEW.cep,
+        'observacoes', NEW.observacoes,
+        'ativo', NEW.ativo,
+        'created_at', NEW.created_at,
+        'updated_at', NEW.updated_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fornecedores_log_delete
+AFTER DELETE ON fornecedores
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao) VALUES ('fornecedores', OLD.id, 'DELETE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_log_insert
+AFTER INSERT ON brindes
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('brindes', NEW.id, 'INSERT', json_object(
+        'id', NEW.id,
+        'descricao', NEW.descricao,
+        'quantidade', NEW.quantidade,
+        'valor_unitario', NEW.valor_unitario,
+        'categoria_id', NEW.categoria_id,
+        'unidade_id', NEW.unidade_id,
+        'filial_id', NEW.filial_id,
+        'fornecedor_id', NEW.fornecedor_id,
+        'codigo_interno', NEW.codigo_interno,
+        'observacoes', NEW.observacoes,
+        'estoque_minimo', NEW.estoque_minimo,
+        'created_at', NEW.created_at,
+        'updated_at', NEW.updated_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_log_update
+AFTER UPDATE ON brindes
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('brindes', NEW.id, 'UPDATE', json_object(
+        'id', NEW.id,
+        'descricao', NEW.descricao,
+        'quantidade', NEW.quantidade,
+        'valor_unitario', NEW.valor_unitario,
+        'categoria_id', NEW.categoria_id,
+        'unidade_id', NEW.unidade_id,
+        'filial_id', NEW.filial_id,
+        'fornecedor_id', NEW.fornecedor_id,
+        'codigo_interno', NEW.codigo_interno,
+        'observacoes', NEW.observacoes,
+        'estoque_minimo', NEW.estoque_minimo,
+        'created_at', NEW.created_at,
+        'updated_at', NEW.updated_at
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_log_delete
+AFTER DELETE ON brindes
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao) VALUES ('brindes', OLD.id, 'DELETE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_log_insert
+AFTER INSERT ON movimentacoes
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('movimentacoes', NEW.id, 'INSERT', json_object(
+        'id', NEW.id,
+        'brinde_id', NEW.brinde_id,
+        'tipo', NEW.tipo,
+        'quantidade', NEW.quantidade,
+        'valor_unitario', NEW.valor_unitario,
+        'usuario_id', NEW.usuario_id,
+        'justificativa', NEW.justificativa,
+        'data_movimentacao', NEW.data_movimentacao
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_log_update
+AFTER UPDATE ON movimentacoes
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('movimentacoes', NEW.id, 'UPDATE', json_object(
+        'id', NEW.id,
+        'brinde_id', NEW.brinde_id,
+        'tipo', NEW.tipo,
+        'quantidade', NEW.quantidade,
+        'valor_unitario', NEW.valor_unitario,
+        'usuario_id', NEW.usuario_id,
+        'justificativa', NEW.justificativa,
+        'data_movimentacao', NEW.data_movimentacao
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_log_delete
+AFTER DELETE ON movimentacoes
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao) VALUES ('movimentacoes', OLD.id, 'DELETE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transferencias_log_insert
+AFTER INSERT ON transferencias
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('transferencias', NEW.id, 'INSERT', json_object(
+        'id', NEW.id,
+        'brinde_id', NEW.brinde_id,
+        'filial_origem_id', NEW.filial_origem_id,
+        'filial_destino_id', NEW.filial_destino_id,
+        'quantidade', NEW.quantidade,
+        'usuario_id', NEW.usuario_id,
+        'justificativa', NEW.justificativa,
+        'data_transferencia', NEW.data_transferencia
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transferencias_log_update
+AFTER UPDATE ON transferencias
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('transferencias', NEW.id, 'UPDATE', json_object(
+        'id', NEW.id,
+        'brinde_id', NEW.brinde_id,
+        'filial_origem_id', NEW.filial_origem_id,
+        'filial_destino_id', NEW.filial_destino_id,
+        'quantidade', NEW.quantidade,
+        'usuario_id', NEW.usuario_id,
+        'justificativa', NEW.justificativa,
+        'data_transferencia', NEW.data_transferencia
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transferencias_log_delete
+AFTER DELETE ON transferencias
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao) VALUES ('transferencias', OLD.id, 'DELETE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_excluidos_log_insert
+AFTER INSERT ON brindes_excluidos
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('brindes_excluidos', NEW.id, 'INSERT', json_object(
+        'id', NEW.id,
+        'brinde_id_original', NEW.brinde_id_original,
+        'descricao', NEW.descricao,
+        'categoria_nome', NEW.categoria_nome,
+        'unidade_codigo', NEW.unidade_codigo,
+        'filial_nome', NEW.filial_nome,
+        'fornecedor_nome', NEW.fornecedor_nome,
+        'quantidade', NEW.quantidade,
+        'valor_unitario', NEW.valor_unitario,
+        'codigo_interno', NEW.codigo_interno,
+        'observacoes', NEW.observacoes,
+        'estoque_minimo', NEW.estoque_minimo,
+        'data_criacao', NEW.data_criacao,
+        'data_exclusao', NEW.data_exclusao,
+        'usuario_exclusao_id', NEW.usuario_exclusao_id,
+        'usuario_exclusao_nome', NEW.usuario_exclusao_nome,
+        'motivo_exclusao', NEW.motivo_exclusao
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_excluidos_log_update
+AFTER UPDATE ON brindes_excluidos
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao, dados)
+    VALUES ('brindes_excluidos', NEW.id, 'UPDATE', json_object(
+        'id', NEW.id,
+        'brinde_id_original', NEW.brinde_id_original,
+        'descricao', NEW.descricao,
+        'categoria_nome', NEW.categoria_nome,
+        'unidade_codigo', NEW.unidade_codigo,
+        'filial_nome', NEW.filial_nome,
+        'fornecedor_nome', NEW.fornecedor_nome,
+        'quantidade', NEW.quantidade,
+        'valor_unitario', NEW.valor_unitario,
+        'codigo_interno', NEW.codigo_interno,
+        'observacoes', NEW.observacoes,
+        'estoque_minimo', NEW.estoque_minimo,
+        'data_criacao', NEW.data_criacao,
+        'data_exclusao', NEW.data_exclusao,
+        'usuario_exclusao_id', NEW.usuario_exclusao_id,
+        'usuario_exclusao_nome', NEW.usuario_exclusao_nome,
+        'motivo_exclusao', NEW.motivo_exclusao
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_excluidos_log_delete
+AFTER DELETE ON brindes_excluidos
+BEGIN
+    INSERT INTO log_alteracoes (tabela, registro_id, operacao) VALUES ('brindes_excluidos', OLD.id, 'DELETE');
+END;
+
+-- ============================================
+-- AUDITORIA (historico; ver database/dao/historico_dao.py)
+-- ============================================
+
+-- Cada alteração grava em historico, na mesma transação, só as colunas que
+-- mudaram: dados_anteriores/dados_novos são objetos JSON {coluna: valor}
+-- (INSERT e DELETE trazem as colunas não nulas). updated_at/created_at ficam
+-- de fora, e UPDATEs que não mudam nenhuma coluna auditada não geram linha.
+-- movimentacoes e transferencias já são o próprio registro da operação: só
+-- correções (UPDATE) são auditadas; exclusões vêm da cascata do brinde (já
+-- auditada) ou do arquivamento (database/archive.py).
+-- usuario_id vem da própria linha quando ela o tem (movimentacoes,
+-- transferencias) e, na exclusão de brinde, do registro em brindes_excluidos.
+
+CREATE INDEX IF NOT EXISTS idx_historico_usuario ON historico(usuario_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_filiais_historico_insert
+AFTER INSERT ON filiais
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_novos)
+    SELECT 'filiais', NEW.id, 'INSERT', NULL, json_group_object(campo, valor)
+    FROM (
+        SELECT 'numero' AS campo, NEW.numero AS valor WHERE NEW.numero IS NOT NULL
+        UNION ALL SELECT 'nome', NEW.nome WHERE NEW.nome IS NOT NULL
+        UNION ALL SELECT 'cidade', NEW.cidade WHERE NEW.cidade IS NOT NULL
+        UNION ALL SELECT 'estado', NEW.estado WHERE NEW.estado IS NOT NULL
+        UNION ALL SELECT 'endereco', NEW.endereco WHERE NEW.endereco IS NOT NULL
+        UNION ALL SELECT 'telefone', NEW.telefone WHERE NEW.telefone IS NOT NULL
+        UNION ALL SELECT 'email', NEW.email WHERE NEW.email IS NOT NULL
+        UNION ALL SELECT 'responsavel', NEW.responsavel WHERE NEW.responsavel IS NOT NULL
+        UNION ALL SELECT 'ativo', NEW.ativo WHERE NEW.ativo IS NOT NULL
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_filiais_historico_update
+AFTER UPDATE ON filiais
+WHEN OLD.numero IS NOT NEW.numero
+    OR OLD.nome IS NOT NEW.nome
+    OR OLD.cidade IS NOT NEW.cidade
+    OR OLD.estado IS NOT NEW.estado
+    OR OLD.endereco IS NOT NEW.endereco
+    OR OLD.telefone IS NOT NEW.telefone
+    OR OLD.email IS NOT NEW.email
+    OR OLD.responsavel IS NOT NEW.responsavel
+    OR OLD.ativo IS NOT NEW.ativo
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores, dados_novos)
+    SELECT 'filiais', NEW.id, 'UPDATE', NULL, json_group_object(campo, antes), json_group_object(campo, depois)
+    FROM (
+        SELECT 'numero' AS campo, OLD.numero AS antes, NEW.numero AS depois WHERE OLD.numero IS NOT NEW.numero
+        UNION ALL SELECT 'nome', OLD.nome, NEW.nome WHERE OLD.nome IS NOT NEW.nome
+        UNION ALL SELECT 'cidade', OLD.cidade, NEW.cidade WHERE OLD.cidade IS NOT NEW.cidade
+        UNION ALL SELECT 'estado', OLD.estado, NEW.estado WHERE OLD.estado IS NOT NEW.estado
+        UNION ALL SELECT 'endereco', OLD.endereco, NEW.endereco WHERE OLD.endereco IS NOT NEW.endereco
+        UNION ALL SELECT 'telefone', OLD.telefone, NEW.telefone WHERE OLD.telefone IS NOT NEW.telefone
+        UNION ALL SELECT 'email', OLD.email, NEW.email WHERE OLD.email IS NOT NEW.email
+        UNION ALL SELECT 'responsavel', OLD.responsavel, NEW.responsavel WHERE OLD.responsavel IS NOT NEW.responsavel
+        UNION ALL SELECT 'ativo', OLD.ativo, NEW.ativo WHERE OLD.ativo IS NOT NEW.ativo
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_filiais_historico_delete
+AFTER DELETE ON filiais
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores)
+    SELECT 'filiais', OLD.id, 'DELETE', NULL, json_group_object(campo, valor)
+    FROM (
+        SELECT 'numero' AS campo, OLD.numero AS valor WHERE OLD.numero IS NOT NULL
+        UNION ALL SELECT 'nome', OLD.nome WHERE OLD.nome IS NOT NULL
+        UNION ALL SELECT 'cidade', OLD.cidade WHERE OLD.cidade IS NOT NULL
+        UNION ALL SELECT 'estado', OLD.estado WHERE OLD.estado IS NOT NULL
+        UNION ALL SELECT 'endereco', OLD.endereco WHERE OLD.endereco IS NOT NULL
+        UNION ALL SELECT 'telefone', OLD.telefone WHERE OLD.telefone IS NOT NULL
+        UNION ALL SELECT 'email', OLD.email WHERE OLD.email IS NOT NULL
+        UNION ALL SELECT 'responsavel', OLD.responsavel WHERE OLD.responsavel IS NOT NULL
+        UNION ALL SELECT 'ativo', OLD.ativo WHERE OLD.ativo IS NOT NULL
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_usuarios_historico_insert
+AFTER INSERT ON usuarios
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_novos)
+    SELECT 'usuarios', NEW.id, 'INSERT', NULL, json_group_object(campo, valor)
+    FROM (
+        SELECT 'nome' AS campo, NEW.nome AS valor WHERE NEW.nome IS NOT NULL
+        UNION ALL SELECT 'username', NEW.username WHERE NEW.username IS NOT NULL
+        UNION ALL SELECT 'email', NEW.email WHERE NEW.email IS NOT NULL
+        UNION ALL SELECT 'perfil', NEW.perfil WHERE NEW.perfil IS NOT NULL
+        UNION ALL SELECT 'filial_id', NEW.filial_id WHERE NEW.filial_id IS NOT NULL
+        UNION ALL SELECT 'ativo', NEW.ativo WHERE NEW.ativo IS NOT NULL
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_usuarios_historico_update
+AFTER UPDATE ON usuarios
+WHEN OLD.nome IS NOT NEW.nome
+    OR OLD.username IS NOT NEW.username
+    OR OLD.email IS NOT NEW.email
+    OR OLD.perfil IS NOT NEW.perfil
+    OR OLD.filial_id IS NOT NEW.filial_id
+    OR OLD.ativo IS NOT NEW.ativo
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores, dados_novos)
+    SELECT 'usuarios', NEW.id, 'UPDATE', NULL, json_group_object(campo, antes), json_group_object(campo, depois)
+    FROM (
+        SELECT 'nome' AS campo, OLD.nome AS antes, NEW.nome AS depois WHERE OLD.nome IS NOT NEW.nome
+        UNION ALL SELECT 'username', OLD.username, NEW.username WHERE OLD.username IS NOT NEW.username
+        UNION ALL SELECT 'email', OLD.email, NEW.email WHERE OLD.email IS NOT NEW.email
+        UNION ALL SELECT 'perfil', OLD.perfil, NEW.perfil WHERE OLD.perfil IS NOT NEW.perfil
+        UNION ALL SELECT 'filial_id', OLD.filial_id, NEW.filial_id WHERE OLD.filial_id IS NOT NEW.filial_id
+        UNION ALL SELECT 'ativo', OLD.ativo, NEW.ativo WHERE OLD.ativo IS NOT NEW.ativo
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_usuarios_historico_delete
+AFTER DELETE ON usuarios
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores)
+    SELECT 'usuarios', OLD.id, 'DELETE', NULL, json_group_object(campo, valor)
+    FROM (
+        SELECT 'nome' AS campo, OLD.nome AS valor WHERE OLD.nome IS NOT NULL
+        UNION ALL SELECT 'username', OLD.username WHERE OLD.username IS NOT NULL
+        UNION ALL SELECT 'email', OLD.email WHERE OLD.email IS NOT NULL
+        UNION ALL SELECT 'perfil', OLD.perfil WHERE OLD.perfil IS NOT NULL
+        UNION ALL SELECT 'filial_id', OLD.filial_id WHERE OLD.filial_id IS NOT NULL
+        UNION ALL SELECT 'ativo', OLD.ativo WHERE OLD.ativo IS NOT NULL
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categorias_historico_insert
+AFTER INSERT ON categorias
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_novos)
+    SELECT 'categorias', NEW.id, 'INSERT', NULL, json_group_object(campo, valor)
+    FROM (
+        SELECT 'nome' AS campo, NEW.nome AS valor WHERE NEW.nome IS NOT NULL
+        UNION ALL SELECT 'descricao', NEW.descricao WHERE NEW.descricao IS NOT NULL
+        UNION ALL SELECT 'ativo', NEW.ativo WHERE NEW.ativo IS NOT NULL
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categorias_historico_update
+AFTER UPDATE ON categorias
+WHEN OLD.nome IS NOT NEW.nome
+    OR OLD.descricao IS NOT NEW.descricao
+    OR OLD.ativo IS NOT NEW.ativo
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores, dados_novos)
+    SELECT 'categorias', NEW.id, 'UPDATE', NULL, json_group_object(campo, antes), json_group_object(campo, depois)
+    FROM (
+        SELECT 'nome' AS campo, OLD.nome AS antes, NEW.nome AS depois WHERE OLD.nome IS NOT NEW.nome
+        UNION ALL SELECT 'descricao', OLD.descricao, NEW.descricao WHERE OLD.descricao IS NOT NEW.descricao
+        UNION ALL SELECT 'ativo', OLD.ativo, NEW.ativo WHERE OLD.ativo IS NOT NEW.ativo
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categorias_historico_delete
+AFTER DELETE ON categorias
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores)
+    SELECT 'categorias', OLD.id, 'DELETE', NULL, json_group_object(campo, valor)
+    FROM (
+        SELECT 'nome' AS campo, OLD.nome AS valor WHERE OLD.nome IS NOT NULL
+        UNION ALL SELECT 'descricao', OLD.descricao WHERE OLD.descricao IS NOT NULL
+        UNION ALL SELECT 'ativo', OLD.ativo WHERE OLD.ativo IS NOT NULL
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_unidades_medida_historico_insert
+AFTER INSERT ON unidades_medida
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_novos)
+    SELECT 'unidades_medida', NEW.id, 'INSERT', NULL, json_group_object(campo, valor)
+    FROM (
+        SELECT 'codigo' AS campo, NEW.codigo AS valor WHERE NEW.codigo IS NOT NULL
+        UNION ALL SELECT 'nome', NEW.nome WHERE NEW.nome IS NOT NULL
+        UNION ALL SELECT 'descricao', NEW.descricao WHERE NEW.descricao IS NOT NULL
+        UNION ALL SELECT 'ativo', NEW.ativo WHERE NEW.ativo IS NOT NULL
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_unidades_medida_historico_update
+AFTER UPDATE ON unidades_medida
+WHEN OLD.codigo IS NOT NEW.codigo
+    OR OLD.nome IS NOT NEW.nome
+    OR OLD.descricao IS NOT NEW.descricao
+    OR OLD.ativo IS NOT NEW.ativo
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores, dados_novos)
+    SELECT 'unidades_medida', NEW.id, 'UPDATE', NULL, json_group_object(campo, antes), json_group_object(campo, depois)
+    FROM (
+        SELECT 'codigo' AS campo, OLD.codigo AS antes, NEW.codigo AS depois WHERE OLD.codigo IS NOT NEW.codigo
+        UNION ALL SELECT 'nome', OLD.nome, NEW.nome WHERE OLD.nome IS NOT NEW.nome
+        UNION ALL SELECT 'descricao', OLD.descricao, NEW.descricao WHERE OLD.descricao IS NOT NEW.descricao
+        UNION ALL SELECT 'ativo', OLD.ativo, NEW.ativo WHERE OLD.ativo IS NOT NEW.ativo
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_unidades_medida_historico_delete
+AFTER DELETE ON unidades_medida
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores)
+    SELECT 'unidades_medida', OLD.id, 'DELETE', NULL, json_group_object(campo, valor)
+    FROM (
+        SELECT 'codigo' AS campo, OLD.codigo AS valor WHERE OLD.codigo IS NOT NULL
+        UNION ALL SELECT 'nome', OLD.nome WHERE OLD.nome IS NOT NULL
+        UNION ALL SELECT 'descricao', OLD.descricao WHERE OLD.descricao IS NOT NULL
+        UNION ALL SELECT 'ativo', OLD.ativo WHERE OLD.ativo IS NOT NULL
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fornecedores_historico_insert
+AFTER INSERT ON fornecedores
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_novos)
+    SELECT 'fornecedores', NEW.id, 'INSERT', NULL, json_group_object(campo, valor)
+    FROM (
+        SELECT 'nome' AS campo, NEW.nome AS valor WHERE NEW.nome IS NOT NULL
+        UNION ALL SELECT 'cnpj', NEW.cnpj WHERE NEW.cnpj IS NOT NULL
+        UNION ALL SELECT 'contato', NEW.contato WHERE NEW.contato IS NOT NULL
+        UNION ALL SELECT 'telefone', NEW.telefone WHERE NEW.telefone IS NOT NULL
+        UNION ALL SELECT 'email', NEW.email WHERE NEW.email IS NOT NULL
+        UNION ALL SELECT 'endereco', NEW.endereco WHERE NEW.endereco IS NOT NULL
+        UNION ALL SELECT 'cidade', NEW.cidade WHERE NEW.cidade IS NOT NULL
+        UNION ALL SELECT 'estado', NEW.estado WHERE NEW.estado IS NOT NULL
+        UNION ALL SELECT 'cep', NEW.cep WHERE NEW.cep IS NOT NULL
+        UNION ALL SELECT 'observacoes', NEW.observacoes WHERE NEW.observacoes IS NOT NULL
+        UNION ALL SELECT 'ativo', NEW.ativo WHERE NEW.ativo IS NOT NULL
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fornecedores_historico_update
+AFTER UPDATE ON fornecedores
+WHEN OLD.nome IS NOT NEW.nome
+    OR OLD.cnpj IS NOT NEW.cnpj
+    OR OLD.contato IS NOT NEW.contato
+    OR OLD.telefone IS NOT NEW.telefone
+    OR OLD.email IS NOT NEW.email
+    OR OLD.endereco IS NOT NEW.endereco
+    OR OLD.cidade IS NOT NEW.cidade
+    OR OLD.estado IS NOT NEW.estado
+    OR OLD.cep IS NOT NEW.cep
+    OR OLD.observacoes IS NOT NEW.observacoes
+    OR OLD.ativo IS NOT NEW.ativo
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores, dados_novos)
+    SELECT 'fornecedores', NEW.id, 'UPDATE', NULL, json_group_object(campo, antes), json_group_object(campo, depois)
+    FROM (
+        SELECT 'nome' AS campo, OLD.nome AS antes, NEW.nome AS depois WHERE OLD.nome IS NOT NEW.nome
+        UNION ALL SELECT 'cnpj', OLD.cnpj, NEW.cnpj WHERE OLD.cnpj IS NOT NEW.cnpj
+        UNION ALL SELECT 'contato', OLD.contato, NEW.contato WHERE OLD.contato IS NOT NEW.contato
+        UNION ALL SELECT 'telefone', OLD.telefone, NEW.telefone WHERE OLD.telefone IS NOT NEW.telefone
+        UNION ALL SELECT 'email', OLD.email, NEW.email WHERE OLD.email IS NOT NEW.email
+        UNION ALL SELECT 'endereco', OLD.endereco, NEW.endereco WHERE OLD.endereco IS NOT NEW.endereco
+        UNION ALL SELECT 'cidade', OLD.cidade, NEW.cidade WHERE OLD.cidade IS NOT NEW.cidade
+        UNION ALL SELECT 'estado', OLD.estado, NEW.estado WHERE OLD.estado IS NOT NEW.estado
+        UNION ALL SELECT 'cep', OLD.cep, NEW.cep WHERE OLD.cep IS NOT NEW.cep
+        UNION ALL SELECT 'observacoes', OLD.observacoes, NEW.observacoes WHERE OLD.observacoes IS NOT NEW.observacoes
+        UNION ALL SELECT 'ativo', OLD.ativo, NEW.ativo WHERE OLD.ativo IS NOT NEW.ativo
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fornecedores_historico_delete
+AFTER DELETE ON fornecedores
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores)
+    SELECT 'fornecedores', OLD.id, 'DELETE', NULL, json_group_object(campo, valor)
+    FROM (
+        SELECT 'nome' AS campo, OLD.nome AS valor WHERE OLD.nome IS NOT NULL
+        UNION ALL SELECT 'cnpj', OLD.cnpj WHERE OLD.cnpj IS NOT NULL
+        UNION ALL SELECT 'contato', OLD.contato WHERE OLD.contato IS NOT NULL
+        UNION ALL SELECT 'telefone', OLD.telefone WHERE OLD.telefone IS NOT NULL
+        UNION ALL SELECT 'email', OLD.email WHERE OLD.email IS NOT NULL
+        UNION ALL SELECT 'endereco', OLD.endereco WHERE OLD.endereco IS NOT NULL
+        UNION ALL SELECT 'cidade', OLD.cidade WHERE OLD.cidade IS NOT NULL
+        UNION ALL SELECT 'estado', OLD.estado WHERE OLD.estado IS NOT NULL
+        UNION ALL SELECT 'cep', OLD.cep WHERE OLD.cep IS NOT NULL
+        UNION ALL SELECT 'observacoes', OLD.observacoes WHERE OLD.observacoes IS NOT NULL
+        UNION ALL SELECT 'ativo', OLD.ativo WHERE OLD.ativo IS NOT NULL
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_historico_insert
+AFTER INSERT ON brindes
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_novos)
+    SELECT 'brindes', NEW.id, 'INSERT', NULL, json_group_object(campo, valor)
+    FROM (
+        SELECT 'descricao' AS campo, NEW.descricao AS valor WHERE NEW.descricao IS NOT NULL
+        UNION ALL SELECT 'quantidade', NEW.quantidade WHERE NEW.quantidade IS NOT NULL
+        UNION ALL SELECT 'valor_unitario', NEW.valor_unitario WHERE NEW.valor_unitario IS NOT NULL
+        UNION ALL SELECT 'categoria_id', NEW.categoria_id WHERE NEW.categoria_id IS NOT NULL
+        UNION ALL SELECT 'unidade_id', NEW.unidade_id WHERE NEW.unidade_id IS NOT NULL
+        UNION ALL SELECT 'filial_id', NEW.filial_id WHERE NEW.filial_id IS NOT NULL
+        UNION ALL SELECT 'fornecedor_id', NEW.fornecedor_id WHERE NEW.fornecedor_id IS NOT NULL
+        UNION ALL SELECT 'codigo_interno', NEW.codigo_interno WHERE NEW.codigo_interno IS NOT NULL
+        UNION ALL SELECT 'observacoes', NEW.observacoes WHERE NEW.observacoes IS NOT NULL
+        UNION ALL SELECT 'estoque_minimo', NEW.estoque_minimo WHERE NEW.estoque_minimo IS NOT NULL
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_historico_update
+AFTER UPDATE ON brindes
+WHEN OLD.descricao IS NOT NEW.descricao
+    OR OLD.quantidade IS NOT NEW.quantidade
+    OR OLD.valor_unitario IS NOT NEW.valor_unitario
+    OR OLD.categoria_id IS NOT NEW.categoria_id
+    OR OLD.unidade_id IS NOT NEW.unidade_id
+    OR OLD.filial_id IS NOT NEW.filial_id
+    OR OLD.fornecedor_id IS NOT NEW.fornecedor_id
+    OR OLD.codigo_interno IS NOT NEW.codigo_interno
+    OR OLD.observacoes IS NOT NEW.observacoes
+    OR OLD.estoque_minimo IS NOT NEW.estoque_minimo
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores, dados_novos)
+    SELECT 'brindes', NEW.id, 'UPDATE', NULL, json_group_object(campo, antes), json_group_object(campo, depois)
+    FROM (
+        SELECT 'descricao' AS campo, OLD.descricao AS antes, NEW.descricao AS depois WHERE OLD.descricao IS NOT NEW.descricao
+        UNION ALL SELECT 'quantidade', OLD.quantidade, NEW.quantidade WHERE OLD.quantidade IS NOT NEW.quantidade
+        UNION ALL SELECT 'valor_unitario', OLD.valor_unitario, NEW.valor_unitario WHERE OLD.valor_unitario IS NOT NEW.valor_unitario
+        UNION ALL SELECT 'categoria_id', OLD.categoria_id, NEW.categoria_id WHERE OLD.categoria_id IS NOT NEW.categoria_id
+        UNION ALL SELECT 'unidade_id', OLD.unidade_id, NEW.unidade_id WHERE OLD.unidade_id IS NOT NEW.unidade_id
+        UNION ALL SELECT 'filial_id', OLD.filial_id, NEW.filial_id WHERE OLD.filial_id IS NOT NEW.filial_id
+        UNION ALL SELECT 'fornecedor_id', OLD.fornecedor_id, NEW.fornecedor_id WHERE OLD.fornecedor_id IS NOT NEW.fornecedor_id
+        UNION ALL SELECT 'codigo_interno', OLD.codigo_interno, NEW.codigo_interno WHERE OLD.codigo_interno IS NOT NEW.codigo_interno
+        UNION ALL SELECT 'observacoes', OLD.observacoes, NEW.observacoes WHERE OLD.observacoes IS NOT NEW.observacoes
+        UNION ALL SELECT 'estoque_minimo', OLD.estoque_minimo, NEW.estoque_minimo WHERE OLD.estoque_minimo IS NOT NEW.estoque_minimo
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_brindes_historico_delete
+AFTER DELETE ON brindes
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores)
+    SELECT 'brindes', OLD.id, 'DELETE', (
+        SELECT usuario_exclusao_id FROM brindes_excluidos
+        WHERE brinde_id_original = OLD.id ORDER BY id DESC LIMIT 1
+    ), json_group_object(campo, valor)
+    FROM (
+        SELECT 'descricao' AS campo, OLD.descricao AS valor WHERE OLD.descricao IS NOT NULL
+        UNION ALL SELECT 'quantidade', OLD.quantidade WHERE OLD.quantidade IS NOT NULL
+        UNION ALL SELECT 'valor_unitario', OLD.valor_unitario WHERE OLD.valor_unitario IS NOT NULL
+        UNION ALL SELECT 'categoria_id', OLD.categoria_id WHERE OLD.categoria_id IS NOT NULL
+        UNION ALL SELECT 'unidade_id', OLD.unidade_id WHERE OLD.unidade_id IS NOT NULL
+        UNION ALL SELECT 'filial_id', OLD.filial_id WHERE OLD.filial_id IS NOT NULL
+        UNION ALL SELECT 'fornecedor_id', OLD.fornecedor_id WHERE OLD.fornecedor_id IS NOT NULL
+        UNION ALL SELECT 'codigo_interno', OLD.codigo_interno WHERE OLD.codigo_interno IS NOT NULL
+        UNION ALL SELECT 'observacoes', OLD.observacoes WHERE OLD.observacoes IS NOT NULL
+        UNION ALL SELECT 'estoque_minimo', OLD.estoque_minimo WHERE OLD.estoque_minimo IS NOT NULL
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_historico_update
+AFTER UPDATE ON movimentacoes
+WHEN OLD.brinde_id IS NOT NEW.brinde_id
+    OR OLD.tipo IS NOT NEW.tipo
+    OR OLD.quantidade IS NOT NEW.quantidade
+    OR OLD.valor_unitario IS NOT NEW.valor_unitario
+    OR OLD.usuario_id IS NOT NEW.usuario_id
+    OR OLD.justificativa IS NOT NEW.justificativa
+    OR OLD.data_movimentacao IS NOT NEW.data_movimentacao
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores, dados_novos)
+    SELECT 'movimentacoes', NEW.id, 'UPDATE', NEW.usuario_id, json_group_object(campo, antes), json_group_object(campo, depois)
+    FROM (
+        SELECT 'brinde_id' AS campo, OLD.brinde_id AS antes, NEW.brinde_id AS depois WHERE OLD.brinde_id IS NOT NEW.brinde_id
+        UNION ALL SELECT 'tipo', OLD.tipo, NEW.tipo WHERE OLD.tipo IS NOT NEW.tipo
+        UNION ALL SELECT 'quantidade', OLD.quantidade, NEW.quantidade WHERE OLD.quantidade IS NOT NEW.quantidade
+        UNION ALL SELECT 'valor_unitario', OLD.valor_unitario, NEW.valor_unitario WHERE OLD.valor_unitario IS NOT NEW.valor_unitario
+        UNION ALL SELECT 'usuario_id', OLD.usuario_id, NEW.usuario_id WHERE OLD.usuario_id IS NOT NEW.usuario_id
+        UNION ALL SELECT 'justificativa', OLD.justificativa, NEW.justificativa WHERE OLD.justificativa IS NOT NEW.justificativa
+        UNION ALL SELECT 'data_movimentacao', OLD.data_movimentacao, NEW.data_movimentacao WHERE OLD.data_movimentacao IS NOT NEW.data_movimentacao
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transferencias_historico_update
+AFTER UPDATE ON transferencias
+WHEN OLD.brinde_id IS NOT NEW.brinde_id
+    OR OLD.filial_origem_id IS NOT NEW.filial_origem_id
+    OR OLD.filial_destino_id IS NOT NEW.filial_destino_id
+    OR OLD.quantidade IS NOT NEW.quantidade
+    OR OLD.usuario_id IS NOT NEW.usuario_id
+    OR OLD.justificativa IS NOT NEW.justificativa
+    OR OLD.data_transferencia IS NOT NEW.data_transferencia
+BEGIN
+    INSERT INTO historico (tabela, registro_id, acao, usuario_id, dados_anteriores, dados_novos)
+    SELECT 'transferencias', NEW.id, 'UPDATE', NEW.usuario_id, json_group_object(campo, antes), json_group_object(campo, depois)
+    FROM (
+        SELECT 'brinde_id' AS campo, OLD.brinde_id AS antes, NEW.brinde_id AS depois WHERE OLD.brinde_id IS NOT NEW.brinde_id
+        UNION ALL SELECT 'filial_origem_id', OLD.filial_origem_id, NEW.filial_origem_id WHERE OLD.filial_origem_id IS NOT NEW.filial_origem_id
+        UNION ALL SELECT 'filial_destino_id', OLD.filial_destino_id, NEW.filial_destino_id WHERE OLD.filial_destino_id IS NOT NEW.filial_destino_id
+        UNION ALL SELECT 'quantidade', OLD.quantidade, NEW.quantidade WHERE OLD.quantidade IS NOT NEW.quantidade
+        UNION ALL SELECT 'usuario_id', OLD.usuario_id, NEW.usuario_id WHERE OLD.usuario_id IS NOT NEW.usuario_id
+        UNION ALL SELECT 'justificativa', OLD.justificativa, NEW.justificativa WHERE OLD.justificativa IS NOT NEW.justificativa
+        UNION ALL SELECT 'data_transferencia', OLD.data_transferencia, NEW.data_transferencia WHERE OLD.data_transferencia IS NOT NEW.data_transferencia
+    );
+END;
+
+-- ============================================
+-- FECHAMENTOS DE ESTOQUE (ver database/stock_closings.py)
+-- ============================================
+
+-- Foto diária do estoque; o primeiro fechamento de cada mês é mensal e não
+-- expira. ultima_*_id: últimas linhas do razão já refletidas na foto
+CREATE TABLE IF NOT EXISTS estoque_fechamentos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data_fechamento TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    mensal BOOLEAN NOT NULL DEFAULT 0,
+    ultima_movimentacao_id INTEGER NOT NULL,
+    ultima_transferencia_id INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_estoque_fechamentos_data ON estoque_fechamentos(data_fechamento);
+
+-- Sem chave estrangeira para brindes: brindes excluídos continuam nos fechamentos
+CREATE TABLE IF NOT EXISTS estoque_fechamento_itens (
+    fechamento_id INTEGER NOT NULL,
+    brinde_id INTEGER NOT NULL,
+    filial_id INTEGER NOT NULL,
+    quantidade INTEGER NOT NULL,
+    valor_unitario DECIMAL(10, 2),
+    PRIMARY KEY (fechamento_id, brinde_id),
+    FOREIGN KEY (fechamento_id) REFERENCES estoque_fechamentos(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- ============================================
+-- CONSOLIDAÇÃO DIÁRIA DE MOVIMENTAÇÕES (ver database/dao/movimentacao_diaria_dao.py)
+-- ============================================
+
+-- Totais por dia, filial, brinde e tipo; mantida pelos triggers
+-- trg_movimentacoes_diarias_* e lida pelos relatórios de tendência e volume.
+-- valor_total soma quantidade * valor_unitario das movimentações que
+-- registram valor (saídas não guardam valor_unitario)
+CREATE TABLE IF NOT EXISTS movimentacoes_diarias (
+    dia DATE NOT NULL,
+    filial_id INTEGER NOT NULL,
+    brinde_id INTEGER NOT NULL,
+    tipo VARCHAR(10) NOT NULL,
+    movimentacoes INTEGER NOT NULL DEFAULT 0,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    valor_total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, filial_id, brinde_id, tipo)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_movimentacoes_diarias_brinde ON movimentacoes_diarias(brinde_id, dia);
+-- Cobre as séries de todas as filiais: lidas na ordem do índice, sem a tabela
+CREATE INDEX IF NOT EXISTS idx_movimentacoes_diarias_serie
+    ON movimentacoes_diarias(dia, tipo, filial_id, movimentacoes, quantidade, valor_total);
+
+-- Linha presente só dentro da transação de um lote de arquivamento
+-- (database/archive.py): as linhas movidas para os arquivos anuais continuam
+-- nos totais diários
+CREATE TABLE IF NOT EXISTS arquivamento_lote (
+    id INTEGER PRIMARY KEY CHECK(id = 1)
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_diarias_insert
+AFTER INSERT ON movimentacoes
+BEGIN
+    INSERT INTO movimentacoes_diarias (dia, filial_id, brinde_id, tipo, movimentacoes, quantidade, valor_total)
+    SELECT date(NEW.data_movimentacao), filial_id, NEW.brinde_id, NEW.tipo, 1, NEW.quantidade,
+           NEW.quantidade * COALESCE(NEW.valor_unitario, 0)
+    FROM brindes
+    WHERE id = NEW.brinde_id AND date(NEW.data_movimentacao) IS NOT NULL
+    ON CONFLICT(dia, filial_id, brinde_id, tipo) DO UPDATE SET
+        movimentacoes = movimentacoes + 1,
+        quantidade = quantidade + excluded.quantidade,
+        valor_total = valor_total + excluded.valor_total;
+END;
+
+-- Linha antiga: localizada por dia, brinde e tipo (na exclusão em cascata de
+-- um brinde, o brinde já não existe para informar a filial)
+CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_diarias_update
+AFTER UPDATE OF brinde_id, tipo, quantidade, valor_unitario, data_movimentacao ON movimentacoes
+BEGIN
+    UPDATE movimentacoes_diarias SET
+        movimentacoes = movimentacoes - 1,
+        quantidade = quantidade - OLD.quantidade,
+        valor_total = valor_total - OLD.quantidade * COALESCE(OLD.valor_unitario, 0)
+    WHERE dia = date(OLD.data_movimentacao) AND brinde_id = OLD.brinde_id AND tipo = OLD.tipo
+      AND filial_id = COALESCE((SELECT filial_id FROM brindes WHERE id = OLD.brinde_id), filial_id);
+
+    DELETE FROM movimentacoes_diarias
+    WHERE dia = date(OLD.data_movimentacao) AND brinde_id = OLD.brinde_id AND tipo = OLD.tipo
+      AND movimentacoes <= 0;
+
+    INSERT INTO movimentacoes_diarias (dia, filial_id, brinde_id, tipo, movimentacoes, quantidade, valor_total)
+    SELECT date(NEW.data_movimentacao), filial_id, NEW.brinde_id, NEW.tipo, 1, NEW.quantidade,
+           NEW.quantidade * COALESCE(NEW.valor_unitario, 0)
+    FROM brindes
+    WHERE id = NEW.brinde_id AND date(NEW.data_movimentacao) IS NOT NULL
+    ON CONFLICT(dia, filial_id, brinde_id, tipo) DO UPDATE SET
+        movimentacoes = movimentacoes + 1,
+        quantidade = quantidade + excluded.quantidade,
+        valor_total = valor_total + excluded.valor_total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_movimentacoes_diarias_delete
+AFTER DELETE ON movimentacoes
+WHEN NOT EXISTS (SELECT 1 FROM arquivamento_lote)
+BEGIN
+    UPDATE movimentacoes_diarias SET
+        movimentacoes = movimentacoes - 1,
+        quantidade = quantidade - OLD.quantidade,
+        valor_total = valor_total - OLD.quantidade * COALESCE(OLD.valor_unitario, 0)
+    WHERE dia = date(OLD.data_movimentacao) AND brinde_id = OLD.brinde_id AND tipo = OLD.tipo
+      AND filial_id = COALESCE((SELECT filial_id FROM brindes WHERE id = OLD.brinde_id), filial_id);
+
+    DELETE FROM movimentacoes_diarias
+    WHERE dia = date(OLD.data_movimentacao) AND brinde_id = OLD.brinde_id AND tipo = OLD.tipo
+      AND movimentacoes <= 0;
+END;
+
+-- ============================================
+-- CONCILIAÇÃO DO ESTOQUE COM O RAZÃO (ver database/reconciliation.py)
+-- ============================================
+
+-- Último id de cada fonte (movimentacoes, transferencias, historico) já processado
+CREATE TABLE IF NOT EXISTS conciliacao_estado (
+    fonte VARCHAR(20) PRIMARY KEY,
+    ultimo_id INTEGER NOT NULL,
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) WITHOUT ROWID;
+
+-- Saldo do razão por brinde; verificar: a comparar com brindes.quantidade
+-- quando o processamento alcançar o fim das fontes
+CREATE TABLE IF NOT EXISTS conciliacao_saldos (
+    brinde_id INTEGER PRIMARY KEY,
+    saldo_razao INTEGER NOT NULL DEFAULT 0,
+    verificar BOOLEAN NOT NULL DEFAULT 1,
+    divergente_desde TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_conciliacao_verificar ON conciliacao_saldos(brinde_id) WHERE verificar;
+CREATE INDEX IF NOT EXISTS idx_conciliacao_divergentes ON conciliacao_saldos(divergente_desde) WHERE divergente_desde IS NOT NULL;
+
+-- Transferências ainda não processadas apagadas na exclusão em cascata do
+-- brinde de origem: continuam no razão para creditar o brinde de destino
+-- (lidas junto com transferencias e removidas quando o checkpoint passa delas)
+CREATE TABLE IF NOT EXISTS conciliacao_transferencias_excluidas (
+    id INTEGER PRIMARY KEY,
+    brinde_id INTEGER NOT NULL,
+    filial_destino_id INTEGER NOT NULL,
+    quantidade INTEGER NOT NULL,
+    data_transferencia TIMESTAMP
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_transferencias_conciliacao_delete
+AFTER DELETE ON transferencias
+WHEN NOT EXISTS (SELECT 1 FROM arquivamento_lote)
+  AND OLD.id > COALESCE((SELECT ultimo_id FROM conciliacao_estado WHERE fonte = 'transferencias'), 0)
+BEGIN
+    INSERT OR REPLACE INTO conciliacao_transferencias_excluidas (
+        id, brinde_id, filial_destino_id, quantidade, data_transferencia
+    ) VALUES (OLD.id, OLD.brinde_id, OLD.filial_destino_id, OLD.quantidade, OLD.data_transferencia);
+END;
+
+-- ============================================
+-- MANUTENÇÃO DO BANCO (ver utils/maintenance.py)
+-- ============================================
+
+-- Execuções das tarefas de manutenção (ANALYZE, PRAGMA optimize, incremental_vacuum)
+CREATE TABLE IF NOT EXISTS manutencao_execucoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tarefa VARCHAR(50) NOT NULL,
+    executada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    duracao_ms INTEGER NOT NULL,
+    detalhes TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_manutencao_tarefa ON manutencao_execucoes(tarefa, executada_em);
 
 -- Updated: 2025-10-14
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+Fechamentos de Estoque e Estoque em uma Data
+brindes guarda só a quantidade atual. Para responder "quanto a filial Y tinha
+do item X no dia D" seria preciso refazer todas as movimentações desde o
+início; os fechamentos limitam esse trabalho.
+
+Um fechamento (estoque_fechamentos + estoque_fechamento_itens) é a foto de
+quantidade e valor unitário de cada brinde, tirada pela manutenção em período
+ocioso uma vez por dia (ver utils/maintenance.py). Fechamentos diários ficam
+STOCK_CLOSING_KEEP_DAYS dias; o primeiro de cada mês é mensal e fica para
+sempre. Cada fechamento guarda também o último id de movimentacoes e
+transferencias incluído na foto, então linhas que chegam depois com data
+anterior (réplicas que estavam sem conexão) não são contadas em dobro.
+
+O estoque em D parte do fechamento mais próximo depois de D (ou do estoque
+atual, se não houver) e desfaz só as movimentações e transferências entre D e
+a foto, lidas pelo índice de data (e dos arquivos anuais, ver
+database/archive.py). O trabalho fica limitado ao intervalo entre
+fechamentos, não ao histórico inteiro. Voltar a partir da foto seguinte, e
+não avançar a partir da anterior, dispensa saber a quantidade inicial dos
+brindes criados no meio do intervalo, que nenhuma movimentação registra.
+
+Transferências registram só o brinde de origem: a entrada no destino é
+atribuída ao brinde da filial destino com a mesma categoria e descrição
+normalizada, a regra que BrindeDAO.transfer usa para escolhê-lo.
+
+Excluir um brinde apaga em cascata as movimentações e transferências dele;
+o que elas mudaram entre D e a foto não pode ser desfeito. Brindes excluídos
+depois de D entram com a quantidade do fechamento anterior a D, e o destino
+de uma transferência vinda de um brinde excluído fica com o valor da foto.
+"""
+from datetime import date, timedelta
+from config.settings import STOCK_CLOSING_KEEP_DAYS
+from database.connection import db
+from database.archive import archive_manager
+from database.records import record_class
+from utils.fuzzy_match import normalize
+from utils.logger import info, debug
+
+
+# Linhas devolvidas por stock_as_of
+StockRow = record_class((
+    "brinde_id", "descricao", "categoria", "filial_id", "filial",
+    "quantidade", "valor_unitario", "valor_total",
+))
+
+
+class StockClosings:
+    """Fechamentos periódicos de estoque e consulta do estoque em uma data"""
+    
+    @staticmethod
+    def pending():
+        """Indica se ainda não houve fechamento hoje"""
+        row = db.get_connection().execute(
+            "SELECT EXISTS (SELECT 1 FROM estoque_fechamentos WHERE data_fechamento >= date('now'))"
+        ).fetchone()
+        return not row[0]
+    
+    @staticmethod
+    def close():
+        """
+        Registra um fechamento com o estoque atual de todos os brindes e
+        remove os fechamentos diários vencidos
+        
+        Returns:
+            tuple: (id do fechamento, brindes registrados)
+        """
+        conn = db.get_connection()
+        conn.commit()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute(
+                """
+                INSERT INTO estoque_fechamentos (mensal, ultima_movimentacao_id, ultima_transferencia_id)
+                SELECT
+                    NOT EXISTS (
+                        SELECT 1 FROM estoque_fechamentos
+                        WHERE mensal AND data_fechamento >= date('now', 'start of month')
+                    ),
+                    COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'movimentacoes'), 0),
+                    COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'transferencias'), 0)
+                """
+            )
+            fechamento_id = cursor.lastrowid
+            itens = conn.execute(
+                """
+                INSERT INTO estoque_fechamento_itens (fechamento_id, brinde_id, filial_id, quantidade, valor_unitario)
+                SELECT ?, id, filial_id, quantidade, valor_unitario FROM brindes
+                """,
+                (fechamento_id,)
+            ).rowcount
+            conn.execute(
+                "DELETE FROM estoque_fechamentos WHERE NOT mensal AND data_fechamento < datetime('now', ?)",
+                (f"-{STOCK_CLOSING_KEEP_DAYS} days",)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        info(f"Fechamento de estoque {fechamento_id}: {itens} brindes")
+        return fechamento_id, itens
+    
+    def stock_as_of(self, data, filial_id=None):
+        """
+        Estoque de cada brinde no fim do dia informado
+        
+        Args:
+            data: Dia (AAAA-MM-DD, date ou datetime)
+            filial_id: Restringe a uma filial
+        
+        Returns:
+            list: StockRow ordenados por filial e descrição
+        """
+        conn = db.get_connection()
+        dia = date.fromisoformat(str(data)[:10])
+        limite = (dia + timedelta(days=1)).isoformat()
+        
+        base = conn.execute(
+            """
+            SELECT id, data_fechamento, ultima_movimentacao_id, ultima_transferencia_id
+            FROM estoque_fechamentos
+            WHERE data_fechamento >= ?
+            ORDER BY data_fechamento
+            LIMIT 1
+            """,
+            (limite,)
+        ).fetchone()
+        
+        if base:
+            estoque = self._closing_items(base["id"])
+            ate = base["data_fechamento"]
+            ultima_movimentacao = base["ultima_movimentacao_id"]
+            ultima_transferencia = base["ultima_transferencia_id"]
+            debug(f"Estoque em {dia}: a partir do fechamento {base['id']} ({ate})")
+        else:
+            estoque = {
+                row[0]: [row[1], row[2], row[3]]
+                for row in conn.execute("SELECT id, filial_id, quantidade, valor_unitario FROM brindes")
+            }
+            ate = None
+            ultima_movimentacao = ultima_transferencia = None
+            debug(f"Estoque em {dia}: a partir do estoque atual")
+        
+        brindes = self._brinde_info()
+        
+        # Brindes criados depois do dia ainda não existiam
+        for brinde_id in list(estoque):
+            criado = brindes.get(brinde_id, {}).get("created_at")
+            if criado and criado >= limite:
+                del estoque[brinde_id]
+        
+        # Desfazer o que aconteceu entre o dia e a foto
+        for brinde_id, delta in self._movements(limite, ate, ultima_movimentacao).items():
+            if brinde_id in estoque:
+                estoque[brinde_id][1] -= delta
+        
+        sem_destino = 0
+        destinos = self._transfer_targets(brindes, estoque)
+        for origem, filial_destino, quantidade in self._transfers(limite, ate, ultima_transferencia):
+            if origem in estoque:
+                estoque[origem][1] += quantidade
+            brinde = brindes.get(origem, {})
+            destino = destinos.get((filial_destino, brinde.get("categoria_id"), brinde.get("chave")))
+            if destino is None:
+                sem_destino += 1
+            else:
+                estoque[destino][1] -= quantidade
+        if sem_destino:
+            debug(f"Estoque em {dia}: {sem_destino} transferências sem brinde de destino identificado")
+        
+        # Excluídos entre o dia e a foto: quantidade do fechamento anterior
+        for brinde_id, item in self._deleted_since(limite, estoque).items():
+            estoque[brinde_id] = item
+        
+        filiais = {row[0]: row[1] for row in conn.execute("SELECT id, nome FROM filiais")}
+        rows = []
+        for brinde_id, (filial, quantidade, valor_unitario) in estoque.items():
+            if filial_id and filial != filial_id:
+                continue
+            brinde = brindes.get(brinde_id, {})
+            rows.append(StockRow((
+                brinde_id, brinde.get("descricao"), brinde.get("categoria"), filial, filiais.get(filial),
+                quantidade, valor_unitario, quantidade * (valor_unitario or 0),
+            )))
+        rows.sort(key=lambda row: (row["filial"] or "", row["descricao"] or ""))
+        return rows
+    
+    @staticmethod
+    def _closing_items(fechamento_id):
+        """{brinde_id: [filial_id, quantidade, valor_unitario]} de um fechamento"""
+        rows = db.get_connection().execute(
+            """
+            SELECT brinde_id, filial_id, quantidade, valor_unitario
+            FROM estoque_fechamento_itens
+            WHERE fechamento_id = ?
+            """,
+            (fechamento_id,)
+        )
+        return {row[0]: [row[1], row[2], row[3]] for row in rows}
+    
+    @staticmethod
+    def _brinde_info():
+        """Descrição, categoria e criação dos brindes atuais e dos excluídos"""
+        conn = db.get_connection()
+        brindes = {}
+        # Excluídos: categoria pelo nome, para o destino das transferências
+        # que saíram deles e já estavam nos arquivos anuais
+        for row in conn.execute(
+            """
+            SELECT e.brinde_id_original, e.descricao, e.categoria_nome, e.data_criacao, c.id
+            FROM brindes_excluidos e
+            LEFT JOIN categorias c ON c.nome = e.categoria_nome
+            """
+        ):
+            brindes[row[0]] = {
+                "descricao": row[1], "categoria": row[2], "created_at": row[3],
+                "categoria_id": row[4], "chave": normalize(row[1]),
+            }
+        for row in conn.execute(
+            """
+            SELECT b.id, b.descricao, c.nome, b.created_at, b.categoria_id, b.filial_id
+            FROM brindes b
+            LEFT JOIN categorias c ON b.categoria_id = c.id
+            """
+        ):
+            brindes[row[0]] = {
+                "descricao": row[1], "categoria": row[2], "created_at": row[3],
+                "categoria_id": row[4], "filial_id": row[5], "chave": normalize(row[1]),
+            }
+        return brindes
+    
+    @staticmethod
+    def _window(coluna, limite, ate, ultimo_id):
+        """Condição das linhas entre o dia e a foto (já incluídas nela)"""
+        condicao = f"{coluna} >= ?"
+        params = [limite]
+        if ate is not None:
+            condicao += f" AND {coluna} <= ? AND id <= ?"
+            params += [ate, ultimo_id]
+        return condicao, params
+    
+    def _movements(self, limite, ate, ultimo_id):
+        """Saldo das movimentações de cada brinde no intervalo"""
+        conn = db.get_connection()
+        condicao, params = self._window("data_movimentacao", limite, ate, ultimo_id)
+        saldo = {}
+        for rodada in archive_manager.rounds("movimentacoes", limite, ate):
+            for tabela, desde, ate_rodada in rodada:
+                faixa, faixa_params = archive_manager.window("data_movimentacao", desde, ate_rodada)
+                for brinde_id, delta in conn.execute(
+                    f"""
+                    SELECT brinde_id, SUM(CASE WHEN tipo = 'ENTRADA' THEN quantidade ELSE -quantidade END)
+                    FROM {tabela}
+                    WHERE {condicao}{faixa}
+                    GROUP BY brinde_id
+                    """,
+                    params + faixa_params
+                ):
+                    saldo[brinde_id] = saldo.get(brinde_id, 0) + delta
+        return saldo
+    
+    def _transfers(self, limite, ate, ultimo_id):
+        """Transferências (brinde de origem, filial destino, quantidade) no intervalo"""
+        conn = db.get_connection()
+        condicao, params = self._window("data_transferencia", limite, ate, ultimo_id)
+        transferencias = []
+        for rodada in archive_manager.rounds("transferencias", limite, ate):
+            for tabela, desde, ate_rodada in rodada:
+                faixa, faixa_params = archive_manager.window("data_transferencia", desde, ate_rodada)
+                transferencias.extend(conn.execute(
+                    f"SELECT brinde_id, filial_destino_id, quantidade FROM {tabela} WHERE {condicao}{faixa}",
+                    params + faixa_params
+                ).fetchall())
+        return transferencias
+    
+    @staticmethod
+    def _transfer_targets(brindes, estoque):
+        """
+        Brinde que recebe uma transferência, por (filial, categoria, descrição
+        normalizada): a mesma regra de BrindeDAO.transfer, que prefere a
+        descrição idêntica (aqui, a do próprio brinde de menor id)
+        """
+        destinos = {}
+        for brinde_id in sorted(estoque):
+            dados = brindes.get(brinde_id)
+            if dados and "filial_id" in dados:
+                destinos.setdefault((dados["filial_id"], dados["categoria_id"], dados["chave"]), brinde_id)
+        return destinos
+    
+    def _deleted_since(self, limite, estoque):
+        """Brindes do fechamento anterior ao dia excluídos depois dele"""
+        conn = db.get_connection()
+        anterior = conn.execute(
+            "SELECT id FROM estoque_fechamentos WHERE data_fechamento < ? ORDER BY data_fechamento DESC LIMIT 1",
+            (limite,)
+        ).fetchone()
+        if not anterior:
+            return {}
+        
+        excluidos_antes = {
+            row[0] for row in conn.execute(
+                "SELECT brinde_id_original FROM brindes_excluidos WHERE data_exclusao < ?", (limite,)
+            )
+        }
+        return {
+            brinde_id: item for brinde_id, item in self._closing_items(anterior[0]).items()
+            if brinde_id not in estoque and brinde_id not in excluidos_antes
+        }
+
+
+# Instância global
+stock_closings = StockClosings()
+
+# Updated: 2026-10-19
@@ -7,6 +7,10 @@ import customtkinter as ctk
 from config.settings import *
 from utils.auth import auth_manager
 from utils.logger import logger, info, error, warning
+from utils.change_watcher import change_watcher
+from utils.event_manager import event_manager, EVENTS
+from database.connection import is_replica
+from database.backend import is_client
 from ui.components.sidebar import Sidebar
 from ui.components.breadcrumb import Breadcrumb
 from ui.views.dashboard_view import DashboardView
@@ -59,6 +63,26 @@ class App(ctk.CTk):
             info("Carregando Dashboard...")
             self.show_view("Dashboard")
             
+            # Recarregar telas quando outra instância alterar o banco
+            change_watcher.start(self)
+            
+            # Banco trocado (backup restaurado): recriar a tela atual com os dados novos
+            event_manager.subscribe(EVENTS['DATA_RESET'], self._on_data_reset)
+            
+            # Modo réplica: sincronizar com o banco principal em segundo plano
+            if is_replica():
+                self._start_replica_sync()
+            
+            # Backup automático só depois que a primeira tela aparece, em segundo plano
+            # (no modo cliente o backup é do servidor; a réplica vem do banco principal)
+            if not is_client() and not is_replica():
+                self.after(AUTO_BACKUP_DELAY_MS, self._start_auto_backup)
+            
+            # Manutenção do banco (ANALYZE, optimize, vacuum) quando o usuário não está usando o sistema
+            if not is_client():
+                from utils.maintenance import maintenance_scheduler
+                maintenance_scheduler.start(self)
+            
             # Maximizar janela após tudo estar carregado
             self.after(100, lambda: self.state('zoomed'))
             
@@ -70,6 +94,30 @@ class App(ctk.CTk):
             error(traceback.format_exc())
             raise
     
+    def _on_data_reset(self, data=None):
+        """Recria a tela atual depois que o banco inteiro foi trocado"""
+        # Depois do diálogo que disparou a restauração terminar
+        self.after_idle(lambda: self.show_view(self.current_view))
+    
+    def _start_auto_backup(self):
+        """Inicia o backup automático (se necessário) na thread de backup"""
+        from utils.backup_manager import backup_manager
+        backup_manager.schedule_auto_backup()
+    
+    def _start_replica_sync(self):
+        """Inicia a sincronização da réplica e a antecipa após cada alteração local"""
+        from database.replica import replica_sync
+        
+        def on_local_change(data=None):
+            # Alterações recebidas do banco principal não precisam ser reenviadas
+            if not (isinstance(data, dict) and data.get("origem") == "externa"):
+                replica_sync.sync_soon()
+        
+        for evento in ("BRINDE_CREATED", "BRINDE_UPDATED", "BRINDE_DELETED", "STOCK_CHANGED"):
+            event_manager.subscribe(EVENTS[evento], on_local_change)
+        
+        replica_sync.start(auth_manager.get_user_branch())
+    
     def _create_layout(self):
         """Cria layout principal"""
         # Grid principal
@@ -106,6 +154,7 @@ class App(ctk.CTk):
             
             # Atualizar breadcrumb
             self.breadcrumb.set_path(view_name)
+            self.current_view = view_name
             
             # Criar ou recuperar view
             if view_name == "Dashboard":
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor de Estoque
+Processo único dono do banco SQLite. Os aplicativos das filiais, configurados
+com o endereço do servidor (server_address em config/user_config.json), chamam
+os DAOs, relatórios e consultas por HTTP/JSON em vez de abrir o arquivo por
+um compartilhamento de rede (ver database/backend.py).
+
+As conexões são atendidas pelo asyncio; as operações no banco rodam uma de
+cada vez numa thread dedicada, na mesma conexão SQLite (que também mantém o
+cache de consultas), sem travar o atendimento das demais conexões.
+
+Toda requisição precisa trazer o token compartilhado (server_token em
+config/user_config.json, o mesmo no servidor e nas filiais) no cabeçalho
+X-Brindez-Token. O servidor atende só em server_listen_host (padrão:
+127.0.0.1); para as filiais alcançarem, configure o endereço da rede local.
+
+Uso:
+    python server.py [--host 192.168.0.10] [--port 8765] [--db caminho/brindes.db]
+"""
+import argparse
+import asyncio
+import hmac
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config.settings as settings
+
+# O servidor sempre abre o banco diretamente
+settings.DB_BACKEND = "embedded"
+
+
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+# Conexões aguardando aceite (todas as filiais abrindo o aplicativo ao mesmo tempo)
+BACKLOG = 1024
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden",
+    404: "Not Found", 500: "Internal Server Error",
+}
+
+
+class InventoryServer:
+    """Servidor HTTP/JSON (keep-alive) que executa as chamadas dos clientes"""
+    
+    def __init__(self, token):
+        from database.backend import EmbeddedBackend
+        from database.connection import db
+        
+        if not token:
+            raise ValueError("Token do servidor não configurado (server_token)")
+        
+        self._token = token.encode("utf-8")
+        self._db = db
+        self._backend = EmbeddedBackend()
+        self._backend.services()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="brindez-db")
+        self._versions = db.table_versions()
+        
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.connections = 0
+    
+    def _execute(self, service, method, args, kwargs):
+        """Executa a chamada na thread do banco; retorna (resultado codificado, versões alteradas)"""
+        from database.backend import encode, decode
+        
+        before = self._db.get_connection()
+        changes = before.total_changes
+        
+        result = self._backend.call(service, method, decode(args), decode(kwargs))
+        # Geradores (iter_*) são consumidos aqui, ainda na thread do banco
+        result = encode(result)
+        
+        versoes = None
+        conn = self._db.get_connection()
+        if conn is not before or conn.total_changes != changes:
+            versions = self._db.table_versions()
+            versoes = {tabela: versao for tabela, versao in versions.items() if self._versions.get(tabela) != versao}
+            self._versions = versions
+        return result, versoes
+    
+    def _authorized(self, headers):
+        """Indica se a requisição trouxe o token do servidor"""
+        from database.backend import TOKEN_HEADER
+        
+        token = headers.get(TOKEN_HEADER.lower(), "").encode("utf-8")
+        return hmac.compare_digest(token, self._token)
+    
+    async def _dispatch(self, method, path, body, headers):
+        """Roteia a requisição; retorna (status, payload)"""
+        from database.backend import RemoteError
+        
+        if not self._authorized(headers):
+            return 401, {"error": "Token do servidor ausente ou inválido", "type": "PermissionError"}
+        
+        if method == "GET" and path == "/health":
+            return 200, {
+                "status": "ok",
+                "uptime": time.time() - self.started,
+                "requests": self.requests,
+                "errors": self.errors,
+                "connections": self.connections,
+                "query_cache": self._db.query_cache.stats(),
+            }
+        
+        if method != "POST" or path != "/call":
+            return 404, {"error": f"Rota desconhecida: {method} {path}"}
+        
+        try:
+            request = json.loads(body)
+            service, name = request["service"], request["method"]
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"Requisição inválida: {e}", "type": "ValueError"}
+        
+        loop = asyncio.get_running_loop()
+        try:
+            result, versoes = await loop.run_in_executor(
+                self._executor, self._execute, service, name, request.get("args", []), request.get("kwargs", {})
+            )
+        except RemoteError as e:
+            return 403, {"error": str(e), "type": e.error_type}
+        except Exception as e:
+            # Mensagem original: as telas verificam, por exemplo, "UNIQUE constraint failed"
+            return 500, {"error": str(e), "type": type(e).__name__}
+        
+        return 200, {"result": result, "versoes": versoes}
+    
+    async def handle_connection(self, reader, writer):
+        """Atende as requisições de uma conexão até o cliente fechá-la"""
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_SIZE:
+                    break
+                body = await reader.readexactly(length) if length else b""
+                
+                self.requests += 1
+                status, payload = await self._dispatch(method, path, body, headers)
+                if status != 200:
+                    self.errors += 1
+                
+                keep_alive = headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+    
+    async def serve(self, host, port, ready=None):
+        """
+        Atende até ser cancelado
+        
+        Args:
+            ready: Callback chamado com a porta em uso (útil com port=0)
+        """
+        from utils.logger import info
+        
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=BACKLOG)
+        port = server.sockets[0].getsockname()[1]
+        info(f"Servidor de estoque atendendo em {host}:{port}")
+        if ready:
+            ready(port)
+        
+        # Backup automático em segundo plano, sem atrasar o atendimento
+        from utils.backup_manager import backup_manager
+        backup_manager.schedule_auto_backup()
+        
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Servidor de estoque do Sistema de Gestão de Brindes")
+    parser.add_argument(
+        "--host", default=settings.SERVER_LISTEN_HOST,
+        help="Endereço de escuta (padrão: server_listen_host em config/user_config.json, ou 127.0.0.1)"
+    )
+    parser.add_argument("--port", type=int, default=settings.SERVER_DEFAULT_PORT, help="Porta de escuta")
+    parser.add_argument("--db", help="Caminho do banco (padrão: o configurado no aplicativo)")
+    parser.add_argument(
+        "--token-file",
+        help="Arquivo com o token (padrão: server_token em config/user_config.json)"
+    )
+    args = parser.parse_args()
+    
+    token = settings.SERVER_TOKEN
+    if args.token_file:
+        with open(args.token_file, encoding="utf-8") as f:
+            token = f.read().strip()
+    if not token:
+        parser.error("defina server_token em config/user_config.json (o mesmo nas filiais)")
+    
+    if args.db:
+        settings.DB_PATH = args.db
+        from utils.backup_manager import backup_manager
+        backup_manager.db_path = args.db
+    
+    server = InventoryServer(token)
+    try:
+        asyncio.run(server.serve(args.host, args.port, ready=lambda port: print(f"PORT {port}", flush=True)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
+
+# Updated: 2026-10-19
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Componente de Lista com Rolagem Infinita
+Busca a próxima página de dados quando o usuário rola até o final
+"""
+import customtkinter as ctk
+
+
+class InfiniteScrollFrame(ctk.CTkScrollableFrame):
+    """Frame rolável que carrega páginas sob demanda"""
+    
+    def __init__(self, master, fetch_page, render_row, render_header=None,
+                 empty_text="Nenhum registro encontrado", threshold=0.9, **kwargs):
+        """
+        Args:
+            fetch_page: função(cursor) -> (linhas, próximo cursor ou None)
+            render_row: função(parent, linha) que cria o widget da linha
+            render_header: função(parent) que cria o cabeçalho (opcional)
+            empty_text: Texto exibido quando a primeira página vem vazia
+            threshold: Fração da rolagem que dispara a próxima página
+        """
+        super().__init__(master, **kwargs)
+        
+        self.fetch_page = fetch_page
+        self.render_row = render_row
+        self.render_header = render_header
+        self.empty_text = empty_text
+        self.threshold = threshold
+        
+        self._cursor = None
+        self._has_more = True
+        self._loading = False
+        self._total_rows = 0
+        
+        # Interceptar a rolagem para detectar a chegada ao final da lista
+        self._parent_canvas.configure(yscrollcommand=self._on_scroll)
+        
+        self.reset()
+    
+    def set_fetch_page(self, fetch_page):
+        """Troca a fonte de dados (ex.: novo filtro) e recarrega do início"""
+        self.fetch_page = fetch_page
+        self.reset()
+    
+    def reset(self):
+        """Limpa a lista e carrega a primeira página"""
+        for widget in self.winfo_children():
+            widget.destroy()
+        
+        self._cursor = None
+        self._has_more = True
+        self._total_rows = 0
+        
+        if self.render_header:
+            self.render_header(self)
+        
+        self._load_next_page()
+    
+    def _on_scroll(self, first, last):
+        """Atualiza a barra de rolagem e carrega mais linhas perto do final"""
+        self._scrollbar.set(first, last)
+        
+        if float(last) >= self.threshold and self._has_more and not self._loading:
+            self._loading = True
+            self.after_idle(self._load_next_page)
+    
+    def _load_next_page(self):
+        """Busca e renderiza a próxima página"""
+        self._loading = True
+        try:
+            if not self._has_more or not self.winfo_exists():
+                return
+            
+            rows, self._cursor = self.fetch_page(self._cursor)
+            self._has_more = self._cursor is not None
+            
+            for row in rows:
+                self.render_row(self, row)
+            self._total_rows += len(rows)
+            
+            if self._total_rows == 0:
+                no_data = ctk.CTkLabel(
+                    self,
+                    text=self.empty_text,
+                    font=("Segoe UI", 14),
+                    text_color="#999999"
+                )
+                no_data.pack(pady=50)
+        finally:
+            self._loading = False
+
+# Updated: 2026-10-19
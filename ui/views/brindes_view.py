@@ -3,11 +3,13 @@
 Tela de Gestão de Brindes - Versão Completa com BD
 """
 import customtkinter as ctk
-from config.settings import COLORS
-from database.dao import BrindeDAO, CategoriaDAO, UnidadeDAO, FilialDAO, FornecedorDAO, MovimentacaoDAO, BrindeExcluidoDAO
+from config.settings import COLORS, DEFAULT_ITEMS_PER_PAGE
+from database.dao import BrindeDAO, MovimentacaoDAO, BrindeExcluidoDAO
+from database.reference_cache import reference_cache
 from ui.components.form_dialog import FormDialog, ConfirmDialog, show_error, show_info, show_warning
 from ui.components.multi_filial_selector import MultiFilialSelector
 from ui.components.expandable_card import ExpandableCard
+from ui.components.infinite_scroll_frame import InfiniteScrollFrame
 from utils.event_manager import event_manager, EVENTS
 from utils.auth import auth_manager
 
@@ -29,11 +31,12 @@ class BrindesView(ctk.CTkFrame):
             "ordem_valor": None,  # "asc" ou "desc"
             "ordem_qtd": None,    # "asc" ou "desc"
             "data_inicio": None,
-            "data_fim": None
+            "data_fim": None,
+            "busca": None
         }
+        self._search_job = None
         
         self._create_widgets()
-        self.load_brindes_grouped()
         
         # Inscrever para eventos com verificação de segurança
         event_manager.subscribe(EVENTS['BRINDE_CREATED'], lambda d: self._safe_reload())
@@ -111,148 +114,158 @@ class BrindesView(ctk.CTkFrame):
         )
         self.active_filters_label.pack(side="left", padx=10)
         
+        # Busca por texto (atualiza enquanto o usuário digita)
+        self.search_entry = ctk.CTkEntry(
+            actions_frame,
+            placeholder_text="🔎 Buscar descrição, código ou fornecedor",
+            font=("Segoe UI", 12),
+            height=40,
+            width=320,
+            corner_radius=8
+        )
+        self.search_entry.pack(side="right", padx=5)
+        self.search_entry.bind("<KeyRelease>", self._on_search_changed)
+        
         # Container de lista
         list_container = ctk.CTkFrame(main_container, fg_color=COLORS["card_bg"], corner_radius=10)
         list_container.pack(fill="both", expand=True)
         
         # Cabeçalho removido - visualização agrupada não precisa
         
-        # Lista
-        self.list_frame = ctk.CTkScrollableFrame(list_container, fg_color="transparent", corner_radius=0)
+        # Lista com rolagem infinita (carrega a primeira página ao ser criada)
+        self.list_frame = InfiniteScrollFrame(
+            list_container,
+            fetch_page=self._catalog_page_fetcher(),
+            render_row=self._create_brinde_card,
+            empty_text="Nenhum brinde encontrado",
+            fg_color="transparent",
+            corner_radius=0
+        )
         self.list_frame.pack(fill="both", expand=True)
-        
-        # Paginação removida - visualização agrupada não usa paginação
+    
+    def _on_search_changed(self, event=None):
+        """Agenda a busca para quando o usuário parar de digitar"""
+        if self._search_job:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(250, self._apply_search)
+    
+    def _apply_search(self):
+        """Aplica o texto da busca e recarrega a lista"""
+        self._search_job = None
+        termo = self.search_entry.get().strip()
+        
+        # Buscas com menos de 2 caracteres mostram a lista completa
+        busca = termo if len(termo) >= 2 else None
+        if busca != self.filters["busca"]:
+            self.filters["busca"] = busca
+            self._safe_reload()
     
     # Método _create_brinde_row removido - não usado mais na visualização agrupada
     
     # Método load_brindes removido - usando apenas load_brindes_grouped
     
-    def _apply_filters(self, brindes):
-        """Aplica todos os filtros ativos"""
-        filtered = brindes
-        
-        # Filtro por categoria
-        if self.filters["categoria"]:
-            filtered = [b for b in filtered if b["categoria"] == self.filters["categoria"]]
-        
-        # Filtro por filial
-        if self.filters["filial"]:
-            filial_numero = self.filters["filial"].split(" - ")[0]
-            filtered = [b for b in filtered if b["filial_numero"] == filial_numero]
-        
-        # Filtro por fornecedor
-        if self.filters["fornecedor"]:
-            filtered = [b for b in filtered if b.get("fornecedor") == self.filters["fornecedor"]]
-        
-        # Ordenar por valor
-        if self.filters["ordem_valor"]:
-            reverse = self.filters["ordem_valor"] == "desc"
-            filtered = sorted(filtered, key=lambda x: x.get("valor_unitario", 0), reverse=reverse)
+    def _catalog_filters(self, branch_id):
+        """Filtros da tela como ids para BrindeDAO.get_catalog_page"""
+        filtros = {
+            "filial_id": branch_id,
+            "ordem_valor": self.filters["ordem_valor"],
+            "ordem_qtd": self.filters["ordem_qtd"],
+        }
         
-        # Ordenar por quantidade
-        if self.filters["ordem_qtd"]:
-            reverse = self.filters["ordem_qtd"] == "desc"
-            filtered = sorted(filtered, key=lambda x: x.get("quantidade", 0), reverse=reverse)
+        # O diálogo guarda nomes (e a filial como "numero - nome")
+        referencias = (
+            ("categoria", "categorias", "categoria_id", None),
+            ("fornecedor", "fornecedores", "fornecedor_id", None),
+            ("filial", "filiais", "filial_id", "numero"),
+        )
+        for chave, tabela, coluna, campo in referencias:
+            valor = self.filters[chave]
+            if not valor or filtros.get(coluna):
+                continue
+            if chave == "filial":
+                valor = valor.split(" - ")[0]
+            
+            registro = reference_cache.get_by_name(tabela, valor, campo)
+            if registro:
+                filtros[coluna] = registro["id"]
+            else:
+                # Renomeado ou excluído desde que o filtro foi escolhido
+                self.filters[chave] = None
+                self._update_filters_label()
         
-        return filtered
+        return filtros
     
-    # Métodos de paginação e alternância de visualização removidos
+    def _catalog_page_fetcher(self):
+        """Função de página do catálogo com os filtros atuais (ver InfiniteScrollFrame)"""
+        branch_id = None if auth_manager.can_view_all_branches() else auth_manager.get_user_branch()
+        filtros = self._catalog_filters(branch_id)
+        busca = self.filters["busca"]
+        
+        def fetch_page(cursor):
+            if busca:
+                # Busca por texto: apenas os encontrados, na ordem de relevância
+                encontrados = BrindeDAO.search(busca, branch_id, limit=200)
+                ordem = {}
+                for brinde in encontrados:
+                    ordem.setdefault(brinde["descricao"], len(ordem))
+                if not ordem:
+                    return [], None
+                
+                grupos, proximo = BrindeDAO.get_catalog_page(
+                    dict(filtros, descricoes=list(ordem)), limit=len(ordem)
+                )
+                if not (filtros["ordem_valor"] or filtros["ordem_qtd"]):
+                    grupos = sorted(grupos, key=lambda g: ordem[g["descricao"]])
+            else:
+                grupos, proximo = BrindeDAO.get_catalog_page(filtros, DEFAULT_ITEMS_PER_PAGE, cursor)
+            
+            # Registros por filial de todos os grupos da página em uma consulta
+            detalhes = {}
+            for brinde in BrindeDAO.get_catalog_details([g["descricao"] for g in grupos], filtros):
+                detalhes.setdefault(brinde["descricao"], []).append(brinde)
+            
+            return [(grupo, detalhes.get(grupo["descricao"], [])) for grupo in grupos], proximo
+        
+        return fetch_page
     
     def load_brindes_grouped(self):
-        """Carrega lista de brindes agrupados por descrição com filtros aplicados"""
+        """Recarrega a lista de brindes agrupados por descrição com os filtros aplicados"""
         try:
             if not hasattr(self, 'list_frame') or not self.list_frame.winfo_exists():
                 return
         except:
             return
         
-        try:
-            for widget in self.list_frame.winfo_children():
-                widget.destroy()
-        except Exception as e:
-            from utils.logger import logger
-            logger.debug(f"View destruída durante load_brindes_grouped: {e}")
-            return
-        
-        # Determinar filial baseado nas permissões
-        branch_id = None if auth_manager.can_view_all_branches() else auth_manager.get_user_branch()
-        
-        # Buscar brindes agrupados
-        brindes_grouped = BrindeDAO.get_grouped_by_description(branch_id)
-        
-        # Aplicar filtros no agrupamento
-        brindes_grouped = self._apply_filters_grouped(brindes_grouped)
-        
-        if not brindes_grouped:
-            no_data = ctk.CTkLabel(
-                self.list_frame,
-                text="Nenhum brinde encontrado",
-                font=("Segoe UI", 14),
-                text_color="#999999"
-            )
-            no_data.pack(pady=50)
-            return
-        
-        # Criar cards expandíveis
-        for brinde_group in brindes_grouped:
-            # Buscar detalhes por filial
-            detalhes = BrindeDAO.get_by_description(brinde_group['descricao'], branch_id)
-            
-            # Aplicar filtros nos detalhes
-            detalhes = self._apply_filters(detalhes)
-            
-            # Se após filtrar não sobrar nenhum detalhe, pular este brinde
-            if not detalhes:
-                continue
-            
-            # Criar título do card
-            title = f"{brinde_group['descricao']}"
-            if brinde_group.get('codigo_interno'):
-                title += f" ({brinde_group['codigo_interno']})"
-            
-            # Criar card
-            card = ExpandableCard(
-                self.list_frame,
-                title=title,
-                data=detalhes,
-                on_edit=self.edit_brinde,
-                on_add_stock=self.add_stock,
-                on_remove_stock=self.remove_stock,
-                on_transfer=self.transfer_brinde,
-                on_delete=self.delete_brinde
-            )
-            card.pack(fill="x", padx=5, pady=5)
+        self.list_frame.set_fetch_page(self._catalog_page_fetcher())
     
-    def _apply_filters_grouped(self, brindes_grouped):
-        """Aplica filtros aos brindes agrupados"""
-        filtered = brindes_grouped
-        
-        # Filtro por categoria
-        if self.filters["categoria"]:
-            filtered = [b for b in filtered if b.get("categoria") == self.filters["categoria"]]
-        
-        # Filtro por fornecedor
-        if self.filters["fornecedor"]:
-            filtered = [b for b in filtered if b.get("fornecedor") == self.filters["fornecedor"]]
-        
-        # Ordenar por valor médio
-        if self.filters["ordem_valor"]:
-            reverse = self.filters["ordem_valor"] == "desc"
-            filtered = sorted(filtered, key=lambda x: x.get("valor_medio", 0), reverse=reverse)
-        
-        # Ordenar por quantidade total
-        if self.filters["ordem_qtd"]:
-            reverse = self.filters["ordem_qtd"] == "desc"
-            filtered = sorted(filtered, key=lambda x: x.get("quantidade_total", 0), reverse=reverse)
-        
-        return filtered
+    def _create_brinde_card(self, parent, item):
+        """Cria o card expandível de um grupo com os registros por filial"""
+        brinde_group, detalhes = item
+        
+        # Criar título do card
+        title = f"{brinde_group['descricao']}"
+        if brinde_group.get('codigo_interno'):
+            title += f" ({brinde_group['codigo_interno']})"
+        
+        # Criar card
+        card = ExpandableCard(
+            parent,
+            title=title,
+            data=detalhes,
+            on_edit=self.edit_brinde,
+            on_add_stock=self.add_stock,
+            on_remove_stock=self.remove_stock,
+            on_transfer=self.transfer_brinde,
+            on_delete=self.delete_brinde
+        )
+        card.pack(fill="x", padx=5, pady=5)
     
     def show_new_brinde_form(self):
         """Mostra formulário de novo brinde com suporte a múltiplas filiais"""
-        # Buscar dados FRESCOS do banco
-        categorias = CategoriaDAO.get_all()
-        unidades = UnidadeDAO.get_all()
-        fornecedores = FornecedorDAO.get_all()
+        # Dados de referência (cache invalidado pelos eventos *_CHANGED)
+        categorias = reference_cache.get_all("categorias")
+        unidades = reference_cache.get_all("unidades")
+        fornecedores = reference_cache.get_all("fornecedores")
         
         # Controle de permissões por filial
         user_branch_id = auth_manager.get_user_branch()
@@ -261,10 +274,10 @@ class BrindesView(ctk.CTkFrame):
         # Se for matriz, pode cadastrar para todas as filiais
         # Se for filial, só pode cadastrar para sua própria filial
         if is_matriz:
-            filiais = FilialDAO.get_all()
+            filiais = reference_cache.get_all("filiais")
         else:
             # Buscar apenas a filial do usuário
-            filiais = [f for f in FilialDAO.get_all() if f['id'] == user_branch_id]
+            filiais = [f for f in reference_cache.get_all("filiais") if f['id'] == user_branch_id]
         
         # Validar se há dados necessários
         if not categorias:
@@ -363,13 +376,13 @@ class BrindesView(ctk.CTkFrame):
                 
                 # Obter IDs
                 cat_nome = cat_combo.get()
-                categoria = next((c for c in categorias if c["nome"] == cat_nome), None)
+                categoria = reference_cache.get_by_name("categorias", cat_nome)
                 
                 un_codigo = un_combo.get().split(" - ")[0]
-                unidade = next((u for u in unidades if u["codigo"] == un_codigo), None)
+                unidade = reference_cache.get_by_name("unidades", un_codigo)
                 
                 forn_nome = forn_combo.get()
-                fornecedor = next((f for f in fornecedores if f["nome"] == forn_nome), None) if forn_nome != "Nenhum" else None
+                fornecedor = reference_cache.get_by_name("fornecedores", forn_nome) if forn_nome != "Nenhum" else None
                 
                 # Dados do brinde (sem filial_id e quantidade)
                 data = {
@@ -388,15 +401,33 @@ class BrindesView(ctk.CTkFrame):
                     filial_id = list(distribuicao.keys())[0]
                     distribuicao[filial_id] = quantidade_total
                 
-                # Criar brinde(s)
-                BrindeDAO.create_multi_filial(data, distribuicao)
-                
-                event_manager.emit(EVENTS['BRINDE_CREATED'])
-                event_manager.emit(EVENTS['STOCK_CHANGED'])
+                def confirm_create():
+                    # Criar brinde(s)
+                    BrindeDAO.create_multi_filial(data, distribuicao)
+                    
+                    event_manager.emit(EVENTS['BRINDE_CREATED'])
+                    event_manager.emit(EVENTS['STOCK_CHANGED'])
+                    
+                    dialog.safe_destroy()
+                    num_filiais = len(distribuicao)
+                    show_info("Sucesso", f"Brinde cadastrado com sucesso em {num_filiais} filiai{'s' if num_filiais > 1 else ''}!")
+                
+                # Avisar sobre possíveis duplicatas (erros de digitação, acentos, maiúsculas)
+                similares = BrindeDAO.find_similar(data["descricao"])
+                if similares:
+                    lista = "\n".join(
+                        f"  • {s['descricao']} ({s['similaridade']:.0%})" for s in similares
+                    )
+                    ConfirmDialog(
+                        self,
+                        "⚠️ Possível Duplicata",
+                        f"Já existem brindes com descrição parecida:\n\n{lista}\n\n"
+                        f"Cadastrar '{data['descricao']}' mesmo assim?",
+                        confirm_create
+                    )
+                    return
                 
-                dialog.safe_destroy()
-                num_filiais = len(distribuicao)
-                show_info("Sucesso", f"Brinde cadastrado com sucesso em {num_filiais} filiai{'s' if num_filiais > 1 else ''}!")
+                confirm_create()
                 
             except Exception as e:
                 show_error("Erro", f"Erro ao cadastrar brinde: {str(e)}")
@@ -407,11 +438,11 @@ class BrindesView(ctk.CTkFrame):
     
     def edit_brinde(self, brinde):
         """Edita brinde"""
-        # Buscar brinde completo e dados FRESCOS do banco
+        # Buscar brinde completo do banco e dados de referência do cache
         brinde_full = BrindeDAO.get_by_id(brinde["id"])
-        categorias = CategoriaDAO.get_all()
-        unidades = UnidadeDAO.get_all()
-        fornecedores = FornecedorDAO.get_all()
+        categorias = reference_cache.get_all("categorias")
+        unidades = reference_cache.get_all("unidades")
+        fornecedores = reference_cache.get_all("fornecedores")
         
         # Validar se há dados necessários
         if not categorias:
@@ -470,13 +501,13 @@ class BrindesView(ctk.CTkFrame):
             try:
                 # Obter IDs
                 cat_nome = cat_combo.get()
-                categoria = next((c for c in categorias if c["nome"] == cat_nome), None)
+                categoria = reference_cache.get_by_name("categorias", cat_nome)
                 
                 un_codigo = un_combo.get().split(" - ")[0]
-                unidade = next((u for u in unidades if u["codigo"] == un_codigo), None)
+                unidade = reference_cache.get_by_name("unidades", un_codigo)
                 
                 forn_nome = forn_combo.get()
-                fornecedor = next((f for f in fornecedores if f["nome"] == forn_nome), None) if forn_nome != "Nenhum" else None
+                fornecedor = reference_cache.get_by_name("fornecedores", forn_nome) if forn_nome != "Nenhum" else None
                 
                 # Atualizar
                 data = {
@@ -503,10 +534,10 @@ class BrindesView(ctk.CTkFrame):
     
     def transfer_brinde(self, brinde):
         """Transfere brinde para outra filial"""
-        from database.dao import FilialDAO, TransferenciaDAO
+        from database.dao import TransferenciaDAO
         
         # Buscar filiais (exceto a atual)
-        todas_filiais = FilialDAO.get_all()
+        todas_filiais = reference_cache.get_all("filiais")
         outras_filiais = [f for f in todas_filiais if f['id'] != brinde['filial_id']]
         
         if not outras_filiais:
@@ -746,9 +777,9 @@ class BrindesView(ctk.CTkFrame):
         dialog = FormDialog(self, "Filtros Avançados", width=700, height=650)
         
         # Buscar dados para os combos
-        categorias = CategoriaDAO.get_all()
-        filiais = FilialDAO.get_all()
-        fornecedores = FornecedorDAO.get_all()
+        categorias = reference_cache.get_all("categorias")
+        filiais = reference_cache.get_all("filiais")
+        fornecedores = reference_cache.get_all("fornecedores")
         
         # Categoria
         cat_values = ["Todas"] + [c["nome"] for c in categorias]
@@ -848,8 +879,10 @@ class BrindesView(ctk.CTkFrame):
             "ordem_valor": None,
             "ordem_qtd": None,
             "data_inicio": None,
-            "data_fim": None
+            "data_fim": None,
+            "busca": None
         }
+        self.search_entry.delete(0, "end")
         self._update_filters_label()
         self._safe_reload()
     
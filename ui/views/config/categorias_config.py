@@ -5,6 +5,7 @@ Configuração de Categorias
 import customtkinter as ctk
 from config.settings import COLORS
 from database.dao import CategoriaDAO
+from database.reference_cache import reference_cache
 from ui.components.form_dialog import FormDialog, ConfirmDialog, show_error, show_info, show_warning
 from utils.event_manager import event_manager, EVENTS
 from utils.auth import auth_manager
@@ -63,7 +64,7 @@ class CategoriasConfig(ctk.CTkFrame):
             logger.debug(f"View destruída durante load_data: {e}")
             return
         
-        categorias = CategoriaDAO.get_all(ativo_apenas=False)
+        categorias = reference_cache.get_all("categorias", ativo_apenas=False)
         
         if not categorias:
             no_data = ctk.CTkLabel(
@@ -146,8 +147,7 @@ class CategoriasConfig(ctk.CTkFrame):
                 return
             
             # Verificar se já existe
-            categorias_existentes = CategoriaDAO.get_all(ativo_apenas=False)
-            if any(c["nome"].lower() == nome.lower() for c in categorias_existentes):
+            if reference_cache.get_by_name("categorias", nome):
                 show_error("Erro", f"Já existe uma categoria com o nome '{nome}'!")
                 return
             
@@ -189,8 +189,7 @@ class CategoriasConfig(ctk.CTkFrame):
                 return
             
             # Verificar se já existe (exceto a própria categoria)
-            categorias_existentes = CategoriaDAO.get_all(ativo_apenas=False)
-            if any(c["nome"].lower() == nome.lower() and c["id"] != cat["id"] for c in categorias_existentes):
+            if any(c["id"] != cat["id"] for c in reference_cache.get_all_by_name("categorias", nome)):
                 show_error("Erro", f"Já existe outra categoria com o nome '{nome}'!")
                 return
             
@@ -264,9 +263,7 @@ class CategoriasConfig(ctk.CTkFrame):
                     return
                 
                 # Excluir permanentemente
-                from database.connection import db
-                delete_query = "DELETE FROM categorias WHERE id = ?"
-                db.execute_update(delete_query, (cat["id"],))
+                CategoriaDAO.delete_permanent(cat["id"])
                 
                 event_manager.emit(EVENTS['CATEGORIA_CHANGED'])
                 show_info("Sucesso", "Categoria excluída permanentemente!")
@@ -5,6 +5,7 @@ Configuração de Filiais
 import customtkinter as ctk
 from config.settings import COLORS
 from database.dao import FilialDAO
+from database.reference_cache import reference_cache
 from ui.components.form_dialog import FormDialog, ConfirmDialog, show_error, show_info, show_warning
 from utils.event_manager import event_manager, EVENTS
 from utils.auth import auth_manager
@@ -81,7 +82,7 @@ class FiliaisConfig(ctk.CTkFrame):
             logger.debug(f"View destruída durante load_data: {e}")
             return
         
-        filiais = FilialDAO.get_all(ativo_apenas=False)
+        filiais = reference_cache.get_all("filiais", ativo_apenas=False)
         
         if not filiais:
             no_data = ctk.CTkLabel(
@@ -198,8 +199,7 @@ class FiliaisConfig(ctk.CTkFrame):
                 return
             
             # Verificar se já existe filial com este número
-            filiais_existentes = FilialDAO.get_all(ativo_apenas=False)
-            if any(f["numero"] == numero for f in filiais_existentes):
+            if any(f["numero"] == numero for f in reference_cache.get_all_by_name("filiais", numero)):
                 show_error("Erro", f"Já existe uma filial com o número '{numero}'!")
                 return
             
@@ -272,8 +272,10 @@ class FiliaisConfig(ctk.CTkFrame):
                 return
             
             # Verificar se já existe outra filial com este número
-            filiais_existentes = FilialDAO.get_all(ativo_apenas=False)
-            if any(f["numero"] == numero and f["id"] != fil["id"] for f in filiais_existentes):
+            if any(
+                f["numero"] == numero and f["id"] != fil["id"]
+                for f in reference_cache.get_all_by_name("filiais", numero)
+            ):
                 show_error("Erro", f"Já existe outra filial com o número '{numero}'!")
                 return
             
@@ -309,25 +311,19 @@ class FiliaisConfig(ctk.CTkFrame):
             try:
                 if not ativar:
                     # Verificar se há usuários ou brindes nesta filial
-                    from database.connection import db
+                    usuarios, brindes = FilialDAO.count_dependencies(fil["id"])
                     
-                    check_users = "SELECT COUNT(*) as count FROM usuarios WHERE filial_id = ? AND ativo = 1"
-                    result_users = db.execute_query(check_users, (fil["id"],))
-                    
-                    check_brindes = "SELECT COUNT(*) as count FROM brindes WHERE filial_id = ?"
-                    result_brindes = db.execute_query(check_brindes, (fil["id"],))
-                    
-                    if result_users[0]['count'] > 0:
+                    if usuarios > 0:
                         show_error(
                             "Erro",
-                            f"Não é possível desativar!\nExistem {result_users[0]['count']} usuários ativos nesta filial."
+                            f"Não é possível desativar!\nExistem {usuarios} usuários ativos nesta filial."
                         )
                         return
                     
-                    if result_brindes[0]['count'] > 0:
+                    if brindes > 0:
                         show_error(
                             "Erro",
-                            f"Não é possível desativar!\nExistem {result_brindes[0]['count']} brindes nesta filial."
+                            f"Não é possível desativar!\nExistem {brindes} brindes nesta filial."
                         )
                         return
                 
@@ -381,9 +377,7 @@ class FiliaisConfig(ctk.CTkFrame):
                     return
                 
                 # Excluir permanentemente
-                from database.connection import db
-                delete_query = "DELETE FROM filiais WHERE id = ?"
-                db.execute_update(delete_query, (fil["id"],))
+                FilialDAO.delete_permanent(fil["id"])
                 
                 event_manager.emit(EVENTS['FILIAL_CHANGED'])
                 show_info("Sucesso", "Filial excluída permanentemente!")
@@ -5,6 +5,7 @@ Configuração de Fornecedores
 import customtkinter as ctk
 from config.settings import COLORS
 from database.dao import FornecedorDAO
+from database.reference_cache import reference_cache
 from ui.components.form_dialog import FormDialog, ConfirmDialog, show_error, show_info, show_warning
 from utils.event_manager import event_manager, EVENTS
 
@@ -64,7 +65,7 @@ class FornecedoresConfig(ctk.CTkFrame):
             logger.debug(f"View destruída durante load_data: {e}")
             return
         
-        fornecedores = FornecedorDAO.get_all(ativo_apenas=False)
+        fornecedores = reference_cache.get_all("fornecedores", ativo_apenas=False)
         
         for forn in fornecedores:
             self._create_row(forn)
@@ -243,27 +244,16 @@ class FornecedoresConfig(ctk.CTkFrame):
         """Exclui fornecedor permanentemente"""
         def confirm():
             try:
-                from database.connection import db
+                # Excluir permanentemente (a referência nos brindes é removida antes)
+                brindes = FornecedorDAO.delete_permanent(forn["id"])
                 
-                # Verificar se há brindes usando este fornecedor
-                check_query = "SELECT COUNT(*) as count FROM brindes WHERE fornecedor_id = ?"
-                result = db.execute_query(check_query, (forn["id"],))
-                
-                if result[0]['count'] > 0:
-                    # Remover a referência do fornecedor nos brindes primeiro
-                    update_query = "UPDATE brindes SET fornecedor_id = NULL WHERE fornecedor_id = ?"
-                    db.execute_update(update_query, (forn["id"],))
-                    
+                if brindes > 0:
                     show_warning(
                         "Aviso",
-                        f"Existem {result[0]['count']} brindes associados a este fornecedor.\n" +
+                        f"Existem {brindes} brindes associados a este fornecedor.\n" +
                         "A referência ao fornecedor foi removida dos brindes."
                     )
                 
-                # Excluir permanentemente
-                delete_query = "DELETE FROM fornecedores WHERE id = ?"
-                db.execute_update(delete_query, (forn["id"],))
-                
                 event_manager.emit(EVENTS['FORNECEDOR_CHANGED'])
                 show_info("Sucesso", "Fornecedor excluído permanentemente!")
                 
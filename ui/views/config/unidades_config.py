@@ -5,6 +5,7 @@ Configuração de Unidades de Medida
 import customtkinter as ctk
 from config.settings import COLORS
 from database.dao import UnidadeDAO
+from database.reference_cache import reference_cache
 from ui.components.form_dialog import FormDialog, ConfirmDialog, show_error, show_info, show_warning
 from utils.event_manager import event_manager, EVENTS
 from utils.auth import auth_manager
@@ -63,7 +64,7 @@ class UnidadesConfig(ctk.CTkFrame):
             logger.debug(f"View destruída durante load_data: {e}")
             return
         
-        unidades = UnidadeDAO.get_all(ativo_apenas=False)
+        unidades = reference_cache.get_all("unidades", ativo_apenas=False)
         
         if not unidades:
             no_data = ctk.CTkLabel(
@@ -152,8 +153,7 @@ class UnidadesConfig(ctk.CTkFrame):
                 return
             
             # Verificar se já existe
-            unidades_existentes = UnidadeDAO.get_all(ativo_apenas=False)
-            if any(u["codigo"] == codigo for u in unidades_existentes):
+            if any(u["codigo"] == codigo for u in reference_cache.get_all_by_name("unidades", codigo)):
                 show_error("Erro", f"Já existe uma unidade com o código '{codigo}'!")
                 return
             
@@ -201,8 +201,10 @@ class UnidadesConfig(ctk.CTkFrame):
                 return
             
             # Verificar se já existe (exceto a própria unidade)
-            unidades_existentes = UnidadeDAO.get_all(ativo_apenas=False)
-            if any(u["codigo"] == codigo and u["id"] != un["id"] for u in unidades_existentes):
+            if any(
+                u["codigo"] == codigo and u["id"] != un["id"]
+                for u in reference_cache.get_all_by_name("unidades", codigo)
+            ):
                 show_error("Erro", f"Já existe outra unidade com o código '{codigo}'!")
                 return
             
@@ -233,13 +235,11 @@ class UnidadesConfig(ctk.CTkFrame):
             try:
                 if not ativar:
                     # Verificar se há brindes usando esta unidade
-                    from database.connection import db
-                    check_query = "SELECT COUNT(*) as count FROM brindes WHERE unidade_id = ?"
-                    result = db.execute_query(check_query, (un["id"],))
-                    if result[0]['count'] > 0:
+                    brindes = UnidadeDAO.count_brindes(un["id"])
+                    if brindes > 0:
                         show_error(
                             "Erro",
-                            f"Não é possível desativar!\nExistem {result[0]['count']} brindes usando esta unidade."
+                            f"Não é possível desativar!\nExistem {brindes} brindes usando esta unidade."
                         )
                         return
                 
@@ -268,19 +268,16 @@ class UnidadesConfig(ctk.CTkFrame):
         def confirm():
             try:
                 # Verificar se há brindes usando esta unidade
-                from database.connection import db
-                check_query = "SELECT COUNT(*) as count FROM brindes WHERE unidade_id = ?"
-                result = db.execute_query(check_query, (un["id"],))
-                if result[0]['count'] > 0:
+                brindes = UnidadeDAO.count_brindes(un["id"])
+                if brindes > 0:
                     show_error(
                         "Erro",
-                        f"Não é possível excluir!\nExistem {result[0]['count']} brindes usando esta unidade.\n\nDesative a unidade ao invés de excluir."
+                        f"Não é possível excluir!\nExistem {brindes} brindes usando esta unidade.\n\nDesative a unidade ao invés de excluir."
                     )
                     return
                 
                 # Excluir permanentemente
-                delete_query = "DELETE FROM unidades_medida WHERE id = ?"
-                db.execute_update(delete_query, (un["id"],))
+                UnidadeDAO.delete_permanent(un["id"])
                 
                 event_manager.emit(EVENTS['UNIDADE_CHANGED'])
                 show_info("Sucesso", "Unidade excluída permanentemente!")
@@ -4,7 +4,8 @@ Configuração de Usuários
 """
 import customtkinter as ctk
 from config.settings import COLORS, USER_PROFILES
-from database.dao import UsuarioDAO, FilialDAO
+from database.dao import UsuarioDAO
+from database.reference_cache import reference_cache
 from ui.components.form_dialog import FormDialog, ConfirmDialog, show_error, show_info, show_warning
 from utils.event_manager import event_manager, EVENTS
 from utils.auth import auth_manager
@@ -153,7 +154,7 @@ class UsuariosConfig(ctk.CTkFrame):
     def show_new_form(self):
         """Formulário novo usuário"""
         # Buscar dados FRESCOS do banco
-        filiais = FilialDAO.get_all()
+        filiais = reference_cache.get_all("filiais")
         
         # Validar se há filiais cadastradas
         if not filiais:
@@ -222,7 +223,7 @@ class UsuariosConfig(ctk.CTkFrame):
     def edit_usuario(self, usr):
         """Edita usuário"""
         # Buscar dados FRESCOS do banco
-        filiais = FilialDAO.get_all()
+        filiais = reference_cache.get_all("filiais")
         
         # Validar se há filiais cadastradas
         if not filiais:
@@ -317,38 +318,26 @@ class UsuariosConfig(ctk.CTkFrame):
         """Exclui usuário permanentemente"""
         def confirm():
             try:
-                from database.connection import db
+                # Verificar se há movimentações, transferências ou histórico de auditoria deste usuário
+                movimentacoes, transferencias, historico = UsuarioDAO.count_references(usr["id"])
                 
-                # Verificar se há movimentações feitas por este usuário
-                check_mov = "SELECT COUNT(*) as count FROM movimentacoes WHERE usuario_id = ?"
-                result_mov = db.execute_query(check_mov, (usr["id"],))
-                
-                # Verificar se há transferências feitas por este usuário
-                check_trans = "SELECT COUNT(*) as count FROM transferencias WHERE usuario_id = ?"
-                result_trans = db.execute_query(check_trans, (usr["id"],))
-                
-                # Verificar se há histórico de auditoria
-                check_hist = "SELECT COUNT(*) as count FROM historico WHERE usuario_id = ?"
-                result_hist = db.execute_query(check_hist, (usr["id"],))
-                
-                total_registros = result_mov[0]['count'] + result_trans[0]['count'] + result_hist[0]['count']
+                total_registros = movimentacoes + transferencias + historico
                 
                 if total_registros > 0:
                     show_error(
                         "Erro",
                         f"Não é possível excluir este usuário!\n\n"
                         f"Registros encontrados:\n"
-                        f"• Movimentações: {result_mov[0]['count']}\n"
-                        f"• Transferências: {result_trans[0]['count']}\n"
-                        f"• Histórico: {result_hist[0]['count']}\n\n"
+                        f"• Movimentações: {movimentacoes}\n"
+                        f"• Transferências: {transferencias}\n"
+                        f"• Histórico: {historico}\n\n"
                         f"Usuários com histórico não podem ser excluídos.\n"
                         f"Use 'Desativar' ao invés de excluir."
                     )
                     return
                 
                 # Excluir permanentemente
-                delete_query = "DELETE FROM usuarios WHERE id = ?"
-                db.execute_update(delete_query, (usr["id"],))
+                UsuarioDAO.delete_permanent(usr["id"])
                 
                 event_manager.emit(EVENTS['USUARIO_CHANGED'])
                 show_info("Sucesso", "Usuário excluído permanentemente!")
@@ -165,7 +165,7 @@ class ConfiguracoesView(ctk.CTkFrame):
         
         info_text = ctk.CTkLabel(
             info_frame,
-            text="ℹ️ O sistema mantém automaticamente apenas os 2 backups mais recentes.\nBackups são criados automaticamente a cada hora quando necessário.",
+            text="ℹ️ O sistema mantém o último backup de cada hora, dia, semana e mês.\nBackups são criados automaticamente a cada hora, apenas se o banco foi alterado.",
             font=("Segoe UI", 11),
             text_color="#1976d2",
             justify="center"
@@ -177,7 +177,9 @@ class ConfiguracoesView(ctk.CTkFrame):
         buttons_frame.pack(fill="x", padx=20, pady=20)
         
         # Botão criar backup
-        create_btn = ctk.CTkButton(
+        self._backup_future = None
+        self._backup_status_job = None
+        self.create_backup_btn = ctk.CTkButton(
             buttons_frame,
             text="📁 Criar Backup Agora",
             font=("Segoe UI", 12, "bold"),
@@ -186,7 +188,7 @@ class ConfiguracoesView(ctk.CTkFrame):
             fg_color=COLORS["primary"],
             command=self._create_manual_backup
         )
-        create_btn.pack(side="left", padx=(0, 10))
+        self.create_backup_btn.pack(side="left", padx=(0, 10))
         
         # Botão listar backups
         list_btn = ctk.CTkButton(
@@ -200,6 +202,26 @@ class ConfiguracoesView(ctk.CTkFrame):
         )
         list_btn.pack(side="left", padx=10)
         
+        # Banco criado antes do auto_vacuum incremental: conversão (VACUUM completo) sob demanda
+        self._convert_future = None
+        try:
+            from database.backend import is_client
+            from utils.maintenance import maintenance_scheduler
+            needs_conversion = not is_client() and maintenance_scheduler.needs_conversion()
+        except Exception:
+            needs_conversion = False
+        if needs_conversion:
+            self.convert_btn = ctk.CTkButton(
+                buttons_frame,
+                text="🗜️ Compactar Banco",
+                font=("Segoe UI", 12, "bold"),
+                height=40,
+                width=180,
+                fg_color=COLORS["warning"],
+                command=self._convert_database
+            )
+            self.convert_btn.pack(side="left", padx=10)
+        
         # Status dos backups
         self.backup_status_frame = ctk.CTkFrame(card, fg_color="#f8f9fa", corner_radius=8)
         self.backup_status_frame.pack(fill="x", padx=20, pady=(10, 20))
@@ -208,21 +230,94 @@ class ConfiguracoesView(ctk.CTkFrame):
         self._update_backup_status()
     
     def _create_manual_backup(self):
-        """Cria backup manual"""
+        """Cria backup manual (em segundo plano, a interface continua respondendo)"""
         try:
             from database.connection import db
-            from ui.components.form_dialog import show_info, show_error
+            from utils.backup_manager import backup_manager
+            from ui.components.form_dialog import show_info
             
-            backup_path = db.create_backup("manual")
-            if backup_path:
-                show_info("Sucesso", f"Backup criado com sucesso!\n\n{backup_path}")
-                self._update_backup_status()
-            else:
-                show_error("Erro", "Falha ao criar backup!")
+            if self._backup_future is not None and not self._backup_future.done():
+                show_info("Backup", "Já existe um backup em andamento.")
+                return
+            
+            self._backup_future = backup_manager.submit(db.create_backup, "manual")
+            self.create_backup_btn.configure(state="disabled", text="⏳ Criando backup...")
+            self.after(200, self._check_manual_backup)
         except Exception as e:
             from ui.components.form_dialog import show_error
             show_error("Erro", f"Erro ao criar backup: {str(e)}")
     
+    def _check_manual_backup(self):
+        """Aguarda o backup manual sem bloquear o loop da interface"""
+        from ui.components.form_dialog import show_info, show_error
+        
+        try:
+            if not self._backup_future.done():
+                self.after(200, self._check_manual_backup)
+                return
+            self.create_backup_btn.configure(state="normal", text="📁 Criar Backup Agora")
+        except Exception:
+            # Tela fechada durante o backup
+            return
+        
+        try:
+            backup_path = self._backup_future.result()
+        except Exception as e:
+            show_error("Erro", f"Erro ao criar backup: {str(e)}")
+            return
+        
+        if backup_path:
+            show_info("Sucesso", f"Backup criado com sucesso!\n\n{backup_path}")
+            self._update_backup_status()
+        else:
+            show_error("Erro", "Falha ao criar backup!")
+    
+    def _convert_database(self):
+        """Ativa o auto_vacuum incremental no banco (VACUUM completo na thread de backup)"""
+        from ui.components.form_dialog import ConfirmDialog, show_error
+        
+        def confirm_convert():
+            try:
+                from utils.backup_manager import backup_manager
+                from utils.maintenance import maintenance_scheduler
+                
+                self._convert_future = backup_manager.submit(maintenance_scheduler.convert_auto_vacuum)
+                self.convert_btn.configure(state="disabled", text="⏳ Compactando...")
+                self.after(500, self._check_convert)
+            except Exception as e:
+                show_error("Erro", f"Erro ao compactar o banco: {str(e)}")
+        
+        ConfirmDialog(
+            self,
+            "⚠️ Compactar Banco",
+            "O banco será reescrito por inteiro para liberar espaço automaticamente "
+            "daqui em diante.\n\nEnquanto isso, as gravações deste e dos outros "
+            "computadores ficam aguardando. Faça fora do horário de uso.\n\nContinuar?",
+            confirm_convert
+        )
+    
+    def _check_convert(self):
+        """Aguarda a compactação sem bloquear o loop da interface"""
+        from ui.components.form_dialog import show_info, show_error
+        
+        try:
+            if not self._convert_future.done():
+                self.after(500, self._check_convert)
+                return
+        except Exception:
+            # Tela fechada durante a compactação
+            return
+        
+        try:
+            detalhes = self._convert_future.result()
+        except Exception as e:
+            self.convert_btn.configure(state="normal", text="🗜️ Compactar Banco")
+            show_error("Erro", f"Erro ao compactar o banco: {str(e)}")
+            return
+        
+        self.convert_btn.pack_forget()
+        show_info("Sucesso", f"Banco compactado com sucesso!\n\n{detalhes}")
+    
     def _show_backups_list(self):
         """Mostra lista de backups disponíveis"""
         from ui.components.form_dialog import FormDialog
@@ -269,7 +364,10 @@ class ConfiguracoesView(ctk.CTkFrame):
                     
                     # Tamanho
                     size_mb = backup["size"] / (1024 * 1024)
-                    size_label = ctk.CTkLabel(row, text=f"{size_mb:.1f} MB", font=("Segoe UI", 10))
+                    stored_mb = backup["stored"] / (1024 * 1024)
+                    size_label = ctk.CTkLabel(
+                        row, text=f"{size_mb:.1f} MB (+{stored_mb:.1f} MB gravados)", font=("Segoe UI", 10)
+                    )
                     size_label.grid(row=0, column=1, padx=10, pady=8, sticky="w")
                     
                     # Data
@@ -392,18 +490,25 @@ class ConfiguracoesView(ctk.CTkFrame):
     
     def _restore_backup(self, backup_path, dialog):
         """Restaura um backup específico"""
-        from ui.components.form_dialog import ConfirmDialog, show_info, show_error
+        from ui.components.form_dialog import ConfirmDialog, show_error
         
         def confirm_restore():
             try:
-                from database.connection import db
-                success = db.restore_backup(backup_path)
-                if success:
-                    dialog.safe_destroy()
-                    show_info("Sucesso", "Backup restaurado com sucesso!\n\nO sistema foi atualizado.")
-                    self._update_backup_status()
-                else:
-                    show_error("Erro", "Falha ao restaurar backup!")
+                from database.backend import is_client
+                
+                # No modo cliente o banco é do servidor: restaurar lá, com o aplicativo em modo embutido
+                if is_client():
+                    show_error(
+                        "Erro",
+                        "A restauração de backups é feita no computador do servidor de estoque."
+                    )
+                    return
+                
+                # Remontar/verificar o backup e copiar o banco atual em segundo plano;
+                # a interface só espera a troca do conteúdo do banco
+                from utils.backup_manager import backup_manager
+                future = backup_manager.submit(backup_manager.prepare_restore, backup_path)
+                self.after(100, lambda: self._check_restore(backup_path, dialog, future))
             except Exception as e:
                 show_error("Erro", f"Erro ao restaurar backup: {str(e)}")
         
@@ -414,6 +519,47 @@ class ConfiguracoesView(ctk.CTkFrame):
             confirm_restore
         )
     
+    def _check_restore(self, backup_path, dialog, future):
+        """Aguarda a preparação da restauração sem bloquear o loop da interface"""
+        from ui.components.form_dialog import show_error
+        
+        if not future.done():
+            self.after(100, lambda: self._check_restore(backup_path, dialog, future))
+            return
+        
+        try:
+            prepared = future.result()
+        except Exception as e:
+            show_error("Erro", f"Erro ao restaurar backup: {str(e)}")
+            return
+        
+        if prepared is None:
+            show_error("Erro", "Falha ao restaurar backup!")
+            return
+        self._finish_restore(backup_path, dialog, prepared)
+    
+    def _finish_restore(self, backup_path, dialog, prepared=None):
+        """Grava o backup no banco aberto e avisa as telas"""
+        from ui.components.form_dialog import show_info, show_error
+        
+        try:
+            from database.connection import db
+            
+            if prepared is None:
+                success = db.restore_backup(backup_path)
+            else:
+                success = db.restore_backup(backup_path, prepared=prepared)
+            
+            if success:
+                # A própria conexão emite DATA_RESET
+                dialog.safe_destroy()
+                # A tela é recriada com os dados restaurados (inclusive o status dos backups)
+                show_info("Sucesso", "Backup restaurado com sucesso!\n\nO sistema foi atualizado.")
+            else:
+                show_error("Erro", "Falha ao restaurar backup!")
+        except Exception as e:
+            show_error("Erro", f"Erro ao restaurar backup: {str(e)}")
+    
     def _update_backup_status(self):
         """Atualiza status dos backups"""
         try:
@@ -442,6 +588,29 @@ class ConfiguracoesView(ctk.CTkFrame):
                     text_color="#666666"
                 )
                 latest_label.pack()
+            
+            # Backup em segundo plano (automático ou manual) nesta sessão
+            from utils.backup_manager import backup_manager
+            current = backup_manager.get_status()
+            if current["state"] in ("running", "failed"):
+                tipo = "automático" if current["reason"].startswith("auto") else current["reason"]
+                if current["state"] == "running":
+                    text = f"⏳ Backup {tipo} em andamento desde {current['started'].strftime('%H:%M:%S')}..."
+                    color = COLORS["info"]
+                else:
+                    text = f"❌ Falha no backup {tipo} às {current['finished'].strftime('%H:%M:%S')} (ver log)"
+                    color = COLORS["danger"]
+                running_label = ctk.CTkLabel(
+                    self.backup_status_frame,
+                    text=text,
+                    font=("Segoe UI", 10, "bold"),
+                    text_color=color
+                )
+                running_label.pack(pady=(5, 10))
+            
+            # Acompanhar até o backup terminar
+            if current["state"] == "running" and self._backup_status_job is None:
+                self._backup_status_job = self.after(1000, self._refresh_backup_status)
         
         except Exception as e:
             error_label = ctk.CTkLabel(
@@ -452,6 +621,15 @@ class ConfiguracoesView(ctk.CTkFrame):
             )
             error_label.pack(pady=10)
     
+    def _refresh_backup_status(self):
+        """Atualiza o indicador enquanto um backup em segundo plano estiver rodando"""
+        self._backup_status_job = None
+        try:
+            self._update_backup_status()
+        except Exception:
+            # Tela fechada
+            pass
+    
     def _create_fornecedores_tab(self):
         """Cria aba de fornecedores"""
         from ui.views.config.fornecedores_config import FornecedoresConfig
@@ -6,6 +6,7 @@ import customtkinter as ctk
 from config.settings import COLORS
 from utils.auth import auth_manager
 from database.dao import BrindeDAO
+from utils.event_manager import event_manager, EVENTS
 
 
 class DashboardView(ctk.CTkFrame):
@@ -18,6 +19,22 @@ class DashboardView(ctk.CTkFrame):
         
         self._create_widgets()
         self.load_data()
+        
+        # Inscrever para eventos (inclusive alterações feitas por outras instâncias)
+        event_manager.subscribe(EVENTS['BRINDE_CREATED'], lambda d: self._safe_reload())
+        event_manager.subscribe(EVENTS['BRINDE_UPDATED'], lambda d: self._safe_reload())
+        event_manager.subscribe(EVENTS['BRINDE_DELETED'], lambda d: self._safe_reload())
+        event_manager.subscribe(EVENTS['STOCK_CHANGED'], lambda d: self._safe_reload())
+        event_manager.subscribe(EVENTS['CATEGORIA_CHANGED'], lambda d: self._safe_reload())
+    
+    def _safe_reload(self):
+        """Recarrega os indicadores de forma segura, verificando se a view ainda existe"""
+        try:
+            if hasattr(self, 'winfo_exists') and self.winfo_exists():
+                self.load_data()
+        except Exception as e:
+            from utils.logger import logger
+            logger.debug(f"View não existe mais durante _safe_reload: {e}")
     
     def _create_widgets(self):
         """Cria os widgets do dashboard"""
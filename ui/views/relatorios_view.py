@@ -7,8 +7,11 @@ from ui.components.form_dialog import show_info, show_error, show_warning, FormD
 from config.settings import COLORS
 from utils.report_generator import report_generator
 from utils.data_export import data_exporter
-from database.dao import BrindeDAO, BrindeExcluidoDAO
+from database.dao import BrindeDAO, BrindeExcluidoDAO, MovimentacaoDAO, TransferenciaDAO
+from ui.components.infinite_scroll_frame import InfiniteScrollFrame
+from utils.event_manager import event_manager, EVENTS
 from datetime import datetime, timedelta
+from itertools import chain
 import os
 import subprocess
 
@@ -172,7 +175,7 @@ class RelatoriosView(ctk.CTkFrame):
             filter_frame,
             text="🔄 Atualizar",
             width=100,
-            command=lambda: self.load_brindes_excluidos(list_frame)
+            command=lambda: list_frame.reset()
         )
         refresh_btn.pack(side="right")
         
@@ -182,41 +185,27 @@ class RelatoriosView(ctk.CTkFrame):
             text="📊 Exportar XLSX",
             width=150,
             fg_color=COLORS["success"],
-            command=lambda: self.export_report(BrindeExcluidoDAO.get_all(limit=50), "brindes_excluidos", "excel")
+            command=lambda: self.export_report(BrindeExcluidoDAO.iter_all(), "brindes_excluidos", "excel")
         )
         xlsx_btn.pack(side="right", padx=5)
         
-        # Frame para lista
-        list_frame = ctk.CTkScrollableFrame(dialog.content_frame, fg_color="white", corner_radius=5)
+        # Lista com rolagem infinita (carrega páginas conforme o usuário rola)
+        list_frame = InfiniteScrollFrame(
+            dialog.content_frame,
+            fetch_page=lambda cursor: BrindeExcluidoDAO.get_page(cursor),
+            render_row=self._create_brinde_excluido_row,
+            render_header=self._create_brindes_excluidos_header,
+            empty_text="Nenhum brinde excluído encontrado",
+            fg_color="white",
+            corner_radius=5
+        )
         list_frame.pack(fill="both", expand=True)
         
-        # Carregar dados
-        self.load_brindes_excluidos(list_frame)
-        
         # Botão fechar
         dialog.add_buttons(lambda: dialog.safe_destroy())
     
-    def load_brindes_excluidos(self, list_frame):
-        """Carrega lista de brindes excluídos"""
-        
-        # Limpar lista atual
-        for widget in list_frame.winfo_children():
-            widget.destroy()
-        
-        # Buscar dados
-        brindes_excluidos = BrindeExcluidoDAO.get_all(limit=50)
-        
-        if not brindes_excluidos:
-            no_data = ctk.CTkLabel(
-                list_frame,
-                text="Nenhum brinde excluído encontrado",
-                font=("Segoe UI", 14),
-                text_color="#999999"
-            )
-            no_data.pack(pady=50)
-            return
-        
-        # Cabeçalho
+    def _create_brindes_excluidos_header(self, list_frame):
+        """Cria cabeçalho da lista de brindes excluídos"""
         header = ctk.CTkFrame(list_frame, fg_color="#e3f2fd", corner_radius=5)
         header.pack(fill="x", padx=5, pady=(5, 10))
         
@@ -224,33 +213,33 @@ class RelatoriosView(ctk.CTkFrame):
         for i, text in enumerate(headers):
             label = ctk.CTkLabel(header, text=text, font=("Segoe UI", 12, "bold"))
             label.grid(row=0, column=i, padx=10, pady=10, sticky="w")
+    
+    def _create_brinde_excluido_row(self, list_frame, brinde):
+        """Cria uma linha da lista de brindes excluídos"""
+        row = ctk.CTkFrame(list_frame, fg_color="#f8f9fa", corner_radius=3)
+        row.pack(fill="x", padx=5, pady=2)
         
-        # Dados
-        for brinde in brindes_excluidos:
-            row = ctk.CTkFrame(list_frame, fg_color="#f8f9fa", corner_radius=3)
-            row.pack(fill="x", padx=5, pady=2)
-            
-            # Formatar data
-            try:
-                data_exclusao = datetime.fromisoformat(brinde["data_exclusao"].replace("Z", "+00:00"))
-                data_str = data_exclusao.strftime("%d/%m/%Y %H:%M")
-            except:
-                data_str = brinde["data_exclusao"]
-            
-            # Dados da linha
-            dados = [
-                brinde["descricao"][:30] + "..." if len(brinde["descricao"]) > 30 else brinde["descricao"],
-                brinde["categoria_nome"] or "-",
-                str(brinde["quantidade"] or 0),
-                f"R$ {brinde['valor_unitario']:.2f}" if brinde["valor_unitario"] else "R$ 0,00",
-                data_str,
-                brinde["usuario_exclusao_nome"],
-                brinde["motivo_exclusao"][:20] + "..." if brinde["motivo_exclusao"] and len(brinde["motivo_exclusao"]) > 20 else (brinde["motivo_exclusao"] or "-")
-            ]
-            
-            for i, text in enumerate(dados):
-                label = ctk.CTkLabel(row, text=text, font=("Segoe UI", 10))
-                label.grid(row=0, column=i, padx=8, pady=8, sticky="w")
+        # Formatar data
+        try:
+            data_exclusao = datetime.fromisoformat(brinde["data_exclusao"].replace("Z", "+00:00"))
+            data_str = data_exclusao.strftime("%d/%m/%Y %H:%M")
+        except:
+            data_str = brinde["data_exclusao"]
+        
+        # Dados da linha
+        dados = [
+            brinde["descricao"][:30] + "..." if len(brinde["descricao"]) > 30 else brinde["descricao"],
+            brinde["categoria_nome"] or "-",
+            str(brinde["quantidade"] or 0),
+            f"R$ {brinde['valor_unitario']:.2f}" if brinde["valor_unitario"] else "R$ 0,00",
+            data_str,
+            brinde["usuario_exclusao_nome"],
+            brinde["motivo_exclusao"][:20] + "..." if brinde["motivo_exclusao"] and len(brinde["motivo_exclusao"]) > 20 else (brinde["motivo_exclusao"] or "-")
+        ]
+        
+        for i, text in enumerate(dados):
+            label = ctk.CTkLabel(row, text=text, font=("Segoe UI", 10))
+            label.grid(row=0, column=i, padx=8, pady=8, sticky="w")
     
     def show_estoque_atual(self):
         """Relatório de estoque atual"""
@@ -265,15 +254,12 @@ class RelatoriosView(ctk.CTkFrame):
         export_frame = ctk.CTkFrame(dialog.content_frame, fg_color="transparent")
         export_frame.pack(fill="x", pady=(0, 10))
         
-        # Buscar dados
-        dados = report_generator.get_estoque_atual(branch_id)
-        
         excel_btn = ctk.CTkButton(
             export_frame,
             text="📊 Exportar Excel",
             width=150,
             fg_color=COLORS["success"],
-            command=lambda: self.export_report(dados, "estoque_atual", "excel")
+            command=lambda: self.export_report(report_generator.iter_estoque(branch_id), "estoque_atual", "excel")
         )
         excel_btn.pack(side="left", padx=5)
         
@@ -282,7 +268,7 @@ class RelatoriosView(ctk.CTkFrame):
             text="📄 Exportar CSV",
             width=150,
             fg_color=COLORS["info"],
-            command=lambda: self.export_report(dados, "estoque_atual", "csv")
+            command=lambda: self.export_report(report_generator.iter_estoque(branch_id), "estoque_atual", "csv")
         )
         csv_btn.pack(side="left", padx=5)
         
@@ -290,20 +276,17 @@ class RelatoriosView(ctk.CTkFrame):
         list_frame = ctk.CTkScrollableFrame(dialog.content_frame, fg_color="white", corner_radius=5)
         list_frame.pack(fill="both", expand=True, pady=10)
         
-        if not dados:
-            no_data = ctk.CTkLabel(list_frame, text="Nenhum item encontrado", font=("Segoe UI", 14), text_color="#999999")
-            no_data.pack(pady=50)
-        else:
-            self._create_table(list_frame, dados, [
-                ("Descrição", "descricao"),
-                ("Categoria", "categoria"),
-                ("Qtd", "quantidade"),
-                ("Unidade", "unidade"),
-                ("Valor Unit.", "valor_unitario"),
-                ("Valor Total", "valor_total"),
-                ("Filial", "filial"),
-                ("Status", "status_estoque")
-            ])
+        # Linhas chegam em lotes e são desenhadas aos poucos
+        self._create_table(list_frame, report_generator.iter_estoque(branch_id), [
+            ("Descrição", "descricao"),
+            ("Categoria", "categoria"),
+            ("Qtd", "quantidade"),
+            ("Unidade", "unidade"),
+            ("Valor Unit.", "valor_unitario"),
+            ("Valor Total", "valor_total"),
+            ("Filial", "filial"),
+            ("Status", "status_estoque")
+        ], empty_text="Nenhum item encontrado")
         
         dialog.add_buttons(lambda: dialog.safe_destroy())
     
@@ -342,52 +325,43 @@ class RelatoriosView(ctk.CTkFrame):
         
         # Botão filtrar
         filter_btn = ctk.CTkButton(filter_frame, text="🔍 Filtrar", width=80,
-                                   command=lambda: self._load_movimentacoes(list_frame, start_entry.get(), end_entry.get()))
+                                   command=lambda: list_frame.set_fetch_page(
+                                       self._movimentacoes_page_fetcher(branch_id, start_entry.get(), end_entry.get())))
         filter_btn.pack(side="left", padx=10)
         
         # Botão exportar XLSX
         xlsx_btn = ctk.CTkButton(filter_frame, text="📊 Exportar XLSX", width=150,
                                  fg_color=COLORS["success"],
-                                 command=lambda: self.export_report(report_generator.get_movimentacoes(start_entry.get(), end_entry.get(), branch_id), "movimentacoes", "excel"))
+                                 command=lambda: self.export_report(report_generator.iter_movimentacoes(start_entry.get(), end_entry.get(), branch_id), "movimentacoes", "excel"))
         xlsx_btn.pack(side="left", padx=10)
         
-        # Frame para lista
-        list_frame = ctk.CTkScrollableFrame(dialog.content_frame, fg_color="white", corner_radius=5)
+        # Lista com rolagem infinita (carrega páginas conforme o usuário rola)
+        colunas = [
+            ("Data", "data_movimentacao"),
+            ("Tipo", "tipo"),
+            ("Brinde", "brinde"),
+            ("Qtd", "quantidade"),
+            ("Valor Unit.", "valor_unitario"),
+            ("Valor Total", "valor_total"),
+            ("Usuário", "usuario"),
+            ("Filial", "filial")
+        ]
+        list_frame = InfiniteScrollFrame(
+            dialog.content_frame,
+            fetch_page=self._movimentacoes_page_fetcher(branch_id, start_entry.get(), end_entry.get()),
+            render_row=lambda parent, item: self._create_table_row(parent, item, colunas),
+            render_header=lambda parent: self._create_table_header(parent, colunas),
+            empty_text="Nenhuma movimentação encontrada",
+            fg_color="white",
+            corner_radius=5
+        )
         list_frame.pack(fill="both", expand=True, pady=10)
         
-        # Carregar dados iniciais
-        self._load_movimentacoes(list_frame, start_entry.get(), end_entry.get())
-        
         dialog.add_buttons(lambda: dialog.safe_destroy())
     
-    def _load_movimentacoes(self, list_frame, data_inicio, data_fim):
-        """Carrega movimentações"""
-        from utils.report_generator import report_generator
-        from utils.auth import auth_manager
-        
-        # Determinar filial baseado nas permissões
-        branch_id = None if auth_manager.can_view_all_branches() else auth_manager.get_user_branch()
-        
-        # Limpar lista
-        for widget in list_frame.winfo_children():
-            widget.destroy()
-        
-        dados = report_generator.get_movimentacoes(data_inicio, data_fim, branch_id)
-        
-        if not dados:
-            no_data = ctk.CTkLabel(list_frame, text="Nenhuma movimentação encontrada", font=("Segoe UI", 14), text_color="#999999")
-            no_data.pack(pady=50)
-        else:
-            self._create_table(list_frame, dados, [
-                ("Data", "data_movimentacao"),
-                ("Tipo", "tipo"),
-                ("Brinde", "brinde"),
-                ("Qtd", "quantidade"),
-                ("Valor Unit.", "valor_unitario"),
-                ("Valor Total", "valor_total"),
-                ("Usuário", "usuario"),
-                ("Filial", "filial")
-            ])
+    def _movimentacoes_page_fetcher(self, branch_id, data_inicio, data_fim):
+        """Retorna função que busca páginas de movimentações com os filtros informados"""
+        return lambda cursor: MovimentacaoDAO.get_page(branch_id, data_inicio, data_fim, cursor)
     
     def show_estoque_baixo(self):
         """Relatório de estoque baixo"""
@@ -407,27 +381,21 @@ class RelatoriosView(ctk.CTkFrame):
         
         xlsx_btn = ctk.CTkButton(export_frame, text="📊 Exportar XLSX", width=150,
                                  fg_color=COLORS["success"],
-                                 command=lambda: self.export_report(report_generator.get_estoque_baixo(branch_id), "estoque_baixo", "excel"))
+                                 command=lambda: self.export_report(report_generator.iter_estoque_baixo(branch_id), "estoque_baixo", "excel"))
         xlsx_btn.pack(side="left", padx=5)
         
         list_frame = ctk.CTkScrollableFrame(dialog.content_frame, fg_color="white", corner_radius=5)
         list_frame.pack(fill="both", expand=True, pady=10)
         
-        dados = report_generator.get_estoque_baixo(branch_id)
-        
-        if not dados:
-            no_data = ctk.CTkLabel(list_frame, text="✅ Nenhum item com estoque baixo!", font=("Segoe UI", 14), text_color=COLORS["success"])
-            no_data.pack(pady=50)
-        else:
-            self._create_table(list_frame, dados, [
-                ("Descrição", "descricao"),
-                ("Categoria", "categoria"),
-                ("Qtd Atual", "quantidade"),
-                ("Qtd Mínima", "estoque_minimo"),
-                ("Unidade", "unidade"),
-                ("Filial", "filial"),
-                ("Fornecedor", "fornecedor")
-            ])
+        self._create_table(list_frame, report_generator.iter_estoque_baixo(branch_id), [
+            ("Descrição", "descricao"),
+            ("Categoria", "categoria"),
+            ("Qtd Atual", "quantidade"),
+            ("Qtd Mínima", "estoque_minimo"),
+            ("Unidade", "unidade"),
+            ("Filial", "filial"),
+            ("Fornecedor", "fornecedor")
+        ], empty_text="✅ Nenhum item com estoque baixo!", empty_color=COLORS["success"])
         
         dialog.add_buttons(lambda: dialog.safe_destroy())
     
@@ -486,27 +454,21 @@ class RelatoriosView(ctk.CTkFrame):
         
         xlsx_btn = ctk.CTkButton(export_frame, text="📊 Exportar XLSX", width=150,
                                  fg_color=COLORS["success"],
-                                 command=lambda: self.export_report(report_generator.get_usuarios_report(), "usuarios", "excel"))
+                                 command=lambda: self.export_report(report_generator.iter_usuarios(), "usuarios", "excel"))
         xlsx_btn.pack(side="left", padx=5)
         
         list_frame = ctk.CTkScrollableFrame(dialog.content_frame, fg_color="white", corner_radius=5)
         list_frame.pack(fill="both", expand=True, pady=10)
         
-        dados = report_generator.get_usuarios_report()
-        
-        if not dados:
-            no_data = ctk.CTkLabel(list_frame, text="Nenhum usuário encontrado", font=("Segoe UI", 14), text_color="#999999")
-            no_data.pack(pady=50)
-        else:
-            self._create_table(list_frame, dados, [
-                ("Nome", "nome"),
-                ("Username", "username"),
-                ("Email", "email"),
-                ("Perfil", "perfil"),
-                ("Filial", "filial"),
-                ("Status", "status"),
-                ("Movimentações", "total_movimentacoes")
-            ])
+        self._create_table(list_frame, report_generator.iter_usuarios(), [
+            ("Nome", "nome"),
+            ("Username", "username"),
+            ("Email", "email"),
+            ("Perfil", "perfil"),
+            ("Filial", "filial"),
+            ("Status", "status"),
+            ("Movimentações", "total_movimentacoes")
+        ], empty_text="Nenhum usuário encontrado")
         
         dialog.add_buttons(lambda: dialog.safe_destroy())
     
@@ -542,48 +504,41 @@ class RelatoriosView(ctk.CTkFrame):
         end_entry.pack(side="left", padx=(0, 10))
         
         filter_btn = ctk.CTkButton(filter_frame, text="🔍 Filtrar", width=80,
-                                   command=lambda: self._load_transferencias(list_frame, start_entry.get(), end_entry.get()))
+                                   command=lambda: list_frame.set_fetch_page(
+                                       self._transferencias_page_fetcher(branch_id, start_entry.get(), end_entry.get())))
         filter_btn.pack(side="left", padx=10)
         
         # Botão exportar XLSX
         xlsx_btn = ctk.CTkButton(filter_frame, text="📊 Exportar XLSX", width=150,
                                  fg_color=COLORS["success"],
-                                 command=lambda: self.export_report(report_generator.get_transferencias(start_entry.get(), end_entry.get(), branch_id), "transferencias", "excel"))
+                                 command=lambda: self.export_report(report_generator.iter_transferencias(start_entry.get(), end_entry.get(), branch_id), "transferencias", "excel"))
         xlsx_btn.pack(side="left", padx=10)
         
-        list_frame = ctk.CTkScrollableFrame(dialog.content_frame, fg_color="white", corner_radius=5)
+        colunas = [
+            ("Data", "data_transferencia"),
+            ("Brinde", "brinde"),
+            ("Quantidade", "quantidade"),
+            ("Origem", "filial_origem"),
+            ("Destino", "filial_destino"),
+            ("Usuário", "usuario"),
+            ("Justificativa", "justificativa")
+        ]
+        list_frame = InfiniteScrollFrame(
+            dialog.content_frame,
+            fetch_page=self._transferencias_page_fetcher(branch_id, start_entry.get(), end_entry.get()),
+            render_row=lambda parent, item: self._create_table_row(parent, item, colunas),
+            render_header=lambda parent: self._create_table_header(parent, colunas),
+            empty_text="Nenhuma transferência encontrada",
+            fg_color="white",
+            corner_radius=5
+        )
         list_frame.pack(fill="both", expand=True, pady=10)
         
-        self._load_transferencias(list_frame, start_entry.get(), end_entry.get())
-        
         dialog.add_buttons(lambda: dialog.safe_destroy())
     
-    def _load_transferencias(self, list_frame, data_inicio, data_fim):
-        """Carrega transferências"""
-        from utils.report_generator import report_generator
-        from utils.auth import auth_manager
-        
-        # Determinar filial baseado nas permissões
-        branch_id = None if auth_manager.can_view_all_branches() else auth_manager.get_user_branch()
-        
-        for widget in list_frame.winfo_children():
-            widget.destroy()
-        
-        dados = report_generator.get_transferencias(data_inicio, data_fim, branch_id)
-        
-        if not dados:
-            no_data = ctk.CTkLabel(list_frame, text="Nenhuma transferência encontrada", font=("Segoe UI", 14), text_color="#999999")
-            no_data.pack(pady=50)
-        else:
-            self._create_table(list_frame, dados, [
-                ("Data", "data_transferencia"),
-                ("Brinde", "brinde"),
-                ("Quantidade", "quantidade"),
-                ("Origem", "filial_origem"),
-                ("Destino", "filial_destino"),
-                ("Usuário", "usuario"),
-                ("Justificativa", "justificativa")
-            ])
+    def _transferencias_page_fetcher(self, branch_id, data_inicio, data_fim):
+        """Retorna função que busca páginas de transferências com os filtros informados"""
+        return lambda cursor: TransferenciaDAO.get_page(branch_id, data_inicio, data_fim, cursor)
     
     def show_historico_item(self):
         """Relatório de histórico de item"""
@@ -695,52 +650,86 @@ class RelatoriosView(ctk.CTkFrame):
         
         dialog.add_buttons(lambda: dialog.safe_destroy())
     
-    def _create_table(self, parent, dados, colunas):
-        """Cria uma tabela genérica"""
-        import customtkinter as ctk
-        from datetime import datetime
+    def _create_table(self, parent, dados, colunas, empty_text=None, empty_color="#999999", batch_size=100):
+        """
+        Cria uma tabela genérica
+        
+        Aceita lista ou iterador (report_generator.iter_*). O iterador é lido
+        inteiro antes de desenhar: um cursor aberto entre os lotes manteria o
+        banco bloqueado para escrita nos outros computadores. As linhas são
+        desenhadas em lotes pelo loop de eventos: o primeiro lote aparece
+        logo e a janela continua respondendo enquanto o restante é desenhado.
+        """
+        try:
+            linhas = list(dados)
+        except Exception as e:
+            erro = ctk.CTkLabel(parent, text=f"Erro ao carregar o relatório: {e}",
+                                font=("Segoe UI", 14), text_color=COLORS["danger"])
+            erro.pack(pady=50)
+            return
         
-        # Cabeçalho
+        if not linhas:
+            if empty_text:
+                no_data = ctk.CTkLabel(parent, text=empty_text, font=("Segoe UI", 14), text_color=empty_color)
+                no_data.pack(pady=50)
+            return
+        
+        self._create_table_header(parent, colunas)
+        
+        def render_batch(inicio):
+            if not parent.winfo_exists():
+                return
+            
+            for item in linhas[inicio:inicio + batch_size]:
+                self._create_table_row(parent, item, colunas)
+            
+            if inicio + batch_size < len(linhas):
+                parent.after(10, lambda: render_batch(inicio + batch_size))
+        
+        render_batch(0)
+    
+    def _create_table_header(self, parent, colunas):
+        """Cria o cabeçalho de uma tabela genérica"""
         header = ctk.CTkFrame(parent, fg_color="#e3f2fd", corner_radius=5)
         header.pack(fill="x", padx=5, pady=(5, 10))
         
         for i, (titulo, _) in enumerate(colunas):
             label = ctk.CTkLabel(header, text=titulo, font=("Segoe UI", 12, "bold"))
             label.grid(row=0, column=i, padx=10, pady=10, sticky="w")
+    
+    def _create_table_row(self, parent, item, colunas):
+        """Cria uma linha de uma tabela genérica"""
+        row = ctk.CTkFrame(parent, fg_color="#f8f9fa", corner_radius=3)
+        row.pack(fill="x", padx=5, pady=2)
         
-        # Dados
-        for item in dados:
-            row = ctk.CTkFrame(parent, fg_color="#f8f9fa", corner_radius=3)
-            row.pack(fill="x", padx=5, pady=2)
+        for i, (_, campo) in enumerate(colunas):
+            valor = item.get(campo, "")
             
-            for i, (_, campo) in enumerate(colunas):
-                valor = item.get(campo, "")
-                
-                # Formatação especial para alguns campos
-                if campo in ["valor_unitario", "valor_total", "valor_medio"] and valor:
-                    texto = f"R$ {float(valor):.2f}"
-                elif campo in ["data_movimentacao", "data_transferencia", "data_criacao"] and valor:
-                    try:
-                        if isinstance(valor, str):
-                            dt = datetime.fromisoformat(valor.replace("Z", "+00:00"))
-                        else:
-                            dt = valor
-                        texto = dt.strftime("%d/%m/%Y %H:%M")
-                    except:
-                        texto = str(valor)
-                elif campo == "tipo" and valor:
-                    texto = "📈 ENTRADA" if valor == "ENTRADA" else "📉 SAÍDA"
-                elif campo == "status_estoque" and valor:
-                    texto = "⚠️ BAIXO" if valor == "BAIXO" else "✅ OK"
-                else:
-                    texto = str(valor) if valor is not None else "-"
-                
-                # Truncar texto longo
-                if len(texto) > 30:
-                    texto = texto[:27] + "..."
-                
-                label = ctk.CTkLabel(row, text=texto, font=("Segoe UI", 10))
-                label.grid(row=0, column=i, padx=8, pady=8, sticky="w")
+            # Formatação especial para alguns campos
+            if campo in ["valor_unitario", "valor_total", "valor_medio"] and valor:
+                texto = f"R$ {float(valor):.2f}"
+            elif campo in ["data_movimentacao", "data_transferencia", "data_criacao"] and valor:
+                try:
+                    if isinstance(valor, str):
+                        dt = datetime.fromisoformat(valor.replace("Z", "+00:00"))
+                    else:
+                        dt = valor
+                    texto = dt.strftime("%d/%m/%Y %H:%M")
+                except:
+                    texto = str(valor)
+            elif campo == "tipo" and valor:
+                texto = "📈 ENTRADA" if valor == "ENTRADA" else "📉 SAÍDA"
+            elif campo == "status_estoque" and valor:
+                texto = "⚠️ BAIXO" if valor == "BAIXO" else "✅ OK"
+            else:
+                texto = str(valor) if valor is not None else "-"
+            
+            # Truncar texto longo
+            if len(texto) > 30:
+                texto = texto[:27] + "..."
+            
+            label = ctk.CTkLabel(row, text=texto, font=("Segoe UI", 10))
+            label.grid(row=0, column=i, padx=8, pady=8, sticky="w")
 
     def show_import_dialog(self):
         """Mostra diálogo de importação"""
@@ -823,10 +812,18 @@ class RelatoriosView(ctk.CTkFrame):
                 if tipo == "Brindes":
                     filial_id = auth_manager.get_user_branch()
                     result = data_importer.import_brindes(df, filial_id)
+                    eventos = ['BRINDE_CREATED', 'STOCK_CHANGED']
                 elif tipo == "Categorias":
                     result = data_importer.import_categorias(df)
+                    eventos = ['CATEGORIA_CHANGED']
                 elif tipo == "Fornecedores":
                     result = data_importer.import_fornecedores(df)
+                    eventos = ['FORNECEDOR_CHANGED']
+
+                # Atualizar telas e caches com os registros importados
+                if result and result['success']:
+                    for evento in eventos:
+                        event_manager.emit(EVENTS[evento])
 
                 if result:
                     msg = "✅ Importação concluída!\n\n"
@@ -836,6 +833,11 @@ class RelatoriosView(ctk.CTkFrame):
                         msg += "\n".join(result['errors'][:5])
                         if len(result['errors']) > 5:
                             msg += f"\n... e mais {len(result['errors']) - 5} erros"
+                    if result.get('warnings'):
+                        msg += f"\n\nPossíveis duplicatas: {len(result['warnings'])}\n"
+                        msg += "\n".join(result['warnings'][:5])
+                        if len(result['warnings']) > 5:
+                            msg += f"\n... e mais {len(result['warnings']) - 5} avisos"
 
                     show_info("Importação", msg)
                     dialog.safe_destroy()
@@ -887,9 +889,13 @@ class RelatoriosView(ctk.CTkFrame):
     def export_report(self, data, filename, format="excel"):
         """Exporta relatório"""
         try:
-            if not data:
+            # Aceita lista ou iterador: verifica se há ao menos uma linha
+            rows = iter(data)
+            first = next(rows, None)
+            if first is None:
                 show_warning("Aviso", "Nenhum dado para exportar!")
                 return
+            data = chain([first], rows)
 
             if format == "excel":
                 filepath = data_exporter.export_to_excel(data, filename)
@@ -4,6 +4,7 @@ Módulo de Autenticação e Controle de Acesso
 """
 import os
 import getpass
+from utils.logger import debug
 
 
 class AuthManager:
@@ -45,21 +46,12 @@ class AuthManager:
             }
         else:
             # Se não encontrar, retornar None para usuário não autorizado
-            from database.connection import db
+            from database.dao import FilialDAO
             
             try:
-                # Tenta obter a filial padrão (Matriz)
-                query = 'SELECT id, nome FROM filiais WHERE id = 1'
-                result = db.execute_query(query)
-                print(f"DEBUG: Resultado da consulta de filiais (id=1): {result}")
-                filial = result[0] if result else None
-                
-                if not filial:
-                    # Se não houver filial matriz, usa a primeira disponível
-                    query = 'SELECT id, nome FROM filiais LIMIT 1'
-                    result = db.execute_query(query)
-                    print(f"DEBUG: Resultado da consulta de filiais (LIMIT 1): {result}")
-                    filial = result[0] if result else None
+                # Filial padrão (Matriz, id 1) ou, se não houver, a primeira disponível
+                filial = FilialDAO.get_default()
+                debug(f"Filial padrão para usuário não cadastrado: {filial}")
                 
                 if filial:
                     # Cria um usuário comum com perfil básico
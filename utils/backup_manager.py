@@ -1,22 +1,120 @@
 # -*- coding: utf-8 -*-
 """
 Gerenciador de Backup do Banco de Dados
+
+O banco é lido página a página numa conexão própria, em etapas de
+BACKUP_PAGES_PER_STEP páginas, cada etapa dentro de uma transação de leitura:
+entre uma etapa e outra o banco fica livre para o aplicativo. O contador de
+alterações do cabeçalho é conferido a cada etapa; se outra conexão gravar no
+meio da leitura, ela recomeça, então o backup é sempre consistente (após
+BACKUP_MAX_RESTARTS recomeços a leitura é feita numa etapa só). Bancos em modo
+WAL são copiados antes com a API de backup do SQLite. Antes de gravar o
+manifesto, o banco do backup novo é remontado dos blocos e verificado (PRAGMA
+quick_check): se falhar, o backup é descartado e a retenção não roda.
+
+Armazenamento: as páginas são guardadas em blocos de BACKUP_BLOCK_SIZE bytes,
+comprimidos (zlib) em blocos/ com o sha256 do conteúdo como nome (blocos
+iguais são gravados uma vez só). Cada backup é um manifesto JSON
+(brindes_backup_<data>_<motivo>.json):
+  - completo: todas as páginas do banco
+  - diferencial: só as páginas alteradas desde o backup anterior, comparando
+    o hash de cada página com o mapa de páginas (.paginas) do último backup
+
+A restauração remonta o banco da base completa e da cadeia de diferenciais
+até o backup escolhido, conferindo o hash de cada bloco e o PRAGMA quick_check.
+Após BACKUP_DIFF_MAX_CHAIN diferenciais seguidos é feita uma nova base.
+Backups antigos (.db, cópias completas) continuam listados e podem ser restaurados.
+
+O backup automático é pulado quando o banco não mudou desde o último backup
+(contador de alterações do cabeçalho do arquivo e último seq do log de
+alterações); e um backup cujo conteúdo é igual ao do último não é gravado.
+A retenção é avô-pai-filho: ficam os BACKUP_KEEP_LAST mais recentes e o último
+backup de cada hora, dia, semana e mês, até BACKUP_KEEP_HOURLY/DAILY/WEEKLY/MONTHLY
+de cada (com a base e os diferenciais de que cada um depende).
+
+Arquivos anuais (arquivo/arquivo_<ano>.db, ver database/archive.py): cada
+manifesto tem uma entrada por ano em "arquivos". Só os anos alterados desde o
+último backup (contador de alterações e tamanho do arquivo) são lidos de novo,
+com os mesmos blocos deduplicados; os demais repetem a entrada anterior. A
+restauração devolve os arquivos junto com o banco e remove os anos criados
+depois do backup (as linhas deles voltam a estar no banco restaurado).
+Backups sem "arquivos" (anteriores) não mexem na pasta arquivo/.
 """
 import os
 import shutil
 import glob
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from config.settings import (
+    BACKUP_PAGES_PER_STEP, BACKUP_STEP_PAUSE, BACKUP_MAX_RESTARTS,
+    BACKUP_BLOCK_SIZE, BACKUP_COMPRESS_LEVEL, BACKUP_DIFF_MAX_CHAIN,
+    BACKUP_KEEP_LAST, BACKUP_KEEP_HOURLY, BACKUP_KEEP_DAILY, BACKUP_KEEP_WEEKLY, BACKUP_KEEP_MONTHLY,
+)
 from utils.logger import logger
 
 
+MANIFEST_FORMAT = 2
+PAGE_HASH_SIZE = 16                 # bytes do hash (blake2b) de cada página no mapa de páginas
+LOCK_BYTE_OFFSET = 0x40000000       # página reservada pelo SQLite para travas (nunca contém dados)
+
+# Níveis da retenção: (quantidade mantida, período de cada backup mantido)
+RETENTION_TIERS = (
+    (BACKUP_KEEP_LAST, None),
+    (BACKUP_KEEP_HOURLY, "%Y%m%d%H"),
+    (BACKUP_KEEP_DAILY, "%Y%m%d"),
+    (BACKUP_KEEP_WEEKLY, "%G%V"),
+    (BACKUP_KEEP_MONTHLY, "%Y%m"),
+)
+
+
+class _BackupRestarted(Exception):
+    """O banco foi alterado durante a cópia/leitura em etapas"""
+
+
+class _BlockWriter:
+    """Agrupa páginas em blocos de BACKUP_BLOCK_SIZE e os guarda no armazenamento"""
+    
+    def __init__(self, manager):
+        self.manager = manager
+        self.blocks = []
+        self.written = 0
+        self._buffer = bytearray()
+    
+    def add(self, page):
+        self._buffer += page
+        if len(self._buffer) >= self.manager.block_size:
+            self.flush()
+    
+    def flush(self):
+        if self._buffer:
+            digest, written = self.manager._store_block(bytes(self._buffer))
+            self.blocks.append(digest)
+            self.written += written
+            self._buffer = bytearray()
+
+
 class BackupManager:
     """Gerenciador de backups do banco de dados"""
     
     def __init__(self, db_path="data/brindes.db", backup_dir="data/backups"):
         self.db_path = db_path
         self.backup_dir = backup_dir
-        self.max_backups = 2  # Manter apenas 2 backups
+        self.block_size = BACKUP_BLOCK_SIZE
+        self.compress_level = BACKUP_COMPRESS_LEVEL
+        self.pages_per_step = BACKUP_PAGES_PER_STEP
+        self.step_pause = BACKUP_STEP_PAUSE
+        
+        # Um backup por vez; os pedidos em segundo plano rodam numa thread própria
+        self._lock = threading.RLock()
+        self._executor = None
+        self._status = {"state": "idle"}
         
         # Criar diretório de backup se não existir
         os.makedirs(self.backup_dir, exist_ok=True)
@@ -31,21 +129,81 @@ class BackupManager:
         Returns:
             str: Caminho do backup criado ou None se falhou
         """
+        with self._lock:
+            self._status = {"state": "running", "reason": reason, "started": datetime.now(), "path": None}
+            backup_path = self._create_backup(reason)
+            self._status.update(state="done" if backup_path else "failed", finished=datetime.now(), path=backup_path)
+            return backup_path
+    
+    def _create_backup(self, reason):
         try:
             if not os.path.exists(self.db_path):
                 logger.warning(f"Banco de dados não encontrado: {self.db_path}")
                 return None
             
             # Gerar nome do backup com timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"brindes_backup_{timestamp}_{reason}.db"
-            backup_path = os.path.join(self.backup_dir, backup_filename)
+            created = datetime.now()
+            backup_name = f"brindes_backup_{created.strftime('%Y%m%d_%H%M%S')}_{reason}"
+            backup_path = os.path.join(self.backup_dir, backup_name + ".json")
+            suffix = 1
+            while os.path.exists(backup_path):
+                suffix += 1
+                backup_path = os.path.join(self.backup_dir, f"{backup_name}_{suffix}.json")
+            
+            self._remove_temp_files()
+            started = time.perf_counter()
+            marker = self._change_marker()
+            
+            # Diferencial sobre o último backup enquanto a cadeia for curta;
+            # sem o mapa de páginas do último (ou cadeia longa), base completa
+            latest = self.get_latest_backup()
+            previous = self._load_page_map(latest)
+            if previous and latest["chain"] >= BACKUP_DIFF_MAX_CHAIN:
+                previous = None
+            
+            snapshot = self._snapshot(previous)
+            previous_archives = (latest.get("archives") if latest else None) or {}
+            arquivos, alterados = self._snapshot_archives(previous_archives)
             
-            # Criar backup
-            shutil.copy2(self.db_path, backup_path)
-            logger.info(f"Backup criado: {backup_path}")
+            # Conteúdo igual ao do último backup: nada a gravar
+            if latest and latest.get("content") == snapshot["conteudo"] and previous_archives == arquivos:
+                logger.info(f"Banco sem alterações desde o backup {latest['filename']}: nenhum backup novo gravado")
+                self._write_manifest(latest["path"], dict(self._read_manifest(latest["path"]), marca=marker))
+                return latest["path"]
             
-            # Limpar backups antigos
+            manifest = {
+                "formato": MANIFEST_FORMAT,
+                "tipo": "diferencial" if snapshot["diferencial"] else "completo",
+                "criado": created.isoformat(timespec="microseconds"),
+                "motivo": reason,
+                "tamanho": snapshot["tamanho"],
+                "pagina": snapshot["pagina"],
+                "bloco": self.block_size,
+                "blocos": snapshot["blocos"],
+                "conteudo": snapshot["conteudo"],
+                "gravado": snapshot["gravado"] + sum(arquivos[ano]["gravado"] for ano in alterados),
+                "marca": marker,
+                "elo": 0,
+                "arquivos": arquivos,
+            }
+            if snapshot["diferencial"]:
+                manifest.update(anterior=latest["filename"], elo=latest["chain"] + 1, paginas=snapshot["paginas"])
+            
+            # Só grava o manifesto (e aplica a retenção) se o banco remontado passar na verificação
+            if not self._verify_snapshot(backup_path, manifest, alterados):
+                logger.error(f"Backup descartado: falha na verificação (quick_check) de {backup_path}")
+                self._remove_unused_blocks()
+                return None
+            
+            self._write_manifest(backup_path, manifest)
+            self._save_page_map(backup_path, snapshot["hashes"])
+            logger.info(
+                f"Backup {manifest['tipo']} criado: {backup_path} ({snapshot['tamanho'] / (1024 * 1024):.1f} MB, "
+                f"{len(alterados)} arquivo(s) anual(is) alterado(s), "
+                f"{manifest['gravado'] / (1024 * 1024):.2f} MB novos gravados, {time.perf_counter() - started:.1f}s)"
+            )
+            
+            # Aplicar a retenção
             self._cleanup_old_backups()
             
             return backup_path
@@ -54,36 +212,489 @@ class BackupManager:
             logger.error(f"Erro ao criar backup: {e}")
             return None
     
-    def _cleanup_old_backups(self):
-        """Remove backups antigos, mantendo apenas os mais recentes"""
+    def submit(self, func, *args, **kwargs):
+        """
+        Executa a função na thread de backup, sem travar a interface
+        
+        Returns:
+            Future: resultado da função (a interface consulta done() com after())
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="brindez-backup")
+        return self._executor.submit(func, *args, **kwargs)
+    
+    def create_backup_async(self, reason="manual"):
+        """Cria o backup em segundo plano; retorna um Future com o caminho (ou None)"""
+        return self.submit(self.create_backup, reason)
+    
+    def schedule_auto_backup(self):
+        """
+        Verifica/cria o backup automático em segundo plano
+        
+        Chamado depois que a primeira tela é exibida, para a abertura do
+        sistema não depender do tamanho do banco.
+        """
+        future = self.submit(self.auto_backup_if_needed)
+        future.add_done_callback(self._auto_backup_done)
+        return future
+    
+    @staticmethod
+    def _auto_backup_done(future):
         try:
-            # Buscar todos os arquivos de backup
-            backup_pattern = os.path.join(self.backup_dir, "brindes_backup_*.db")
-            backup_files = glob.glob(backup_pattern)
+            backup_path = future.result()
+            if backup_path:
+                logger.info(f"Backup automático criado: {os.path.basename(backup_path)}")
+        except Exception as e:
+            logger.warning(f"Erro no backup automático: {e}")
+    
+    def get_status(self):
+        """
+        Estado do último backup desta sessão
+        
+        Returns:
+            dict: state (idle, running, done, failed), reason, started, finished e path
+        """
+        return dict(self._status)
+    
+    def _copy_database(self, target_path, path=None):
+        """
+        Copia o banco (ou o arquivo em path) em etapas com a API de backup do SQLite
+        
+        Se o aplicativo gravar sem parar, a cópia em etapas recomeçaria
+        indefinidamente; após BACKUP_MAX_RESTARTS recomeços a cópia é feita
+        numa etapa só (as gravações esperam apenas o tempo dessa etapa).
+        """
+        source_uri = Path(os.path.abspath(path or self.db_path)).as_uri() + "?mode=ro"
+        source = sqlite3.connect(source_uri, uri=True, timeout=30)
+        try:
+            target = sqlite3.connect(target_path)
+            try:
+                progress = {"copied": 0, "restarts": 0}
+                
+                def step_done(status, remaining, total):
+                    copied = total - remaining
+                    if copied <= progress["copied"]:
+                        progress["restarts"] += 1
+                        if progress["restarts"] > BACKUP_MAX_RESTARTS:
+                            raise _BackupRestarted()
+                    progress["copied"] = copied
+                    
+                    # Entre as etapas, deixa o banco livre para o aplicativo
+                    if remaining and self.step_pause:
+                        time.sleep(self.step_pause)
+                
+                try:
+                    source.backup(target, pages=self.pages_per_step, progress=step_done)
+                except _BackupRestarted:
+                    logger.warning("Banco alterado durante todo o backup: copiando numa etapa só")
+                    source.backup(target)
+            finally:
+                target.close()
+        finally:
+            source.close()
+    
+    def _snapshot(self, previous, path=None):
+        """
+        Lê o banco e guarda no armazenamento as páginas do backup
+        
+        Args:
+            previous: (tamanho da página, mapa de páginas) do último backup para
+                guardar só as páginas alteradas, ou None para uma base completa
+            path: Outro arquivo SQLite a ler (arquivo anual) em vez do banco
+        
+        Returns:
+            dict: pagina, tamanho, hashes (mapa de páginas), blocos, paginas
+                (números das páginas guardadas), gravado, conteudo e diferencial
+        """
+        path = path or self.db_path
+        source_uri = Path(os.path.abspath(path)).as_uri() + "?mode=ro"
+        source = sqlite3.connect(source_uri, uri=True, timeout=30, isolation_level=None)
+        try:
+            # Em WAL parte das páginas está no -wal: ler de uma cópia da API de backup
+            if source.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+                return self._snapshot_copy(previous, path)
             
-            if len(backup_files) <= self.max_backups:
-                return  # Não há backups suficientes para limpar
+            with open(path, "rb") as file:
+                for _ in range(BACKUP_MAX_RESTARTS + 1):
+                    try:
+                        return self._read_snapshot(file, source, previous, self.pages_per_step)
+                    except _BackupRestarted:
+                        pass
+                
+                logger.warning("Banco alterado durante todo o backup: lendo numa etapa só")
+                return self._read_snapshot(file, source, previous, None)
+        finally:
+            source.close()
+    
+    def _snapshot_copy(self, previous, path):
+        """Lê as páginas de uma cópia do banco feita com a API de backup (bancos em modo WAL)"""
+        temp_path = os.path.join(self.backup_dir, "brindes_backup_copia.db.tmp")
+        try:
+            self._copy_database(temp_path, path)
+            with open(temp_path, "rb") as file:
+                return self._read_snapshot(file, None, previous, None)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def _snapshot_archives(self, previous):
+        """
+        Guarda no armazenamento os arquivos anuais alterados desde o último backup
+        
+        Args:
+            previous: Entradas "arquivos" do último backup ({ano: entrada})
+        
+        Returns:
+            tuple: (entradas de todos os anos, anos lidos nesta chamada)
+        """
+        from database.archive import archive_manager
+        
+        entries = {}
+        changed = []
+        for ano in archive_manager.years():
+            path = archive_manager.archive_path(ano)
+            with open(path, "rb") as file:
+                header = file.read(100)
+            marker = {"contador": int.from_bytes(header[24:28], "big"), "tamanho": os.path.getsize(path)}
             
-            # Ordenar por data de modificação (mais recente primeiro)
-            backup_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+            entry = previous.get(str(ano))
+            if entry and entry.get("marca") == marker:
+                entries[str(ano)] = entry
+                continue
+            
+            snapshot = self._snapshot(None, path)
+            entries[str(ano)] = {
+                "tamanho": snapshot["tamanho"],
+                "pagina": snapshot["pagina"],
+                "blocos": snapshot["blocos"],
+                "conteudo": snapshot["conteudo"],
+                "gravado": snapshot["gravado"],
+                "marca": marker,
+            }
+            changed.append(str(ano))
+        return entries, changed
+    
+    def _read_snapshot(self, file, source, previous, pages_per_step):
+        """
+        Lê as páginas do arquivo em etapas, guardando as novas ou alteradas
+        
+        Cada etapa roda numa transação de leitura de source (as gravações do
+        aplicativo esperam só a etapa) e confere o contador de alterações do
+        cabeçalho: se mudou desde a primeira etapa, levanta _BackupRestarted.
+        """
+        writer = _BlockWriter(self)
+        hashes = []
+        changed = []
+        counter = None
+        page = 0
+        
+        while True:
+            if source is not None:
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            try:
+                file.seek(0)
+                header = file.read(100)
+                current = int.from_bytes(header[24:28], "big")
+                if counter is None:
+                    counter = current
+                    page_size = int.from_bytes(header[16:18], "big")
+                    page_size = 65536 if page_size == 1 else page_size
+                    page_count = os.fstat(file.fileno()).st_size // page_size
+                    if previous and previous[0] != page_size:
+                        previous = None
+                elif current != counter:
+                    raise _BackupRestarted()
+                
+                end = page_count if pages_per_step is None else min(page + pages_per_step, page_count)
+                data = self._read_pages(file, page, end, page_size)
+            finally:
+                if source is not None:
+                    source.execute("COMMIT")
             
-            # Manter apenas os mais recentes
-            files_to_keep = backup_files[:self.max_backups]
-            files_to_remove = backup_files[self.max_backups:]
+            # Hash e compressão fora da transação
+            for index in range(end - page):
+                content = data[index * page_size:(index + 1) * page_size]
+                digest = hashlib.blake2b(content, digest_size=PAGE_HASH_SIZE).digest()
+                hashes.append(digest)
+                
+                number = page + index
+                if previous is None or previous[1][number * PAGE_HASH_SIZE:(number + 1) * PAGE_HASH_SIZE] != digest:
+                    changed.append(number)
+                    writer.add(content)
             
-            # Remover backups antigos
-            for file_path in files_to_remove:
+            page = end
+            if page >= page_count:
+                break
+            if self.step_pause:
+                time.sleep(self.step_pause)
+        
+        writer.flush()
+        page_map = b"".join(hashes)
+        return {
+            "pagina": page_size,
+            "tamanho": page_count * page_size,
+            "hashes": page_map,
+            "blocos": writer.blocks,
+            "paginas": changed,
+            "gravado": writer.written,
+            "conteudo": hashlib.sha256(page_map).hexdigest(),
+            "diferencial": previous is not None,
+        }
+    
+    @staticmethod
+    def _read_pages(file, first, end, page_size):
+        """
+        Lê as páginas [first, end) do arquivo
+        
+        A página do byte de trava (1 GiB) nunca tem dados e fica bloqueada no
+        Windows enquanto há conexões abertas: volta zerada.
+        """
+        lock_page = LOCK_BYTE_OFFSET // page_size
+        if not first <= lock_page < end:
+            file.seek(first * page_size)
+            return file.read((end - first) * page_size)
+        
+        before = BackupManager._read_pages(file, first, lock_page, page_size)
+        after = BackupManager._read_pages(file, lock_page + 1, end, page_size)
+        return before + bytes(page_size) + after
+    
+    @staticmethod
+    def _verify(path):
+        """Verifica a integridade do arquivo copiado (PRAGMA quick_check)"""
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+        except sqlite3.DatabaseError:
+            return False
+        finally:
+            conn.close()
+    
+    def _verify_snapshot(self, backup_path, manifest, anos=()):
+        """Remonta o banco do backup novo (manifesto ainda não gravado) e os arquivos anuais lidos e os verifica"""
+        temp_path = os.path.join(self.backup_dir, "brindes_backup_verificacao.db.tmp")
+        try:
+            self._materialize(backup_path, temp_path, manifest)
+            if not self._verify(temp_path):
+                return False
+            for ano in anos:
+                self._materialize(backup_path, temp_path, manifest["arquivos"][ano])
+                if not self._verify(temp_path):
+                    logger.error(f"Falha na verificação (quick_check) do arquivo anual {ano}")
+                    return False
+            return True
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def _change_marker(self):
+        """
+        Marca de alteração do banco: contador de alterações do cabeçalho do
+        arquivo (incrementado pelo SQLite a cada transação gravada) e último seq
+        do log de alterações
+        """
+        with open(self.db_path, "rb") as file:
+            header = file.read(100)
+        marker = {"contador": int.from_bytes(header[24:28], "big"), "seq": None}
+        
+        try:
+            from database.change_log import ChangeLog
+            source_uri = Path(os.path.abspath(self.db_path)).as_uri() + "?mode=ro"
+            conn = sqlite3.connect(source_uri, uri=True, timeout=30)
+            try:
+                marker["seq"] = ChangeLog.last_seq(conn)
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+        
+        return marker
+    
+    def _blocks_dir(self):
+        return os.path.join(self.backup_dir, "blocos")
+    
+    def _block_path(self, digest):
+        return os.path.join(self._blocks_dir(), digest[:2], digest)
+    
+    def _store_block(self, data):
+        """
+        Guarda um bloco comprimido (se ainda não existe)
+        
+        Returns:
+            tuple: (sha256 do bloco, bytes gravados)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        block_path = self._block_path(digest)
+        if os.path.exists(block_path):
+            return digest, 0
+        
+        compressed = zlib.compress(data, self.compress_level)
+        os.makedirs(os.path.dirname(block_path), exist_ok=True)
+        with open(block_path + ".tmp", "wb") as block_file:
+            block_file.write(compressed)
+        os.replace(block_path + ".tmp", block_path)
+        return digest, len(compressed)
+    
+    def _read_blocks(self, blocks):
+        """Lê os blocos em ordem, conferindo o sha256 de cada um"""
+        for digest in blocks:
+            with open(self._block_path(digest), "rb") as block_file:
+                data = zlib.decompress(block_file.read())
+            if hashlib.sha256(data).hexdigest() != digest:
+                raise ValueError(f"Bloco corrompido no armazenamento de backups: {digest}")
+            yield data
+    
+    def _materialize(self, manifest_path, target_path, manifest=None):
+        """
+        Remonta o banco de um backup: a base completa e, em ordem, as páginas de cada diferencial
+        
+        Args:
+            manifest: Conteúdo do manifesto, se ainda não foi gravado em manifest_path
+                (ou a entrada de um arquivo anual, sempre completa)
+        """
+        if manifest is None:
+            manifest = self._read_manifest(manifest_path)
+        size = manifest["tamanho"]
+        
+        chain = []
+        while manifest.get("tipo") == "diferencial":
+            chain.append(manifest)
+            manifest = self._read_manifest(os.path.join(self.backup_dir, manifest["anterior"]))
+        
+        with open(target_path, "wb") as target:
+            for data in self._read_blocks(manifest["blocos"]):
+                target.write(data)
+            
+            for diff in reversed(chain):
+                page_size = diff["pagina"]
+                numbers = iter(diff["paginas"])
+                for data in self._read_blocks(diff["blocos"]):
+                    for offset in range(0, len(data), page_size):
+                        target.seek(next(numbers) * page_size)
+                        target.write(data[offset:offset + page_size])
+            
+            target.truncate(size)
+        
+        if os.path.getsize(target_path) != size:
+            raise ValueError(f"Tamanho do banco remontado difere do manifesto: {manifest_path}")
+    
+    @staticmethod
+    def _load_page_map(backup):
+        """Mapa de páginas do backup (tamanho da página, hashes) ou None se não houver"""
+        if not backup or not backup.get("page_size"):
+            return None
+        
+        map_path = backup["path"] + ".paginas"
+        if not os.path.exists(map_path):
+            return None
+        with open(map_path, "rb") as file:
+            page_map = file.read()
+        if len(page_map) != backup["size"] // backup["page_size"] * PAGE_HASH_SIZE:
+            return None
+        return backup["page_size"], page_map
+    
+    def _save_page_map(self, backup_path, page_map):
+        """Guarda o mapa de páginas do backup (só o do último é mantido)"""
+        map_path = backup_path + ".paginas"
+        with open(map_path + ".tmp", "wb") as file:
+            file.write(page_map)
+        os.replace(map_path + ".tmp", map_path)
+        
+        for old_map in glob.glob(os.path.join(self.backup_dir, "brindes_backup_*.json.paginas")):
+            if old_map != map_path:
+                os.remove(old_map)
+    
+    @staticmethod
+    def _read_manifest(path):
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    
+    @staticmethod
+    def _write_manifest(path, manifest):
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+        os.replace(path + ".tmp", path)
+    
+    def _remove_temp_files(self):
+        """Remove cópias e manifestos incompletos de backups interrompidos"""
+        for file_path in glob.glob(os.path.join(self.backup_dir, "brindes_backup_*.tmp")):
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _select_retained(backups):
+        """
+        Backups mantidos pela retenção avô-pai-filho
+        
+        Ficam os BACKUP_KEEP_LAST mais recentes e, em cada nível (hora, dia,
+        semana, mês), o backup mais recente de cada período, para os períodos
+        mais recentes até a quantidade do nível.
+        """
+        keep = set()
+        for count, period_format in RETENTION_TIERS:
+            periods = set()
+            for backup in backups:
+                period = backup["path"] if period_format is None else backup["created"].strftime(period_format)
+                if period in periods:
+                    continue
+                if len(periods) >= count:
+                    break
+                periods.add(period)
+                keep.add(backup["path"])
+        return keep
+    
+    def _cleanup_old_backups(self):
+        """Remove os backups fora da retenção e os blocos que nenhum backup usa mais"""
+        try:
+            backups = self.list_backups()
+            keep = self._select_retained(backups)
+            
+            # Diferenciais precisam da base e dos diferenciais anteriores
+            previous = {backup["path"]: backup.get("previous") for backup in backups}
+            for path in list(keep):
+                while previous.get(path):
+                    path = previous[path]
+                    keep.add(path)
+            
+            removed = 0
+            for backup in backups:
+                if backup["path"] in keep:
+                    continue
                 try:
-                    os.remove(file_path)
-                    logger.info(f"Backup antigo removido: {os.path.basename(file_path)}")
+                    os.remove(backup["path"])
+                    removed += 1
+                    logger.info(f"Backup antigo removido: {backup['filename']}")
                 except Exception as e:
-                    logger.error(f"Erro ao remover backup {file_path}: {e}")
+                    logger.error(f"Erro ao remover backup {backup['path']}: {e}")
             
-            logger.info(f"Limpeza concluída. Mantidos {len(files_to_keep)} backups")
+            if removed:
+                self._remove_unused_blocks()
             
+            logger.info(f"Limpeza concluída. Mantidos {len(keep)} backups")
+        
         except Exception as e:
             logger.error(f"Erro na limpeza de backups: {e}")
     
+    def _remove_unused_blocks(self):
+        """Remove do armazenamento os blocos sem nenhum manifesto"""
+        used = set()
+        for manifest_path in glob.glob(os.path.join(self.backup_dir, "brindes_backup_*.json")):
+            manifest = self._read_manifest(manifest_path)
+            used.update(manifest["blocos"])
+            for entry in manifest.get("arquivos", {}).values():
+                used.update(entry["blocos"])
+        
+        freed = 0
+        for block_path in glob.glob(os.path.join(self._blocks_dir(), "*", "*")):
+            if os.path.basename(block_path) not in used:
+                freed += os.path.getsize(block_path)
+                os.remove(block_path)
+        
+        if freed:
+            logger.info(f"Blocos de backup sem uso removidos: {freed / (1024 * 1024):.1f} MB liberados")
+    
     def list_backups(self):
         """
         Lista todos os backups disponíveis
@@ -92,16 +703,37 @@ class BackupManager:
             list: Lista de dicionários com informações dos backups
         """
         try:
-            backup_pattern = os.path.join(self.backup_dir, "brindes_backup_*.db")
-            backup_files = glob.glob(backup_pattern)
-            
             backups = []
-            for file_path in backup_files:
+            
+            # Backups no armazenamento de blocos (manifestos)
+            for file_path in glob.glob(os.path.join(self.backup_dir, "brindes_backup_*.json")):
+                manifest = self._read_manifest(file_path)
+                created = datetime.fromisoformat(manifest["criado"])
+                backups.append({
+                    "path": file_path,
+                    "filename": os.path.basename(file_path),
+                    "size": manifest["tamanho"],
+                    "stored": manifest["gravado"],
+                    "created": created,
+                    "modified": created,
+                    "reason": manifest["motivo"],
+                    "content": manifest["conteudo"],
+                    "marker": manifest.get("marca"),
+                    "type": manifest.get("tipo", "completo"),
+                    "previous": os.path.join(self.backup_dir, manifest["anterior"]) if manifest.get("anterior") else None,
+                    "chain": manifest.get("elo", 0),
+                    "page_size": manifest.get("pagina"),
+                    "archives": manifest.get("arquivos"),
+                })
+            
+            # Cópias completas (formato anterior)
+            for file_path in glob.glob(os.path.join(self.backup_dir, "brindes_backup_*.db")):
                 stat = os.stat(file_path)
                 backup_info = {
                     "path": file_path,
                     "filename": os.path.basename(file_path),
                     "size": stat.st_size,
+                    "stored": stat.st_size,
                     "created": datetime.fromtimestamp(stat.st_ctime),
                     "modified": datetime.fromtimestamp(stat.st_mtime)
                 }
@@ -116,35 +748,136 @@ class BackupManager:
             logger.error(f"Erro ao listar backups: {e}")
             return []
     
-    def restore_backup(self, backup_path):
+    def restore_backup(self, backup_path, target=None, prepared=None):
         """
         Restaura um backup específico
         
         Args:
-            backup_path (str): Caminho do backup a ser restaurado
+            backup_path (str): Caminho do backup a ser restaurado (manifesto .json ou cópia .db)
+            target: Conexão aberta com o banco: o backup é gravado nela com a API
+                de backup do SQLite, sem fechar/reabrir (sem ela, o arquivo é substituído)
+            prepared: Cópias já preparadas por prepare_restore (em segundo plano)
         
         Returns:
             bool: True se restaurado com sucesso, False caso contrário
         """
         try:
-            if not os.path.exists(backup_path):
-                logger.error(f"Backup não encontrado: {backup_path}")
-                return False
+            if prepared is None:
+                prepared = self.prepare_restore(backup_path)
+                if prepared is None:
+                    return False
             
-            # Criar backup do banco atual antes de restaurar
-            current_backup = self.create_backup("pre_restore")
-            if current_backup:
-                logger.info(f"Backup atual criado antes da restauração: {current_backup}")
-            
-            # Restaurar backup
-            shutil.copy2(backup_path, self.db_path)
+            # Sem concorrer com um backup em andamento
+            with self._lock:
+                if prepared["arquivos"] is not None:
+                    # Antes de mexer no banco: um arquivo ainda em uso cancela a restauração
+                    from database.archive import archive_manager
+                    archive_manager.detach_all()
+                
+                if target is None:
+                    shutil.copyfile(prepared["banco"], self.db_path)
+                else:
+                    source = sqlite3.connect(prepared["banco"])
+                    try:
+                        source.backup(target)
+                    finally:
+                        source.close()
+                
+                if prepared["arquivos"] is not None:
+                    self._restore_archives(prepared["arquivos"])
             logger.info(f"Backup restaurado: {backup_path} -> {self.db_path}")
             
             return True
-            
+        
         except Exception as e:
             logger.error(f"Erro ao restaurar backup: {e}")
             return False
+        finally:
+            self._discard_prepared(prepared)
+    
+    @staticmethod
+    def _restore_archives(arquivos):
+        """Substitui os arquivos anuais pelos do backup e remove os anos criados depois dele"""
+        from database.archive import archive_manager
+        
+        os.makedirs(archive_manager.archive_dir(), exist_ok=True)
+        for ano in archive_manager.years():
+            if str(ano) not in arquivos:
+                os.remove(archive_manager.archive_path(ano))
+                logger.info(f"Arquivo anual {ano} removido: posterior ao backup restaurado")
+        
+        for ano, temp_path in arquivos.items():
+            os.replace(temp_path, archive_manager.archive_path(ano))
+    
+    @staticmethod
+    def _discard_prepared(prepared):
+        """Remove as cópias temporárias que sobraram de prepare_restore"""
+        if not prepared:
+            return
+        for temp_path in [prepared["banco"], *(prepared["arquivos"] or {}).values()]:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def prepare_restore(self, backup_path):
+        """
+        Parte demorada da restauração: remonta e verifica o banco do backup (e
+        os arquivos anuais) e faz o backup do banco atual (pode rodar na thread
+        de backup com submit)
+        
+        Returns:
+            dict: Cópias verificadas a passar para restore_backup (banco e
+                arquivos: {ano: cópia}, None se o backup não tem os arquivos
+                anuais), ou None se falhou
+        """
+        prepared = None
+        try:
+            if not os.path.exists(backup_path):
+                logger.error(f"Backup não encontrado: {backup_path}")
+                return None
+            
+            with self._lock:
+                # Cópias de restaurações interrompidas
+                for file_path in glob.glob(os.path.join(self.backup_dir, "restaurando_*.tmp")):
+                    os.remove(file_path)
+                
+                # Preparar a cópia a restaurar antes do backup do banco atual
+                # (a retenção aplicada por esse backup pode remover o escolhido)
+                temp_path = os.path.join(self.backup_dir, "restaurando_" + os.path.basename(backup_path) + ".tmp")
+                prepared = {"banco": temp_path, "arquivos": None}
+                if backup_path.endswith(".json"):
+                    # Remontar o banco dos blocos
+                    self._materialize(backup_path, temp_path)
+                else:
+                    shutil.copy2(backup_path, temp_path)
+                
+                if not self._verify(temp_path):
+                    logger.error(f"Restauração cancelada: falha na verificação (quick_check) de {backup_path}")
+                    self._discard_prepared(prepared)
+                    return None
+                
+                arquivos = self._read_manifest(backup_path).get("arquivos") if backup_path.endswith(".json") else None
+                if arquivos is not None:
+                    prepared["arquivos"] = {}
+                    for ano, entry in arquivos.items():
+                        archive_temp = os.path.join(self.backup_dir, f"restaurando_arquivo_{ano}.db.tmp")
+                        prepared["arquivos"][ano] = archive_temp
+                        self._materialize(backup_path, archive_temp, entry)
+                        if not self._verify(archive_temp):
+                            logger.error(f"Restauração cancelada: falha na verificação (quick_check) do arquivo anual {ano}")
+                            self._discard_prepared(prepared)
+                            return None
+                
+                # Criar backup do banco atual antes de restaurar
+                current_backup = self.create_backup("pre_restore")
+                if current_backup:
+                    logger.info(f"Backup atual criado antes da restauração: {current_backup}")
+            
+            return prepared
+        
+        except Exception as e:
+            logger.error(f"Erro ao preparar a restauração do backup: {e}")
+            self._discard_prepared(prepared)
+            return None
     
     def get_latest_backup(self):
         """
@@ -181,6 +914,10 @@ class BackupManager:
             age_hours = (datetime.now() - latest_backup["modified"]).total_seconds() / 3600
             
             if age_hours > 1:  # Mais de 1 hora
+                # Banco sem gravações desde o último backup: nada a copiar
+                if latest_backup.get("marker") and latest_backup["marker"] == self._change_marker():
+                    logger.debug(f"Backup não necessário. Banco sem alterações desde {latest_backup['filename']}")
+                    return None
                 return self.create_backup("auto_scheduled")
             
             logger.debug(f"Backup não necessário. Último backup: {age_hours:.1f}h atrás")
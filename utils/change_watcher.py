@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Detecção de Alterações Feitas por Outras Instâncias
+Vários computadores abrem o mesmo brindes.db. Um timer no loop do Tk consulta
+PRAGMA data_version, que só muda quando outra conexão grava no banco; então
+os contadores de tabela_versoes (mantidos por triggers) dizem quais tabelas
+mudaram, e apenas os eventos correspondentes são emitidos.
+
+No modo cliente (servidor de estoque) os contadores são lidos do servidor a
+cada verificação; as escritas feitas por esta instância voltam com as novas
+versões na resposta e não geram eventos repetidos.
+"""
+from config.settings import CHANGE_WATCH_INTERVAL_MS
+from database.backend import is_client, get_backend
+from database.connection import db
+from utils.event_manager import event_manager, EVENTS
+from utils.logger import debug, warning
+
+
+# tabela -> evento emitido quando outra instância a altera
+WATCHED_TABLES = {
+    "brindes": "STOCK_CHANGED",
+    "movimentacoes": "STOCK_CHANGED",
+    "transferencias": "STOCK_CHANGED",
+    "brindes_excluidos": "STOCK_CHANGED",
+    "categorias": "CATEGORIA_CHANGED",
+    "unidades_medida": "UNIDADE_CHANGED",
+    "fornecedores": "FORNECEDOR_CHANGED",
+    "filiais": "FILIAL_CHANGED",
+    "usuarios": "USUARIO_CHANGED",
+}
+
+
+class ChangeWatcher:
+    """Emite eventos quando outra instância altera o banco"""
+    
+    def __init__(self):
+        self._root = None
+        self._job = None
+        self._interval = CHANGE_WATCH_INTERVAL_MS
+        self._data_version = None
+        self._versions = {}
+        self._listening = False
+        
+        # Banco trocado por esta instância (backup restaurado): as telas já recarregam
+        event_manager.subscribe(EVENTS['DATA_RESET'], self._on_data_reset, first=True)
+    
+    def _on_data_reset(self, data=None):
+        """Adota as versões do banco restaurado sem emitir eventos de alteração"""
+        if self._job is None:
+            return
+        if not is_client():
+            self._data_version = db.data_version()
+        self._versions = db.table_versions()
+    
+    def acknowledge(self, versoes):
+        """Registra versões já conhecidas (escritas feitas por esta instância)"""
+        self._versions.update(versoes)
+    
+    def start(self, root, interval_ms=None):
+        """
+        Inicia a verificação periódica
+        
+        Args:
+            root: Janela principal (o timer roda no loop do Tk, sem threads)
+            interval_ms: Intervalo entre verificações
+        """
+        self.stop()
+        self._root = root
+        self._interval = interval_ms or CHANGE_WATCH_INTERVAL_MS
+        if is_client():
+            if not self._listening:
+                get_backend().on_write(self.acknowledge)
+                self._listening = True
+        else:
+            self._data_version = db.data_version()
+        self._versions = db.table_versions()
+        self._job = root.after(self._interval, self._tick)
+        debug(f"Monitor de alterações iniciado ({self._interval} ms)")
+    
+    def stop(self):
+        """Interrompe a verificação periódica"""
+        if self._job is not None:
+            try:
+                self._root.after_cancel(self._job)
+            except Exception:
+                pass
+        self._job = None
+    
+    def _tick(self):
+        try:
+            self.poll()
+        except Exception as e:
+            warning(f"Erro ao verificar alterações no banco: {e}")
+        
+        try:
+            self._job = self._root.after(self._interval, self._tick)
+        except Exception:
+            # Janela fechada
+            self._job = None
+    
+    def poll(self):
+        """
+        Verifica se outra instância gravou no banco e emite os eventos
+        
+        Returns:
+            set: Tabelas alteradas desde a última verificação
+        """
+        if not is_client():
+            data_version = db.data_version()
+            if data_version == self._data_version:
+                return set()
+            self._data_version = data_version
+        
+        versions = db.table_versions()
+        changed = {tabela for tabela, versao in versions.items() if self._versions.get(tabela) != versao}
+        self._versions = versions
+        
+        # No modo embutido os contadores também sobem com as escritas desta instância
+        # (já notificadas); elas só geram uma recarga a mais quando coincidem com uma
+        # escrita externa
+        changed &= WATCHED_TABLES.keys()
+        if not changed:
+            return changed
+        
+        debug(f"Alterações de outra instância: {', '.join(sorted(changed))}")
+        
+        if "brindes" in changed:
+            from database.dao import BrindeDAO
+            BrindeDAO._descricao_index = None
+        
+        data = {"origem": "externa", "tabelas": sorted(changed)}
+        for evento in dict.fromkeys(WATCHED_TABLES[tabela] for tabela in sorted(changed)):
+            event_manager.emit(EVENTS[evento], data)
+        
+        return changed
+
+
+# Instância global
+change_watcher = ChangeWatcher()
+
+# Updated: 2026-10-19
@@ -3,7 +3,10 @@
 Módulo de Exportação de Dados
 Suporta exportação para Excel e CSV
 """
-import pandas as pd
+import csv
+from itertools import chain, islice
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
 from datetime import datetime
 import os
 from utils.logger import logger
@@ -12,13 +15,70 @@ from utils.logger import logger
 class DataExporter:
     """Classe para exportação de dados"""
     
+    # Linhas lidas por vez; também usadas para estimar a largura das colunas
+    BATCH_SIZE = 500
+    
+    @staticmethod
+    def _peek(data):
+        """
+        Separa o primeiro lote de linhas do restante
+        
+        Aceita listas ou iteradores (ex.: report_generator.iter_*), assim os
+        dados nunca precisam estar inteiros em memória.
+        
+        Returns:
+            tuple: (colunas, primeiro lote, iterador com todas as linhas) ou None se vazio
+        """
+        rows = iter(data)
+        first_batch = list(islice(rows, DataExporter.BATCH_SIZE))
+        if not first_batch:
+            return None
+        
+        columns = list(first_batch[0].keys())
+        return columns, first_batch, chain(first_batch, rows)
+    
+    @staticmethod
+    def _row_values(row, columns):
+        """Valores da linha na ordem das colunas"""
+        return [row.get(column) for column in columns]
+    
+    @staticmethod
+    def _export_path(filename, extension):
+        """Caminho do arquivo de exportação com timestamp"""
+        # Criar diretório de exportação se não existir
+        export_dir = os.path.join(os.getcwd(), "exports")
+        os.makedirs(export_dir, exist_ok=True)
+        
+        # Nome do arquivo com timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(export_dir, f"{filename}_{timestamp}.{extension}")
+    
+    @staticmethod
+    def _write_sheet(workbook, sheet_name, peeked):
+        """Escreve as linhas em uma planilha do workbook (modo write-only)"""
+        columns, first_batch, rows = peeked
+        worksheet = workbook.create_sheet(title=sheet_name[:31])  # Limite de 31 caracteres
+        
+        # Ajustar largura das colunas pelo primeiro lote (no modo write-only
+        # as larguras precisam ser definidas antes de escrever as linhas)
+        for idx, column in enumerate(columns, start=1):
+            max_length = max(
+                max(len(str(row.get(column))) for row in first_batch),
+                len(str(column))
+            )
+            worksheet.column_dimensions[get_column_letter(idx)].width = min(max_length + 2, 50)
+        
+        worksheet.append(columns)
+        for row in rows:
+            worksheet.append(DataExporter._row_values(row, columns))
+    
     @staticmethod
     def export_to_excel(data, filename, sheet_name="Dados"):
         """
         Exporta dados para Excel
         
         Args:
-            data: Lista de dicionários com os dados
+            data: Lista ou iterador de linhas (dicionários ou registros do banco)
             filename: Nome do arquivo (sem extensão)
             sheet_name: Nome da planilha
             
@@ -26,33 +86,17 @@ class DataExporter:
             str: Caminho do arquivo gerado ou None em caso de erro
         """
         try:
-            if not data:
+            peeked = DataExporter._peek(data)
+            if not peeked:
                 logger.warning("Nenhum dado para exportar")
                 return None
             
-            # Criar DataFrame
-            df = pd.DataFrame(data)
-            
-            # Criar diretório de exportação se não existir
-            export_dir = os.path.join(os.getcwd(), "exports")
-            os.makedirs(export_dir, exist_ok=True)
-            
-            # Nome do arquivo com timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filepath = os.path.join(export_dir, f"{filename}_{timestamp}.xlsx")
+            filepath = DataExporter._export_path(filename, "xlsx")
             
-            # Exportar para Excel
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                
-                # Ajustar largura das colunas
-                worksheet = writer.sheets[sheet_name]
-                for idx, col in enumerate(df.columns):
-                    max_length = max(
-                        df[col].astype(str).apply(len).max(),
-                        len(str(col))
-                    )
-                    worksheet.column_dimensions[chr(65 + idx)].width = min(max_length + 2, 50)
+            # Exportar para Excel escrevendo linha a linha
+            workbook = Workbook(write_only=True)
+            DataExporter._write_sheet(workbook, sheet_name, peeked)
+            workbook.save(filepath)
             
             logger.info(f"Dados exportados para: {filepath}")
             return filepath
@@ -67,7 +111,7 @@ class DataExporter:
         Exporta dados para CSV
         
         Args:
-            data: Lista de dicionários com os dados
+            data: Lista ou iterador de linhas (dicionários ou registros do banco)
             filename: Nome do arquivo (sem extensão)
             delimiter: Delimitador do CSV (padrão: ;)
             encoding: Codificação do arquivo (padrão: utf-8-sig para Excel)
@@ -75,30 +119,31 @@ class DataExporter:
         Returns:
             str: Caminho do arquivo gerado ou None em caso de erro
         """
+        filepath = None
         try:
-            if not data:
+            peeked = DataExporter._peek(data)
+            if not peeked:
                 logger.warning("Nenhum dado para exportar")
                 return None
             
-            # Criar DataFrame
-            df = pd.DataFrame(data)
-            
-            # Criar diretório de exportação se não existir
-            export_dir = os.path.join(os.getcwd(), "exports")
-            os.makedirs(export_dir, exist_ok=True)
+            columns, _, rows = peeked
+            filepath = DataExporter._export_path(filename, "csv")
             
-            # Nome do arquivo com timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filepath = os.path.join(export_dir, f"{filename}_{timestamp}.csv")
-            
-            # Exportar para CSV
-            df.to_csv(filepath, sep=delimiter, index=False, encoding=encoding)
+            # Exportar para CSV escrevendo linha a linha
+            with open(filepath, 'w', newline='', encoding=encoding) as f:
+                writer = csv.writer(f, delimiter=delimiter)
+                writer.writerow(columns)
+                for row in rows:
+                    writer.writerow(DataExporter._row_values(row, columns))
             
             logger.info(f"Dados exportados para: {filepath}")
             return filepath
             
         except Exception as e:
             logger.error(f"Erro ao exportar para CSV: {e}")
+            # Linhas interrompidas no meio: não deixar um arquivo incompleto
+            if filepath and os.path.exists(filepath):
+                os.remove(filepath)
             return None
     
     @staticmethod
@@ -118,29 +163,21 @@ class DataExporter:
                 logger.warning("Nenhum dado para exportar")
                 return None
             
-            # Criar diretório de exportação se não existir
-            export_dir = os.path.join(os.getcwd(), "exports")
-            os.makedirs(export_dir, exist_ok=True)
-            
-            # Nome do arquivo com timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filepath = os.path.join(export_dir, f"{filename}_{timestamp}.xlsx")
+            filepath = DataExporter._export_path(filename, "xlsx")
             
             # Exportar para Excel
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                for sheet_name, data in data_dict.items():
-                    if data:
-                        df = pd.DataFrame(data)
-                        df.to_excel(writer, sheet_name=sheet_name[:31], index=False)  # Limite de 31 caracteres
-                        
-                        # Ajustar largura das colunas
-                        worksheet = writer.sheets[sheet_name[:31]]
-                        for idx, col in enumerate(df.columns):
-                            max_length = max(
-                                df[col].astype(str).apply(len).max(),
-                                len(str(col))
-                            )
-                            worksheet.column_dimensions[chr(65 + idx)].width = min(max_length + 2, 50)
+            workbook = Workbook(write_only=True)
+            for sheet_name, data in data_dict.items():
+                peeked = DataExporter._peek(data)
+                if peeked:
+                    DataExporter._write_sheet(workbook, sheet_name, peeked)
+            
+            # Um workbook precisa de ao menos uma planilha
+            if not workbook.worksheets:
+                logger.warning("Nenhum dado para exportar")
+                return None
+            
+            workbook.save(filepath)
             
             logger.info(f"Dados exportados para: {filepath}")
             return filepath
@@ -6,6 +6,7 @@ Suporta importação de Excel e CSV
 import pandas as pd
 from utils.logger import logger
 from database.dao import *
+from database.reference_cache import reference_cache
 
 
 class DataImporter:
@@ -68,11 +69,15 @@ class DataImporter:
         - estoque_minimo (opcional)
         - observacoes (opcional)
         
+        Descrições parecidas com itens já cadastrados (ou com linhas anteriores
+        do próprio arquivo) são importadas, mas geram avisos de possível duplicata.
+        
         Returns:
-            dict: {"success": int, "errors": list}
+            dict: {"success": int, "errors": list, "warnings": list}
         """
         success_count = 0
         errors = []
+        warnings = []
         
         try:
             # Validar colunas obrigatórias
@@ -82,13 +87,14 @@ class DataImporter:
             if missing_cols:
                 return {
                     "success": 0,
-                    "errors": [f"Colunas obrigatórias faltando: {', '.join(missing_cols)}"]
+                    "errors": [f"Colunas obrigatórias faltando: {', '.join(missing_cols)}"],
+                    "warnings": []
                 }
             
             # Buscar categorias, unidades e fornecedores existentes
-            categorias = {c['nome']: c['id'] for c in CategoriaDAO.get_all()}
-            unidades = {u['codigo']: u['id'] for u in UnidadeDAO.get_all()}
-            fornecedores = {f['nome']: f['id'] for f in FornecedorDAO.get_all()}
+            categorias = {c['nome']: c['id'] for c in reference_cache.get_all("categorias")}
+            unidades = {u['codigo']: u['id'] for u in reference_cache.get_all("unidades")}
+            fornecedores = {f['nome']: f['id'] for f in reference_cache.get_all("fornecedores")}
             
             # Processar cada linha
             for idx, row in df.iterrows():
@@ -125,18 +131,30 @@ class DataImporter:
                         "observacoes": str(row.get('observacoes', '')).strip() or None
                     }
                     
+                    # Possível duplicata (o índice inclui as linhas já importadas)
+                    similares = BrindeDAO.find_similar(data['descricao'], limit=1, min_score=0.7)
+                    if similares:
+                        parecido = similares[0]
+                        warnings.append(
+                            f"Linha {idx + 2}: '{data['descricao']}' parecido com "
+                            f"'{parecido['descricao']}' ({parecido['similaridade']:.0%})"
+                        )
+                    
                     BrindeDAO.create(data)
                     success_count += 1
                     
                 except Exception as e:
                     errors.append(f"Linha {idx + 2}: {str(e)}")
             
-            logger.info(f"Importação concluída: {success_count} sucesso, {len(errors)} erros")
-            return {"success": success_count, "errors": errors}
+            logger.info(
+                f"Importação concluída: {success_count} sucesso, {len(errors)} erros, "
+                f"{len(warnings)} possíveis duplicatas"
+            )
+            return {"success": success_count, "errors": errors, "warnings": warnings}
             
         except Exception as e:
             logger.error(f"Erro na importação de brindes: {e}")
-            return {"success": 0, "errors": [str(e)]}
+            return {"success": 0, "errors": [str(e)], "warnings": []}
     
     @staticmethod
     def import_categorias(df):
@@ -10,11 +10,19 @@ class EventManager:
     def __init__(self):
         self.listeners = {}
     
-    def subscribe(self, event_name, callback):
-        """Inscreve um callback para um evento"""
+    def subscribe(self, event_name, callback, first=False):
+        """
+        Inscreve um callback para um evento
+        
+        first=True coloca o callback antes dos já inscritos (caches precisam
+        ser invalidados antes de as telas recarregarem).
+        """
         if event_name not in self.listeners:
             self.listeners[event_name] = []
-        self.listeners[event_name].append(callback)
+        if first:
+            self.listeners[event_name].insert(0, callback)
+        else:
+            self.listeners[event_name].append(callback)
     
     def unsubscribe(self, event_name, callback):
         """Remove inscrição de um callback"""
@@ -42,6 +50,7 @@ EVENTS = {
     'FILIAL_CHANGED': 'filial_changed',
     'USUARIO_CHANGED': 'usuario_changed',
     'FORNECEDOR_CHANGED': 'fornecedor_changed',
+    'DATA_RESET': 'data_reset',              # banco inteiro trocado (ex. backup restaurado)
 }
 
 # Updated: 2025-10-14 14:28:20
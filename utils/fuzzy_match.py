@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Busca Aproximada por Trigramas
+Encontra textos parecidos (erros de digitação, maiúsculas, acentos, espaços)
+"""
+import math
+import re
+import unicodedata
+from collections import defaultdict
+
+
+# Marcas de acentuação separadas das letras pela normalização NFKD
+_ACENTOS = re.compile(r"[\u0300-\u036f]")
+
+
+def normalize(texto):
+    """Normaliza texto para comparação: minúsculas, sem acentos e espaços simples"""
+    texto = unicodedata.normalize("NFKD", str(texto or "").lower())
+    texto = _ACENTOS.sub("", texto)
+    return " ".join(re.findall(r"\w+", texto))
+
+
+def trigrams(texto):
+    """
+    Conjunto de trigramas do texto normalizado
+    
+    Cada palavra é completada com espaços ("  caneta ") para que o início
+    das palavras pese mais, como no pg_trgm do PostgreSQL.
+    """
+    return _trigrams(normalize(texto))
+
+
+def _trigrams(chave):
+    """Trigramas de um texto já normalizado"""
+    return frozenset({
+        palavra[i:i + 3]
+        for palavra in (f"  {p} " for p in chave.split())
+        for i in range(len(palavra) - 2)
+    })
+
+
+def _jaccard(a, b):
+    comuns = len(a & b)
+    return comuns / (len(a) + len(b) - comuns)
+
+
+def _pelo_menos(conjuntos, minimo, dentro=None):
+    """
+    Ids presentes em pelo menos `minimo` dos conjuntos (do menor para o maior)
+    
+    Quem está no primeiro conjunto precisa de minimo - 1 nos demais; quem não
+    está precisa de minimo nos demais. Restringindo sempre ao menor conjunto já
+    escolhido, nenhuma operação percorre as listas grandes das palavras comuns.
+    """
+    if minimo <= 0 or (dentro is not None and not dentro):
+        return dentro
+    if minimo == len(conjuntos):
+        # "&" percorre o menor dos dois lados (intersection copiaria o primeiro)
+        if dentro is None:
+            dentro, conjuntos = conjuntos[0], conjuntos[1:]
+        for conjunto in conjuntos:
+            dentro = dentro & conjunto
+        return dentro
+    
+    primeiro, resto = conjuntos[0], conjuntos[1:]
+    com = primeiro if dentro is None else dentro & primeiro
+    return _pelo_menos(resto, minimo - 1, com) | _pelo_menos(resto, minimo, dentro)
+
+
+def similarity(a, b):
+    """Similaridade entre dois textos (0 a 1), pela proporção de trigramas em comum"""
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    return _jaccard(ta, tb)
+
+
+class TrigramIndex:
+    """
+    Índice em memória para busca aproximada por trigramas
+    
+    Os candidatos saem das palavras: um erro de digitação altera uma palavra,
+    mas as outras continuam idênticas, então um texto parecido contém pelo
+    menos ceil(t * k) das k palavras conhecidas do texto procurado (t é a
+    similaridade mínima), o que se resolve com operações de conjunto sobre as
+    listas de textos de cada palavra. Quando nenhuma palavra é conhecida (descrições de uma palavra só, ou todas
+    com erro), cada palavra é corrigida pelo vocabulário, que é pequeno e tem
+    seu próprio índice de trigramas. Os trigramas de cada texto só são
+    calculados quando ele vira candidato, então montar o índice é barato.
+    """
+    
+    def __init__(self, textos=()):
+        self._chaves = []                       # id -> texto normalizado
+        self._trigramas = []                    # id -> trigramas (calculados sob demanda)
+        self._originais = []                    # id -> textos originais com essa forma normalizada
+        self._ids = {}                          # texto normalizado -> id
+        self._palavras = defaultdict(set)       # palavra -> ids dos textos
+        self._vocabulario = defaultdict(set)    # trigrama -> palavras
+        
+        for texto in textos:
+            self.add(texto)
+    
+    def __len__(self):
+        return len(self._ids)
+    
+    def add(self, texto):
+        """Adiciona um texto ao índice"""
+        chave = normalize(texto)
+        if not chave:
+            return
+        
+        texto_id = self._ids.get(chave)
+        if texto_id is not None:
+            if texto not in self._originais[texto_id]:
+                self._originais[texto_id].append(texto)
+            return
+        
+        texto_id = len(self._chaves)
+        self._ids[chave] = texto_id
+        self._chaves.append(chave)
+        self._trigramas.append(None)
+        self._originais.append([texto])
+        
+        for palavra in set(chave.split()):
+            ids = self._palavras[palavra]
+            if not ids:
+                for tri in _trigrams(palavra):
+                    self._vocabulario[tri].add(palavra)
+            ids.add(texto_id)
+    
+    def _trigramas_de(self, texto_id):
+        tris = self._trigramas[texto_id]
+        if tris is None:
+            tris = self._trigramas[texto_id] = _trigrams(self._chaves[texto_id])
+        return tris
+    
+    def _palavras_parecidas(self, palavra, min_score):
+        """Palavras do vocabulário parecidas com uma palavra desconhecida"""
+        tris = _trigrams(palavra)
+        vizinhas = set()
+        for tri in tris:
+            vizinhas.update(self._vocabulario.get(tri, ()))
+        return [outra for outra in vizinhas if _jaccard(tris, _trigrams(outra)) >= min_score]
+    
+    def search(self, texto, limit=5, min_score=0.5):
+        """
+        Busca textos parecidos
+        
+        Args:
+            texto: Texto procurado
+            limit: Quantidade máxima de resultados
+            min_score: Similaridade mínima (0 a 1)
+        
+        Returns:
+            list: Tuplas (texto original, similaridade), da mais parecida para a menos
+        """
+        chave = normalize(texto)
+        tris = _trigrams(chave)
+        if not tris:
+            return []
+        
+        resultados = []
+        
+        # Mesma forma normalizada: similaridade máxima, sem precisar comparar
+        exato = self._ids.get(chave)
+        if exato is not None:
+            resultados.extend((original, 1.0) for original in self._originais[exato])
+        
+        # Candidatos: textos com ceil(t * k) das k palavras conhecidas
+        palavras = set(chave.split())
+        conhecidas = sorted((self._palavras[p] for p in palavras if p in self._palavras), key=len)
+        if conhecidas:
+            candidatos = _pelo_menos(conhecidas, max(1, math.ceil(min_score * len(conhecidas))))
+        else:
+            candidatos = set()
+            for palavra in palavras:
+                for parecida in self._palavras_parecidas(palavra, min_score):
+                    candidatos.update(self._palavras[parecida])
+        
+        for candidato in candidatos:
+            if candidato == exato:
+                continue
+            
+            outros = self._trigramas_de(candidato)
+            
+            # Filtro por tamanho antes de comparar os conjuntos
+            if not min_score * len(tris) <= len(outros) <= len(tris) / min_score:
+                continue
+            
+            score = _jaccard(tris, outros)
+            if score >= min_score:
+                resultados.extend((original, score) for original in self._originais[candidato])
+        
+        resultados.sort(key=lambda item: -item[1])
+        return resultados[:limit]
+
+# Updated: 2026-10-19
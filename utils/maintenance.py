@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+Manutenção do Banco em Períodos Ociosos
+Sem manutenção, o otimizador de consultas trabalha com estatísticas antigas
+(movimentacoes só cresce) e o arquivo guarda as páginas liberadas por
+exclusões. Um timer no loop do Tk verifica se o usuário está sem usar teclado
+e mouse há MAINTENANCE_IDLE_SECONDS e, se estiver, executa uma tarefa vencida
+por verificação (cada uma curta, na própria conexão do aplicativo):
+  - analyze: ANALYZE com PRAGMA analysis_limit, a cada MAINTENANCE_ANALYZE_DAYS
+  - optimize: PRAGMA optimize, a cada MAINTENANCE_OPTIMIZE_HOURS
+  - incremental_vacuum: devolve ao disco até MAINTENANCE_VACUUM_PAGES páginas
+    livres por execução
+  - arquivar: move movimentações e transferências mais antigas que o horizonte
+    para os arquivos anuais, até ARCHIVE_MAX_ROWS_PER_RUN linhas por execução
+    (ver database/archive.py; não roda na réplica, que recebe as exclusões do
+    banco principal)
+  - fechamento_estoque: foto diária do estoque para as consultas de estoque
+    em uma data (ver database/stock_closings.py; só no banco principal)
+  - conciliar: soma ao saldo do razão as movimentações e transferências
+    novas e compara com o estoque, até RECONCILE_MAX_ROWS_PER_RUN linhas por
+    execução (ver database/reconciliation.py; só no banco principal). Fica
+    por último para não atrasar as outras tarefas enquanto houver razão a
+    processar
+
+Cada execução é registrada em manutencao_execucoes com a duração; como o
+registro fica no banco, várias instâncias abrindo o mesmo arquivo não repetem
+as tarefas umas das outras.
+
+Bancos criados antes do auto_vacuum incremental só passam a usá-lo depois de
+um VACUUM completo, que reescreve o arquivo inteiro e bloqueia as outras
+conexões até terminar: não é uma tarefa ociosa, é uma ação do administrador
+em Configurações > Backup (convert_auto_vacuum, na thread de backup, numa
+conexão própria).
+"""
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from config.settings import (
+    MAINTENANCE_CHECK_INTERVAL_MS, MAINTENANCE_IDLE_SECONDS, MAINTENANCE_OPTIMIZE_HOURS,
+    MAINTENANCE_ANALYZE_DAYS, MAINTENANCE_ANALYSIS_LIMIT, MAINTENANCE_VACUUM_PAGES,
+    MAINTENANCE_VACUUM_MIN_FREE_PAGES, MAINTENANCE_HISTORY_DAYS, DB_PATH, REPLICA_PATH,
+)
+from database.connection import db, is_replica, resolve_db_path
+from database.archive import archive_manager
+from database.stock_closings import stock_closings
+from database.reconciliation import ledger_reconciler
+from utils.logger import info, debug, warning
+
+
+# PRAGMA auto_vacuum
+AUTO_VACUUM_INCREMENTAL = 2
+
+# Eventos do Tk que contam como atividade do usuário
+ACTIVITY_EVENTS = ("<KeyPress>", "<ButtonPress>", "<Motion>", "<MouseWheel>")
+
+
+class MaintenanceScheduler:
+    """Executa as tarefas de manutenção do banco quando o aplicativo está ocioso"""
+    
+    def __init__(self):
+        self._root = None
+        self._job = None
+        self._interval = MAINTENANCE_CHECK_INTERVAL_MS
+        self._last_activity = time.monotonic()
+    
+    def start(self, root, interval_ms=None):
+        """
+        Inicia a verificação periódica
+        
+        Args:
+            root: Janela principal (atividade e timer vêm do loop do Tk, sem threads)
+            interval_ms: Intervalo entre verificações
+        """
+        self.stop()
+        self._root = root
+        self._interval = interval_ms or MAINTENANCE_CHECK_INTERVAL_MS
+        self._last_activity = time.monotonic()
+        for sequence in ACTIVITY_EVENTS:
+            root.bind_all(sequence, self._touch, add="+")
+        self._job = root.after(self._interval, self._tick)
+        debug(f"Manutenção em períodos ociosos iniciada ({self._interval} ms)")
+    
+    def stop(self):
+        """Interrompe a verificação periódica"""
+        if self._job is not None:
+            try:
+                self._root.after_cancel(self._job)
+            except Exception:
+                pass
+        self._job = None
+    
+    def _touch(self, event=None):
+        self._last_activity = time.monotonic()
+    
+    def idle_seconds(self):
+        """Segundos desde a última tecla/clique/movimento do mouse"""
+        return time.monotonic() - self._last_activity
+    
+    def _tick(self):
+        try:
+            self.run_pending(self.idle_seconds())
+        except Exception as e:
+            warning(f"Erro na manutenção do banco: {e}")
+        
+        try:
+            self._job = self._root.after(self._interval, self._tick)
+        except Exception:
+            # Janela fechada
+            self._job = None
+    
+    def run_pending(self, idle_seconds):
+        """
+        Executa a primeira tarefa vencida, se o aplicativo estiver ocioso
+        
+        Args:
+            idle_seconds: Tempo sem atividade do usuário
+        
+        Returns:
+            str: Nome da tarefa executada ou None
+        """
+        if idle_seconds < MAINTENANCE_IDLE_SECONDS:
+            return None
+        
+        last_runs = self.last_runs()
+        now = datetime.utcnow()
+        
+        def older_than(tarefa, interval):
+            return tarefa not in last_runs or now - last_runs[tarefa] >= interval
+        
+        # Sem auto_vacuum incremental (banco antigo) não há o que devolver ao disco
+        # até o administrador converter o banco (convert_auto_vacuum)
+        conn = db.get_connection()
+        if (
+            not self.needs_conversion()
+            and conn.execute("PRAGMA freelist_count").fetchone()[0] >= MAINTENANCE_VACUUM_MIN_FREE_PAGES
+        ):
+            return self._run("incremental_vacuum", self._incremental_vacuum)
+        
+        if not is_replica() and stock_closings.pending():
+            return self._run("fechamento_estoque", self._close_stock)
+        if not is_replica() and archive_manager.pending():
+            return self._run("arquivar", self._archive)
+        
+        if older_than("analyze", timedelta(days=MAINTENANCE_ANALYZE_DAYS)):
+            return self._run("analyze", self._analyze)
+        if older_than("optimize", timedelta(hours=MAINTENANCE_OPTIMIZE_HOURS)):
+            return self._run("optimize", self._optimize)
+        if not is_replica() and ledger_reconciler.pending():
+            return self._run("conciliar", self._reconcile)
+        return None
+    
+    def _run(self, tarefa, func):
+        """Executa a tarefa e registra a duração"""
+        started = time.perf_counter()
+        detalhes = func()
+        duracao_ms = int((time.perf_counter() - started) * 1000)
+        
+        db.execute_update(
+            "INSERT INTO manutencao_execucoes (tarefa, duracao_ms, detalhes) VALUES (?, ?, ?)",
+            (tarefa, duracao_ms, detalhes)
+        )
+        db.execute_update(
+            "DELETE FROM manutencao_execucoes WHERE executada_em < datetime('now', ?)",
+            (f"-{MAINTENANCE_HISTORY_DAYS} days",)
+        )
+        info(f"Manutenção do banco: {tarefa} em {duracao_ms} ms ({detalhes})")
+        return tarefa
+    
+    @staticmethod
+    def needs_conversion():
+        """Indica se o banco ainda não usa auto_vacuum incremental (criado antes da mudança)"""
+        conn = db.get_connection()
+        # O valor fica guardado na conexão até a próxima leitura do arquivo:
+        # ler o schema antes, para enxergar uma conversão feita por outra conexão
+        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL
+    
+    @staticmethod
+    def convert_auto_vacuum():
+        """
+        VACUUM único: reorganiza o arquivo e ativa auto_vacuum incremental
+        
+        Ação do administrador (Configurações > Backup): rodar na thread de
+        backup (backup_manager.submit), nunca no loop do Tk. Usa uma conexão
+        própria; o aplicativo e as outras instâncias esperam o VACUUM terminar
+        para gravar.
+        
+        Returns:
+            str: Páginas antes e depois
+        """
+        path = resolve_db_path(REPLICA_PATH if is_replica() else DB_PATH)
+        started = time.perf_counter()
+        
+        conn = sqlite3.connect(path, timeout=60)
+        try:
+            before = conn.execute("PRAGMA page_count").fetchone()[0]
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            after = conn.execute("PRAGMA page_count").fetchone()[0]
+            detalhes = f"{before} -> {after} páginas"
+            
+            duracao_ms = int((time.perf_counter() - started) * 1000)
+            conn.execute(
+                "INSERT INTO manutencao_execucoes (tarefa, duracao_ms, detalhes) VALUES (?, ?, ?)",
+                ("converter_auto_vacuum", duracao_ms, detalhes)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        
+        info(f"Manutenção do banco: converter_auto_vacuum em {duracao_ms} ms ({detalhes})")
+        return detalhes
+    
+    @staticmethod
+    def _incremental_vacuum():
+        """Devolve ao disco parte das páginas livres (limite por execução)"""
+        conn = db.get_connection()
+        conn.commit()
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        # Cada passo do comando libera uma página: executescript roda até o fim
+        # (execute daria um único passo)
+        conn.executescript(f"PRAGMA incremental_vacuum({int(MAINTENANCE_VACUUM_PAGES)});")
+        after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return f"{before - after} páginas liberadas, {after} livres restantes"
+    
+    @staticmethod
+    def _archive():
+        """Move as linhas antigas para os arquivos anuais (limite por execução)"""
+        moved = archive_manager.archive()
+        return ", ".join(f"{tabela}: {linhas}" for tabela, linhas in moved.items())
+    
+    @staticmethod
+    def _close_stock():
+        """Registra o fechamento de estoque do dia"""
+        fechamento_id, itens = stock_closings.close()
+        return f"fechamento {fechamento_id}: {itens} brindes"
+    
+    @staticmethod
+    def _reconcile():
+        """Processa o razão novo e verifica os brindes alterados (limite por execução)"""
+        resultado = ledger_reconciler.run()
+        return (
+            f"{resultado['linhas']} linhas do razão, {resultado['verificados']} brindes verificados, "
+            f"{resultado['divergentes']} divergentes"
+        )
+    
+    @staticmethod
+    def _analyze():
+        """Atualiza as estatísticas do otimizador (amostragem limitada)"""
+        conn = db.get_connection()
+        conn.execute(f"PRAGMA analysis_limit = {int(MAINTENANCE_ANALYSIS_LIMIT)}")
+        conn.execute("ANALYZE")
+        conn.commit()
+        return f"analysis_limit {MAINTENANCE_ANALYSIS_LIMIT}"
+    
+    @staticmethod
+    def _optimize():
+        """PRAGMA optimize: reanalisa só o que ficou desatualizado"""
+        conn = db.get_connection()
+        conn.execute(f"PRAGMA analysis_limit = {int(MAINTENANCE_ANALYSIS_LIMIT)}")
+        conn.execute("PRAGMA optimize").fetchall()
+        conn.commit()
+        return "ok"
+    
+    @staticmethod
+    def last_runs():
+        """Última execução (UTC) de cada tarefa"""
+        rows = db.execute_query(
+            "SELECT tarefa, MAX(executada_em) AS executada_em FROM manutencao_execucoes GROUP BY tarefa"
+        )
+        return {row["tarefa"]: datetime.fromisoformat(row["executada_em"]) for row in rows}
+    
+    @staticmethod
+    def history(limit=50):
+        """Execuções mais recentes (tarefa, executada_em, duracao_ms, detalhes)"""
+        return db.execute_query(
+            """
+            SELECT tarefa, executada_em, duracao_ms, detalhes
+            FROM manutencao_execucoes
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (limit,)
+        )
+
+
+# Instância global
+maintenance_scheduler = MaintenanceScheduler()
+
+# Updated: 2026-10-19
@@ -3,7 +3,11 @@
 Gerador de Relatórios
 """
 from database.connection import db
+from database.archive import archive_manager
+from database.stock_closings import stock_closings
+from database.reconciliation import ledger_reconciler
 from database.dao import BrindeDAO, BrindeExcluidoDAO, MovimentacaoDAO, TransferenciaDAO
+from database.backend import is_client, RemoteService
 from utils.logger import logger
 from datetime import datetime, timedelta
 import json
@@ -12,48 +16,114 @@ import json
 class ReportGenerator:
     """Gerador de relatórios do sistema"""
     
+    @staticmethod
+    def _estoque_atual_query(filial_id=None):
+        """Monta a query do relatório de estoque atual"""
+        query = """
+            SELECT 
+                b.descricao,
+                c.nome as categoria,
+                b.quantidade,
+                u.codigo as unidade,
+                b.valor_unitario,
+                b.quantidade * b.valor_unitario as valor_total,
+                f.nome as filial,
+                fo.nome as fornecedor,
+                b.estoque_minimo,
+                CASE WHEN b.quantidade <= b.estoque_minimo THEN 'BAIXO' ELSE 'OK' END as status_estoque
+            FROM brindes b
+            INNER JOIN categorias c ON b.categoria_id = c.id
+            INNER JOIN unidades_medida u ON b.unidade_id = u.id
+            INNER JOIN filiais f ON b.filial_id = f.id
+            LEFT JOIN fornecedores fo ON b.fornecedor_id = fo.id
+        """
+        
+        params = []
+        if filial_id:
+            query += " WHERE b.filial_id = ?"
+            params.append(filial_id)
+        
+        query += " ORDER BY f.nome, c.nome, b.descricao"
+        
+        return query, params
+    
     @staticmethod
     def get_estoque_atual(filial_id=None):
         """Relatório de estoque atual"""
         try:
-            query = """
-                SELECT 
-                    b.descricao,
-                    c.nome as categoria,
-                    b.quantidade,
-                    u.codigo as unidade,
-                    b.valor_unitario,
-                    b.quantidade * b.valor_unitario as valor_total,
-                    f.nome as filial,
-                    fo.nome as fornecedor,
-                    b.estoque_minimo,
-                    CASE WHEN b.quantidade <= b.estoque_minimo THEN 'BAIXO' ELSE 'OK' END as status_estoque
-                FROM brindes b
-                INNER JOIN categorias c ON b.categoria_id = c.id
-                INNER JOIN unidades_medida u ON b.unidade_id = u.id
-                INNER JOIN filiais f ON b.filial_id = f.id
-                LEFT JOIN fornecedores fo ON b.fornecedor_id = fo.id
-            """
-            
-            params = []
-            if filial_id:
-                query += " WHERE b.filial_id = ?"
-                params.append(filial_id)
-            
-            query += " ORDER BY f.nome, c.nome, b.descricao"
-            
+            query, params = ReportGenerator._estoque_atual_query(filial_id)
             rows = db.execute_query(query, params)
-            return [dict(row) for row in rows]
-            
+            return rows
+        
         except Exception as e:
             logger.error(f"Erro no relatório de estoque: {e}")
             return []
     
     @staticmethod
-    def get_movimentacoes(data_inicio=None, data_fim=None, filial_id=None):
-        """Relatório de movimentações"""
+    def iter_estoque(filial_id=None, batch_size=500):
+        """Relatório de estoque atual entregue sob demanda (exportação e tabelas grandes)"""
         try:
-            query = """
+            query, params = ReportGenerator._estoque_atual_query(filial_id)
+            yield from db.iter_query(query, params, batch_size)
+        
+        except Exception as e:
+            logger.error(f"Erro no relatório de estoque: {e}")
+            # Exportação interrompida não pode parecer completa
+            raise
+    
+    @staticmethod
+    def _union(partes):
+        """Junta as consultas de cada tabela (principal e arquivos anuais) com UNION ALL"""
+        query = " UNION ALL ".join(consulta for consulta, _ in partes)
+        params = [param for _, parametros in partes for param in parametros]
+        return query, params
+    
+    @staticmethod
+    def _windows(rodada, coluna):
+        """(tabela, condição, parâmetros) da faixa de datas de cada fonte de uma rodada"""
+        return [(tabela, *archive_manager.window(coluna, desde, ate)) for tabela, desde, ate in rodada]
+    
+    @staticmethod
+    def get_estoque_em(data, filial_id=None):
+        """Relatório de estoque no fim de um dia passado (ver database/stock_closings.py)"""
+        try:
+            return stock_closings.stock_as_of(data, filial_id)
+            
+        except Exception as e:
+            logger.error(f"Erro no relatório de estoque em {data}: {e}")
+            return []
+    
+    @staticmethod
+    def get_divergencias_estoque(filial_id=None):
+        """Brindes cuja quantidade não bate com o razão (ver database/reconciliation.py)"""
+        try:
+            return ledger_reconciler.divergences(filial_id)
+            
+        except Exception as e:
+            logger.error(f"Erro no relatório de divergências de estoque: {e}")
+            return []
+    
+    @staticmethod
+    def get_conciliacao_status():
+        """Linhas do razão ainda não processadas, brindes a verificar e divergências"""
+        return ledger_reconciler.status()
+    
+    @staticmethod
+    def _movimentacoes_queries(data_inicio=None, data_fim=None, filial_id=None):
+        """
+        Monta as queries do relatório de movimentações, uma por rodada de
+        anos arquivados do período (ver ArchiveManager.rounds), da mais
+        recente para a mais antiga
+        """
+        for rodada in archive_manager.rounds("movimentacoes", data_inicio, data_fim):
+            yield ReportGenerator._movimentacoes_round(rodada, data_inicio, data_fim, filial_id)
+    
+    @staticmethod
+    def _movimentacoes_round(rodada, data_inicio, data_fim, filial_id):
+        """Query do relatório de movimentações sobre as tabelas de uma rodada"""
+        partes = []
+        for tabela, desde, ate in rodada:
+            query = f"""
                 SELECT 
                     m.data_movimentacao,
                     m.tipo,
@@ -64,7 +134,7 @@ class ReportGenerator:
                     u.nome as usuario,
                     f.nome as filial,
                     m.justificativa
-                FROM movimentacoes m
+                FROM {tabela} m
                 INNER JOIN brindes b ON m.brinde_id = b.id
                 INNER JOIN usuarios u ON m.usuario_id = u.id
                 INNER JOIN filiais f ON b.filial_id = f.id
@@ -85,20 +155,58 @@ class ReportGenerator:
                 query += " AND b.filial_id = ?"
                 params.append(filial_id)
             
-            query += " ORDER BY m.data_movimentacao DESC"
-            
-            rows = db.execute_query(query, params)
-            return [dict(row) for row in rows]
+            faixa, faixa_params = archive_manager.window("m.data_movimentacao", desde, ate)
+            query += faixa
+            params += faixa_params
             
+            partes.append((query, params))
+        
+        query, params = ReportGenerator._union(partes)
+        query += " ORDER BY data_movimentacao DESC"
+        
+        return query, params
+    
+    @staticmethod
+    def get_movimentacoes(data_inicio=None, data_fim=None, filial_id=None):
+        """Relatório de movimentações"""
+        try:
+            rows = []
+            for query, params in ReportGenerator._movimentacoes_queries(data_inicio, data_fim, filial_id):
+                rows += db.execute_query(query, params)
+            return rows
+        
         except Exception as e:
             logger.error(f"Erro no relatório de movimentações: {e}")
             return []
     
     @staticmethod
-    def get_transferencias(data_inicio=None, data_fim=None, filial_id=None):
-        """Relatório de transferências"""
+    def iter_movimentacoes(data_inicio=None, data_fim=None, filial_id=None, batch_size=500):
+        """Relatório de movimentações entregue sob demanda (exportação e tabelas grandes)"""
         try:
-            query = """
+            for query, params in ReportGenerator._movimentacoes_queries(data_inicio, data_fim, filial_id):
+                yield from db.iter_query(query, params, batch_size)
+        
+        except Exception as e:
+            logger.error(f"Erro no relatório de movimentações: {e}")
+            # Exportação interrompida não pode parecer completa
+            raise
+    
+    @staticmethod
+    def _transferencias_queries(data_inicio=None, data_fim=None, filial_id=None):
+        """
+        Monta as queries do relatório de transferências, uma por rodada de
+        anos arquivados do período (ver ArchiveManager.rounds), da mais
+        recente para a mais antiga
+        """
+        for rodada in archive_manager.rounds("transferencias", data_inicio, data_fim):
+            yield ReportGenerator._transferencias_round(rodada, data_inicio, data_fim, filial_id)
+    
+    @staticmethod
+    def _transferencias_round(rodada, data_inicio, data_fim, filial_id):
+        """Query do relatório de transferências sobre as tabelas de uma rodada"""
+        partes = []
+        for tabela, desde, ate in rodada:
+            query = f"""
                 SELECT 
                     t.data_transferencia,
                     b.descricao as brinde,
@@ -107,7 +215,7 @@ class ReportGenerator:
                     fd.nome as filial_destino,
                     u.nome as usuario,
                     t.justificativa
-                FROM transferencias t
+                FROM {tabela} t
                 INNER JOIN brindes b ON t.brinde_id = b.id
                 INNER JOIN filiais fo ON t.filial_origem_id = fo.id
                 INNER JOIN filiais fd ON t.filial_destino_id = fd.id
@@ -130,50 +238,95 @@ class ReportGenerator:
                 params.append(filial_id)
                 params.append(filial_id)
             
-            query += " ORDER BY t.data_transferencia DESC"
-            
-            rows = db.execute_query(query, params)
-            return [dict(row) for row in rows]
+            faixa, faixa_params = archive_manager.window("t.data_transferencia", desde, ate)
+            query += faixa
+            params += faixa_params
             
+            partes.append((query, params))
+        
+        query, params = ReportGenerator._union(partes)
+        query += " ORDER BY data_transferencia DESC"
+        
+        return query, params
+    
+    @staticmethod
+    def get_transferencias(data_inicio=None, data_fim=None, filial_id=None):
+        """Relatório de transferências"""
+        try:
+            rows = []
+            for query, params in ReportGenerator._transferencias_queries(data_inicio, data_fim, filial_id):
+                rows += db.execute_query(query, params)
+            return rows
+        
         except Exception as e:
             logger.error(f"Erro no relatório de transferências: {e}")
             return []
     
+    @staticmethod
+    def iter_transferencias(data_inicio=None, data_fim=None, filial_id=None, batch_size=500):
+        """Relatório de transferências entregue sob demanda (exportação e tabelas grandes)"""
+        try:
+            for query, params in ReportGenerator._transferencias_queries(data_inicio, data_fim, filial_id):
+                yield from db.iter_query(query, params, batch_size)
+        
+        except Exception as e:
+            logger.error(f"Erro no relatório de transferências: {e}")
+            # Exportação interrompida não pode parecer completa
+            raise
+    
+    @staticmethod
+    def _estoque_baixo_query(filial_id=None):
+        """Monta a query do relatório de estoque baixo"""
+        query = """
+            SELECT 
+                b.descricao,
+                c.nome as categoria,
+                b.quantidade,
+                b.estoque_minimo,
+                u.codigo as unidade,
+                f.nome as filial,
+                fo.nome as fornecedor
+            FROM brindes b
+            INNER JOIN categorias c ON b.categoria_id = c.id
+            INNER JOIN unidades_medida u ON b.unidade_id = u.id
+            INNER JOIN filiais f ON b.filial_id = f.id
+            LEFT JOIN fornecedores fo ON b.fornecedor_id = fo.id
+            WHERE b.quantidade <= b.estoque_minimo
+        """
+        
+        params = []
+        if filial_id:
+            query += " AND b.filial_id = ?"
+            params.append(filial_id)
+        
+        query += " ORDER BY f.nome, (b.quantidade - b.estoque_minimo), b.descricao"
+        
+        return query, params
+    
     @staticmethod
     def get_estoque_baixo(filial_id=None):
         """Relatório de estoque baixo"""
         try:
-            query = """
-                SELECT 
-                    b.descricao,
-                    c.nome as categoria,
-                    b.quantidade,
-                    b.estoque_minimo,
-                    u.codigo as unidade,
-                    f.nome as filial,
-                    fo.nome as fornecedor
-                FROM brindes b
-                INNER JOIN categorias c ON b.categoria_id = c.id
-                INNER JOIN unidades_medida u ON b.unidade_id = u.id
-                INNER JOIN filiais f ON b.filial_id = f.id
-                LEFT JOIN fornecedores fo ON b.fornecedor_id = fo.id
-                WHERE b.quantidade <= b.estoque_minimo
-            """
-            
-            params = []
-            if filial_id:
-                query += " AND b.filial_id = ?"
-                params.append(filial_id)
-            
-            query += " ORDER BY f.nome, (b.quantidade - b.estoque_minimo), b.descricao"
-            
+            query, params = ReportGenerator._estoque_baixo_query(filial_id)
             rows = db.execute_query(query, params)
-            return [dict(row) for row in rows]
-            
+            return rows
+        
         except Exception as e:
             logger.error(f"Erro no relatório de estoque baixo: {e}")
             return []
     
+    @staticmethod
+    def iter_estoque_baixo(filial_id=None, batch_size=500):
+        """Relatório de estoque baixo entregue sob demanda (exportação e tabelas grandes)"""
+        try:
+            query, params = ReportGenerator._estoque_baixo_query(filial_id)
+            yield from db.iter_query(query, params, batch_size)
+        
+        except Exception as e:
+            logger.error(f"Erro no relatório de estoque baixo: {e}")
+            # Exportação interrompida não pode parecer completa
+            raise
+    
     @staticmethod
     def get_valor_por_categoria(filial_id=None):
         """Relatório de valor por categoria"""
@@ -203,40 +356,58 @@ class ReportGenerator:
             """
             
             rows = db.execute_query(query, params)
-            return [dict(row) for row in rows]
-            
+            return rows
+        
         except Exception as e:
             logger.error(f"Erro no relatório de valor por categoria: {e}")
             return []
     
+    @staticmethod
+    def _usuarios_query():
+        """Monta a query do relatório de usuários"""
+        query = """
+            SELECT 
+                u.nome,
+                u.username,
+                u.email,
+                u.perfil,
+                f.nome as filial,
+                CASE WHEN u.ativo = 1 THEN 'ATIVO' ELSE 'INATIVO' END as status,
+                u.created_at as data_criacao,
+                COUNT(m.id) as total_movimentacoes
+            FROM usuarios u
+            INNER JOIN filiais f ON u.filial_id = f.id
+            LEFT JOIN movimentacoes m ON u.id = m.usuario_id
+            GROUP BY u.id, u.nome, u.username, u.email, u.perfil, f.nome, u.ativo, u.created_at
+            ORDER BY f.nome, u.nome
+        """
+        
+        return query, []
+    
     @staticmethod
     def get_usuarios_report():
         """Relatório de usuários"""
         try:
-            query = """
-                SELECT 
-                    u.nome,
-                    u.username,
-                    u.email,
-                    u.perfil,
-                    f.nome as filial,
-                    CASE WHEN u.ativo = 1 THEN 'ATIVO' ELSE 'INATIVO' END as status,
-                    u.created_at as data_criacao,
-                    COUNT(m.id) as total_movimentacoes
-                FROM usuarios u
-                INNER JOIN filiais f ON u.filial_id = f.id
-                LEFT JOIN movimentacoes m ON u.id = m.usuario_id
-                GROUP BY u.id, u.nome, u.username, u.email, u.perfil, f.nome, u.ativo, u.created_at
-                ORDER BY f.nome, u.nome
-            """
-            
-            rows = db.execute_query(query)
-            return [dict(row) for row in rows]
-            
+            query, params = ReportGenerator._usuarios_query()
+            rows = db.execute_query(query, params)
+            return rows
+        
         except Exception as e:
             logger.error(f"Erro no relatório de usuários: {e}")
             return []
     
+    @staticmethod
+    def iter_usuarios(batch_size=500):
+        """Relatório de usuários entregue sob demanda (exportação e tabelas grandes)"""
+        try:
+            query, params = ReportGenerator._usuarios_query()
+            yield from db.iter_query(query, params, batch_size)
+        
+        except Exception as e:
+            logger.error(f"Erro no relatório de usuários: {e}")
+            # Exportação interrompida não pode parecer completa
+            raise
+    
     @staticmethod
     def get_historico_item(brinde_id):
         """Histórico completo de um item"""
@@ -257,33 +428,41 @@ class ReportGenerator:
             if not brinde_rows:
                 return {"brinde": None, "movimentacoes": [], "transferencias": []}
             
-            brinde = dict(brinde_rows[0])
-            
-            # Buscar movimentações
-            mov_query = """
-                SELECT m.*, u.nome as usuario
-                FROM movimentacoes m
-                INNER JOIN usuarios u ON m.usuario_id = u.id
-                WHERE m.brinde_id = ?
-                ORDER BY m.data_movimentacao DESC
-            """
-            
-            mov_rows = db.execute_query(mov_query, (brinde_id,))
-            movimentacoes = [dict(row) for row in mov_rows]
-            
-            # Buscar transferências
-            trans_query = """
-                SELECT t.*, u.nome as usuario, fo.nome as filial_origem, fd.nome as filial_destino
-                FROM transferencias t
-                INNER JOIN usuarios u ON t.usuario_id = u.id
-                INNER JOIN filiais fo ON t.filial_origem_id = fo.id
-                INNER JOIN filiais fd ON t.filial_destino_id = fd.id
-                WHERE t.brinde_id = ?
-                ORDER BY t.data_transferencia DESC
-            """
-            
-            trans_rows = db.execute_query(trans_query, (brinde_id,))
-            transferencias = [dict(row) for row in trans_rows]
+            brinde = brinde_rows[0]
+            
+            # Buscar movimentações (banco principal e anos arquivados)
+            movimentacoes = []
+            for rodada in archive_manager.rounds("movimentacoes"):
+                mov_query, mov_params = ReportGenerator._union([
+                    (f"""
+                        SELECT m.*, u.nome as usuario
+                        FROM {tabela} m
+                        INNER JOIN usuarios u ON m.usuario_id = u.id
+                        WHERE m.brinde_id = ?{faixa}
+                    """, [brinde_id] + faixa_params)
+                    for tabela, faixa, faixa_params in ReportGenerator._windows(rodada, "m.data_movimentacao")
+                ])
+                mov_query += " ORDER BY data_movimentacao DESC"
+                
+                movimentacoes += db.execute_query(mov_query, mov_params)
+            
+            # Buscar transferências (banco principal e anos arquivados)
+            transferencias = []
+            for rodada in archive_manager.rounds("transferencias"):
+                trans_query, trans_params = ReportGenerator._union([
+                    (f"""
+                        SELECT t.*, u.nome as usuario, fo.nome as filial_origem, fd.nome as filial_destino
+                        FROM {tabela} t
+                        INNER JOIN usuarios u ON t.usuario_id = u.id
+                        INNER JOIN filiais fo ON t.filial_origem_id = fo.id
+                        INNER JOIN filiais fd ON t.filial_destino_id = fd.id
+                        WHERE t.brinde_id = ?{faixa}
+                    """, [brinde_id] + faixa_params)
+                    for tabela, faixa, faixa_params in ReportGenerator._windows(rodada, "t.data_transferencia")
+                ])
+                trans_query += " ORDER BY data_transferencia DESC"
+                
+                transferencias += db.execute_query(trans_query, trans_params)
             
             return {
                 "brinde": brinde,
@@ -301,25 +480,27 @@ class ReportGenerator:
         try:
             stats = {}
             
-            # Total de brindes
-            total_query = "SELECT COUNT(*) as total FROM brindes"
-            result = db.execute_query(total_query)
-            stats["total_brindes"] = result[0]["total"] if result else 0
-            
-            # Valor total do estoque
-            valor_query = "SELECT SUM(quantidade * valor_unitario) as valor_total FROM brindes"
-            result = db.execute_query(valor_query)
-            stats["valor_total"] = result[0]["valor_total"] or 0
-            
-            # Itens com estoque baixo
-            baixo_query = "SELECT COUNT(*) as total FROM brindes WHERE quantidade <= estoque_minimo"
-            result = db.execute_query(baixo_query)
-            stats["estoque_baixo"] = result[0]["total"] if result else 0
-            
-            # Movimentações hoje
-            hoje = datetime.now().strftime("%Y-%m-%d")
-            mov_query = "SELECT COUNT(*) as total FROM movimentacoes WHERE DATE(data_movimentacao) = ?"
-            result = db.execute_query(mov_query, (hoje,))
+            # Totais de estoque a partir do resumo materializado
+            resumo_query = """
+                SELECT 
+                    SUM(total_produtos) as total_brindes,
+                    SUM(valor_total) as valor_total,
+                    SUM(itens_estoque_baixo) as estoque_baixo
+                FROM estoque_resumo
+            """
+            resumo = db.execute_query(resumo_query)[0]
+            stats["total_brindes"] = resumo["total_brindes"] or 0
+            stats["valor_total"] = resumo["valor_total"] or 0
+            stats["estoque_baixo"] = resumo["estoque_baixo"] or 0
+            
+            # Movimentações hoje (intervalo em vez de DATE() para usar o índice de data)
+            hoje = datetime.now()
+            amanha = hoje + timedelta(days=1)
+            mov_query = """
+                SELECT COUNT(*) as total FROM movimentacoes
+                WHERE data_movimentacao >= ? AND data_movimentacao < ?
+            """
+            result = db.execute_query(mov_query, (hoje.strftime("%Y-%m-%d"), amanha.strftime("%Y-%m-%d")))
             stats["movimentacoes_hoje"] = result[0]["total"] if result else 0
             
             return stats
@@ -329,7 +510,10 @@ class ReportGenerator:
             return {}
 
 
-# Instância global
-report_generator = ReportGenerator()
+# Instância global (no modo cliente, os relatórios rodam no servidor de estoque)
+if is_client():
+    report_generator = RemoteService("report_generator")
+else:
+    report_generator = ReportGenerator()
 
 # Updated: 2025-10-14 14:28:20